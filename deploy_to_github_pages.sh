@@ -1,6 +1,10 @@
 #!/bin/bash
 # Deploy Training Guides to GitHub Pages
 # Copies guides from races/ to docs/guides/ with normalized URLs
+#
+# Usage:
+#   ./deploy_to_github_pages.sh              # guides keep their embedded CSS/JS
+#   ./deploy_to_github_pages.sh --optimize   # + shared hashed CSS/JS, minified, precompressed (guide_assets.py)
 
 set -e
 
@@ -109,6 +113,13 @@ done
 
 echo ""
 echo "✅ Deployed $GUIDE_COUNT guides to docs/guides/"
+
+if [ "$1" = "--optimize" ]; then
+    echo ""
+    echo "📦 Linking shared assets and compressing guides..."
+    python3 guide_assets.py docs/guides --compress --prune
+fi
+
 echo ""
 echo "📝 URL mapping saved to: $URL_MAPPING"
 echo ""
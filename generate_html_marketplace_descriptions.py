@@ -2,43 +2,32 @@
 """
 TRAININGPEAKS MARKETPLACE DESCRIPTION GENERATOR - HTML VERSION
 Uses tier-specific variation pools with proper HTML formatting
+
+Generation is deterministic and parallel-safe: every plan draws from its own
+random.Random (seeded from race, tier and variation), and openings, stories,
+closings and alternatives are assigned to plans up front by
+allocate_content() so no two plans share one. Nothing touches the global
+random state.
+
+Usage:
+    python generate_html_marketplace_descriptions.py
+    python generate_html_marketplace_descriptions.py --jobs 4
 """
 
-import random
+import argparse
 import hashlib
+import os
+import random
 import re
-from TIER_SPECIFIC_SOLUTION_STATE_V3 import SOLUTION_STATE_OPENINGS
-from TIER_SPECIFIC_CHOICE_FEATURES import CHOICE_FEATURES
-from TIER_SPECIFIC_GUIDE_TOPICS_FINAL import GUIDE_TOPICS
-from ALTERNATIVE_HOOKS_BEHAVIORAL import ALTERNATIVES, MASTERS_ALTERNATIVES
-from TIER_SPECIFIC_STORY_JUSTIFICATIONS import STORY_JUSTIFICATIONS
-from TIER_SPECIFIC_VALUE_PROP_BOXES import VALUE_PROP_BOXES
-from GUIDE_INTRIGUE_LINES import GUIDE_INTRIGUE_LINES
-from SMR_SPECIFIC_VARIATIONS import (
-    SMR_OPENINGS, SMR_STORY_JUSTIFICATIONS, SMR_FEATURES, 
-    SMR_GUIDE_TOPICS, SMR_ALTERNATIVES, SMR_CLOSINGS, SMR_VALUE_PROP_BOXES
+from concurrent.futures import ProcessPoolExecutor
+from variation_pools import (
+    is_masters_content, VariationPool, as_pool, compile_pools, get_item, mask_of,
+    OPENING_POOLS, STORY_POOLS, FEATURE_POOLS, GUIDE_TOPIC_POOLS, VALUE_PROP_POOLS,
+    ALTERNATIVE_POOLS, MASTERS_ALTERNATIVE_POOLS, GUIDE_INTRIGUE_POOL,
+    SMR_OPENING_POOL, SMR_STORY_POOLS, SMR_FEATURE_POOL, SMR_GUIDE_TOPIC_POOL,
+    SMR_ALTERNATIVE_POOL, SMR_CLOSING_POOLS, SMR_VALUE_PROP_POOLS
 )
-
-# Helper functions to extract content from HTML (same as validate_descriptions.py)
-def extract_opening_from_html(html):
-    """Extract opening paragraph from HTML."""
-    match = re.search(r'<p style="margin:0;font-size:24px;font-weight:700;line-height:1.3">([^<]+)</p>', html)
-    return match.group(1) if match else ""
-
-def extract_story_from_html(html):
-    """Extract story justification paragraph from HTML."""
-    match = re.search(r'<div style="margin-bottom:14px">\s*<p style="margin:0;font-size:16px">([^<]+)</p>', html)
-    return match.group(1) if match else ""
-
-def extract_closing_from_html(html):
-    """Extract closing statement from HTML."""
-    match = re.search(r'<p style="margin:0;font-size:16px">(This is |Built for |Designed for |Unbound)[^<]+</p>', html)
-    return match.group(1) if match else ""
-
-def extract_alternative_from_html(html):
-    """Extract alternative hook paragraph from HTML."""
-    match = re.search(r'<h3[^>]*>Alternative\?</h3>\s*<p style="margin:0;font-size:16px">([^<]+)</p>', html)
-    return match.group(1) if match else ""
+from validate_descriptions import NEAR_DUPLICATE_THRESHOLD, estimated_similarity, minhash_signature
 
 # ============================================================================
 # TIER CONFIGURATION
@@ -113,6 +102,8 @@ CLOSING_STATEMENTS = {
     ]
 }
 
+CLOSING_POOLS = compile_pools("CLOSING_STATEMENTS", CLOSING_STATEMENTS)
+
 # Race-specific context
 RACE_CONTEXT = {
     "unbound_200": {
@@ -175,106 +166,237 @@ HTML_TEMPLATE = """<div style="font-family:'Courier New',monospace;color:#111;ma
 # MASTERS-AWARE SELECTION
 # ============================================================================
 
-def is_masters_content(item):
+# Pools are compiled at import (see variation_pools): each variation is
+# classified once, and selection works on ID bitsets
+
+def filter_masters(pool, is_masters_plan):
     """
-    Check if a variation contains Masters-specific content.
-    
-    Masters content typically includes:
-    - Age references: 45+, 50+, age, older, veteran
-    - Age-specific training: recovery protocols, adaptation timelines
-    - Age-related language: "at your age", "as you age"
-    
-    Args:
-        item: Can be a string (for most variations) or dict (for value prop boxes)
+    Masters plans get ONLY Masters variations; non-Masters plans get none.
+
+    Falls back to the full pool if filtering removes everything (shouldn't happen).
     """
-    if not item:
-        return False
-    
-    # Handle dict (value prop boxes)
-    if isinstance(item, dict):
-        # Check both philosophy and props
-        text = item.get('philosophy', '') + ' ' + ' '.join(item.get('props', []))
-    else:
-        # Handle string
-        text = item
-    
-    if not text:
-        return False
-    
-    text_lower = text.lower()
-    
-    # Direct age references
-    age_keywords = ['45+', '50+', 'age', 'older', 'veteran', 'masters']
-    if any(keyword in text_lower for keyword in age_keywords):
-        return True
-    
-    # Age-specific training language
-    age_training_patterns = [
-        'recovery protocols for',
-        'adaptation timeline',
-        'adaptation windows',
-        'longer recovery',
-        'age-appropriate',
-        'at your age',
-        'as you age',
-        'recovery isn\'t optional',
-        'recovery becomes the primary',
-        'recovery architecture',
-        'recovery-first',
-        'injury prevention',
-        'hrv monitoring',
-        'hrv-based'
-    ]
-    if any(pattern in text_lower for pattern in age_training_patterns):
-        return True
-    
-    return False
+    pool = as_pool(pool)
+    return pool.items(pool.partition(is_masters_plan))
 
-def select_masters_aware(pool, is_masters_plan, k=1):
+def select_masters_aware(pool, is_masters_plan, k=1, *, rng):
     """
     Select from variation pool with Masters-aware filtering.
-    
+
     Args:
-        pool: List of variations to select from
+        pool: VariationPool (or list of variations) to select from
         is_masters_plan: True if this is a Masters plan, False otherwise
-        k: Number of items to select (for random.sample)
-    
+        k: Number of items to select (for rng.sample)
+        rng: random.Random instance to draw from (required keyword, so no caller
+            silently falls back to the global random state)
+
     Returns:
         Selected item(s) - single item if k=1, list if k>1
     """
+    pool = as_pool(pool)
     if not pool:
         return None if k == 1 else []
-    
-    # Filter pool based on Masters status
-    if is_masters_plan:
-        # Masters plans: ONLY select from Masters variations
-        filtered_pool = [item for item in pool if is_masters_content(item)]
-        # If no Masters variations found, fall back to all (shouldn't happen)
-        if not filtered_pool:
-            filtered_pool = pool
-    else:
-        # Non-Masters plans: EXCLUDE Masters variations
-        filtered_pool = [item for item in pool if not is_masters_content(item)]
-        # If filtering removes everything, fall back to all (shouldn't happen)
-        if not filtered_pool:
-            filtered_pool = pool
-    
-    # Select from filtered pool
+
+    mask = pool.partition(is_masters_plan)
     if k == 1:
-        return random.choice(filtered_pool) if filtered_pool else None
+        return pool.choice(rng, mask)
+    return pool.sample(rng, k, mask)
+
+# ============================================================================
+# CONTENT POOLS & ALLOCATION
+# ============================================================================
+
+# Slots that must be unique across all plans of a race
+ALLOCATED_SLOTS = ("opening", "story", "closing", "alternative")
+
+DEFAULT_ALTERNATIVE = "Or you could keep training without structure."
+
+EMPTY_POOL = VariationPool("<empty>", [])
+
+def alternative_pool(tier, variation):
+    """Alternative hooks for a regular (non-SMR) plan: Masters pool or tier_level pool"""
+    if "masters" in variation.lower():
+        return MASTERS_ALTERNATIVE_POOLS.get(f"{tier}_masters", EMPTY_POOL)
+
+    # Non-Masters: use tier + level from variation
+    if variation == "elite":
+        alt_key = f"{tier}_advanced"  # Elite uses advanced pool
+    elif variation in ["beginner", "intermediate", "advanced"]:
+        alt_key = f"{tier}_{variation}"
     else:
-        # For sample, ensure we don't request more than available
-        sample_size = min(k, len(filtered_pool))
-        return random.sample(filtered_pool, sample_size) if filtered_pool else []
+        # Fallback based on tier defaults
+        alt_key = {
+            "ayahuasca": "ayahuasca_beginner",
+            "finisher": "finisher_intermediate",
+            "compete": "compete_intermediate"
+        }.get(tier, "podium_advanced")
+    alt_pool = ALTERNATIVE_POOLS.get(alt_key)
+    if not alt_pool:
+        # Fallback if key not found
+        fallback_key = f"{tier}_intermediate" if tier != "podium" else "podium_advanced"
+        alt_pool = ALTERNATIVE_POOLS.get(fallback_key, EMPTY_POOL)
+    return alt_pool
+
+def content_pools(tier, variation):
+    """
+    Candidate variations for each allocated slot of one plan
+
+    Save My Race plans draw ONLY from SMR pools (different product, different
+    positioning), preferring variations without age-related wording. Regular
+    plans must name the plan in their story, so story variations with
+    {plan_name} are preferred; any other story is only a fallback.
+
+    Returns:
+        dict: slot (see ALLOCATED_SLOTS) -> (VariationPool, candidate bitset,
+        preferred bitset); preferred is the subset of candidates to use first
+    """
+    if "save_my_race" in variation.lower():
+        story_pool = SMR_STORY_POOLS.get(tier, EMPTY_POOL)
+        closing_pool = SMR_CLOSING_POOLS.get(tier) or next(iter(SMR_CLOSING_POOLS.values()), EMPTY_POOL)
+        return {
+            slot: (pool, pool.mask, pool.partition(False))
+            for slot, pool in (("opening", SMR_OPENING_POOL), ("story", story_pool),
+                               ("closing", closing_pool), ("alternative", SMR_ALTERNATIVE_POOL))
+        }
+
+    is_masters_plan = "masters" in variation.lower()
+    opening_pool = OPENING_POOLS[tier]
+    story_pool = STORY_POOLS[tier]
+    closing_pool = CLOSING_POOLS[tier]
+    alt_pool = alternative_pool(tier, variation)
+    openings = opening_pool.partition(is_masters_plan)
+    # Positioning trumps Masters content: stories use the non-Masters partition
+    stories = story_pool.partition(False)
+    return {
+        "opening": (opening_pool, openings, openings),
+        "story": (story_pool, stories, story_pool.with_placeholder('{plan_name}', stories)),
+        "closing": (closing_pool, closing_pool.mask, closing_pool.mask),  # No Masters variations in closings
+        "alternative": (alt_pool, alt_pool.mask, alt_pool.mask)
+    }
+
+def seed_for_plan(race_name, tier, variation):
+    """Stable per-plan seed string, e.g. "unbound_gravel_200_finisher_beginner_1a2b3c4d" """
+    plan_id = f"{race_name.lower().replace(' ', '_')}_{tier}_{variation}"
+    seed_hash = hashlib.md5(plan_id.encode()).hexdigest()
+    return f"{plan_id}_{seed_hash[:8]}"
+
+def match_plans(preferences):
+    """
+    Maximum bipartite matching of plans to content (augmenting paths).
+
+    Plans are matched in order and take their most preferred free key, so
+    the result equals a greedy pass whenever greedy works; earlier plans
+    are only moved to another key when a later plan would otherwise go
+    without.
+
+    Args:
+        preferences: One list of candidate keys per plan, most preferred first
+
+    Returns:
+        list: Matched key per plan (None if the plan couldn't be matched)
+    """
+    owner = {}
+
+    def assign(plan, seen):
+        for key in preferences[plan]:
+            if key not in owner:
+                owner[key] = plan
+                return True
+        # No free key: move the owner of one of ours to another key
+        for key in preferences[plan]:
+            if key in seen:
+                continue
+            seen.add(key)
+            if assign(owner[key], seen):
+                owner[key] = plan
+                return True
+        return False
+
+    for plan in range(len(preferences)):
+        assign(plan, set())
+
+    matched = [None] * len(preferences)
+    for key, plan in owner.items():
+        matched[plan] = key
+    return matched
+
+def allocate_content(plans, race_name):
+    """
+    Assign openings, stories, closings and alternatives to every plan up front.
+
+    Each slot is solved as one matching between plans and their candidate
+    variations, so no two plans share content whenever the pools allow it.
+    Candidates are shuffled with each plan's own seed first (preferred
+    candidates ahead of the rest, see content_pools), which keeps the
+    assignment varied but reproducible. Closings keep pool order, as before.
+    Variations that render identically, or that validate_descriptions would
+    flag as near-duplicates, share one key, so they count as the same content.
+
+    Args:
+        plans: List of (tier, variation)
+        race_name: e.g., "Unbound Gravel 200"
+
+    Returns:
+        tuple: ({(tier, variation): {slot: template}}, [(tier, variation, slot) reused])
+    """
+    allocation = {plan: {} for plan in plans}
+    conflicts = []
+
+    for slot in ALLOCATED_SLOTS:
+        preferences = []
+        own_ids = []  # Per plan: key -> the plan's own variation for that key
+        keys = {}
+        signatures = []
+
+        def content_key(variation_id):
+            """First variation ID with the same or near-duplicate rendered text"""
+            if variation_id not in keys:
+                signature = minhash_signature(get_item(variation_id).format(race_name=race_name, plan_name=""))
+                keys[variation_id] = next(
+                    (key for key, other in signatures
+                     if estimated_similarity(signature, other) >= NEAR_DUPLICATE_THRESHOLD),
+                    variation_id)
+                if keys[variation_id] == variation_id:
+                    signatures.append((variation_id, signature))
+            return keys[variation_id]
+
+        for tier, variation in plans:
+            pool, mask, preferred = content_pools(tier, variation)[slot]
+            if slot == "closing":
+                ids = pool.ids_in(mask)
+            else:
+                # Preferred candidates first, the rest only as a fallback
+                rng = random.Random(f"{seed_for_plan(race_name, tier, variation)}_{slot}")
+                ids = []
+                for group in (preferred, mask & ~preferred):
+                    group_ids = pool.ids_in(group)
+                    rng.shuffle(group_ids)
+                    ids.extend(group_ids)
+            own = {}
+            for variation_id in ids:
+                own.setdefault(content_key(variation_id), variation_id)
+            preferences.append(list(own))
+            own_ids.append(own)
+
+        matched = match_plans(preferences)
+        for plan, own, key in zip(plans, own_ids, matched):
+            if key is not None:
+                allocation[plan][slot] = get_item(own[key])
+            elif own:
+                # Pool too small for every plan: reuse this plan's first choice
+                allocation[plan][slot] = get_item(next(iter(own.values())))
+                conflicts.append((*plan, slot))
+
+    return allocation, conflicts
 
 # ============================================================================
 # GENERATION LOGIC
 # ============================================================================
 
-def generate_html_description(tier, race_name, plan_seed, variation="", forced_closing=None, used_content=None):
+def generate_html_description(tier, race_name, plan_seed, variation="", forced_closing=None, used_content=None,
+                              rng=None, allocation=None):
     """
     Generate HTML marketplace description with tier-specific variations
-    
+
     Args:
         tier: One of ["ayahuasca", "finisher", "compete", "podium"]
         race_name: e.g., "Unbound Gravel 200"
@@ -282,125 +404,86 @@ def generate_html_description(tier, race_name, plan_seed, variation="", forced_c
         variation: Optional plan variation (e.g., "intermediate", "beginner_masters")
         forced_closing: Optional closing statement template to force (for uniqueness)
         used_content: Optional dict of used content sets to exclude from selection
-    
+        rng: Optional random.Random to draw from (default: random.Random(plan_seed))
+        allocation: Optional {slot: template} from allocate_content(); allocated
+            slots are used as-is instead of being drawn
+
     Returns:
         Complete HTML description string
     """
-    
+
     # Validate tier
     if tier not in TIER_SPECS:
         raise ValueError(f"Invalid tier: {tier}. Must be one of {list(TIER_SPECS.keys())}")
-    
-    # Set seed for reproducible randomization
-    random.seed(plan_seed)
-    
+
+    # Per-plan generator for reproducible randomization (never the global random state)
+    if rng is None:
+        rng = random.Random(plan_seed)
+
+    allocated = dict(allocation or {})
+    if forced_closing:
+        allocated["closing"] = forced_closing
+
     # Determine if this is a Save My Race plan (CRITICAL: Different product, different positioning)
     is_save_my_race = "save_my_race" in variation.lower()
-    
+
     # Determine if this is a Masters plan
     is_masters_plan = "masters" in variation.lower()
-    
-    # Helper to select from pool excluding used content
-    def select_excluding_used(pool, is_masters, used_set, k=1):
-        """Select from pool excluding items in used_set"""
-        # First filter by Masters
-        filtered = select_masters_aware(pool, is_masters, k=len(pool))
-        if isinstance(filtered, list):
-            available = [item for item in filtered if item not in used_set]
-        else:
-            available = [filtered] if filtered and filtered not in used_set else []
-        
-        if not available:
-            # Fallback: use all filtered if nothing available
-            available = filtered if isinstance(filtered, list) else [filtered]
-        
-        if k == 1:
-            return random.choice(available) if available else None
-        else:
-            return random.sample(available, min(k, len(available))) if available else []
-    
-    # Helper to select variation with required placeholder (guaranteed positioning)
-    def select_variation_with_placeholder(pool, is_masters, required_placeholder, used_set):
-        """
-        Select variation containing required placeholder.
-        Guarantees critical positioning elements appear.
-        Falls back to any available variation if none contain placeholder.
-        """
-        # First filter by Masters
-        filtered = select_masters_aware(pool, is_masters, k=len(pool))
-        if isinstance(filtered, list):
-            available = [item for item in filtered if item not in used_set]
-        else:
-            available = [filtered] if filtered and filtered not in used_set else []
-        
-        if not available:
-            # Fallback: use all filtered if nothing available
-            available = filtered if isinstance(filtered, list) else [filtered]
-        
-        # Prioritize variations with required placeholder
-        with_placeholder = [item for item in available if required_placeholder in item]
-        
-        if with_placeholder:
-            return random.choice(with_placeholder)
-        else:
-            # Fallback: select any available variation
-            return random.choice(available) if available else None
-    
-    # Get used content sets (default to empty if not provided)
-    used_opening = used_content.get('opening', set()) if used_content else set()
-    used_story = used_content.get('story', set()) if used_content else set()
-    used_alternative = used_content.get('alternative', set()) if used_content else set()
-    used_features = used_content.get('features', set()) if used_content else set()
-    
+
+    pools = content_pools(tier, variation)
+
+    # Used content as ID bitsets (default to none used)
+    used = {slot: mask_of(items) for slot, items in (used_content or {}).items()}
+
+    def select_slot(slot):
+        """Allocated template for slot, else a draw from its pool excluding used content"""
+        if slot in allocated:
+            return allocated[slot]
+        pool, mask, preferred = pools[slot]
+        # Fallback: use the whole candidate set if everything is used
+        available = (mask & ~used.get(slot, 0)) or mask
+        return pool.choice(rng, (available & preferred) or available)
+
     # ========================================================================
     # SAVE MY RACE: COMPLETELY DIFFERENT POSITIONING (salvage/urgency, not performance)
     # ========================================================================
     if is_save_my_race:
         # SMR plans use ONLY SMR-specific variations
         # NOT regular tier variations (different product, different positioning)
-        
+
         # Select SMR opening (salvage/urgency, 6 weeks)
-        available_openings = [op for op in SMR_OPENINGS if op not in used_opening]
-        solution_state = random.choice(available_openings) if available_openings else random.choice(SMR_OPENINGS)
-        used_opening.add(solution_state)
-        
+        solution_state = select_slot("opening")
+
         # Select SMR story (tier-specific, triage, minimum viable, sufficient not perfect)
-        smr_stories = SMR_STORY_JUSTIFICATIONS.get(tier, [])
-        available_stories = [s for s in smr_stories if s not in used_story]
-        story_justification = random.choice(available_stories) if available_stories else random.choice(smr_stories) if smr_stories else "The {plan_name} is built for this exact situation: compressed timeline, race-critical focus, emergency protocols."
-        used_story.add(story_justification)
-        
-        # Format SMR placeholders immediately (before plan_name is generated)
-        # We'll format again later, but this ensures placeholders are handled
-        
-        # Select SMR features (6-week timeline, race-critical focus, emergency protocols)
-        available_features = [f for f in SMR_FEATURES if f not in used_features]
-        choice_features_list = random.sample(available_features, min(3, len(available_features))) if len(available_features) >= 3 else available_features
-        for f in choice_features_list:
-            used_features.add(f)
-        
+        story_justification = select_slot("story") or "The {plan_name} is built for this exact situation: compressed timeline, race-critical focus, emergency protocols."
+
+        # Select SMR features (6-week timeline, race-critical focus, emergency protocols),
+        # avoiding age-related wording ("triage") while enough other features are unused
+        available_features = SMR_FEATURE_POOL.mask & ~used.get('features', 0)
+        preferred_features = available_features & SMR_FEATURE_POOL.partition(False)
+        if len(SMR_FEATURE_POOL.ids_in(preferred_features)) >= 3:
+            choice_features_list = SMR_FEATURE_POOL.sample(rng, 3, preferred_features)
+        elif len(SMR_FEATURE_POOL.ids_in(available_features)) >= 3:
+            choice_features_list = SMR_FEATURE_POOL.sample(rng, 3, available_features)
+        else:
+            choice_features_list = SMR_FEATURE_POOL.items(available_features)
+
         # Select SMR guide topics (6-week arc, triage, emergency)
-        guide_topics_list = random.sample(SMR_GUIDE_TOPICS, min(3, len(SMR_GUIDE_TOPICS)))
-        
+        guide_topics_list = SMR_GUIDE_TOPIC_POOL.sample(rng, 3, SMR_GUIDE_TOPIC_POOL.partition(False))
+
         # Select SMR alternative (defer or cram)
-        available_alternatives = [a for a in SMR_ALTERNATIVES if a not in used_alternative]
-        alternative_hook = random.choice(available_alternatives) if available_alternatives else random.choice(SMR_ALTERNATIVES)
-        used_alternative.add(alternative_hook)
-        
+        alternative_hook = select_slot("alternative")
+
         # Select SMR closing (haven't been training, don't defer, 6 weeks)
-        if forced_closing:
-            closing_statement = forced_closing
-        else:
-            available_closings = [c for c in SMR_CLOSINGS if c not in used_content.get('closing', set())]
-            closing_statement = random.choice(available_closings) if available_closings else random.choice(SMR_CLOSINGS)
-        
-        guide_intrigue = random.choice(GUIDE_INTRIGUE_LINES)  # Not tier-specific
-        
+        closing_statement = select_slot("closing")
+
+        guide_intrigue = GUIDE_INTRIGUE_POOL.choice(rng)  # Not tier-specific
+
         # SMR value prop box (tier-specific, use SMR-specific, NOT regular tier variations)
-        smr_value_props = SMR_VALUE_PROP_BOXES.get(tier, [])
+        smr_value_props = SMR_VALUE_PROP_POOLS.get(tier, EMPTY_POOL)
         if smr_value_props:
             # Convert string to dict format for consistency
-            value_prop_philosophy = random.choice(smr_value_props)
+            value_prop_philosophy = smr_value_props.choice(rng, smr_value_props.partition(False))
             value_prop_box = {
                 "philosophy": value_prop_philosophy,
                 "props": ["Emergency mental preparation protocols", "Triage system: what matters most", "Minimum viable fitness approach", "Six-week compressed timeline"]
@@ -411,7 +494,7 @@ def generate_html_description(tier, race_name, plan_seed, variation="", forced_c
                 "philosophy": "Six weeks isn't enough for perfect preparation. But it's enough to finish.",
                 "props": ["Emergency protocols", "Triage approach", "Minimum viable fitness", "Six-week timeline"]
             }
-    
+
     # ========================================================================
     # REGULAR PLANS: Standard tier-specific positioning
     # ========================================================================
@@ -421,92 +504,42 @@ def generate_html_description(tier, race_name, plan_seed, variation="", forced_c
         # ========================================================================
         # Positioning requirements trump content filtering.
         # Tier-specific positioning > Masters content specificity
-        
+
         # GUARANTEED POSITIONING: Story must contain {plan_name} for full designation
-        # Use FULL pool (not Masters-filtered) to ensure placeholder variations exist
-        story_justification = select_variation_with_placeholder(
-            STORY_JUSTIFICATIONS[tier],  # Full pool, no Masters filtering
-            False,  # Don't filter for Masters - we need positioning first
-            '{plan_name}', 
-            used_story
-        )
-        used_story.add(story_justification)
-        
+        # (content_pools prefers those variations while any is unused)
+        story_justification = select_slot("story")
+
         # GUARANTEED POSITIONING: First feature must contain {race_name} for race-specificity
         # Use FULL pool (not Masters-filtered) to ensure placeholder variations exist
-        first_feature = select_variation_with_placeholder(
-            CHOICE_FEATURES[tier],  # Full pool, no Masters filtering
-            False,  # Don't filter for Masters - we need positioning first
-            '{race_name}',
-            used_features
-        )
-        used_features.add(first_feature)
-        choice_features_list = [first_feature]
-        
+        feature_pool = FEATURE_POOLS[tier]
+        first_feature_id = rng.choice(feature_pool.ids_in(
+            feature_pool.with_placeholder('{race_name}', feature_pool.partition(False))))
+        choice_features_list = [get_item(first_feature_id)]
+        chosen_features = 1 << first_feature_id
+
         # ========================================================================
         # PHASE 2: REMAINING VARIATIONS (Masters-filtered for content appropriateness)
         # ========================================================================
         # Now that positioning is guaranteed, filter remaining selections for Masters content
-        
+
         # Select other components with Masters filtering
-        solution_state = select_excluding_used(SOLUTION_STATE_OPENINGS[tier], is_masters_plan, used_opening, k=1)
-        guide_topics_list = select_masters_aware(GUIDE_TOPICS[tier], is_masters_plan, k=3)
-        guide_intrigue = random.choice(GUIDE_INTRIGUE_LINES)  # Not tier-specific, no Masters filtering needed
-        
-        # Select alternative from correct pool (Masters vs non-Masters)
-        # Build key: tier_level for non-Masters, tier_masters for Masters
-        if is_masters_plan:
-            alt_key = f"{tier}_masters"
-            alt_pool = MASTERS_ALTERNATIVES.get(alt_key, [])
-        else:
-            # Non-Masters: use tier + level from variation
-            # Handle special cases: elite -> advanced, save_my_race uses SMR_ALTERNATIVES (handled separately)
-            if variation == "elite":
-                alt_key = f"{tier}_advanced"  # Elite uses advanced pool
-            elif variation in ["beginner", "intermediate", "advanced"]:
-                alt_key = f"{tier}_{variation}"
-            else:
-                # Fallback based on tier defaults
-                if tier == "ayahuasca":
-                    alt_key = "ayahuasca_beginner"
-                elif tier == "finisher":
-                    alt_key = "finisher_intermediate"
-                elif tier == "compete":
-                    alt_key = "compete_intermediate"
-                else:  # podium
-                    alt_key = "podium_advanced"
-            alt_pool = ALTERNATIVES.get(alt_key, [])
-        
-        # Select from pool excluding used
-        if alt_pool:
-            available_alternatives = [a for a in alt_pool if a not in used_alternative]
-            alternative_hook = random.choice(available_alternatives) if available_alternatives else random.choice(alt_pool)
-        else:
-            # Fallback if key not found
-            fallback_key = f"{tier}_intermediate" if tier != "podium" else "podium_advanced"
-            fallback_pool = ALTERNATIVES.get(fallback_key, [])
-            available_alternatives = [a for a in fallback_pool if a not in used_alternative]
-            alternative_hook = random.choice(available_alternatives) if available_alternatives else (random.choice(fallback_pool) if fallback_pool else "Or you could keep training without structure.")
-        used_alternative.add(alternative_hook)
-        
-        # Remaining features: Masters-filtered random selection
+        solution_state = select_slot("opening")
+        guide_topics_list = select_masters_aware(GUIDE_TOPIC_POOLS[tier], is_masters_plan, k=3, rng=rng)
+        guide_intrigue = GUIDE_INTRIGUE_POOL.choice(rng)  # Not tier-specific, no Masters filtering needed
+
+        # Select alternative from correct pool (Masters vs non-Masters, see alternative_pool)
+        alternative_hook = select_slot("alternative") or DEFAULT_ALTERNATIVE
+
+        # Remaining features: Masters-filtered random selection, no repeats within the plan
+        available_features = feature_pool.partition(is_masters_plan)
         for i in range(2):  # Need 2 more features (already have first one)
-            available_features = select_masters_aware(CHOICE_FEATURES[tier], is_masters_plan, k=len(CHOICE_FEATURES[tier]))
-            if isinstance(available_features, list):
-                available = [f for f in available_features if f not in used_features]
-                feature = random.choice(available) if available else random.choice(available_features)
-            else:
-                feature = available_features
-            choice_features_list.append(feature)
-            used_features.add(feature)
-        
-        # Use forced closing if provided, otherwise random
-        if forced_closing:
-            closing_statement = forced_closing
-        else:
-            closing_statement = random.choice(CLOSING_STATEMENTS[tier])  # No Masters variations in closings
-        
-        value_prop_box = select_masters_aware(VALUE_PROP_BOXES[tier], is_masters_plan, k=1)
+            feature_id = rng.choice(feature_pool.ids_in((available_features & ~chosen_features) or available_features))
+            choice_features_list.append(get_item(feature_id))
+            chosen_features |= 1 << feature_id
+
+        closing_statement = select_slot("closing")
+
+        value_prop_box = select_masters_aware(VALUE_PROP_POOLS[tier], is_masters_plan, k=1, rng=rng)
     
     # Get tier specs
     specs = TIER_SPECS[tier]
@@ -641,106 +674,59 @@ def format_as_prose(items):
 # BATCH GENERATION
 # ============================================================================
 
-def generate_all_html_descriptions(race_name="Unbound Gravel 200", output_dir="output/html_descriptions"):
-    """Generate HTML descriptions for all 15 plans with deduplication"""
-    
-    import os
-    import hashlib
-    os.makedirs(output_dir, exist_ok=True)
-    
-    # Plan variations (matches your 15 TrainingPeaks plans)
-    plan_mapping = {
-        "ayahuasca": ["beginner", "intermediate", "beginner_masters", "save_my_race"],
-        "finisher": ["beginner", "intermediate", "advanced", "intermediate_masters", "save_my_race"],
-        "compete": ["intermediate", "advanced", "intermediate_masters", "save_my_race"],
-        "podium": ["advanced", "elite"]
-    }
-    
-    # Track used content to prevent duplicates
-    used_content = {
-        'opening': set(),
-        'story': set(),
-        'closing': set(),
-        'alternative': set()
-    }
-    
-    # Track used closings globally (after formatting) to ensure uniqueness across all tiers
-    used_closings_global = set()  # Track formatted closings across all tiers
+# Plan variations (matches your 15 TrainingPeaks plans)
+PLAN_MAPPING = {
+    "ayahuasca": ["beginner", "intermediate", "beginner_masters", "save_my_race"],
+    "finisher": ["beginner", "intermediate", "advanced", "intermediate_masters", "save_my_race"],
+    "compete": ["intermediate", "advanced", "intermediate_masters", "save_my_race"],
+    "podium": ["advanced", "elite"]
+}
+
+def iter_plans(plan_mapping=None):
+    """Yield (tier, variation) for every plan, in catalogue order"""
+    for tier, variations in (plan_mapping or PLAN_MAPPING).items():
+        for variation in variations:
+            yield tier, variation
+
+def render_plan(race_name, tier, variation, allocation):
+    """Generate one plan's description with its own seeded generator (safe to run in a worker)"""
+    plan_seed = seed_for_plan(race_name, tier, variation)
+    return generate_html_description(tier, race_name, plan_seed, variation,
+                                     rng=random.Random(plan_seed), allocation=allocation)
+
+def generate_all_html_descriptions(race_name="Unbound Gravel 200", output_dir="output/html_descriptions",
+                                   jobs=1, plan_mapping=None):
+    """
+    Generate HTML descriptions for all 15 plans with deduplication
+
+    Unique content is allocated across plans first (allocate_content), so each
+    plan renders independently and the output is identical for any `jobs`.
+    """
+    plans = list(iter_plans(plan_mapping))
+    allocation, conflicts = allocate_content(plans, race_name)
+    for tier, variation, slot in conflicts:
+        print(f"⚠️  Not enough unique {slot} variations: {tier}_{variation} reuses one")
+    
+    render_args = [(race_name, tier, variation, allocation[(tier, variation)]) for tier, variation in plans]
+    if jobs > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            rendered = list(executor.map(render_plan, *zip(*render_args)))
+    else:
+        rendered = [render_plan(*args) for args in render_args]
     
     generated = []
-    max_attempts = 200  # Maximum regeneration attempts per plan (increased for better uniqueness)
-    plan_index = 0  # Global plan counter for deterministic selection
-    
-    for tier, variations in plan_mapping.items():
+    for (tier, variation), html in zip(plans, rendered):
         tier_dir = os.path.join(output_dir, tier)
         os.makedirs(tier_dir, exist_ok=True)
         
-        for variation in variations:
-            plan_index += 1
-            # Create unique seed using hash for better distribution
-            plan_id = f"{race_name.lower().replace(' ', '_')}_{tier}_{variation}"
-            seed_hash = hashlib.md5(plan_id.encode()).hexdigest()
-            seed = f"{plan_id}_{seed_hash[:8]}"
-            
-            # Pre-select a unique closing for this plan
-            # SMR plans use SMR_CLOSINGS, regular plans use CLOSING_STATEMENTS[tier]
-            is_save_my_race = "save_my_race" in variation.lower()
-            
-            if is_save_my_race:
-                # SMR plans: use tier-specific SMR closings
-                closing_pool = SMR_CLOSINGS.get(tier, [])
-                if not closing_pool:
-                    # Fallback to first tier available
-                    closing_pool = list(SMR_CLOSINGS.values())[0] if SMR_CLOSINGS else []
-            else:
-                # Regular plans: use tier-specific closings
-                closing_pool = CLOSING_STATEMENTS[tier]
-            
-            selected_closing_template = None
-            for closing_template in closing_pool:
-                formatted_closing = closing_template.format(race_name=race_name)
-                if formatted_closing not in used_closings_global:
-                    selected_closing_template = closing_template
-                    used_closings_global.add(formatted_closing)
-                    break
-            
-            # If all closings for this tier are duplicates, use the first one anyway
-            # (This shouldn't happen with diverse closing pools, but provides fallback)
-            if not selected_closing_template:
-                selected_closing_template = closing_pool[0]
-                formatted_closing = selected_closing_template.format(race_name=race_name)
-                used_closings_global.add(formatted_closing)
-            
-            # Generate with forced closing and active deduplication
-            # Pass used_content to generator so it can exclude used items BEFORE selection
-            attempt_seed = seed
-            random.seed(attempt_seed)
-            html = generate_html_description(tier, race_name, attempt_seed, variation, forced_closing=selected_closing_template, used_content=used_content)
-            
-            # Extract and track content (generator already excluded used items, so these should be unique)
-            opening = extract_opening_from_html(html)
-            story = extract_story_from_html(html)
-            closing = extract_closing_from_html(html)
-            alternative = extract_alternative_from_html(html)
-            
-            # Track used content (generator should have already excluded these, but verify)
-            if opening:
-                used_content['opening'].add(opening)
-            if story:
-                used_content['story'].add(story)
-            if closing:
-                used_content['closing'].add(closing)
-            if alternative:
-                used_content['alternative'].add(alternative)
-            
-            filename = f"{tier}_{variation}.html"
-            filepath = os.path.join(tier_dir, filename)
-            
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(html)
-            
-            generated.append(filename)
-            print(f"✓ Generated: {filename}")
+        filename = f"{tier}_{variation}.html"
+        filepath = os.path.join(tier_dir, filename)
+        
+        with open(filepath, 'w', encoding='utf-8') as f:
+            f.write(html)
+        
+        generated.append(filename)
+        print(f"✓ Generated: {filename}")
     
     print(f"\n✓ Total generated: {len(generated)} HTML descriptions")
     print(f"✓ Output directory: {output_dir}")
@@ -752,6 +738,13 @@ def generate_all_html_descriptions(race_name="Unbound Gravel 200", output_dir="o
 # ============================================================================
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate TrainingPeaks marketplace HTML descriptions")
+    parser.add_argument("--race-name", default="Unbound Gravel 200")
+    parser.add_argument("--output-dir", default="output/html_descriptions")
+    parser.add_argument("--jobs", "-j", type=int, default=1,
+                        help="Number of worker processes (output is identical for any value)")
+    args = parser.parse_args()
+    
     # Test single generation
     print("Testing HTML generation...\n")
     
@@ -772,4 +765,4 @@ if __name__ == "__main__":
     # Generate all 15
     print("\n\nGenerating all 15 HTML descriptions...")
     print("=" * 80)
-    generate_all_html_descriptions()
+    generate_all_html_descriptions(args.race_name, args.output_dir, jobs=args.jobs)
@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+"""
+GUIDE ASSET OPTIMIZER
+=====================
+Deploy-time output mode for the guides under docs/guides/<race>/.
+
+Every guide embeds the same stylesheet and scripts. This pass moves each
+<style>/<script> block that two or more guides share into one
+content-hashed asset (docs/guides/assets/guide.<hash>.css / .js), written
+once per deploy and linked from every guide that used it - readers
+download it once and cache it for good, since any change gets a new name.
+Blocks used by a single guide stay inline.
+
+It also strips template comments and collapses whitespace (never inside
+<pre>, <textarea>, <script> or <style>), minifies the shared CSS, and with
+--compress writes .gz (and .br, if the brotli module is installed) next to
+every file for hosts/CDNs that serve precompressed files. GitHub Pages
+compresses on the fly, so there the win is the smaller files themselves.
+
+Rerunning is safe: optimized guides have no shared inline blocks left, and
+assets are only written when their hash is new. The default deploy keeps
+the CSS embedded (see the css_embedding check in guide_qc.py, which also
+accepts linked guide.<hash>.css assets).
+
+Usage:
+    python guide_assets.py                          # docs/guides
+    python guide_assets.py docs/guides --compress --prune
+    python guide_assets.py docs/guides/unbound-gravel-200 --dry-run
+    python guide_assets.py --json guide_assets.json  # "-" writes to stdout
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import re
+import sys
+from collections import Counter
+from pathlib import Path
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+GUIDES_ROOT = Path("docs/guides")
+ASSETS_DIRNAME = "assets"
+ASSET_PREFIX = "guide."
+HASH_LENGTH = 12
+
+# Directory listings keep their markup as-is
+SKIP_FILES = {"index.html"}
+
+# Attribute-less blocks only: <script src=...>, <style media=...> etc. are left alone
+INLINE_BLOCK_RE = re.compile(r'<(style|script)>(.*?)</\1>', re.DOTALL)
+ASSET_LINK_RE = re.compile(
+    r'<(?:link rel="stylesheet" href|script src)="([^"]*' + re.escape(ASSET_PREFIX) + r'[0-9a-f]+\.(?:css|js))"'
+)
+
+# Block extension -> how the guide links the asset
+ASSET_TAGS = {
+    "css": '<link rel="stylesheet" href="{href}">',
+    "js": '<script src="{href}"></script>',
+}
+BLOCK_EXTENSIONS = {"style": "css", "script": "js"}
+COMPRESSED_SUFFIXES = (".gz", ".br")
+
+# ============================================================================
+# MINIFICATION
+# ============================================================================
+
+# Comments, raw-text elements (kept verbatim) and tags; text in between is collapsed
+HTML_TOKEN_RE = re.compile(
+    r'<!--.*?-->'
+    r'|<(pre|textarea|script|style)\b[^>]*>.*?</\1\s*>'
+    r'|<[^>]*>',
+    re.DOTALL | re.IGNORECASE
+)
+# HTML whitespace only - \s would also eat &nbsp; characters
+HTML_WHITESPACE_RE = re.compile(r'[ \t\r\n\f]+')
+CSS_STRING_RE = re.compile(r'("(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\')')
+CSS_COMMENT_RE = re.compile(r'/\*.*?\*/', re.DOTALL)
+
+def _collapse_whitespace(text):
+    """A whitespace run becomes one newline (if it had one) or one space - renders the same"""
+    return HTML_WHITESPACE_RE.sub(lambda m: '\n' if '\n' in m.group() else ' ', text)
+
+def minify_html(html):
+    """
+    Drop comments (conditional comments kept) and collapse whitespace
+    between tags; tags and raw-text elements are copied unchanged.
+    """
+    parts = []
+    text = []  # Text since the last kept token (dropped comments join their neighbors)
+    position = 0
+    for match in HTML_TOKEN_RE.finditer(html):
+        text.append(html[position:match.start()])
+        position = match.end()
+        token = match.group()
+        if token.startswith('<!--') and not token.startswith('<!--[if'):
+            continue
+        parts.append(_collapse_whitespace(''.join(text)))
+        parts.append(token)
+        text = []
+    text.append(html[position:])
+    parts.append(_collapse_whitespace(''.join(text)))
+    return ''.join(parts).strip() + '\n'
+
+def minify_css(css):
+    """Remove comments and redundant whitespace (string literals untouched)"""
+    parts = CSS_STRING_RE.split(CSS_COMMENT_RE.sub('', css))
+    for index in range(0, len(parts), 2):  # Odd indexes are strings
+        code = ' '.join(parts[index].split())
+        code = re.sub(r'\s*([{};,>])\s*', r'\1', code)
+        parts[index] = code.replace(';}', '}')
+    return ''.join(parts).strip()
+
+def minify_js(js):
+    """
+    Trim indentation and blank lines. Scripts with template literals are
+    returned as-is: their line breaks and indentation are string content.
+    """
+    if '`' in js:
+        return js.strip()
+    return '\n'.join(line.strip() for line in js.splitlines() if line.strip())
+
+MINIFIERS = {"css": minify_css, "js": minify_js}
+
+# ============================================================================
+# ASSETS
+# ============================================================================
+
+def block_digest(content):
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+def asset_name(extension, content):
+    """guide.<hash>.<ext>, hashed over the content that's served"""
+    return f"{ASSET_PREFIX}{block_digest(content)[:HASH_LENGTH]}.{extension}"
+
+def compress_file(path, data):
+    """Write path.gz (and path.br when brotli is installed) for data; returns {suffix: bytes}"""
+    sizes = {}
+    outputs = {".gz": gzip.compress(data, compresslevel=9, mtime=0)}
+    if BROTLI_AVAILABLE:
+        outputs[".br"] = brotli.compress(data, quality=11)
+    for suffix, compressed in outputs.items():
+        _write_if_changed(Path(f"{path}{suffix}"), compressed)
+        sizes[suffix] = len(compressed)
+    return sizes
+
+def _write_if_changed(path, data):
+    """Atomic write, skipped when the file already holds data; returns True if written"""
+    try:
+        if path.read_bytes() == data:
+            return False
+    except OSError:
+        pass
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return True
+
+# ============================================================================
+# OPTIMIZER
+# ============================================================================
+
+def find_guides(guides_root):
+    """Guide files under guides_root (any depth, assets and index pages skipped), sorted"""
+    return sorted(
+        path for path in Path(guides_root).rglob("*.html")
+        if path.name not in SKIP_FILES and ASSETS_DIRNAME not in path.relative_to(guides_root).parts
+    )
+
+def shared_blocks(contents):
+    """Digests of inline blocks that appear in at least two guides"""
+    counts = Counter()
+    for content in contents:
+        counts.update({block_digest(match.group(2)) for match in INLINE_BLOCK_RE.finditer(content)})
+    return {digest for digest, count in counts.items() if count > 1}
+
+def externalize_blocks(content, shared, guide_dir, assets_dir, assets, minify=True):
+    """
+    Replace each shared inline block with a link to its asset.
+
+    Args:
+        shared: Block digests to externalize (from shared_blocks())
+        assets: name -> served content, filled in for the caller to write
+
+    Returns:
+        str: Guide HTML with shared blocks linked
+    """
+    def replace(match):
+        tag, block = match.group(1), match.group(2)
+        if block_digest(block) not in shared:
+            return match.group()
+        extension = BLOCK_EXTENSIONS[tag]
+        served = MINIFIERS[extension](block) if minify else block
+        name = asset_name(extension, served)
+        assets[name] = served
+        href = Path(os.path.relpath(assets_dir / name, guide_dir)).as_posix()
+        return ASSET_TAGS[extension].format(href=href)
+
+    return INLINE_BLOCK_RE.sub(replace, content)
+
+def optimize_guides(guides_root=GUIDES_ROOT, assets_dir=None, minify=True, compress=False, prune=False, dry_run=False):
+    """
+    Link shared blocks to hashed assets, minify and (optionally) precompress every guide.
+
+    Args:
+        guides_root: Directory searched recursively for guides (docs/guides or one race)
+        assets_dir: Where guide.<hash>.* are written (default: <guides_root>/assets)
+        minify: Strip comments/whitespace from guides and minify shared CSS/JS
+        compress: Write .gz (and .br) next to every guide and asset
+        prune: Delete guide.<hash>.* assets no guide under guides_root links to
+        dry_run: Report sizes without writing anything
+
+    Returns:
+        dict: {"guides": [per-guide sizes], "assets": [...], "pruned": [...], "summary": {...}}
+    """
+    guides_root = Path(guides_root)
+    assets_dir = Path(assets_dir) if assets_dir else guides_root / ASSETS_DIRNAME
+    paths = find_guides(guides_root)
+    originals = [path.read_text(encoding='utf-8') for path in paths]
+    shared = shared_blocks(originals)
+
+    assets = {}
+    guides = []
+    linked = set()
+    for path, original in zip(paths, originals):
+        content = externalize_blocks(original, shared, path.parent, assets_dir, assets, minify=minify)
+        if minify:
+            content = minify_html(content)
+        data = content.encode('utf-8')
+        linked.update(Path(href).name for href in ASSET_LINK_RE.findall(content))
+
+        result = {
+            "path": str(path),
+            "bytes_before": len(original.encode('utf-8')),
+            "bytes": len(data),
+            "gzip_bytes": len(gzip.compress(data, compresslevel=9, mtime=0)),
+            "changed": content != original,
+        }
+        if not dry_run:
+            _write_if_changed(path, data)
+            if compress:
+                compress_file(path, data)
+        guides.append(result)
+
+    asset_results = []
+    for name, served in sorted(assets.items()):
+        data = served.encode('utf-8')
+        asset_path = assets_dir / name
+        written = False
+        if not dry_run:
+            written = _write_if_changed(asset_path, data)
+            if compress:
+                compress_file(asset_path, data)
+        asset_results.append({
+            "path": str(asset_path),
+            "bytes": len(data),
+            "gzip_bytes": len(gzip.compress(data, compresslevel=9, mtime=0)),
+            "written": written,
+        })
+
+    pruned = []
+    if prune and assets_dir.exists():
+        for asset_path in sorted(assets_dir.glob(f"{ASSET_PREFIX}*")):
+            name = asset_path.name
+            if name.endswith(COMPRESSED_SUFFIXES):
+                name = name.rsplit('.', 1)[0]
+            if name not in linked:
+                pruned.append(str(asset_path))
+                if not dry_run:
+                    asset_path.unlink()
+
+    bytes_before = sum(guide["bytes_before"] for guide in guides)
+    asset_bytes = sum(asset["bytes"] for asset in asset_results)
+    return {
+        "guides_root": str(guides_root),
+        "assets_dir": str(assets_dir),
+        "guides": guides,
+        "assets": asset_results,
+        "pruned": pruned,
+        "summary": {
+            "guides": len(guides),
+            "bytes_before": bytes_before,
+            "bytes": sum(guide["bytes"] for guide in guides) + asset_bytes,
+            "gzip_bytes": sum(guide["gzip_bytes"] for guide in guides)
+                          + sum(asset["gzip_bytes"] for asset in asset_results),
+            "shared_asset_bytes": asset_bytes,
+            "brotli": BROTLI_AVAILABLE and compress,
+        }
+    }
+
+# ============================================================================
+# MAIN
+# ============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Link shared guide CSS/JS as hashed assets, minify and precompress guides")
+    parser.add_argument("guides_root", nargs="?", default=str(GUIDES_ROOT),
+                        help="Guides directory, searched recursively (default: docs/guides)")
+    parser.add_argument("--assets-dir", help="Where guide.<hash>.css/.js go (default: <guides_root>/assets)")
+    parser.add_argument("--no-minify", dest="minify", action="store_false",
+                        help="Only externalize shared blocks; keep comments and whitespace")
+    parser.add_argument("--compress", action="store_true",
+                        help="Write .gz (and .br with brotli installed) next to every file")
+    parser.add_argument("--prune", action="store_true", help="Delete assets no guide links to")
+    parser.add_argument("--dry-run", action="store_true", help="Report sizes without writing")
+    parser.add_argument("--json", dest="json_path", help="Write the report as JSON ('-' for stdout)")
+    args = parser.parse_args()
+
+    if not Path(args.guides_root).exists():
+        print(f"❌ Guides directory not found: {args.guides_root}")
+        return 1
+
+    report = optimize_guides(args.guides_root, args.assets_dir, minify=args.minify, compress=args.compress,
+                             prune=args.prune, dry_run=args.dry_run)
+
+    if args.json_path == "-":
+        json.dump(report, sys.stdout, indent=2)
+        print()
+        return 0
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+    summary = report["summary"]
+    if not summary["guides"]:
+        print(f"⚠️  No guides found under {args.guides_root}")
+        return 0
+    print(f"{'(dry run) ' if args.dry_run else ''}{summary['guides']} guides, {len(report['assets'])} shared assets in {report['assets_dir']}")
+    for asset in report["assets"]:
+        print(f"  {'✓' if asset['written'] else '·'} {Path(asset['path']).name} ({asset['bytes']:,} bytes)")
+    for path in report["pruned"]:
+        print(f"  ✗ pruned {Path(path).name}")
+    print(f"Deploy size: {summary['bytes_before']:,} → {summary['bytes']:,} bytes "
+          f"({summary['gzip_bytes']:,} gzipped)")
+    print(f"Per guide:   {summary['bytes_before'] // summary['guides']:,} → "
+          f"{sum(g['bytes'] for g in report['guides']) // summary['guides']:,} bytes")
+    if args.compress and not BROTLI_AVAILABLE:
+        print("⚠️  brotli not installed - wrote .gz only (pip install brotli for .br)")
+    if args.json_path:
+        print(f"✓ Report written to {args.json_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,6 +6,10 @@ Generates HTML training guides from race JSON + plan JSON templates.
 Usage:
     python guide_generator.py --race unbound_200.json --plan compete_masters_complete.json
     python guide_generator.py --race-dir races/unbound-200/ --all-plans
+    python guide_generator.py --race races/unbound_gravel_200.json --all-plans --output-dir guides/
+
+--all-plans renders a guide for every plan folder in --plans-dir (default:
+plans/) in one process; sections that don't depend on the plan render once.
 """
 
 import argparse
@@ -13,6 +17,7 @@ import json
 import os
 import re
 import sys
+from functools import lru_cache, wraps
 from pathlib import Path
 from typing import Dict, Any, Optional
 
@@ -165,12 +170,87 @@ def extract_plan_data(plan_json: Dict[str, Any]) -> Dict[str, str]:
     return data
 
 
+# =============================================================================
+# SECTION CACHE
+# =============================================================================
+# Sections are classified by the data fields they read. Race-independent
+# sections are rendered once per process; the others are cached under the
+# values of their inputs, so the plans of one race share every section that
+# doesn't depend on tier or ability.
+
+# Section name -> data fields it reads (() = race-independent)
+SECTION_INPUTS = {}
+_SECTION_CACHES = {}
+
+
+def race_independent(func):
+    """Cache a section that takes no race or plan input."""
+    cached = lru_cache(maxsize=None)(func)
+    SECTION_INPUTS[func.__name__] = ()
+    _SECTION_CACHES[func.__name__] = cached
+    return cached
+
+
+def section_inputs(*fields: str):
+    """
+    Declare the data fields a section reads and cache it per distinct values.
+
+    The section is called with only those fields, so reading an undeclared
+    one raises KeyError instead of serving another guide's cached HTML
+    (data.get() can't be caught that way; test_regression_guide.py compares
+    every section against section.__wrapped__, the uncached function).
+    """
+    def decorate(func):
+        render = lru_cache(maxsize=None)(lambda key: func(dict(key)))
+
+        @wraps(func)
+        def cached(data: Dict[str, str]) -> str:
+            return render(tuple((field, data[field]) for field in fields if field in data))
+
+        SECTION_INPUTS[func.__name__] = fields
+        _SECTION_CACHES[func.__name__] = render
+        return cached
+    return decorate
+
+
+def section_cache_stats() -> Dict[str, int]:
+    """Fragments rendered vs. served from cache since the last clear."""
+    infos = [cache.cache_info() for cache in _SECTION_CACHES.values()]
+    return {
+        'rendered': sum(info.misses for info in infos),
+        'reused': sum(info.hits for info in infos),
+    }
+
+
+def clear_section_cache():
+    for cache in _SECTION_CACHES.values():
+        cache.cache_clear()
+
+
 # =============================================================================
 # RADAR CHART SVG GENERATION
 # =============================================================================
 
+# Radar axes in drawing order: (score key, default score)
+RADAR_AXES = (
+    ('elevation', 3),
+    ('length', 3),
+    ('technicality', 3),
+    ('climate', 3),
+    ('altitude', 1),
+    ('adventure', 3),
+)
+SECTION_INPUTS['generate_radar_svg'] = tuple(key for key, _ in RADAR_AXES)
+
+
 def generate_radar_svg(scores: Dict[str, int], size: int = 400) -> str:
-    """Generate SVG radar chart for race difficulty profile."""
+    """Generate SVG radar chart for race difficulty profile (cached per set of six scores)."""
+    values = tuple(scores.get(key, default) for key, default in RADAR_AXES)
+    return _render_radar_svg(values, size)
+
+
+@lru_cache(maxsize=None)
+def _render_radar_svg(values: tuple, size: int) -> str:
     import math
     
     center = size // 2
@@ -178,14 +258,6 @@ def generate_radar_svg(scores: Dict[str, int], size: int = 400) -> str:
     
     # 6 axes: Elevation, Length, Technical, Climate, Altitude, Adventure
     labels = ['ELEVATION', 'LENGTH', 'TECHNICAL', 'CLIMATE', 'ALTITUDE', 'ADVENTURE']
-    values = [
-        scores.get('elevation', 3),
-        scores.get('length', 3),
-        scores.get('technicality', 3),
-        scores.get('climate', 3),
-        scores.get('altitude', 1),
-        scores.get('adventure', 3),
-    ]
     
     # Calculate polygon points
     angle_step = 2 * math.pi / 6
@@ -249,10 +321,14 @@ def generate_radar_svg(scores: Dict[str, int], size: int = 400) -> str:
     return '\n'.join(svg_parts)
 
 
+_SECTION_CACHES['generate_radar_svg'] = _render_radar_svg
+
+
 # =============================================================================
 # PHASE BAR SVG GENERATION
 # =============================================================================
 
+@race_independent
 def generate_phase_bar_svg() -> str:
     """Generate SVG showing 12-week training phases."""
     return '''<svg viewBox="0 0 600 120" width="600" height="120">
@@ -295,6 +371,7 @@ def generate_phase_bar_svg() -> str:
 # HTML TEMPLATE
 # =============================================================================
 
+@race_independent
 def get_css() -> str:
     """Return the complete neo-brutalist CSS."""
     return '''/* ============================================
@@ -472,6 +549,7 @@ tr.g-spot-row:hover { background: rgba(78, 205, 196, 0.25); }
 hr { border: none; border-top: 2px dashed var(--text-dark); margin: 2rem 0; opacity: 0.3; }'''
 
 
+@race_independent
 def get_nav_script() -> str:
     """Return the navigation highlight script."""
     return '''document.addEventListener('DOMContentLoaded', function() {
@@ -712,6 +790,7 @@ def generate_guide_html(race_data: Dict[str, str], plan_data: Dict[str, str],
     return html
 
 
+@lru_cache(maxsize=None)
 def generate_weekly_structure_rows(weekly_structure: str) -> str:
     """Parse weekly structure string into table rows."""
     if not weekly_structure:
@@ -746,10 +825,21 @@ def generate_weekly_structure_rows(weekly_structure: str) -> str:
     return '\n'.join(rows) if rows else generate_weekly_structure_rows('')
 
 
+SECTION_INPUTS['generate_weekly_structure_rows'] = ('WEEKLY_STRUCTURE_DESCRIPTION',)
+_SECTION_CACHES['generate_weekly_structure_rows'] = generate_weekly_structure_rows
+
+
 # =============================================================================
 # SECTION GENERATORS (Abbreviated for brevity - full content in production)
 # =============================================================================
 
+# Non-negotiable fields read by the race-specific section
+NON_NEGOTIABLE_FIELDS = tuple(
+    f'NON_NEG_{i}_{part}' for i in range(1, 6) for part in ('REQUIREMENT', 'BY_WHEN', 'WHY')
+)
+
+
+@section_inputs('RACE_NAME', 'DISTANCE')
 def generate_before_you_start_section(data: Dict[str, str]) -> str:
     """Generate Before You Start section."""
     return f'''<section class="section" id="before">
@@ -786,6 +876,7 @@ def generate_before_you_start_section(data: Dict[str, str]) -> str:
 </section>'''
 
 
+@section_inputs()
 def generate_training_fundamentals_section(data: Dict[str, str]) -> str:
     """Generate Training Fundamentals section."""
     return '''<section class="section" id="how-training-works">
@@ -826,6 +917,7 @@ def generate_training_fundamentals_section(data: Dict[str, str]) -> str:
 </section>'''
 
 
+@race_independent
 def generate_zones_section() -> str:
     """Generate Training Zones section."""
     return '''<section class="section" id="zones">
@@ -861,6 +953,7 @@ def generate_zones_section() -> str:
 </section>'''
 
 
+@race_independent
 def generate_execution_section() -> str:
     """Generate Workout Execution section."""
     return '''<section class="section" id="execution">
@@ -894,6 +987,7 @@ def generate_execution_section() -> str:
 </section>'''
 
 
+@section_inputs()
 def generate_recovery_section(data: Dict[str, str]) -> str:
     """Generate Recovery section - NOTE: This is now part of Workout Execution, kept for backwards compatibility."""
     return f'''<section class="section" id="recovery" style="display:none;">
@@ -927,6 +1021,7 @@ def generate_recovery_section(data: Dict[str, str]) -> str:
 </section>'''
 
 
+@section_inputs('RACE_NAME')
 def generate_strength_section(data: Dict[str, str]) -> str:
     """Generate Strength Training section - NOTE: This is now part of Training Fundamentals, kept for backwards compatibility."""
     return f'''<section class="section" id="strength" style="display:none;">
@@ -951,6 +1046,8 @@ def generate_strength_section(data: Dict[str, str]) -> str:
 </section>'''
 
 
+@section_inputs('RACE_NAME', 'RACE_SPECIFIC_SKILL_NOTES',
+                'SKILL_5_NAME', 'SKILL_5_WHY', 'SKILL_5_HOW', 'SKILL_5_CUE')
 def generate_skills_section(data: Dict[str, str]) -> str:
     """Generate Skills section with race-specific skill 5."""
     skill_5_html = ''
@@ -1005,6 +1102,7 @@ def generate_skills_section(data: Dict[str, str]) -> str:
 </section>'''
 
 
+@section_inputs('DISTANCE', 'DURATION_ESTIMATE')
 def generate_fueling_section(data: Dict[str, str]) -> str:
     """Generate Fueling & Hydration section with improved comprehensive content."""
     race_distance = data.get('DISTANCE', '200')
@@ -1435,6 +1533,7 @@ def generate_fueling_section(data: Dict[str, str]) -> str:
 </section>'''
 
 
+@race_independent
 def generate_mental_section() -> str:
     """Generate Mental Training section."""
     return '''<section class="section" id="mental">
@@ -1466,6 +1565,7 @@ def generate_mental_section() -> str:
 </section>'''
 
 
+@section_inputs('RACE_NAME', 'RACE_SPECIFIC_TACTICS', 'AID_STATION_STRATEGY')
 def generate_race_tactics_section(data: Dict[str, str]) -> str:
     """Generate Race Tactics section."""
     tactics_html = ''
@@ -1503,6 +1603,7 @@ def generate_race_tactics_section(data: Dict[str, str]) -> str:
 </section>'''
 
 
+@section_inputs('RACE_NAME', 'WEATHER_STRATEGY', 'EQUIPMENT_CHECKLIST', *NON_NEGOTIABLE_FIELDS)
 def generate_race_specific_section(data: Dict[str, str]) -> str:
     """Generate Race-Specific Preparation section with non-negotiables."""
     # Build non-negotiables table rows
@@ -1552,6 +1653,7 @@ def generate_race_specific_section(data: Dict[str, str]) -> str:
 </section>'''
 
 
+@race_independent
 def generate_tires_section() -> str:
     """Generate Tires section."""
     return '''<section class="section" id="tires">
@@ -1581,6 +1683,7 @@ def generate_tires_section() -> str:
 </section>'''
 
 
+@section_inputs()
 def generate_race_week_section(data: Dict[str, str]) -> str:
     """Generate Race Week Protocol section."""
     return f'''<section class="section" id="race-week">
@@ -1625,6 +1728,7 @@ def generate_race_week_section(data: Dict[str, str]) -> str:
 </section>'''
 
 
+@race_independent
 def generate_women_section() -> str:
     """Generate Women-Specific Considerations section."""
     return '''<section class="section" id="women-specific">
@@ -1713,6 +1817,7 @@ def generate_women_section() -> str:
 </section>'''
 
 
+@race_independent
 def generate_faq_section() -> str:
     """Generate FAQ section."""
     return '''<section class="section" id="faq">
@@ -1803,22 +1908,14 @@ def get_output_filename(race_name: str, plan_name: str, tier_name: str, ability:
     return f"{race_slug}_{plan_slug}_{tier_name.lower()}_{ability.lower()}_guide.html"
 
 
-def main():
-    parser = argparse.ArgumentParser(description='Generate Gravel God Training Guides')
-    parser.add_argument('--race', required=True, help='Path to race JSON file')
-    parser.add_argument('--plan', required=True, help='Path to plan JSON file')
-    parser.add_argument('--output', help='Output HTML file path (auto-generated if not specified)')
-    parser.add_argument('--output-dir', default='.', help='Output directory')
-    
-    args = parser.parse_args()
-    
-    # Load data
-    print(f"Loading race data from: {args.race}")
-    race_json = load_json(args.race)
-    
-    print(f"Loading plan data from: {args.plan}")
-    plan_json = load_json(args.plan)
-    
+def build_guide(race_json: Dict[str, Any], plan_json: Dict[str, Any]):
+    """
+    Render one guide.
+
+    Returns:
+        (html, race_data, plan_data) - race_data with tier, ability and
+        hours taken from the plan
+    """
     # Extract data for placeholders
     race_data = extract_race_data(race_json)
     plan_data = extract_plan_data(plan_json)
@@ -1846,36 +1943,136 @@ def main():
     race = race_json.get('race', race_json)
     radar = race.get('radar_scores', {})
     radar_scores = {
-        'elevation': radar.get('elevation', {}).get('score', 3),
-        'length': radar.get('length', {}).get('score', 3),
-        'technicality': radar.get('technicality', {}).get('score', 3),
-        'climate': radar.get('climate', {}).get('score', 3),
-        'altitude': radar.get('altitude', {}).get('score', 1),
-        'adventure': radar.get('adventure', {}).get('score', 3),
+        key: radar.get(key, {}).get('score', default)
+        for key, default in RADAR_AXES
     }
     
-    # Generate HTML
-    print("Generating HTML guide...")
     html = generate_guide_html(race_data, plan_data, radar_scores)
-    
-    # Determine output path
-    if args.output:
-        output_path = args.output
-    else:
-        filename = get_output_filename(
-            race_data['RACE_NAME'],
-            plan_data.get('PLAN_NAME', 'plan'),
-            race_data['TIER_NAME'],
-            race_data['ABILITY_LEVEL']
-        )
-        output_path = os.path.join(args.output_dir, filename)
-    
+    return html, race_data, plan_data
+
+
+def default_output_path(race_data: Dict[str, str], plan_data: Dict[str, str], output_dir: str) -> str:
+    filename = get_output_filename(
+        race_data['RACE_NAME'],
+        plan_data.get('PLAN_NAME', 'plan'),
+        race_data['TIER_NAME'],
+        race_data['ABILITY_LEVEL']
+    )
+    return os.path.join(output_dir, filename)
+
+
+def write_guide(html: str, output_path: str):
     # Ensure output directory exists
     os.makedirs(os.path.dirname(output_path) if os.path.dirname(output_path) else '.', exist_ok=True)
     
-    # Write output
     with open(output_path, 'w', encoding='utf-8') as f:
         f.write(html)
+
+
+def find_race_json(race_dir: str) -> str:
+    """The race JSON in race_dir (race.json, or the only *.json file)."""
+    race_dir = Path(race_dir)
+    if (race_dir / 'race.json').is_file():
+        return str(race_dir / 'race.json')
+    candidates = sorted(race_dir.glob('*.json'))
+    if len(candidates) != 1:
+        found = ', '.join(path.name for path in candidates) or 'none'
+        print(f"ERROR: Expected one race JSON in {race_dir} (or race.json), found: {found}")
+        sys.exit(1)
+    return str(candidates[0])
+
+
+def find_plan_files(plans_dir: str) -> list:
+    """
+    One plan JSON per plan folder under plans_dir ("1. Ayahuasca Beginner (12 weeks)/", ...),
+    in plan number order: the completed *_complete.json if present, else template.json.
+    """
+    def plan_number(folder):
+        match = re.match(r'(\d+)\.', folder.name)
+        return (int(match.group(1)) if match else sys.maxsize, folder.name)
+    
+    plan_files = []
+    for folder in sorted((d for d in Path(plans_dir).iterdir() if d.is_dir()), key=plan_number):
+        complete = sorted(folder.glob('*_complete.json'))
+        if complete:
+            plan_files.append(str(complete[0]))
+        elif (folder / 'template.json').is_file():
+            plan_files.append(str(folder / 'template.json'))
+    return plan_files
+
+
+def generate_all_plans(race_path: str, plans_dir: str, output_dir: str) -> list:
+    """
+    Render a guide for every plan of one race in this process.
+
+    Sections shared by the plans (see SECTION_INPUTS) render once and are
+    reused for the remaining guides.
+
+    Returns:
+        list: Output paths
+    """
+    print(f"Loading race data from: {race_path}")
+    race_json = load_json(race_path)
+    plan_files = find_plan_files(plans_dir)
+    if not plan_files:
+        print(f"ERROR: No plan JSON files found under {plans_dir}")
+        sys.exit(1)
+    
+    print(f"Generating {len(plan_files)} guides...")
+    output_paths = []
+    for plan_path in plan_files:
+        html, race_data, plan_data = build_guide(race_json, load_json(plan_path))
+        output_path = default_output_path(race_data, plan_data, output_dir)
+        write_guide(html, output_path)
+        output_paths.append(output_path)
+        print(f"  ✓ {race_data['TIER_NAME']} {race_data['ABILITY_LEVEL']}: {output_path}")
+    
+    stats = section_cache_stats()
+    print(f"✓ {len(output_paths)} guides generated in {output_dir}")
+    print(f"  Sections: {stats['rendered']} rendered, {stats['reused']} reused from cache")
+    return output_paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate Gravel God Training Guides')
+    race_group = parser.add_mutually_exclusive_group(required=True)
+    race_group.add_argument('--race', help='Path to race JSON file')
+    race_group.add_argument('--race-dir', help='Race directory (holds race.json or a single race JSON)')
+    parser.add_argument('--plan', help='Path to plan JSON file')
+    parser.add_argument('--all-plans', action='store_true',
+                        help='Generate a guide for every plan folder in --plans-dir')
+    parser.add_argument('--plans-dir', default='plans', help='Plan folders for --all-plans (default: plans)')
+    parser.add_argument('--output', help='Output HTML file path (auto-generated if not specified)')
+    parser.add_argument('--output-dir', help='Output directory (default: . or <race-dir>/guides)')
+    
+    args = parser.parse_args()
+    if args.all_plans == bool(args.plan):
+        parser.error('give either --plan or --all-plans')
+    if args.all_plans and args.output:
+        parser.error('--output names a single guide; use --output-dir with --all-plans')
+    
+    race_path = args.race or find_race_json(args.race_dir)
+    output_dir = args.output_dir or (os.path.join(args.race_dir, 'guides') if args.race_dir else '.')
+    
+    if args.all_plans:
+        return generate_all_plans(race_path, args.plans_dir, output_dir)
+    
+    # Load data
+    print(f"Loading race data from: {race_path}")
+    race_json = load_json(race_path)
+    
+    print(f"Loading plan data from: {args.plan}")
+    plan_json = load_json(args.plan)
+    
+    # Generate HTML
+    print("Generating HTML guide...")
+    html, race_data, plan_data = build_guide(race_json, plan_json)
+    
+    # Determine output path
+    output_path = args.output or default_output_path(race_data, plan_data, output_dir)
+    
+    # Write output
+    write_guide(html, output_path)
     
     print(f"✓ Guide generated: {output_path}")
     print(f"  Race: {race_data['RACE_NAME']}")
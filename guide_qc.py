@@ -0,0 +1,471 @@
+#!/usr/bin/env python3
+"""
+GUIDE QC ENGINE
+===============
+Reads each training guide once, parses it once into its section/heading
+structure, and runs every registered check against the parsed form.
+Guides are scanned in parallel across files; results come back as JSON.
+
+Parsing records every section marker and </section> position once.
+Section-scoped checks read a region: from the first mention of a marker
+(usually its TOC link) to the next </section>, the same extent the
+original regression regexes captured, so the thresholds they were
+calibrated against still apply. The true per-section structure (anchor
+to next anchor, with titles) is reported in the JSON results.
+
+Usage:
+    python guide_qc.py                                   # all races under docs/guides
+    python guide_qc.py docs/guides/unbound-gravel-200 --jobs 4
+    python guide_qc.py --json qc_results.json            # "-" writes to stdout
+    python guide_qc.py --check faq_format --check section_numbering
+
+Exit codes:
+    0 = All checks passed
+    1 = At least one guide failed a check
+"""
+
+import argparse
+import bisect
+import json
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+GUIDES_ROOT = Path("docs/guides")
+
+# Directory listings, not guides
+SKIP_FILES = {"index.html"}
+
+# ============================================================================
+# PARSING
+# ============================================================================
+
+SECTION_ANCHOR_RE = re.compile(r'<(\w+)\b[^>]*\bid="(section-(\d+)[^"]*)"[^>]*>')
+HEADING_RE = re.compile(r'<h([1-6])\b([^>]*)>(.*?)</h\1>', re.DOTALL | re.IGNORECASE)
+ID_ATTR_RE = re.compile(r'\bid="([^"]*)"')
+SECTION_MARKER_RE = re.compile(r'section-[\w-]*')
+TAG_RE = re.compile(r'<[^>]+>')
+SECTION_CLOSE = '</section>'
+MAIN_END = '</main>'
+# Shared stylesheet written by guide_assets.py (relative link)
+SHARED_STYLESHEET_RE = re.compile(r'<link rel="stylesheet" href="([^":]*guide\.[0-9a-f]+\.css)">')
+
+def html_to_text(html):
+    """Tags replaced by spaces, whitespace normalized"""
+    return ' '.join(TAG_RE.sub(' ', html).split())
+
+class GuideSection:
+    """
+    One numbered guide section
+
+    Attributes:
+        number: Section number (section-8-fueling-hydration -> 8)
+        anchor_id: id of the section's first anchor element
+        slug: anchor_id without the "section-N-" prefix ("" for bare ids)
+        title: Text of the first heading in the section
+        html: Markup from the first anchor to the next section's anchor
+    """
+    __slots__ = ("number", "anchor_id", "slug", "title", "html", "_text")
+
+    def __init__(self, number, anchor_id, title, html):
+        self.number = number
+        self.anchor_id = anchor_id
+        self.slug = anchor_id[len(f"section-{number}"):].lstrip('-')
+        self.title = title
+        self.html = html
+        self._text = None
+
+    @property
+    def text(self):
+        if self._text is None:
+            self._text = html_to_text(self.html)
+        return self._text
+
+class ParsedGuide:
+    """
+    A guide read and parsed once
+
+    Attributes:
+        name: File name (e.g. finisher-beginner.html)
+        content: Full HTML
+        section_ids: Every distinct id="section-..." value in the document
+        headings: [(level, id or None, text)] in document order
+        sections: [GuideSection] in document order (anchor to next anchor)
+    """
+
+    def __init__(self, name, content, path=None):
+        self.name = name
+        self.content = content
+        self.path = Path(path) if path else None
+        self.headings = [
+            (int(level), _id_of(attrs), html_to_text(inner))
+            for level, attrs, inner in HEADING_RE.findall(content)
+        ]
+        self.section_ids = set()
+        self.sections = []
+        self._parse_sections()
+        self._markers = [(m.start(), m.group()) for m in SECTION_MARKER_RE.finditer(content)]
+        self._closings = [m.start() for m in re.finditer(re.escape(SECTION_CLOSE), content)]
+        self._regions = {}
+
+    @classmethod
+    def from_file(cls, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(Path(path).name, f.read(), path)
+
+    def _parse_sections(self):
+        anchors = []
+        for match in SECTION_ANCHOR_RE.finditer(self.content):
+            self.section_ids.add(match.group(2))
+            number = int(match.group(3))
+            # Wrapper <section> and its <h2> share an id; the first one opens the section
+            if anchors and anchors[-1][0] == number:
+                continue
+            anchors.append((number, match.group(2), match.start(), match.end()))
+
+        end_of_body = self.content.find(MAIN_END)
+        if end_of_body == -1:
+            end_of_body = len(self.content)
+        for index, (number, anchor_id, start, body_start) in enumerate(anchors):
+            end = anchors[index + 1][2] if index + 1 < len(anchors) else end_of_body
+            html = self.content[body_start:end]
+            heading = HEADING_RE.search(self.content, start, end)
+            title = html_to_text(heading.group(3)) if heading else ""
+            self.sections.append(GuideSection(number, anchor_id, title, html))
+
+    def marker_end(self, marker):
+        """
+        Offset just past the tag holding the first mention of marker (a regex
+        matched at the start of a "section-..." token, e.g. r"section-\\d+-faq");
+        None if it never appears
+        """
+        pattern = re.compile(marker, re.IGNORECASE)
+        for position, token in self._markers:
+            if pattern.match(token):
+                tag_end = self.content.find('>', position)
+                return None if tag_end == -1 else tag_end + 1
+        return None
+
+    def region(self, marker):
+        """Markup from marker_end(marker) to the next </section> (None if either is missing)"""
+        if marker not in self._regions:
+            start = self.marker_end(marker)
+            index = bisect.bisect_left(self._closings, start) if start is not None else len(self._closings)
+            self._regions[marker] = self.content[start:self._closings[index]] if index < len(self._closings) else None
+        return self._regions[marker]
+
+    @property
+    def section_numbers(self):
+        return sorted({int(s.split('-')[1]) for s in self.section_ids if s.split('-')[1].isdigit()})
+
+def _id_of(attrs):
+    match = ID_ATTR_RE.search(attrs)
+    return match.group(1) if match else None
+
+# ============================================================================
+# CHECKS
+# ============================================================================
+
+# name -> check function (ParsedGuide -> list of error strings)
+CHECKS = {}
+
+def guide_check(name, title):
+    """Register a check; checks return a list of errors (empty = passed)"""
+    def register(func):
+        func.title = title
+        CHECKS[name] = func
+        return func
+    return register
+
+@guide_check("toc_positioning", "Guide TOC Positioning")
+def check_toc_positioning(guide):
+    """TOC must be on left side, not top"""
+    errors = []
+    # Check for grid layout (TOC on left)
+    if 'gg-guide-layout' not in guide.content or 'gg-guide-toc' not in guide.content:
+        errors.append("Missing grid layout for TOC positioning")
+
+    # Check for old top-positioned TOC (should NOT exist)
+    if 'toc-box' in guide.content and 'gg-guide-toc' not in guide.content:
+        errors.append("Old TOC structure detected (top positioning)")
+    return errors
+
+@guide_check("css_embedding", "Guide CSS Embedding")
+def check_css_embedding(guide):
+    """
+    CSS must be embedded, not an external link (GitHub Pages can't resolve it).
+    A relative link to a shared guide.<hash>.css (guide_assets.py) counts as
+    embedded when the asset exists next to the guide.
+    """
+    errors = []
+    if re.search(r'<link[^>]*href=["\']/gravel-landing-page-project/assets/css/guides\.css["\']', guide.content):
+        errors.append("External CSS link detected (should be embedded)")
+
+    shared_css = [
+        href for href in SHARED_STYLESHEET_RE.findall(guide.content)
+        if guide.path is not None and (guide.path.parent / href).is_file()
+    ]
+    if ('<style>' not in guide.content and not shared_css) or 'gg-guide-page' not in guide.content:
+        errors.append("Missing embedded CSS")
+    return errors
+
+@guide_check("no_ftp_hr_settings", "Guide No FTP/HR Settings")
+def check_no_ftp_hr_settings(guide):
+    """Chapter 2 must NOT have FTP/HR settings"""
+    errors = []
+    section2_start = guide.marker_end(r'section-2')
+    if section2_start is None:
+        return errors
+
+    if re.compile(r'FTP\s+[Tt]esting', re.IGNORECASE).search(guide.content, section2_start):
+        errors.append("FTP Testing section in Chapter 2 (should be removed)")
+
+    if re.compile(r'[Hh]eart\s+[Rr]ate\s+[Mm]ax\s+[Tt]esting').search(guide.content, section2_start):
+        errors.append("Heart Rate Max Testing in Chapter 2 (should be removed)")
+    return errors
+
+@guide_check("section_numbering", "Guide Section Numbering")
+def check_section_numbering(guide):
+    """Sections must be numbered 1..N without gaps (fixed after Masters section addition)"""
+    numbers = guide.section_numbers
+    if not numbers:
+        return []
+    gaps = [n for n in range(1, max(numbers) + 1) if n not in numbers]
+    return [f"Missing section numbers: {gaps}"] if gaps else []
+
+@guide_check("section1_plan_uniqueness", "Guide Section 1 Plan Uniqueness")
+def check_section1_plan_uniqueness(guide):
+    """Chapter 1 must explain what makes the plan unique (ability level, tier volume, performance expectations)"""
+    if 'What Makes This Plan Different' not in guide.content:
+        return ["Missing 'What Makes This Plan Different' section"]
+
+    errors = []
+    section1 = guide.region(r'section-1')
+    if section1 is None:
+        return errors
+
+    # Ability level explanation (Beginner/Intermediate/Advanced/Masters)
+    if not re.search(r'(Beginner|Intermediate|Advanced|Masters).*experience|training experience|current fitness', section1, re.IGNORECASE):
+        errors.append("Missing ability level explanation in Section 1")
+
+    # Tier volume explanation (Ayahuasca/Finisher/Compete/Podium)
+    if not re.search(r'(Ayahuasca|Finisher|Compete|Podium).*hours|weekly hours|volume category', section1, re.IGNORECASE):
+        errors.append("Missing tier volume explanation in Section 1")
+
+    if 'performance expectations' not in section1.lower():
+        errors.append("Missing 'Performance Expectations' section in Section 1")
+
+    if '{{PLAN_TITLE}}' in section1:
+        errors.append("Unreplaced {{PLAN_TITLE}} placeholder in Section 1")
+    return errors
+
+@guide_check("section8_nutrition_comprehensive", "Guide Section 8 Nutrition Comprehensive")
+def check_section8_nutrition_comprehensive(guide):
+    """Section 8 (Fueling & Hydration) must be the comprehensive version (~4,200 words)"""
+    errors = []
+    section8 = guide.region(r'section-8-fueling-hydration')
+    if section8 is None:
+        return errors
+    text_content = html_to_text(section8)
+
+    # Comprehensive version is ~25,000+ characters of text; abbreviated is much shorter
+    if len(text_content) < 20000:  # Conservative threshold
+        errors.append(f"Section 8 appears abbreviated ({len(text_content)} chars, expected ~25,000+)")
+
+    required_topics = [
+        'daily nutrition',
+        'supplements',
+        'workout-specific fueling',
+        'cramping',
+        'weight management',
+        'race-day'
+    ]
+    text_lower = text_content.lower()
+    missing_topics = [topic for topic in required_topics if topic not in text_lower]
+    if missing_topics:
+        errors.append(f"Section 8 missing key topics: {', '.join(missing_topics)}")
+    return errors
+
+@guide_check("section12_race_week_comprehensive", "Guide Section 12 Race Week Comprehensive")
+def check_section12_race_week_comprehensive(guide):
+    """Section 12 (Race Week Protocol) must have the comprehensive checklist"""
+    errors = []
+    section12 = guide.region(r'section-12-race-week-protocol')
+    if section12 is None:
+        return errors
+    text_content = html_to_text(section12)
+
+    # Abbreviated version is < 3000 chars; comprehensive is > 5000
+    if len(text_content) < 5000:
+        errors.append(f"Section 12 appears abbreviated ({len(text_content)} chars, expected 5000+)")
+
+    if not re.search(r'<ul>|<ol>|<li>|checklist|•|✓', section12, re.IGNORECASE):
+        errors.append("Section 12 missing checklist structure")
+    return errors
+
+@guide_check("faq_format", "Guide FAQ Format (No Glossary)")
+def check_faq_format(guide):
+    """FAQ section must be Q&A format, not a glossary"""
+    errors = []
+    faq = guide.region(r'section-\d+-faq')
+    if faq is None:
+        return errors
+
+    question_count = faq.count('?')
+    glossary_pattern = re.search(r'<dt>|<dd>|term.*definition', faq, re.IGNORECASE)
+    if question_count < 5 and glossary_pattern:
+        errors.append("FAQ section appears to be glossary format, not Q&A")
+
+    if re.search(r'<dl>|<dt>|<dd>', faq, re.IGNORECASE):
+        errors.append("FAQ section contains glossary terms (dl/dt/dd tags)")
+    return errors
+
+@guide_check("women_specific_content", "Guide Women-Specific Content")
+def check_women_specific_content(guide):
+    """Women-Specific section must have actual content, not just a heading"""
+    women = guide.region(r'section-\d+-women-specific')
+    if women is None:
+        return []
+    text_content = TAG_RE.sub('', women).strip()
+    if len(text_content) < 500:
+        return [f"Women-Specific section has insufficient content ({len(text_content)} chars)"]
+    return []
+
+# ============================================================================
+# SCANNING
+# ============================================================================
+
+def find_guides(guides_dirs):
+    """Guide files under each directory (index pages skipped), sorted"""
+    guides = []
+    for guides_dir in guides_dirs:
+        guides.extend(sorted(
+            path for path in Path(guides_dir).glob("*.html")
+            if path.name not in SKIP_FILES
+        ))
+    return guides
+
+def scan_guide(path, check_names=None):
+    """
+    Read and parse one guide, then run the checks on it.
+
+    Returns:
+        dict: {"file", "path", "bytes", "sections", "checks": {name: [errors]}}
+    """
+    guide = ParsedGuide.from_file(path)
+    results = {}
+    for name in check_names or CHECKS:
+        try:
+            results[name] = CHECKS[name](guide)
+        except Exception as e:
+            results[name] = [f"Check raised {type(e).__name__}: {e}"]
+    return {
+        "file": guide.name,
+        "path": str(path),
+        "bytes": len(guide.content.encode('utf-8')),
+        "sections": [
+            {"number": section.number, "id": section.anchor_id, "title": section.title, "chars": len(section.text)}
+            for section in guide.sections
+        ],
+        "checks": results
+    }
+
+def _scan_job(args):
+    path, check_names = args
+    return scan_guide(path, check_names)
+
+def scan_guides(guides_dirs, jobs=1, check_names=None):
+    """
+    Scan every guide in guides_dirs (one read + parse per file).
+
+    Args:
+        guides_dirs: Directories of guide HTML files
+        jobs: Worker processes (1 = scan in this process)
+        check_names: Subset of CHECKS to run (default: all)
+
+    Returns:
+        dict: {"guides": [per-guide results], "summary": {...}} (JSON-serializable)
+    """
+    check_names = list(check_names or CHECKS)
+    unknown = [name for name in check_names if name not in CHECKS]
+    if unknown:
+        raise ValueError(f"Unknown check(s): {', '.join(unknown)}. Available: {', '.join(CHECKS)}")
+
+    paths = find_guides(guides_dirs)
+    job_args = [(str(path), check_names) for path in paths]
+    if jobs > 1 and len(paths) > 1:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(paths))) as pool:
+            guides = list(pool.map(_scan_job, job_args, chunksize=4))
+    else:
+        guides = [_scan_job(args) for args in job_args]
+
+    checks_summary = {}
+    for name in check_names:
+        failed = [guide["path"] for guide in guides if guide["checks"][name]]
+        checks_summary[name] = {
+            "title": CHECKS[name].title,
+            "passed": len(guides) - len(failed),
+            "failed": len(failed)
+        }
+    return {
+        "guides_dirs": [str(d) for d in guides_dirs],
+        "guides": guides,
+        "summary": {
+            "guides": len(guides),
+            "failed_guides": sum(1 for guide in guides if any(guide["checks"].values())),
+            "checks": checks_summary
+        }
+    }
+
+def check_errors(report, name):
+    """Errors for one check across a report, prefixed with the guide file name"""
+    return [
+        f"{guide['file']}: {error}"
+        for guide in report["guides"]
+        for error in guide["checks"].get(name, [])
+    ]
+
+# ============================================================================
+# MAIN
+# ============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Run guide QC checks (one read per guide)")
+    parser.add_argument("guides_dirs", nargs="*",
+                        help="Guide directories (default: every race under docs/guides)")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1,
+                        help="Worker processes (default: CPU count)")
+    parser.add_argument("--json", dest="json_path",
+                        help="Write results as JSON to this path ('-' for stdout)")
+    parser.add_argument("--check", dest="checks", action="append", choices=list(CHECKS),
+                        help="Run only this check (repeatable)")
+    args = parser.parse_args()
+
+    guides_dirs = args.guides_dirs or sorted(d for d in GUIDES_ROOT.iterdir() if d.is_dir())
+    report = scan_guides(guides_dirs, jobs=args.jobs, check_names=args.checks)
+
+    if args.json_path == "-":
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    else:
+        if args.json_path:
+            with open(args.json_path, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2)
+        summary = report["summary"]
+        print(f"Scanned {summary['guides']} guides in {len(guides_dirs)} director{'y' if len(guides_dirs) == 1 else 'ies'}")
+        for name, result in summary["checks"].items():
+            if result["failed"]:
+                print(f"✗ {result['title']}: {result['failed']} failed")
+                for error in check_errors(report, name):
+                    print(f"  {error}")
+            else:
+                print(f"✓ {result['title']}")
+        if args.json_path:
+            print(f"\n✓ Results written to {args.json_path}")
+
+    return 1 if report["summary"]["failed_guides"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,399 @@
+#!/usr/bin/env python3
+"""
+QC ORCHESTRATOR
+===============
+Runs QC stages in-process instead of one `python3` per stage.
+
+Stages are either:
+- suites: test_regression_*.py files with a module-level TESTS list of
+  (name, test function). Discovered automatically; every test is timed and
+  reported as its own check.
+- scripts: validators and single-file tests with a command line. They run
+  via runpy with sys.argv set, and their exit code decides the check.
+
+Stages share one interpreter per worker, so the variation pools,
+generators and guide QC engine are imported once, not once per stage.
+Independent stages run concurrently across worker processes (--jobs).
+Output is captured per check, and results come back as JSON and/or
+JUnit XML with per-check timings.
+
+Usage:
+    python qc_orchestrator.py                       # marketplace QC ("qc")
+    python qc_orchestrator.py --group qc-all --jobs 4
+    python qc_orchestrator.py --stage guide --stage pools
+    python qc_orchestrator.py --group qc-all --json qc.json --junit qc.xml
+    python qc_orchestrator.py --list
+
+Exit codes:
+    0 = All stages passed
+    1 = At least one check failed
+"""
+
+import argparse
+import ast
+import contextlib
+import importlib
+import io
+import json
+import os
+import runpy
+import sys
+import time
+import traceback
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parent
+DEFAULT_OUTPUT_DIR = "output/html_descriptions"
+
+# Imported before any stage runs (and inherited by forked workers)
+SHARED_FIXTURES = ("variation_pools", "generate_html_marketplace_descriptions", "guide_qc")
+
+# Landing page exports that are backups, not pages to test
+LANDING_BACKUP_MARKERS = ("FIXED", "OLD", "BACKUP", "CORRECTED")
+
+# ============================================================================
+# STAGES
+# ============================================================================
+
+def _landing_pages(options):
+    pages = []
+    for json_file in sorted(PROJECT_DIR.glob("output/elementor-*.json")):
+        if any(marker in json_file.name for marker in LANDING_BACKUP_MARKERS):
+            continue
+        pages.append([str(json_file.relative_to(PROJECT_DIR))])
+    return pages
+
+# name -> (title, script, argv sets); one check per argv set
+SCRIPT_STAGES = {
+    "pools": ("Variation Pool Validation", "validate_variation_pools.py", lambda options: [[]]),
+    "output": ("Description Validation", "validate_descriptions.py", lambda options: [[options["output_dir"]]]),
+    "positioning": ("Positioning Quality Tests", "test_positioning_quality.py", lambda options: [[]]),
+    "landing": ("Landing Page Regression Tests", "test_regression_landing_page.py", _landing_pages),
+    "color-palette": ("Color Palette Regression Tests", "test_regression_color_palette.py", lambda options: [[]]),
+    "downloads": ("Downloads Regression Test", "test_regression_downloads.py", lambda options: [[]]),
+    "route-ids": ("Route ID Regression Tests", "test_regression_route_ids.py", lambda options: [[]]),
+    "training-plans": ("Training Plans Regression Tests", "test_regression_training_plans.py", lambda options: [[]]),
+}
+
+# Makefile targets -> stages
+GROUPS = {
+    "qc": ["marketplace", "pools", "output"],
+    "qc-guide": ["guide"],
+    "qc-all": ["guide", "marketplace", "pools", "output"],
+    "qc-full": ["marketplace", "positioning", "pools", "output"],
+    "qc-landing": ["landing", "color-palette", "downloads", "route-ids", "training-plans"],
+}
+
+
+def _defines_tests(path):
+    """True if the file assigns a module-level TESTS (checked without importing it)"""
+    try:
+        tree = ast.parse(path.read_text(encoding="utf-8"))
+    except (OSError, SyntaxError):
+        return False
+    return any(
+        isinstance(node, ast.Assign) and any(isinstance(t, ast.Name) and t.id == "TESTS" for t in node.targets)
+        for node in tree.body
+    )
+
+
+@lru_cache(maxsize=None)
+def discover_suites():
+    """suite name -> file for test_regression_*.py files defining TESTS ("marketplace" for test_regression_marketplace.py)"""
+    return {
+        path.stem[len("test_regression_"):]: path.name
+        for path in sorted(PROJECT_DIR.glob("test_regression_*.py"))
+        if _defines_tests(path)
+    }
+
+
+def all_stages():
+    """stage name -> (kind, file)"""
+    stages = {name: ("suite", path) for name, path in discover_suites().items()}
+    stages.update({name: ("script", script) for name, (_, script, _) in SCRIPT_STAGES.items()})
+    return stages
+
+# ============================================================================
+# EXECUTION
+# ============================================================================
+
+def _captured(func, *args):
+    """Run func with stdout/stderr captured; returns (value, output, error or None)"""
+    buffer = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(buffer), contextlib.redirect_stderr(buffer):
+            return func(*args), buffer.getvalue(), None
+    except KeyboardInterrupt:
+        raise
+    except BaseException as e:
+        return None, buffer.getvalue(), e
+
+
+def _check(name, status, started, output="", message=""):
+    return {
+        "name": name,
+        "status": status,
+        "duration": round(time.perf_counter() - started, 4),
+        "message": message,
+        "output": output
+    }
+
+
+def run_suite(stage_name, path):
+    """One check per TESTS entry; a test fails by raising (RegressionTestFailure or anything else)"""
+    module = importlib.import_module(Path(path).stem)
+    checks = []
+    for test_name, test_func in module.TESTS:
+        started = time.perf_counter()
+        _, output, error = _captured(test_func)
+        if error is None:
+            checks.append(_check(test_name, "passed", started, output))
+        elif type(error).__name__ == "RegressionTestFailure":
+            checks.append(_check(test_name, "failed", started, output, str(error)))
+        else:
+            checks.append(_check(test_name, "error", started, output, f"Unexpected error: {error}"))
+    return checks
+
+
+def _run_script(path, argv):
+    saved_argv = sys.argv
+    sys.argv = [path] + list(argv)
+    try:
+        runpy.run_path(path, run_name="__main__")
+    except SystemExit as e:
+        if e.code in (None, 0):
+            return 0
+        return e.code if isinstance(e.code, int) else 1
+    finally:
+        sys.argv = saved_argv
+    return 0
+
+
+def run_script(stage_name, path, argv_sets):
+    """One check per argv set; passes when the script exits 0"""
+    checks = []
+    if not argv_sets:
+        started = time.perf_counter()
+        return [_check(path, "skipped", started, message="Nothing to test")]
+    for argv in argv_sets:
+        name = " ".join([path] + list(argv))
+        started = time.perf_counter()
+        code, output, error = _captured(_run_script, path, argv)
+        if error is not None:
+            message = "".join(traceback.format_exception_only(type(error), error)).strip()
+            checks.append(_check(name, "error", started, output, message))
+        elif code:
+            checks.append(_check(name, "failed", started, output, f"Exit code {code}"))
+        else:
+            checks.append(_check(name, "passed", started, output))
+    return checks
+
+
+def _stage_title(name, kind, path):
+    if kind == "script":
+        return SCRIPT_STAGES[name][0]
+    return f"{name.replace('-', ' ').title()} Regression Test Suite"
+
+
+def run_stage(name, options):
+    """
+    Run one stage in this process.
+
+    Returns:
+        dict: {"name", "title", "kind", "file", "status", "duration", "checks"}
+    """
+    kind, path = all_stages()[name]
+    started = time.perf_counter()
+    if kind == "suite":
+        checks = run_suite(name, path)
+    else:
+        if name == "output" and not os.path.exists(options["output_dir"]):
+            checks = [_check(path, "failed", started,
+                             message=f"Output directory not found: {options['output_dir']}. Generate descriptions first.")]
+        else:
+            checks = run_script(name, path, SCRIPT_STAGES[name][2](options))
+    failed = any(check["status"] in ("failed", "error") for check in checks)
+    return {
+        "name": name,
+        "title": _stage_title(name, kind, path),
+        "kind": kind,
+        "file": path,
+        "status": "failed" if failed else "passed",
+        "duration": round(time.perf_counter() - started, 4),
+        "checks": checks
+    }
+
+
+def _prepare_process():
+    """Run from the project root with shared fixtures imported once"""
+    os.chdir(PROJECT_DIR)
+    if str(PROJECT_DIR) not in sys.path:
+        sys.path.insert(0, str(PROJECT_DIR))
+    for module_name in SHARED_FIXTURES:
+        with contextlib.redirect_stdout(io.StringIO()):
+            try:
+                importlib.import_module(module_name)
+            except Exception:
+                pass  # The stage that needs it reports the failure
+
+
+def run_stages(stage_names, options, jobs=1, on_result=None):
+    """
+    Run stages (concurrently when jobs > 1) and collect a report.
+
+    Args:
+        stage_names: Stages to run, in report order
+        options: {"output_dir": ...} passed to script argv builders
+        jobs: Worker processes (1 = run everything in this process)
+        on_result: Optional callback(stage_result) as each stage finishes, in order
+
+    Returns:
+        dict: {"stages": [...], "summary": {...}} (JSON-serializable)
+    """
+    stages = all_stages()
+    unknown = [name for name in stage_names if name not in stages]
+    if unknown:
+        raise ValueError(f"Unknown stage(s): {', '.join(unknown)}. Available: {', '.join(stages)}")
+
+    started = time.perf_counter()
+    _prepare_process()
+    results = []
+    if jobs > 1 and len(stage_names) > 1:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(stage_names)), initializer=_prepare_process) as pool:
+            futures = [pool.submit(run_stage, name, options) for name in stage_names]
+            for future in futures:
+                results.append(future.result())
+                if on_result:
+                    on_result(results[-1])
+    else:
+        for name in stage_names:
+            results.append(run_stage(name, options))
+            if on_result:
+                on_result(results[-1])
+
+    checks = [check for stage in results for check in stage["checks"]]
+    return {
+        "stages": results,
+        "summary": {
+            "stages": len(results),
+            "failed_stages": [stage["name"] for stage in results if stage["status"] == "failed"],
+            "checks": len(checks),
+            "passed": sum(1 for check in checks if check["status"] == "passed"),
+            "failed": sum(1 for check in checks if check["status"] in ("failed", "error")),
+            "skipped": sum(1 for check in checks if check["status"] == "skipped"),
+            "duration": round(time.perf_counter() - started, 4)
+        }
+    }
+
+# ============================================================================
+# REPORTS
+# ============================================================================
+
+def write_json_report(report, path):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+
+def write_junit_report(report, path):
+    """JUnit XML: one <testsuite> per stage, one <testcase> per check"""
+    root = ET.Element("testsuites", {
+        "name": "Gravel God QC",
+        "tests": str(report["summary"]["checks"]),
+        "failures": str(report["summary"]["failed"]),
+        "time": str(report["summary"]["duration"])
+    })
+    for stage in report["stages"]:
+        suite = ET.SubElement(root, "testsuite", {
+            "name": stage["title"],
+            "tests": str(len(stage["checks"])),
+            "failures": str(sum(1 for check in stage["checks"] if check["status"] == "failed")),
+            "errors": str(sum(1 for check in stage["checks"] if check["status"] == "error")),
+            "skipped": str(sum(1 for check in stage["checks"] if check["status"] == "skipped")),
+            "time": str(stage["duration"])
+        })
+        for check in stage["checks"]:
+            case = ET.SubElement(suite, "testcase", {
+                "classname": stage["file"],
+                "name": check["name"],
+                "time": str(check["duration"])
+            })
+            if check["status"] in ("failed", "error"):
+                ET.SubElement(case, "failure" if check["status"] == "failed" else "error",
+                              {"message": check["message"][:500]}).text = check["message"]
+            elif check["status"] == "skipped":
+                ET.SubElement(case, "skipped", {"message": check["message"]})
+            if check["output"]:
+                ET.SubElement(case, "system-out").text = check["output"]
+    ET.ElementTree(root).write(path, encoding="utf-8", xml_declaration=True)
+
+
+def print_stage(stage, verbose=False):
+    """Console summary of one stage; captured output is shown for failures (or always with verbose)"""
+    print(f"\n{'='*80}")
+    print(f"{stage['title']} ({stage['duration']:.2f}s)")
+    print(f"{'='*80}")
+    for check in stage["checks"]:
+        symbol = {"passed": "✓", "skipped": "-"}.get(check["status"], "✗")
+        print(f"{symbol} {check['name']} ({check['duration']:.2f}s)")
+        if check["status"] in ("failed", "error") or verbose:
+            if check["output"].strip():
+                print("  " + check["output"].rstrip().replace("\n", "\n  "))
+            if check["message"]:
+                print(f"  {check['message']}")
+
+# ============================================================================
+# MAIN
+# ============================================================================
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Run QC stages in-process")
+    parser.add_argument("output_dir", nargs="?", default=DEFAULT_OUTPUT_DIR,
+                        help=f"Generated descriptions to validate (default: {DEFAULT_OUTPUT_DIR})")
+    parser.add_argument("--group", choices=list(GROUPS), default="qc",
+                        help="Stage group, named after the Makefile targets (default: qc)")
+    parser.add_argument("--stage", dest="stages", action="append",
+                        help="Run only this stage (repeatable; overrides --group)")
+    parser.add_argument("--jobs", type=int, default=1,
+                        help="Worker processes for independent stages (default: 1, in-process)")
+    parser.add_argument("--json", dest="json_path", help="Write a JSON report")
+    parser.add_argument("--junit", dest="junit_path", help="Write a JUnit XML report")
+    parser.add_argument("--verbose", action="store_true", help="Show captured output of passing checks too")
+    parser.add_argument("--list", action="store_true", help="List stages and groups")
+    return parser
+
+
+def run(args):
+    """Run the stages selected by parsed args; returns the report"""
+    stage_names = args.stages or GROUPS[args.group]
+    report = run_stages(stage_names, {"output_dir": args.output_dir}, jobs=args.jobs,
+                        on_result=lambda stage: print_stage(stage, args.verbose))
+    if args.json_path:
+        write_json_report(report, args.json_path)
+    if args.junit_path:
+        write_junit_report(report, args.junit_path)
+    return report
+
+
+def main():
+    args = build_parser().parse_args()
+    if args.list:
+        for name, (kind, path) in all_stages().items():
+            print(f"  {name:<16} {kind:<7} {path}")
+        for group, names in GROUPS.items():
+            print(f"  make {group:<11} {', '.join(names)}")
+        return 0
+
+    report = run(args)
+    summary = report["summary"]
+    print(f"\n{'='*80}")
+    print(f"RESULTS: {summary['passed']} passed, {summary['failed']} failed "
+          f"({summary['stages']} stages, {summary['duration']:.2f}s)")
+    print(f"{'='*80}")
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
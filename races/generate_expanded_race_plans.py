@@ -10,26 +10,62 @@ Generates training plans with multiple durations and variations:
 
 Usage:
     python generate_expanded_race_plans.py unbound_gravel_200.json
+    python generate_expanded_race_plans.py unbound_gravel_200.json --jobs 4
+    python generate_expanded_race_plans.py unbound_gravel_200.json --bundle zip
+    python generate_expanded_race_plans.py unbound_gravel_200.json --dedup hardlink
+    python generate_expanded_race_plans.py unbound_gravel_200.json --explain
+    python generate_expanded_race_plans.py unbound_gravel_200.json --force
+
+Reruns are incremental: only workouts, guides and marketplace copy whose
+inputs changed are regenerated (see build_graph).
 """
 
+import argparse
+import contextlib
+import io
 import json
 import os
+import re
 import sys
 import shutil
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import lru_cache
 from pathlib import Path
 from datetime import datetime
 import xml.etree.ElementTree as ET
 
 # Import generation modules
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'generation_modules'))
-import subprocess
 try:
     from zwo_generator import generate_all_zwo_files, create_zwo_file
     from marketplace_generator import generate_marketplace_html
+    from nate_workout_generator import configure_synthesis_cache, get_synthesis_cache
+    from zwo_bundle import BUNDLE_FORMATS, bundle_directory, manifest_path_for
+    from zwo_store import (DEDUP_MODES, dedup_directory, objects_manifest_for, print_store_stats,
+                           prune_store, remove_unused_store)
+    from build_graph import BuildGraph, fingerprint, source_fingerprint
+    from plan_catalogue import get_plan_catalogue
 except ImportError as e:
     print(f"ERROR: Could not import required generation modules: {e}")
     sys.exit(1)
 
+# BUILD INPUTS (sources whose changes invalidate an artifact, see build_graph)
+GENERATION_MODULES_DIR = Path(__file__).parent / "generation_modules"
+WORKOUT_SOURCES = (
+    "zwo_generator", "nate_workout_generator", "archetype_store", "new_archetypes", "constants",
+    "workout_description_generator_v2_nate", "workout_description_generator",
+    "strength_generator", "workout_enhancements", "exercise_lookup",
+    "ftp_test_converter", "durability_test_converter", "zwo_bundle", "zwo_store"
+)
+WORKOUT_DATA_FILES = (
+    GENERATION_MODULES_DIR / "MASTER_TEMPLATES_V2.md",
+    GENERATION_MODULES_DIR / "exercise_video_library.json"
+)
+MARKETPLACE_SOURCES = ("marketplace_generator", "gravel_god_copy_variations")
+GUIDE_SOURCES = ("guide_generator",)
+GUIDE_DATA_FILES = (GENERATION_MODULES_DIR / "guide_template_full.html",)
+
 # PLAN TYPES
 PLAN_TYPES = {
     "1. Time Crunched": {
@@ -187,87 +223,115 @@ def load_race_data(race_json_path):
         return json.load(f)
 
 def load_plan_template(plan_folder_name):
-    """Load plan template JSON from old structure"""
-    # Try multiple possible paths
-    possible_paths = [
-        Path(__file__).parent.parent / "plans" / plan_folder_name / "template.json",
-        Path(__file__).parent / "plans" / plan_folder_name / "template.json",
-        Path(__file__).parent.parent.parent / "plans" / plan_folder_name / "template.json"
-    ]
-    
-    for template_path in possible_paths:
-        if template_path.exists():
-            with open(template_path, 'r') as f:
-                return json.load(f)
-    
-    print(f"⚠️  Template not found: {plan_folder_name}")
-    return None
+    """
+    Load plan template JSON from old structure.
+
+    Templates come from the process-wide plan catalogue: parsed once and
+    returned as shared read-only structures (derive with overlay()).
+    """
+    template = get_plan_catalogue().get(plan_folder_name)
+    if template is None:
+        print(f"⚠️  Template not found: {plan_folder_name}")
+    return template
+
+# ============================================================================
+# COPY-ON-WRITE TEMPLATE OVERLAYS
+# ============================================================================
+# Loaded plan templates and their weeks/workouts are treated as immutable and
+# shared between every template derived from them. Extension, test insertion
+# and variations build shallow overlay nodes holding only the overridden keys
+# (week number, renamed workout, volume percent, inserted tests); unchanged
+# weeks, workouts and their description/blocks strings are shared by
+# reference instead of deep-copied. Never mutate a week or workout in place -
+# overlay it.
+
+WEEK_PREFIX_PATTERN = re.compile(r'^W\d{1,2}_')
+WEEK_TOKEN_PATTERN = re.compile(r'W(\d{1,2})(?=[^0-9])')
+
+def overlay(base, **overrides):
+    """Shallow overlay of a template node: new dict sharing all of base's values except overrides"""
+    node = dict(base)
+    node.update(overrides)
+    return node
+
+def renumber_workout_name(name, week_number):
+    """Replace week number tokens (W01_, W01 ...) in a workout name"""
+    # Pattern: W followed by 1-2 digits at start of name
+    new_name = WEEK_PREFIX_PATTERN.sub(f'W{week_number:02d}_', name)
+    # Also handle cases like "W01" in middle of name (less common)
+    return WEEK_TOKEN_PATTERN.sub(f'W{week_number:02d}', new_name)
 
 def extend_plan_template(base_template, target_weeks, ftp_test_template=None):
-    """Extend a 12-week plan template to 16 or 20 weeks"""
+    """Extend a 12-week plan template to 16 or 20 weeks (base_template is not modified)"""
     if target_weeks == 12:
         return base_template
     
-    # Deep copy the template to avoid modifying original
-    import copy
-    extended_template = copy.deepcopy(base_template)
-    
     # Calculate how many additional weeks needed
     additional_weeks = target_weeks - 12
     
     # Get the last few weeks as a pattern (use weeks 9-12 for better progression)
-    last_weeks = extended_template.get("weeks", [])[-4:]  # Last 4 weeks as pattern
+    base_weeks = base_template.get("weeks", [])
+    last_weeks = base_weeks[-4:]  # Last 4 weeks as pattern
     
-    # Create new weeks by repeating and modifying the pattern
-    new_weeks = extended_template.get("weeks", [])[:]
+    # Existing weeks are shared; new weeks overlay the pattern weeks
+    new_weeks = list(base_weeks)
     
     for i in range(additional_weeks):
         # Use pattern from last weeks, cycling through
         pattern_week_idx = i % len(last_weeks)
         pattern_week = last_weeks[pattern_week_idx]
         
-        # Deep copy the pattern week to avoid modifying original
-        new_week = copy.deepcopy(pattern_week)
         new_week_number = 13 + i
-        new_week["week_number"] = new_week_number
-        new_week["focus"] = f"Extended Build - Week {new_week_number}"
+        overrides = {
+            "week_number": new_week_number,
+            "focus": f"Extended Build - Week {new_week_number}",
+        }
         
         # Adjust volume percent slightly (build phase)
         if i < additional_weeks // 2:
-            new_week["volume_percent"] = min(100, pattern_week.get("volume_percent", 100) + 5)
+            overrides["volume_percent"] = min(100, pattern_week.get("volume_percent", 100) + 5)
         else:
-            new_week["volume_percent"] = pattern_week.get("volume_percent", 100)
+            overrides["volume_percent"] = pattern_week.get("volume_percent", 100)
         
-        # Update workout week numbers - use regex to properly replace week numbers
-        import re
-        for workout in new_week.get("workouts", []):
-            old_name = workout.get("name", "")
-            # Replace week number pattern (W01, W02, W12, etc.) with new week number
-            # Pattern: W followed by 1-2 digits at start of name
-            new_name = re.sub(r'^W\d{1,2}_', f'W{new_week_number:02d}_', old_name)
-            # Also handle cases like "W01" in middle of name (less common)
-            new_name = re.sub(r'W(\d{1,2})(?=[^0-9])', f'W{new_week_number:02d}', new_name)
-            workout["name"] = new_name
-            workout["week_number"] = new_week_number
+        # Update workout week numbers
+        if "workouts" in pattern_week:
+            overrides["workouts"] = [
+                overlay(workout,
+                        name=renumber_workout_name(workout.get("name", ""), new_week_number),
+                        week_number=new_week_number)
+                for workout in pattern_week["workouts"]
+            ]
         
-        new_weeks.append(new_week)
-    
-    extended_template["weeks"] = new_weeks
-    extended_template["plan_metadata"]["duration_weeks"] = target_weeks
+        new_weeks.append(overlay(pattern_week, **overrides))
     
-    return extended_template
+    return overlay(
+        base_template,
+        weeks=new_weeks,
+        plan_metadata=overlay(base_template["plan_metadata"], duration_weeks=target_weeks)
+    )
+
+@lru_cache(maxsize=4096)
+def estimate_blocks_duration(blocks):
+    """Rough workout duration in seconds: sum of Duration="..." attributes in ZWO blocks"""
+    if "Duration" not in blocks:
+        return 0
+    return sum(int(d) for d in re.findall(r'Duration="(\d+)"', blocks))
 
 def insert_ftp_tests(plan_template, ftp_test_path, plan_weeks, tier):
-    """Insert FTP test and durability test workouts into plan template at appropriate weeks"""
-    import sys
-    import os
-    sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'generation_modules'))
+    """
+    Insert FTP test and durability test workouts into plan template at appropriate weeks
+    
+    Returns a new template; test weeks are overlaid, all other weeks are shared
+    with plan_template (which is not modified).
+    """
     from ftp_test_converter import convert_ftp_test
     from durability_test_converter import convert_durability_test, select_durability_test
     
+    new_weeks = []
     for week in plan_template.get("weeks", []):
         week_num = week.get("week_number", 1)
-        workouts = week.get("workouts", [])
+        # Workouts list is copied (not its workouts) so insertions don't touch the shared week
+        workouts = list(week.get("workouts", []))
         
         # Check if this is an FTP test week
         if should_insert_ftp_test(week_num, plan_weeks) and ftp_test_path:
@@ -305,47 +369,83 @@ def insert_ftp_tests(plan_template, ftp_test_path, plan_weeks, tier):
                     longest_idx = 0
                     longest_duration = 0
                     for i, workout in enumerate(workouts):
-                        # Try to estimate duration from blocks
-                        blocks = workout.get("blocks", "")
-                        if "Duration" in blocks:
-                            # Extract duration (rough estimate)
-                            import re
-                            durations = re.findall(r'Duration="(\d+)"', blocks)
-                            if durations:
-                                total = sum(int(d) for d in durations)
-                                if total > longest_duration:
-                                    longest_duration = total
-                                    longest_idx = i
+                        # Estimate duration from blocks (cached per blocks string)
+                        total = estimate_blocks_duration(workout.get("blocks", ""))
+                        if total > longest_duration:
+                            longest_duration = total
+                            longest_idx = i
                     
                     # Replace longest workout with durability test
                     durability_workout = convert_durability_test(durability_path, week_num, test_name)
                     if durability_workout:
                         workouts[longest_idx] = durability_workout
-    
-    return plan_template
+        
+        if "workouts" in week and (len(workouts) != len(week["workouts"]) or
+                                   any(a is not b for a, b in zip(workouts, week["workouts"]))):
+            week = overlay(week, workouts=workouts)
+        new_weeks.append(week)
+    
+    if "weeks" not in plan_template:
+        return plan_template
+    return overlay(plan_template, weeks=new_weeks)
 
 def create_plan_variation(base_template, variation_key, variation_info):
-    """Create a variation of a plan template"""
-    variation_template = json.loads(json.dumps(base_template))  # Deep copy
+    """Create a variation of a plan template (overlay; base_template is not modified)"""
+    overrides = {"variation": variation_info}
     
     # Modify based on variation type
     if "Volume" in variation_info["name"]:
         # Increase volume slightly
-        for week in variation_template.get("weeks", []):
-            week["volume_percent"] = min(110, week.get("volume_percent", 100) + 5)
+        overrides["weeks"] = [
+            overlay(week, volume_percent=min(110, week.get("volume_percent", 100) + 5))
+            for week in base_template.get("weeks", [])
+        ]
     elif "Intensity" in variation_info["name"]:
         # Increase intensity slightly (reduce recovery, add intervals)
         pass  # Would need to modify workout structures
     elif "Conservative" in variation_info["name"]:
         # Reduce volume slightly
-        for week in variation_template.get("weeks", []):
-            week["volume_percent"] = max(70, week.get("volume_percent", 100) - 5)
+        overrides["weeks"] = [
+            overlay(week, volume_percent=max(70, week.get("volume_percent", 100) - 5))
+            for week in base_template.get("weeks", [])
+        ]
     
-    variation_template["variation"] = variation_info
-    return variation_template
+    if "weeks" in overrides and "weeks" not in base_template:
+        del overrides["weeks"]
+    return overlay(base_template, **overrides)
+
+def remove_workout_outputs(workouts_dir):
+    """
+    Remove the workouts a previous run left for a plan, in any output mode.
+    
+    Covers loose (or hardlinked) .zwo files, zip/tar bundles with their
+    sidecar manifests, and dedup objects manifests, so switching between
+    loose, --bundle and --dedup output never leaves stale files behind.
+    """
+    if workouts_dir.is_dir():
+        for workout_path in workouts_dir.glob("*.zwo"):
+            workout_path.unlink()
+        try:
+            workouts_dir.rmdir()
+        except OSError:
+            pass  # Holds files this generator didn't write
+    for bundle_format in BUNDLE_FORMATS:
+        bundle_path = workouts_dir.with_name(f"{workouts_dir.name}.{bundle_format}")
+        bundle_path.unlink(missing_ok=True)
+        manifest_path_for(bundle_path).unlink(missing_ok=True)
+    objects_manifest_for(workouts_dir).unlink(missing_ok=True)
 
-def generate_plan_set(race_data, plan_type_info, duration, variation_key, variation_info, race_folder, race_json_path, ftp_test_template):
-    """Generate one complete plan (all workouts, marketplace, guide)"""
+def generate_plan_set(race_data, plan_type_info, duration, variation_key, variation_info, race_folder, race_json_path, ftp_test_template,
+                      bundle_format=None, dedup_mode=None, build=None):
+    """
+    Generate one complete plan (all workouts, marketplace, guide)
+    
+    With bundle_format ("zip" or "tar") the plan's workouts are written as a
+    single workouts.<format> archive plus manifest instead of loose files.
+    With dedup_mode ("hardlink" or "manifest") each distinct workout file is
+    stored once in the race folder's object store (see zwo_store).
+    With a BuildGraph, artifacts whose inputs are unchanged are skipped.
+    """
     # Get plan type number
     plan_type_num = None
     for i, (name, info) in enumerate(PLAN_TYPES.items(), 1):
@@ -362,7 +462,6 @@ def generate_plan_set(race_data, plan_type_info, duration, variation_key, variat
     
     plan_output_dir = race_folder / plan_folder_name
     plan_output_dir.mkdir(exist_ok=True)
-    (plan_output_dir / "workouts").mkdir(exist_ok=True)
     
     # Load base plan template
     source_plan = plan_type_info['source_plans'][0]
@@ -404,22 +503,78 @@ def generate_plan_set(race_data, plan_type_info, duration, variation_key, variat
         "variation": variation_info["name"]
     }
     
-    # Generate ZWO files
-    print(f"  → Generating ZWO files...")
-    zwo_count = generate_all_zwo_files(variation_template, race_data, plan_info, plan_output_dir)
-    print(f"     ✓ Generated {zwo_count} ZWO workout files")
+    # Incremental build: each artifact is rebuilt only when its inputs changed
+    build = build or BuildGraph(None)
+    plan_inputs = {
+        "plan template": fingerprint(variation_template),
+        "plan info": fingerprint(plan_info)
+    }
+    
+    # Generate ZWO, race day and strength workout files (optionally bundled or deduplicated)
+    workouts_dir = plan_output_dir / "workouts"
+    if bundle_format:
+        workouts_sink = bundle_directory(workouts_dir, bundle_format)
+        workouts_output = workouts_dir.with_name(f"{workouts_dir.name}.{bundle_format}")
+    elif dedup_mode:
+        workouts_sink = dedup_directory(workouts_dir, race_folder, dedup_mode)
+        workouts_output = objects_manifest_for(workouts_dir) if dedup_mode == "manifest" else workouts_dir
+    else:
+        workouts_sink = contextlib.nullcontext()
+        workouts_output = workouts_dir
+    step = build.step(f"{plan_folder_name}/workouts", {
+        **plan_inputs,
+        "code": source_fingerprint(WORKOUT_SOURCES, [__file__, *WORKOUT_DATA_FILES]),
+        "output format": fingerprint([bundle_format, dedup_mode])
+    }, race_data, [workouts_output])
+    if step.stale:
+        remove_workout_outputs(workouts_dir)
+        with workouts_sink as sink:
+            generate_workout_files(variation_template, step.track(race_data), plan_info, plan_output_dir)
+        step.finish()
+        if bundle_format:
+            print(f"     ✓ Bundled workouts into {workouts_output.name}")
+        elif dedup_mode:
+            print(f"     ✓ Stored workouts: {sink.store.written} new objects, {sink.store.reused} reused")
+    else:
+        print(f"  ✓ Workouts up to date")
     
     # Generate marketplace description
-    print(f"  → Generating marketplace description...")
-    marketplace_file = generate_marketplace_html(race_data, variation_template, plan_info)
-    if marketplace_file:
-        print(f"     ✓ Generated marketplace description")
+    step = build.step(f"{plan_folder_name}/marketplace", {
+        **plan_inputs,
+        "code": source_fingerprint(MARKETPLACE_SOURCES, [__file__])
+    }, race_data)
+    if step.stale:
+        print(f"  → Generating marketplace description...")
+        marketplace_file = generate_marketplace_html(step.track(race_data), variation_template, plan_info)
+        if marketplace_file:
+            print(f"     ✓ Generated marketplace description")
+            step.finish()
+    else:
+        print(f"  ✓ Marketplace description up to date")
     
     # Generate training guide
-    print(f"  → Generating training plan guide...")
-    guide_file = generate_training_guide(race_data, variation_template, plan_info, plan_output_dir, race_json_path, duration)
-    if guide_file:
-        print(f"     ✓ Generated training plan guide")
+    step = build.step(f"{plan_folder_name}/guide", {
+        **plan_inputs,
+        "code": source_fingerprint(GUIDE_SOURCES, [__file__, *GUIDE_DATA_FILES])
+    }, race_data)
+    if step.stale:
+        print(f"  → Generating training plan guide...")
+        guide_file = generate_training_guide(step.track(race_data), variation_template, plan_info,
+                                             plan_output_dir, duration)
+        if guide_file:
+            print(f"     ✓ Generated training plan guide")
+            step.finish([guide_file])
+    else:
+        print(f"  ✓ Training plan guide up to date")
+    
+    return True
+
+def generate_workout_files(plan_template, race_data, plan_info, plan_output_dir):
+    """Generate all ZWO workouts for a plan: training, race day and strength"""
+    # Generate ZWO files
+    print(f"  → Generating ZWO files...")
+    zwo_count = generate_all_zwo_files(plan_template, race_data, plan_info, plan_output_dir)
+    print(f"     ✓ Generated {zwo_count} ZWO workout files")
     
     # Generate race day workout
     from zwo_generator import generate_race_workout
@@ -456,42 +611,17 @@ def generate_plan_set(race_data, plan_type_info, duration, variation_key, variat
         print(f"     ⚠️  Strength generator not available: {e}")
     except Exception as e:
         print(f"     ⚠️  Error generating strength workouts: {e}")
-    
-    return True
 
-def generate_training_guide(race_data, plan_template, plan_info, plan_output_dir, race_json_path, duration):
-    """Generate training plan guide with duration-specific content"""
-    guide_generator_path = Path(__file__).parent / "generation_modules" / "guide_generator.py"
-    
+def generate_training_guide(race_data, plan_template, plan_info, plan_output_dir, duration):
+    """Generate training plan guide with duration-specific content (in-process)"""
     plan_name_slug = plan_info['tier'] + '_' + plan_info['level']
-    plan_json_path = plan_output_dir / f"{plan_name_slug}_temp.json"
-    
-    with open(plan_json_path, 'w') as f:
-        json.dump(plan_template, f, indent=2)
     
     try:
-        # Guide generator may not support --duration, so we'll handle it in the template
-        result = subprocess.run([
-            sys.executable,
-            str(guide_generator_path),
-            "--race", str(race_json_path),
-            "--plan", str(plan_json_path),
-            "--output-dir", str(plan_output_dir)
-        ], capture_output=True, text=True, check=True)
-        
-        plan_json_path.unlink()
-        
-        guide_files = list(plan_output_dir.glob(f"*{plan_name_slug}*.html"))
-        if guide_files:
-            return guide_files[0]
-    except subprocess.CalledProcessError as e:
-        print(f"     ⚠️  Guide generation failed: {e.stderr}")
-        if plan_json_path.exists():
-            plan_json_path.unlink()
+        from guide_generator import generate_guide_for_plan
+        return generate_guide_for_plan(race_data, plan_template, plan_name_slug,
+                                       plan_output_dir, verbose=False)
     except Exception as e:
         print(f"     ⚠️  Guide generation error: {e}")
-        if plan_json_path.exists():
-            plan_json_path.unlink()
     
     return None
 
@@ -518,21 +648,148 @@ def create_trainingpeaks_export(race_folder, race_name):
     
     print(f"\n📋 Created TrainingPeaks export structure: {tp_export_dir}")
 
-def main():
-    if len(sys.argv) < 2:
-        print("Usage: python generate_expanded_race_plans.py <race_json_file> [ftp_test_path]")
-        print("Example: python generate_expanded_race_plans.py races/unbound_gravel_200.json")
-        sys.exit(1)
+def iter_plan_jobs():
+    """Yield (plan_type_name, duration, variation_key, variation_info) for every plan set"""
+    for plan_type_name in PLAN_TYPES:
+        for duration in DURATIONS:
+            for var_key, var_info in VARIATIONS.items():
+                yield plan_type_name, duration, var_key, var_info
+
+def run_plan_set_job(race_data, plan_type_name, duration, variation_key, variation_info,
+                     race_folder, race_json_path, ftp_test_template, bundle_format=None,
+                     dedup_mode=None, build=None, capture_output=False):
+    """
+    Run generate_plan_set for one plan and return a picklable result summary.
+    
+    Exceptions are caught and returned as a traceback string so one broken
+    plan never takes down the rest of the run. With capture_output=True the
+    plan's console output is buffered and returned instead of printed, which
+    keeps logs from interleaving when running in a worker process.
+    Build records made by the plan are returned so a worker's results can
+    be merged into the parent's build manifest.
+    """
+    plan_label = f"{plan_type_name} {variation_info['name']} ({duration} weeks)"
+    buffer = io.StringIO() if capture_output else None
+    redirect = contextlib.redirect_stdout(buffer) if capture_output else contextlib.nullcontext()
+    cache = get_synthesis_cache()
+    hits_before, misses_before = cache.hits, cache.misses
+    build = build or BuildGraph(None)
+    build.changes, build.explanations = {}, []
+    
+    success = False
+    error = None
+    with redirect:
+        try:
+            success = generate_plan_set(race_data, PLAN_TYPES[plan_type_name], duration,
+                                        variation_key, variation_info, race_folder,
+                                        race_json_path, ftp_test_template, bundle_format,
+                                        dedup_mode, build)
+        except Exception:
+            error = traceback.format_exc()
+    
+    # Templates first used by this plan (possibly in a worker) join the snapshot
+    get_plan_catalogue().save_snapshot()
     
-    race_json_path = Path(sys.argv[1])
+    return {
+        "plan": plan_label,
+        "success": bool(success) and error is None,
+        "error": error,
+        "log": buffer.getvalue() if buffer else "",
+        "cache_hits": cache.hits - hits_before,
+        "cache_misses": cache.misses - misses_before,
+        "build_changes": build.changes,
+        "build_explanations": build.explanations
+    }
+
+def _init_plan_worker(synthesis_cache_dir):
+    """Process pool initializer: configure per-worker state"""
+    if synthesis_cache_dir:
+        configure_synthesis_cache(cache_dir=synthesis_cache_dir)
+
+def generate_plan_sets(race_data, race_folder, race_json_path, ftp_test_template, jobs=1,
+                       synthesis_cache_dir=None, bundle_format=None, dedup_mode=None, build=None):
+    """
+    Generate every plan set for a race, serially or across a process pool.
+    
+    Each plan set writes to its own folder, so plans are independent and can
+    be fanned out to `jobs` worker processes. Progress is reported as each
+    plan finishes.
+    
+    Returns:
+        list: One result dict per plan (see run_plan_set_job)
+    """
+    plan_jobs = list(iter_plan_jobs())
+    common_args = (race_folder, race_json_path, ftp_test_template, bundle_format, dedup_mode, build)
+    
+    if jobs <= 1:
+        _init_plan_worker(synthesis_cache_dir)
+        return [run_plan_set_job(race_data, *job, *common_args) for job in plan_jobs]
+    
+    results = []
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_plan_worker,
+                             initargs=(synthesis_cache_dir,)) as executor:
+        futures = {
+            executor.submit(run_plan_set_job, race_data, *job, *common_args, capture_output=True): job
+            for job in plan_jobs
+        }
+        for done, future in enumerate(as_completed(futures), 1):
+            plan_type_name, duration, _, var_info = futures[future]
+            try:
+                result = future.result()
+            except Exception:
+                result = {
+                    "plan": f"{plan_type_name} {var_info['name']} ({duration} weeks)",
+                    "success": False,
+                    "error": traceback.format_exc(),
+                    "log": "",
+                    "cache_hits": 0,
+                    "cache_misses": 0,
+                    "build_changes": {},
+                    "build_explanations": []
+                }
+            results.append(result)
+            
+            status = "✓" if result["success"] else "❌"
+            print(f"  [{done}/{len(plan_jobs)}] {status} {result['plan']}")
+            # Surface warnings from the worker's buffered log
+            for line in result["log"].splitlines():
+                if "⚠️" in line or "❌" in line:
+                    print(f"      {line.strip()}")
+    
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Generate expanded training plans for a race",
+        epilog="Example: python generate_expanded_race_plans.py races/unbound_gravel_200.json"
+    )
+    parser.add_argument("race_json", help="Path to race JSON file")
+    parser.add_argument("ftp_test_path", nargs="?", help="Path to FTP test ZWO template")
+    parser.add_argument("--jobs", "-j", type=int, default=1,
+                        help="Number of worker processes for plan generation (default: 1, serial)")
+    parser.add_argument("--synthesis-cache-dir",
+                        help="Persist synthesized Nate workouts here so later runs skip re-generation")
+    workouts_output = parser.add_mutually_exclusive_group()
+    workouts_output.add_argument("--bundle", choices=BUNDLE_FORMATS,
+                                 help="Write each plan's workouts as one archive + manifest instead of loose .zwo files")
+    workouts_output.add_argument("--dedup", choices=DEDUP_MODES,
+                                 help="Store each distinct workout file once per race; plan folders get "
+                                      "hardlinks or an objects manifest")
+    parser.add_argument("--force", action="store_true",
+                        help="Regenerate every artifact even if its inputs are unchanged")
+    parser.add_argument("--explain", action="store_true",
+                        help="Print why each artifact was rebuilt or skipped")
+    args = parser.parse_args()
+    
+    race_json_path = Path(args.race_json)
     if not race_json_path.exists():
         print(f"ERROR: Race JSON file not found: {race_json_path}")
         sys.exit(1)
     
     # Load FTP test template if provided
     ftp_test_template = None
-    if len(sys.argv) >= 3:
-        ftp_test_path = Path(sys.argv[2])
+    if args.ftp_test_path:
+        ftp_test_path = Path(args.ftp_test_path)
         ftp_test_template = load_ftp_test_template(ftp_test_path)
     else:
         # Try default location
@@ -549,6 +806,8 @@ def main():
     print(f"   Durations: {', '.join(map(str, DURATIONS))} weeks")
     print(f"   Variation: Standard only")
     print(f"   Total Plans: {len(PLAN_TYPES)} tiers × {len(DURATIONS)} durations = {len(PLAN_TYPES) * len(DURATIONS)}")
+    if args.jobs > 1:
+        print(f"   Workers: {args.jobs}")
     
     if ftp_test_template:
         print(f"   ✓ FTP test template loaded - will be inserted in 20-week plans")
@@ -559,22 +818,50 @@ def main():
     base_path = Path(__file__).parent
     race_folder = base_path / race_name
     race_folder.mkdir(exist_ok=True)
+    build = BuildGraph(race_folder, force=args.force)
     
     # Generate all plans
-    success_count = 0
     total_plans = len(PLAN_TYPES) * len(DURATIONS) * len(VARIATIONS)
-    
-    for plan_type_name, plan_type_info in PLAN_TYPES.items():
-        for duration in DURATIONS:
-            for var_key, var_info in VARIATIONS.items():
-                if generate_plan_set(race_data, plan_type_info, duration, var_key, var_info, 
-                                   race_folder, race_json_path, ftp_test_template):
-                    success_count += 1
+    results = generate_plan_sets(race_data, race_folder, race_json_path, ftp_test_template,
+                                 jobs=args.jobs, synthesis_cache_dir=args.synthesis_cache_dir,
+                                 bundle_format=args.bundle, dedup_mode=args.dedup, build=build)
+    success_count = sum(1 for result in results if result["success"])
+    errors = [result for result in results if result["error"]]
+    cache_hits = sum(result["cache_hits"] for result in results)
+    cache_misses = sum(result["cache_misses"] for result in results)
+    
+    # Record what was built so the next run can skip unchanged artifacts
+    explanations = sorted(explanation for result in results for explanation in result["build_explanations"])
+    for result in results:
+        build.update(result["build_changes"])
+    build.save()
+    rebuilt = sum(1 for _, reasons in explanations if reasons)
     
     # Create TrainingPeaks export structure
     create_trainingpeaks_export(race_folder, race_name)
     
     print(f"\n✅ Successfully generated {success_count}/{total_plans} plans")
+    print(f"   Workout synthesis cache: {cache_hits} hits, {cache_misses} misses")
+    print(f"   Incremental build: {rebuilt} rebuilt, {len(explanations) - rebuilt} up to date")
+    if args.explain:
+        for artifact_id, reasons in explanations:
+            if reasons:
+                print(f"      ↻ {artifact_id}: {'; '.join(reasons)}")
+            else:
+                print(f"      ✓ {artifact_id}: up to date")
+    if args.dedup:
+        # Objects left behind by earlier runs' content are no longer referenced
+        pruned = prune_store(race_folder)
+        if pruned["objects"]:
+            print(f"   Pruned {pruned['objects']} unreferenced workout objects ({pruned['bytes'] / 1e6:.1f} MB)")
+        print_store_stats(race_folder)
+    elif remove_unused_store(race_folder):
+        print(f"   Removed unused workout object store")
+    if errors:
+        print(f"\n❌ {len(errors)} plan(s) raised errors:")
+        for result in errors:
+            print(f"\n   {result['plan']}:")
+            print("      " + result["error"].strip().replace("\n", "\n      "))
     print(f"   Output directory: {race_folder}")
     print(f"\n📋 Next Steps:")
     print(f"   1. Review plans in: {race_folder}")
@@ -584,4 +871,3 @@ def main():
 
 if __name__ == "__main__":
     main()
-
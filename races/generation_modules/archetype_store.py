@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Archetype Store
+Compiled, lazily decoded copy of the Nate archetype library.
+
+nate_archetypes/new_archetypes.py is ~140 KB of nested dict literals that
+every interpreter importing the workout generator used to build in full -
+and compile from source, wherever bytecode isn't cached. The store
+serializes it once into an indexed file next to the bytecode
+(nate_archetypes/__pycache__/new_archetypes.archetypes):
+
+    MAGIC | header length | marshal(header) | one marshal blob per archetype
+
+The header holds the source's size and mtime and the index (category ->
+[(name, offset, length)]). Opening the store reads the file and the index
+only; an archetype's blob - its level data - is decoded on first access
+and cached. Like a .pyc, the store is rebuilt whenever the source's size
+or mtime changes. Unlike a .pyc it is written even under
+PYTHONDONTWRITEBYTECODE: that is where it saves the most.
+
+Usage:
+    python archetype_store.py info
+    python archetype_store.py rebuild
+    python archetype_store.py benchmark [--runs 5] [--json]
+"""
+
+import marshal
+import os
+import sys
+from collections.abc import Mapping
+from pathlib import Path
+
+SOURCE_PATH = Path(__file__).resolve().parent.parent / "nate_archetypes" / "new_archetypes.py"
+STORE_SUFFIX = ".archetypes"
+STORE_MAGIC = b"GGARCH1\0"
+_HEADER_LENGTH_SIZE = 4
+
+
+def store_path_for(source_path):
+    """new_archetypes.py -> __pycache__/new_archetypes.archetypes (next to its bytecode, honoring PYTHONPYCACHEPREFIX)"""
+    source_path = Path(source_path).resolve()
+    name = source_path.stem + STORE_SUFFIX
+    if sys.pycache_prefix:
+        return Path(sys.pycache_prefix, *source_path.parent.parts[1:], name)
+    return source_path.parent / "__pycache__" / name
+
+
+def source_stamp(source_path):
+    """(mtime_ns, size) of the source, the store's staleness key"""
+    stat = os.stat(source_path)
+    return (stat.st_mtime_ns, stat.st_size)
+
+# ============================================================================
+# STORE
+# ============================================================================
+
+class ArchetypeStore(Mapping):
+    """
+    category -> list of archetype dicts, like NEW_ARCHETYPES
+
+    Archetypes are decoded from their blobs on first access and cached, so
+    the same dict is returned every time. Use archetype()/find() to decode
+    a single archetype instead of a whole category.
+    """
+
+    def __init__(self, index, data, stamp):
+        self.index = index
+        self.stamp = stamp
+        self._data = data
+        self._decoded = {}
+        self._by_name = {}
+        self._categories = {}
+
+    def __getitem__(self, category):
+        archetypes = self._categories.get(category)
+        if archetypes is None:
+            archetypes = [self.archetype(category, i) for i in range(len(self.index[category]))]
+            self._categories[category] = archetypes
+        return archetypes
+
+    def __iter__(self):
+        return iter(self.index)
+
+    def __len__(self):
+        return len(self.index)
+
+    def __contains__(self, category):
+        return category in self.index
+
+    def __repr__(self):
+        return f"ArchetypeStore({len(self.index)} categories, {self.count()} archetypes, {len(self._decoded)} decoded)"
+
+    def count(self, category=None):
+        """Number of archetypes (in one category, or in total) without decoding any"""
+        if category is not None:
+            return len(self.index.get(category, ()))
+        return sum(len(entries) for entries in self.index.values())
+
+    def names(self, category):
+        return [name for name, _, _ in self.index.get(category, ())]
+
+    def archetype(self, category, index):
+        """Decode (once) and return one archetype; raises KeyError/IndexError like the dict would"""
+        entries = self.index[category]
+        if index < 0:
+            index += len(entries)
+        key = (category, index)
+        archetype = self._decoded.get(key)
+        if archetype is None:
+            _, offset, length = entries[index]
+            archetype = marshal.loads(self._data[offset:offset + length])
+            self._decoded[key] = archetype
+        return archetype
+
+    def find(self, category, name):
+        """Archetype by category and name, or None"""
+        if category not in self._by_name:
+            self._by_name[category] = {entry[0]: i for i, entry in enumerate(self.index.get(category, ()))}
+        index = self._by_name[category].get(name)
+        return None if index is None else self.archetype(category, index)
+
+
+def compile_archetypes(archetypes, stamp):
+    """Serialize a NEW_ARCHETYPES-style dict into store bytes"""
+    index = {}
+    blobs = []
+    offset = 0
+    for category, entries in archetypes.items():
+        index[category] = []
+        for archetype in entries:
+            blob = marshal.dumps(archetype)
+            index[category].append((archetype.get("name", ""), offset, len(blob)))
+            blobs.append(blob)
+            offset += len(blob)
+    header = marshal.dumps({"source": stamp, "index": index})
+    return b"".join([STORE_MAGIC, len(header).to_bytes(_HEADER_LENGTH_SIZE, "little"), header] + blobs)
+
+
+def parse_store(content):
+    """Store bytes -> ArchetypeStore (raises ValueError if the file isn't a store)"""
+    if not content.startswith(STORE_MAGIC):
+        raise ValueError("not an archetype store")
+    start = len(STORE_MAGIC) + _HEADER_LENGTH_SIZE
+    header_length = int.from_bytes(content[len(STORE_MAGIC):start], "little")
+    header = marshal.loads(content[start:start + header_length])
+    return ArchetypeStore(header["index"], memoryview(content)[start + header_length:], header["source"])
+
+
+def _load_source_module(source_path):
+    import importlib.util
+
+    spec = importlib.util.spec_from_file_location("new_archetypes", source_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _write_store(store_path, content):
+    store_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = store_path.with_name(f".{store_path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(content)
+    os.replace(tmp_path, store_path)
+
+
+def load_store(source_path=SOURCE_PATH, store_path=None, rebuild=False):
+    """
+    Open the compiled store for source_path, (re)building it if missing or stale.
+
+    Args:
+        source_path: The archetype library (new_archetypes.py)
+        store_path: Compiled file (default: store_path_for(source_path))
+        rebuild: Recompile even if the store is current
+
+    Returns:
+        ArchetypeStore
+    """
+    store_path = Path(store_path) if store_path else store_path_for(source_path)
+    stamp = source_stamp(source_path)
+
+    if not rebuild:
+        try:
+            store = parse_store(store_path.read_bytes())
+        except (OSError, ValueError, EOFError, KeyError, TypeError):
+            store = None
+        if store is not None and tuple(store.stamp) == stamp:
+            return store
+
+    content = compile_archetypes(_load_source_module(source_path).NEW_ARCHETYPES, stamp)
+    try:
+        _write_store(store_path, content)
+    except OSError:
+        pass  # Read-only checkout: serve from memory, rebuild next time
+    return parse_store(content)
+
+
+# Compiled library, decoded lazily (drop-in for new_archetypes.NEW_ARCHETYPES)
+NEW_ARCHETYPES = load_store()
+
+# ============================================================================
+# MAIN
+# ============================================================================
+
+BENCHMARK_MODULES = ("nate_workout_generator", "archetype_store", "new_archetypes")
+
+# name -> extra environment; both run against an isolated PYTHONPYCACHEPREFIX
+BENCHMARK_MODES = {
+    "warm": {},                                    # bytecode cached by a warm-up run
+    "no_bytecode": {"PYTHONDONTWRITEBYTECODE": "1"}  # every module compiled from source
+}
+
+
+def importtime_benchmark(module="nate_workout_generator", runs=5, mode="warm"):
+    """
+    Import cost from `python -X importtime`, best of `runs` fresh interpreters.
+
+    Each mode uses its own empty bytecode cache (PYTHONPYCACHEPREFIX) and one
+    untimed warm-up run, so results don't depend on what __pycache__ holds.
+
+    Returns:
+        dict: module -> {"self_us", "cumulative_us"} for BENCHMARK_MODULES
+            found in the import tree (best run by the target's cumulative time)
+    """
+    import subprocess
+    import tempfile
+
+    best = None
+    with tempfile.TemporaryDirectory() as cache_dir:
+        env = dict(os.environ)
+        env.pop("PYTHONDONTWRITEBYTECODE", None)
+        env.update(BENCHMARK_MODES[mode])
+        env["PYTHONPYCACHEPREFIX"] = cache_dir
+        env["PYTHONPATH"] = os.pathsep.join(
+            [str(Path(__file__).resolve().parent), str(SOURCE_PATH.parent)]
+            + ([env["PYTHONPATH"]] if env.get("PYTHONPATH") else [])
+        )
+        for run in range(runs + 1):
+            result = subprocess.run(
+                [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                capture_output=True, text=True, env=env, check=True
+            )
+            if run == 0:
+                continue  # Warm-up
+            timings = {}
+            for line in result.stderr.splitlines():
+                if not line.startswith("import time:") or "|" not in line:
+                    continue
+                self_us, cumulative_us, name = [part.strip() for part in line[len("import time:"):].split("|")]
+                if name in BENCHMARK_MODULES and self_us.isdigit():
+                    timings[name] = {"self_us": int(self_us), "cumulative_us": int(cumulative_us)}
+            if module in timings and (best is None or timings[module]["cumulative_us"] < best[module]["cumulative_us"]):
+                best = timings
+    return best or {}
+
+
+def main():
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Compiled archetype store")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("info", help="Show store location and contents")
+    subparsers.add_parser("rebuild", help="Recompile the store from new_archetypes.py")
+    bench = subparsers.add_parser("benchmark", help="Measure import time with python -X importtime")
+    bench.add_argument("--module", default="nate_workout_generator")
+    bench.add_argument("--runs", type=int, default=5)
+    bench.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    if args.command == "rebuild":
+        store = load_store(rebuild=True)
+        print(f"✓ Rebuilt {store_path_for(SOURCE_PATH)} ({store.count()} archetypes)")
+    elif args.command == "info":
+        store_path = store_path_for(SOURCE_PATH)
+        size = store_path.stat().st_size if store_path.exists() else 0
+        print(f"Store:  {store_path} ({size:,} bytes)")
+        print(f"Source: {SOURCE_PATH} ({SOURCE_PATH.stat().st_size:,} bytes)")
+        for category in NEW_ARCHETYPES:
+            print(f"  {category}: {', '.join(NEW_ARCHETYPES.names(category))}")
+    else:
+        results = {mode: importtime_benchmark(args.module, args.runs, mode) for mode in BENCHMARK_MODES}
+        if args.json:
+            print(json.dumps(results, indent=2))
+        else:
+            for mode, timings in results.items():
+                print(f"python -X importtime ({mode}), best of {args.runs}:")
+                for name in BENCHMARK_MODULES:
+                    if name in timings:
+                        t = timings[name]
+                        print(f"  {name:<24} self {t['self_us'] / 1000:7.2f} ms   cumulative {t['cumulative_us'] / 1000:7.2f} ms")
+                    else:
+                        print(f"  {name:<24} not imported")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""
+Build Graph
+Incremental regeneration: rebuild only the artifacts whose inputs changed.
+
+Every artifact (a plan's workouts, guide, marketplace copy) is built by a
+step with declared inputs - generator sources, template files, the derived
+plan template, plan info - plus the race JSON sub-trees it actually read.
+Reads are recorded by handing the step a TrackedDict view of the race data,
+so editing race_specific.wind_protocol only invalidates the artifacts that
+looked at it.
+
+Fingerprints are stored per race folder in .build_manifest.json. On rerun a
+step is skipped when its record matches and its outputs still exist;
+otherwise the reasons it is stale are kept for --explain.
+"""
+
+import hashlib
+import importlib.util
+import json
+import os
+import sys
+from functools import lru_cache
+from pathlib import Path
+
+BUILD_MANIFEST_NAME = ".build_manifest.json"
+BUILD_MANIFEST_VERSION = 1
+
+# Race data reads are recorded down to this many keys, e.g.
+# ("race_specific", "wind_protocol"); deeper values are fingerprinted whole
+TRACK_DEPTH = 2
+
+_MISSING = "<missing>"
+
+# ============================================================================
+# FINGERPRINTS
+# ============================================================================
+
+def fingerprint(value):
+    """Short stable hash of a JSON-serializable value"""
+    payload = json.dumps(value, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+@lru_cache(maxsize=None)
+def file_fingerprint(path):
+    """Short hash of a file's bytes ("<missing>" if it doesn't exist)"""
+    try:
+        return hashlib.sha256(Path(path).read_bytes()).hexdigest()[:16]
+    except OSError:
+        return _MISSING
+
+
+def _module_file(name):
+    module = sys.modules.get(name) or sys.modules.get(f"generation_modules.{name}")
+    if module is not None:
+        return getattr(module, "__file__", None)
+    try:
+        spec = importlib.util.find_spec(name)
+    except (ImportError, ValueError):
+        return None
+    return spec.origin if spec and spec.has_location else None
+
+
+def source_fingerprint(module_names=(), paths=()):
+    """
+    Combined hash of imported modules' source files and other input files.
+
+    Modules are located without importing them, so lazily imported
+    generators hash the same before and after first use. Modules that
+    can't be found are recorded as absent, so adding one later still
+    invalidates the step.
+    """
+    parts = []
+    for name in module_names:
+        module_file = _module_file(name)
+        parts.append((name, file_fingerprint(os.path.abspath(module_file)) if module_file else _MISSING))
+    for path in paths:
+        parts.append((Path(path).name, file_fingerprint(os.path.abspath(path))))
+    return fingerprint(parts)
+
+# ============================================================================
+# RACE DATA READ TRACKING
+# ============================================================================
+
+def resolve_path(data, path):
+    """Value at a key path, or "<missing>" """
+    for key in path:
+        if not isinstance(data, dict) or key not in data:
+            return _MISSING
+        data = data[key]
+    return data
+
+
+class TrackedDict(dict):
+    """
+    Read-recording view of race data
+
+    Behaves like the wrapped dict; every key read (including misses) is
+    added to the shared `paths` set. Whole-node access (iteration, items(), len(),
+    repr, copying) records the node itself; truth tests don't.
+    """
+    __slots__ = ("_paths", "_path", "_children")
+
+    def __init__(self, data, paths, path=()):
+        super().__init__(data)
+        self._paths = paths
+        self._path = path
+        self._children = {}
+
+    def _record_all(self):
+        self._paths.add(self._path)
+
+    def _child(self, key):
+        path = self._path + (key,)
+        value = dict.__getitem__(self, key)
+        if isinstance(value, dict) and len(path) < TRACK_DEPTH:
+            if key not in self._children:
+                self._children[key] = TrackedDict(value, self._paths, path)
+            return self._children[key]
+        self._paths.add(path)
+        return value
+
+    def __getitem__(self, key):
+        if not dict.__contains__(self, key):
+            self._paths.add(self._path + (key,))
+            raise KeyError(key)
+        return self._child(key)
+
+    def get(self, key, default=None):
+        if not dict.__contains__(self, key):
+            self._paths.add(self._path + (key,))
+            return default
+        return self._child(key)
+
+    def __contains__(self, key):
+        self._paths.add(self._path + (key,))
+        return dict.__contains__(self, key)
+
+    def __iter__(self):
+        self._record_all()
+        return dict.__iter__(self)
+
+    def __len__(self):
+        self._record_all()
+        return dict.__len__(self)
+
+    def __bool__(self):
+        # `if race_data:` guards are followed by key reads; don't record the node
+        return dict.__len__(self) > 0
+
+    def keys(self):
+        self._record_all()
+        return dict.keys(self)
+
+    def values(self):
+        self._record_all()
+        return dict.values(self)
+
+    def items(self):
+        self._record_all()
+        return dict.items(self)
+
+    def __repr__(self):
+        self._record_all()
+        return dict.__repr__(self)
+
+    __str__ = __repr__
+
+    def __eq__(self, other):
+        self._record_all()
+        return dict.__eq__(self, other)
+
+    __hash__ = None
+
+    def copy(self):
+        self._record_all()
+        return dict(dict.items(self))
+
+    def __copy__(self):
+        return self.copy()
+
+    def __deepcopy__(self, memo):
+        import copy
+        return copy.deepcopy(self.copy(), memo)
+
+    def __reduce__(self):
+        return (dict, (self.copy(),))
+
+# ============================================================================
+# GRAPH
+# ============================================================================
+
+class BuildStep:
+    """
+    One artifact's build decision
+
+    Attributes:
+        artifact_id: e.g. "2. Finisher Standard (12 weeks)/guide"
+        stale: True if the step must run
+        reasons: Why it is stale (empty when fresh)
+    """
+
+    def __init__(self, graph, artifact_id, inputs, outputs, stale, reasons):
+        self.graph = graph
+        self.artifact_id = artifact_id
+        self.inputs = inputs
+        self.outputs = [Path(p) for p in outputs]
+        self.stale = stale
+        self.reasons = reasons
+        self.paths = set()
+        self.race_data = None
+
+    def track(self, race_data):
+        """Race data view for the build; reads are recorded for the next run"""
+        self.race_data = race_data
+        return TrackedDict(race_data, self.paths)
+
+    def finish(self, outputs=None):
+        """Record the step's fingerprint after a successful build"""
+        if outputs is not None:
+            self.outputs = [Path(p) for p in outputs]
+        self.graph.record(self, self.race_data)
+
+
+class BuildGraph:
+    """
+    Per-race artifact fingerprints (<race folder>/.build_manifest.json)
+
+    BuildGraph(None) is disabled: every step is stale and nothing is
+    recorded. Records built in this process are collected in `changes` so
+    worker processes can return them for the parent to merge and save.
+    """
+
+    def __init__(self, race_folder, force=False):
+        self.race_folder = Path(race_folder) if race_folder else None
+        self.force = force
+        self.records = {}
+        self.changes = {}
+        self.explanations = []
+        if self.race_folder:
+            self._load()
+
+    @property
+    def manifest_path(self):
+        return self.race_folder / BUILD_MANIFEST_NAME
+
+    def _load(self):
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return
+        if manifest.get("version") == BUILD_MANIFEST_VERSION:
+            self.records = manifest.get("artifacts", {})
+
+    def _relative(self, path):
+        try:
+            return os.path.relpath(path, self.race_folder)
+        except ValueError:
+            return str(path)
+
+    def _output_missing(self, output):
+        path = self.race_folder / output
+        if path.is_dir():
+            return not any(path.iterdir())
+        return not path.exists()
+
+    def step(self, artifact_id, inputs, race_data, outputs=()):
+        """
+        Decide whether an artifact needs rebuilding.
+
+        Args:
+            artifact_id: Unique name within the race folder
+            inputs: dict of input name -> fingerprint (see fingerprint helpers)
+            race_data: Current race data (plain dict)
+            outputs: Paths the step is expected to produce
+        """
+        if self.race_folder is None:
+            return BuildStep(self, artifact_id, inputs, outputs, True, [])
+
+        record = self.records.get(artifact_id)
+        reasons = []
+        if self.force:
+            reasons.append("forced")
+        elif record is None:
+            reasons.append("never built")
+        else:
+            for name in sorted(set(inputs) | set(record["inputs"])):
+                if inputs.get(name) != record["inputs"].get(name):
+                    reasons.append(f"{name} changed")
+            for dotted, digest in sorted(record["race_paths"].items()):
+                path = dotted.split(".") if dotted else ()
+                if fingerprint(resolve_path(race_data, path)) != digest:
+                    reasons.append(f"race data changed: {dotted or '(whole file)'}")
+            for output in record["outputs"]:
+                if self._output_missing(output):
+                    reasons.append(f"output missing: {output}")
+
+        step = BuildStep(self, artifact_id, inputs, outputs, bool(reasons), reasons)
+        self.explanations.append((artifact_id, reasons))
+        return step
+
+    def record(self, step, race_data):
+        if self.race_folder is None:
+            return
+        # A node read whole covers every path below it
+        paths = [path for path in step.paths
+                 if not any(path[:depth] in step.paths for depth in range(len(path)))]
+        race_paths = {
+            ".".join(path): fingerprint(resolve_path(race_data, path))
+            for path in paths
+        }
+        entry = {
+            "inputs": step.inputs,
+            "race_paths": dict(sorted(race_paths.items())),
+            "outputs": [self._relative(p) for p in step.outputs]
+        }
+        self.records[step.artifact_id] = entry
+        self.changes[step.artifact_id] = entry
+
+    def update(self, changes):
+        """Merge records built elsewhere (e.g. in a worker process)"""
+        self.records.update(changes)
+
+    def save(self):
+        if self.race_folder is None:
+            return
+        manifest = {
+            "version": BUILD_MANIFEST_VERSION,
+            "artifacts": dict(sorted(self.records.items()))
+        }
+        tmp_path = self.manifest_path.with_name(f".{BUILD_MANIFEST_NAME}.{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_path, self.manifest_path)
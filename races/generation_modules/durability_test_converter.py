@@ -6,12 +6,18 @@ Tests: 2hr, 3hr, 4hr @ 0.8 FTP (top of Z2/bottom of Z3)
 """
 
 import xml.etree.ElementTree as ET
+from functools import lru_cache
 from pathlib import Path
 
+from ftp_test_converter import file_stamp
+
 def convert_durability_test(durability_test_path, week_num, test_name="Durability Test"):
     """
     Convert durability test from TrainingPeaks format to GG format
     
+    The source ZWO is parsed once per process (per file version); each call
+    only stamps in the week number and test name.
+    
     Args:
         durability_test_path: Path to durability test ZWO file
         week_num: Week number for naming
@@ -20,6 +26,32 @@ def convert_durability_test(durability_test_path, week_num, test_name="Durabilit
     Returns:
         dict with 'name', 'description', 'blocks' for GG format
     """
+    template = load_durability_test_template(str(durability_test_path), file_stamp(durability_test_path))
+    if template is None:
+        return None
+    blocks_str, description, hours = template
+    
+    return {
+        "name": f"W{week_num:02d} - {test_name}",
+        "description": description,
+        "blocks": blocks_str,
+        "week_number": week_num,
+        "duration_hours": hours
+    }
+
+@lru_cache(maxsize=None)
+def load_durability_test_template(durability_test_path, stamp=None):
+    """
+    Parse durability test ZWO and build its GG blocks and description (cached)
+    
+    Args:
+        durability_test_path: Path to durability test ZWO file (str)
+        stamp: File mtime (see file_stamp()), so edits to the source are picked up
+    
+    Returns:
+        tuple: (blocks_str, description, duration_hours), or None if the
+        file can't be converted
+    """
     try:
         tree = ET.parse(durability_test_path)
         root = tree.getroot()
@@ -84,13 +116,7 @@ EXECUTION:
 • HR MONITORING: Watch for HR drift. If HR climbs significantly while power stays steady, that's decoupling - it shows your aerobic fitness limit.
 • TERRAIN: Flat or rolling terrain preferred. Avoid big climbs that would force power changes."""
     
-    return {
-        "name": f"W{week_num:02d} - {test_name}",
-        "description": description,
-        "blocks": blocks_str,
-        "week_number": week_num,
-        "duration_hours": hours
-    }
+    return blocks_str, description, hours
 
 def select_durability_test(week_num, plan_weeks, tier):
     """
@@ -9,21 +9,31 @@ import re
 from pathlib import Path
 from typing import Dict, List, Optional, Set, Tuple
 from difflib import SequenceMatcher
+from functools import lru_cache
 
 # Load library on import
 _LIBRARY = None
+_INDEX = None
 _LIBRARY_PATH = Path(__file__).parent / "exercise_video_library.json"
+_LOOKUP_CACHE_SIZE = 4096
 
 def _load_library():
-    """Load exercise library (lazy loading)"""
-    global _LIBRARY
+    """Load exercise library and build its lookup index (lazy loading)"""
+    global _LIBRARY, _INDEX
     if _LIBRARY is None:
         if not _LIBRARY_PATH.exists():
             raise FileNotFoundError(f"Exercise library not found: {_LIBRARY_PATH}")
         with open(_LIBRARY_PATH, 'r', encoding='utf-8') as f:
             _LIBRARY = json.load(f)
+        _INDEX = ExerciseIndex(_LIBRARY["exercises"])
+        _cached_video_url.cache_clear()
     return _LIBRARY
 
+def _get_index() -> "ExerciseIndex":
+    """Return the exercise index, loading the library if needed"""
+    _load_library()
+    return _INDEX
+
 def normalize_exercise_name(name: str) -> str:
     """Normalize exercise name for matching"""
     # Convert to lowercase
@@ -50,10 +60,101 @@ def similarity_score(str1: str, str2: str) -> float:
     """Calculate similarity score between two strings"""
     return SequenceMatcher(None, str1.lower(), str2.lower()).ratio()
 
+class ExerciseIndex:
+    """
+    Pre-normalized lookup structures over the exercise library.
+    
+    Built once per library load so lookups never re-normalize library
+    names or aliases:
+    - name_to_index / alias_to_index: normalized name -> first exercise index
+    - token_index: word -> indices of exercises whose normalized name contains it
+    - normalized_names / normalized_aliases: per-exercise normalized strings
+    """
+    
+    def __init__(self, exercises: List[Dict]):
+        self.exercises = exercises
+        self.normalized_names: List[str] = []
+        self.normalized_aliases: List[List[str]] = []
+        self.name_to_index: Dict[str, int] = {}
+        self.alias_to_index: Dict[str, int] = {}
+        self.token_index: Dict[str, Set[int]] = {}
+        
+        for idx, exercise in enumerate(exercises):
+            ex_normalized = normalize_exercise_name(exercise["name"]).lower()
+            aliases = [normalize_exercise_name(alias).lower() for alias in exercise.get("aliases", [])]
+            self.normalized_names.append(ex_normalized)
+            self.normalized_aliases.append(aliases)
+            self.name_to_index.setdefault(ex_normalized, idx)
+            for alias in aliases:
+                self.alias_to_index.setdefault(alias, idx)
+            for token in set(ex_normalized.split()):
+                self.token_index.setdefault(token, set()).add(idx)
+    
+    def find_direct_match(self, normalized_search: str) -> Optional[int]:
+        """
+        Return the first exercise matching by exact name, alias, or containment.
+        
+        Library order decides ties, so the first exercise that satisfies any
+        rule wins. Exact/alias hits come from the hash maps; only exercises
+        before that hit need the (cheap) substring check.
+        """
+        limit = len(self.exercises)
+        for mapping in (self.name_to_index, self.alias_to_index):
+            idx = mapping.get(normalized_search)
+            if idx is not None and idx < limit:
+                limit = idx
+        
+        for idx in range(limit):
+            ex_normalized = self.normalized_names[idx]
+            if normalized_search in ex_normalized or ex_normalized in normalized_search:
+                if len(ex_normalized) > 5:  # Avoid very short matches
+                    return idx
+        
+        return limit if limit < len(self.exercises) else None
+    
+    def overlap_candidates(self, normalized_search: str, min_overlap: int = 2) -> Set[int]:
+        """Return indices of exercises sharing at least min_overlap name words"""
+        counts: Dict[int, int] = {}
+        for token in set(normalized_search.split()):
+            for idx in self.token_index.get(token, ()):
+                counts[idx] = counts.get(idx, 0) + 1
+        return {idx for idx, count in counts.items() if count >= min_overlap}
+    
+    def fuzzy_scores(self, normalized_search: str, min_score: float = 0.0) -> List[Tuple[int, float]]:
+        """
+        Score exercises against a normalized query, best of name and aliases.
+        
+        The query is loaded into SequenceMatcher once (seq2 is the cached
+        side), and each name/alias is screened with the real_quick_ratio and
+        quick_ratio upper bounds before the full ratio is computed. Exercises
+        whose bound cannot reach min_score are skipped without scoring, so
+        results above min_score are identical to a full scan.
+        
+        Returns:
+            (index, score) pairs in library order for scores >= min_score
+        """
+        matcher = SequenceMatcher(None)
+        matcher.set_seq2(normalized_search.lower())
+        
+        scored = []
+        for idx, ex_normalized in enumerate(self.normalized_names):
+            score = 0.0
+            for candidate in [ex_normalized] + self.normalized_aliases[idx]:
+                matcher.set_seq1(candidate)
+                if (matcher.real_quick_ratio() > score and matcher.real_quick_ratio() >= min_score
+                        and matcher.quick_ratio() > score and matcher.quick_ratio() >= min_score):
+                    score = max(score, matcher.ratio())
+            if score >= min_score and score > 0.0:
+                scored.append((idx, score))
+        return scored
+
 def get_video_url(exercise_name: str, fuzzy_threshold: float = 0.6) -> Optional[str]:
     """
     Fuzzy match exercise name, return video URL
     
+    Results are memoized per (exercise_name, fuzzy_threshold), so repeated
+    exercise lines across workouts and plans cost a dict lookup.
+    
     Args:
         exercise_name: Exercise name to look up
         fuzzy_threshold: Minimum similarity score (0-1) for fuzzy match
@@ -61,12 +162,15 @@ def get_video_url(exercise_name: str, fuzzy_threshold: float = 0.6) -> Optional[
     Returns:
         Video URL if found, None otherwise
     """
-    library = _load_library()
+    _load_library()
+    return _cached_video_url(exercise_name, fuzzy_threshold)
+
+@lru_cache(maxsize=_LOOKUP_CACHE_SIZE)
+def _cached_video_url(exercise_name: str, fuzzy_threshold: float) -> Optional[str]:
+    """Uncached body of get_video_url (see ExerciseIndex for matching rules)"""
+    index = _get_index()
     normalized_search = normalize_exercise_name(exercise_name)
     
-    best_match = None
-    best_score = 0.0
-    
     # Handle compound names (e.g., "Box Jump or Squat Jump")
     # Try matching each part separately
     if ' or ' in exercise_name.lower() or ' / ' in exercise_name.lower():
@@ -76,46 +180,25 @@ def get_video_url(exercise_name: str, fuzzy_threshold: float = 0.6) -> Optional[
             if part_url:
                 return part_url
     
-    # Priority 1: Exact match (normalized)
-    for exercise in library["exercises"]:
-        ex_normalized = normalize_exercise_name(exercise["name"])
-        
-        # Exact match
-        if ex_normalized == normalized_search:
-            return exercise["video_url"]
-        
-        # Partial match (search term contains exercise name or vice versa)
-        if normalized_search in ex_normalized or ex_normalized in normalized_search:
-            if len(ex_normalized) > 5:  # Avoid very short matches
-                return exercise["video_url"]
-        
-        # Alias match
-        for alias in exercise.get("aliases", []):
-            alias_normalized = normalize_exercise_name(alias)
-            if alias_normalized == normalized_search:
-                return exercise["video_url"]
+    # Priority 1: Exact, partial (containment) or alias match
+    direct_idx = index.find_direct_match(normalized_search)
+    if direct_idx is not None:
+        return index.exercises[direct_idx]["video_url"]
     
     # Priority 2: Fuzzy match
-    for exercise in library["exercises"]:
-        ex_normalized = normalize_exercise_name(exercise["name"])
-        score = similarity_score(ex_normalized, normalized_search)
-        
-        # Also check aliases
-        for alias in exercise.get("aliases", []):
-            alias_normalized = normalize_exercise_name(alias)
-            alias_score = similarity_score(alias_normalized, normalized_search)
-            score = max(score, alias_score)
-        
-        # Check if key words match (for compound names)
-        search_words = set(normalized_search.split())
-        ex_words = set(ex_normalized.split())
-        word_overlap = len(search_words & ex_words)
-        if word_overlap >= 2:  # At least 2 words match
-            score = max(score, 0.7)  # Boost score for word overlap
-        
-        if score > best_score:
-            best_score = score
-            best_match = exercise
+    # Exercises sharing at least 2 words are boosted to 0.7; everything else
+    # only matters if its string similarity can reach the threshold.
+    boosted = index.overlap_candidates(normalized_search)
+    scores = dict(index.fuzzy_scores(normalized_search, min_score=min(fuzzy_threshold, 0.7)))
+    for idx in boosted:
+        scores[idx] = max(scores.get(idx, 0.0), 0.7)
+    
+    best_match = None
+    best_score = 0.0
+    for idx in sorted(scores):
+        if scores[idx] > best_score:
+            best_score = scores[idx]
+            best_match = index.exercises[idx]
     
     # Return if above threshold
     if best_match and best_score >= fuzzy_threshold:
@@ -177,17 +260,12 @@ def get_substitutes(exercise_name: str, reason: str = None) -> List[Dict]:
     library = _load_library()
     
     # Find the exercise first
-    target_exercise = None
     normalized_search = normalize_exercise_name(exercise_name)
+    target_idx = _get_index().name_to_index.get(normalized_search)
     
-    for exercise in library["exercises"]:
-        ex_normalized = normalize_exercise_name(exercise["name"])
-        if ex_normalized == normalized_search:
-            target_exercise = exercise
-            break
-    
-    if not target_exercise:
+    if target_idx is None:
         return []
+    target_exercise = library["exercises"][target_idx]
     
     # Find exercises with same category/subcategory
     category = target_exercise["category"]
@@ -280,22 +358,14 @@ def search_exercises(query: str, limit: int = 10) -> List[Dict]:
     Returns:
         List of matching exercises sorted by relevance
     """
-    library = _load_library()
+    index = _get_index()
     normalized_query = normalize_exercise_name(query)
     
-    matches = []
-    for exercise in library["exercises"]:
-        ex_normalized = normalize_exercise_name(exercise["name"])
-        score = similarity_score(ex_normalized, normalized_query)
-        
-        # Also check aliases
-        for alias in exercise.get("aliases", []):
-            alias_normalized = normalize_exercise_name(alias)
-            alias_score = similarity_score(alias_normalized, normalized_query)
-            score = max(score, alias_score)
-        
-        if score > 0.3:  # Low threshold for search
-            matches.append((exercise, score))
+    matches = [
+        (index.exercises[idx], score)
+        for idx, score in index.fuzzy_scores(normalized_query, min_score=0.3)
+        if score > 0.3  # Low threshold for search
+    ]
     
     # Sort by score (descending)
     matches.sort(key=lambda x: x[1], reverse=True)
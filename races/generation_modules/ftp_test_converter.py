@@ -4,13 +4,25 @@ FTP Test Converter
 Converts TrainingPeaks FTP test format to GG format
 """
 
+import os
 import xml.etree.ElementTree as ET
+from functools import lru_cache
 from pathlib import Path
 
+def file_stamp(path):
+    """Cache key component that changes when the file changes (None if missing)"""
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
 def convert_ftp_test(ftp_test_path, week_num):
     """
     Convert FTP test from TrainingPeaks format to GG format
     
+    The source ZWO is parsed once per process (per file version); each call
+    only stamps in the week number.
+    
     Args:
         ftp_test_path: Path to FTP test ZWO file
         week_num: Week number for naming
@@ -18,6 +30,29 @@ def convert_ftp_test(ftp_test_path, week_num):
     Returns:
         dict with 'name', 'description', 'blocks' for GG format
     """
+    blocks_str = load_ftp_test_blocks(str(ftp_test_path), file_stamp(ftp_test_path))
+    if blocks_str is None:
+        return None
+    
+    return {
+        "name": f"W{week_num:02d} Tue - FTP Test",
+        "description": FTP_TEST_DESCRIPTION,
+        "blocks": blocks_str,
+        "week_number": week_num
+    }
+
+@lru_cache(maxsize=None)
+def load_ftp_test_blocks(ftp_test_path, stamp=None):
+    """
+    Parse FTP test ZWO and convert its blocks to GG format (cached)
+    
+    Args:
+        ftp_test_path: Path to FTP test ZWO file (str)
+        stamp: File mtime (see file_stamp()), so edits to the source are picked up
+    
+    Returns:
+        GG-format blocks string, or None if the file can't be converted
+    """
     try:
         tree = ET.parse(ftp_test_path)
         root = tree.getroot()
@@ -73,10 +108,10 @@ def convert_ftp_test(ftp_test_path, week_num):
             attrs = ' '.join([f'{k}="{v}"' for k, v in child.attrib.items()])
             blocks.append(f'    <{tag} {attrs}/>\n')
     
-    blocks_str = "".join(blocks)
-    
-    # Create GG-formatted description
-    description = f"""WARM-UP:
+    return "".join(blocks)
+
+# GG-formatted FTP test description
+FTP_TEST_DESCRIPTION = """WARM-UP:
 • 12min progressive warmup building from Z1 to Z2
 
 MAIN SET:
@@ -97,13 +132,6 @@ EXECUTION:
 • TIMING: Do this test when fresh (not after a hard week). Schedule it for a day when you're well-rested.
 • PACING: The 20-minute effort is the key. Start conservatively - you can always push harder in the last 5 minutes. If you blow up early, you'll get an inaccurate FTP.
 • RECORDING: Write down your average power for the 20-minute effort immediately after finishing. Multiply by 0.95 to get your FTP."""
-    
-    return {
-        "name": f"W{week_num:02d} Tue - FTP Test",
-        "description": description,
-        "blocks": blocks_str,
-        "week_number": week_num
-    }
 
 if __name__ == "__main__":
     # Test conversion
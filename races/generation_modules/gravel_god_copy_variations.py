@@ -851,7 +851,7 @@ MID_SOUTH_REFERENCES = {
     ],
 }
 
-def get_race_specific_reference(race_data, category, tier_key, level_key, used_refs=None):
+def get_race_specific_reference(race_data, category, tier_key, level_key, used_refs=None, rng=None):
     """
     Get a race-specific reference that's unique to this plan.
     Automatically extracts content from race JSON and research docs.
@@ -862,6 +862,7 @@ def get_race_specific_reference(race_data, category, tier_key, level_key, used_r
         tier_key: Tier key for uniqueness
         level_key: Level key for uniqueness
         used_refs: Set of already-used references to avoid duplicates
+        rng: random.Random to draw from (default: one seeded from tier, level and category)
     
     Returns:
         Race-specific reference string, or empty string if not applicable
@@ -888,17 +889,17 @@ def get_race_specific_reference(race_data, category, tier_key, level_key, used_r
     if not pool:
         return ""
     
-    # Use tier+level as seed to get consistent but varied references
-    import random
-    seed_value = hash(f"{tier_key}_{level_key}_{category}")
-    random.seed(seed_value)
+    # Use tier+level as seed to get consistent but varied references (string
+    # seeds are stable across processes, unlike hash(); global state is untouched)
+    if rng is None:
+        rng = random.Random(f"{tier_key}_{level_key}_{category}")
     
     # Filter out already-used references
     available = [ref for ref in pool if ref not in used_refs]
     if not available:
         available = pool  # Fall back to all if all used
     
-    selected = random.choice(available)
+    selected = rng.choice(available)
     used_refs.add(selected)
     
     return selected
@@ -909,7 +910,7 @@ def get_race_specific_reference(race_data, category, tier_key, level_key, used_r
 
 # ============================================================================
 
-def get_variation(category: str, subcategory: str = None, **kwargs) -> str:
+def get_variation(category: str, subcategory: str = None, *, rng=None, **kwargs) -> str:
 
     """
 
@@ -923,6 +924,8 @@ def get_variation(category: str, subcategory: str = None, **kwargs) -> str:
 
         subcategory: For nested categories like topic variations
 
+        rng: random.Random to draw from (default: the random module)
+
         **kwargs: Variables to format into the string (e.g., distance=200)
 
     
@@ -1003,7 +1006,7 @@ def get_variation(category: str, subcategory: str = None, **kwargs) -> str:
 
     
 
-    selected = random.choice(variations)
+    selected = (rng or random).choice(variations)
 
     
 
@@ -1023,7 +1026,7 @@ def get_variation(category: str, subcategory: str = None, **kwargs) -> str:
 
     return selected
 
-def get_non_negotiable_phrasing(raw_text: str, race_data: dict = None) -> str:
+def get_non_negotiable_phrasing(raw_text: str, race_data: dict = None, rng=None) -> str:
 
     """
 
@@ -1037,6 +1040,8 @@ def get_non_negotiable_phrasing(raw_text: str, race_data: dict = None) -> str:
 
         race_data: Race JSON data for variable substitution
 
+        rng: random.Random to draw from (default: the random module)
+
     
 
     Returns:
@@ -1145,11 +1150,11 @@ def get_non_negotiable_phrasing(raw_text: str, race_data: dict = None) -> str:
 
     
 
-    selected = random.choice(templates)
+    selected = (rng or random).choice(templates)
 
     return selected.format(**kwargs, checkmark=CHECKMARK)
 
-def generate_varied_marketplace_copy(race_data: dict, tier: str, level: str, seed: int = None) -> dict:
+def generate_varied_marketplace_copy(race_data: dict, tier: str, level: str, seed: int = None, rng=None) -> dict:
 
     """
 
@@ -1167,6 +1172,8 @@ def generate_varied_marketplace_copy(race_data: dict, tier: str, level: str, see
 
         seed: Random seed for reproducibility (optional)
 
+        rng: random.Random to draw from (optional; takes precedence over seed)
+
     
 
     Returns:
@@ -1177,9 +1184,9 @@ def generate_varied_marketplace_copy(race_data: dict, tier: str, level: str, see
 
     
 
-    if seed:
+    if rng is None:
 
-        random.seed(seed)
+        rng = random.Random(seed) if seed else random
 
     
 
@@ -1193,36 +1200,36 @@ def generate_varied_marketplace_copy(race_data: dict, tier: str, level: str, see
 
     # Build varied copy
     copy = {
-        'fifteen_plans_headline': get_variation('fifteen_plans_headline'),
-        'fifteen_plans_body': get_variation('fifteen_plans_body'),
-        'philosophy_tagline': get_variation('philosophy_tagline'),
-        'masterclass_headline': get_variation('masterclass_headline'),
-        'masterclass_intro': get_variation('masterclass_intro'),
-        'tier_description': get_variation('tier_description', tier),
-        'level_modifier': get_variation('level_modifier', level),
+        'fifteen_plans_headline': get_variation('fifteen_plans_headline', rng=rng),
+        'fifteen_plans_body': get_variation('fifteen_plans_body', rng=rng),
+        'philosophy_tagline': get_variation('philosophy_tagline', rng=rng),
+        'masterclass_headline': get_variation('masterclass_headline', rng=rng),
+        'masterclass_intro': get_variation('masterclass_intro', rng=rng),
+        'tier_description': get_variation('tier_description', tier, rng=rng),
+        'level_modifier': get_variation('level_modifier', level, rng=rng),
         
         # Topic descriptions with race-specific values
-        'topic_heat': get_variation('topic', 'heat_training'),
-        'topic_fueling': get_variation('topic', 'fueling', distance=race_metadata.get('distance_miles', 100)),
-        'topic_tactics': get_variation('topic', 'race_tactics'),
-        'topic_mental': get_variation('topic', 'mental_training', dark_mile=guide_variables.get('DARK_MILE', 100)),
-        'topic_execution': get_variation('topic', 'workout_execution'),
-        'topic_recovery': get_variation('topic', 'recovery'),
-        'topic_altitude': get_variation('topic', 'altitude'),
+        'topic_heat': get_variation('topic', 'heat_training', rng=rng),
+        'topic_fueling': get_variation('topic', 'fueling', distance=race_metadata.get('distance_miles', 100), rng=rng),
+        'topic_tactics': get_variation('topic', 'race_tactics', rng=rng),
+        'topic_mental': get_variation('topic', 'mental_training', dark_mile=guide_variables.get('DARK_MILE', 100), rng=rng),
+        'topic_execution': get_variation('topic', 'workout_execution', rng=rng),
+        'topic_recovery': get_variation('topic', 'recovery', rng=rng),
+        'topic_altitude': get_variation('topic', 'altitude', rng=rng),
         
         # Non-negotiables (rephrased)
         'non_negotiables': [
-            get_non_negotiable_phrasing(nn, race_data) 
+            get_non_negotiable_phrasing(nn, race_data, rng) 
             for nn in race_data.get('non_negotiables', [])[:3]
         ],
         
         # Simplified template fields (will be formatted with race-specific data)
-        'tier_philosophy': get_variation('tier_philosophy', tier),
-        'training_approach': get_variation('training_approach', tier),
-        'plan_features': get_variation('plan_features', tier),
-        'alternative_warning': get_variation('alternative_warning', tier),
-        'delivery_headline': get_variation('delivery_headline'),
-        'delivery_details': get_variation('delivery_details'),
+        'tier_philosophy': get_variation('tier_philosophy', tier, rng=rng),
+        'training_approach': get_variation('training_approach', tier, rng=rng),
+        'plan_features': get_variation('plan_features', tier, rng=rng),
+        'alternative_warning': get_variation('alternative_warning', tier, rng=rng),
+        'delivery_headline': get_variation('delivery_headline', rng=rng),
+        'delivery_details': get_variation('delivery_details', rng=rng),
     }
 
     
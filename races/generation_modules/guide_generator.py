@@ -7,16 +7,24 @@ Reads the HTML template and substitutes race-specific data.
 import argparse
 import html
 import json
+import re
 import markdown
+from functools import lru_cache
 from pathlib import Path
 
 
+@lru_cache(maxsize=None)
+def _get_markdown(extensions):
+    """Return a reusable Markdown converter for the given extension tuple"""
+    return markdown.Markdown(extensions=list(extensions))
+
+
 def convert_markdown_to_html(text):
     """Convert markdown syntax to HTML"""
     if not text:
         return ""
-    md = markdown.Markdown(extensions=['tables', 'fenced_code', 'nl2br', 'sane_lists'])
-    return md.convert(str(text))
+    md = _get_markdown(('tables', 'fenced_code', 'nl2br', 'sane_lists'))
+    return md.reset().convert(str(text))
 
 
 def load_race_data(race_json_path):
@@ -25,8 +33,9 @@ def load_race_data(race_json_path):
         return json.load(f)
 
 
+@lru_cache(maxsize=1)
 def load_template():
-    """Load the HTML template"""
+    """Load the HTML template (read once per process)"""
     # Get path relative to this script's location
     script_dir = Path(__file__).parent
     # Template is in the same directory as the generator
@@ -35,6 +44,101 @@ def load_template():
         return f.read()
 
 
+# Conditional template sections, matched in document order. Each becomes a
+# segment flag at compile time instead of a regex pass over rendered output.
+_CONDITIONAL_SECTIONS = re.compile(
+    r'(?P<masters><!-- START MASTERS SECTION TOC -->.*?<!-- END MASTERS SECTION TOC -->'
+    r'|<!-- START MASTERS SECTION -->.*?<!-- END MASTERS SECTION -->)'
+    r'|(?P<altitude><!-- START ALTITUDE SECTION - ONLY SHOW IF RACE_ELEVATION >= 3000 -->.*?<!-- END ALTITUDE SECTION -->)'
+    r'|(?P<altitude_detail><!-- START ALTITUDE SECTION - REMOVE IF.*?<!-- END ALTITUDE SECTION -->)',
+    re.DOTALL
+)
+
+_PLACEHOLDER = re.compile(r'(\{\{[A-Za-z0-9_]+\}\})')
+
+# Section renumbering applied when the Masters section is dropped
+_NON_MASTERS_RENUMBERING = [
+    # Women-Specific moves from section 14 to section 13
+    ('id="section-14-women-specific-considerations"', 'id="section-13-women-specific-considerations"'),
+    ('14 · Women-Specific Considerations', '13 · Women-Specific Considerations'),
+    ('href="#section-14-women-specific-considerations"', 'href="#section-13-women-specific-considerations"'),
+    # FAQ moves from section 15 to section 14
+    ('id="section-15-faq"', 'id="section-14-faq"'),
+    ('15 · Frequently Asked Questions', '14 · Frequently Asked Questions'),
+    ('href="#section-15-faq"', 'href="#section-14-faq"'),
+]
+
+
+class CompiledTemplate:
+    """
+    Guide template tokenized once into literal and placeholder segments.
+    
+    Each segment is (section, literal, non_masters_literal, placeholder):
+    - section: None, or the conditional section it belongs to
+      ('masters', 'altitude', 'altitude_detail')
+    - literal / non_masters_literal: text for Masters / non-Masters plans
+      (the latter has sections renumbered)
+    - placeholder: '{{NAME}}' for placeholder segments, else None
+    
+    Rendering is a single join over the included segments.
+    """
+    
+    def __init__(self, text):
+        self.segments = []
+        self.placeholders = set()
+        pos = 0
+        for match in _CONDITIONAL_SECTIONS.finditer(text):
+            self._add_chunk(text[pos:match.start()], None)
+            self._add_chunk(match.group(0), match.lastgroup)
+            pos = match.end()
+        self._add_chunk(text[pos:], None)
+    
+    def _add_chunk(self, chunk, section):
+        for i, part in enumerate(_PLACEHOLDER.split(chunk)):
+            if not part:
+                continue
+            if i % 2:
+                self.segments.append((section, None, None, part))
+                self.placeholders.add(part)
+            else:
+                renumbered = part
+                for old, new in _NON_MASTERS_RENUMBERING:
+                    renumbered = renumbered.replace(old, new)
+                self.segments.append((section, part, renumbered, None))
+    
+    def render(self, values, sections, masters=True):
+        """
+        Render the template.
+        
+        Args:
+            values: Dict mapping '{{NAME}}' to replacement text
+            sections: Dict mapping section name to include flag
+            masters: bool - Use Masters numbering (False renumbers later sections)
+        
+        Returns:
+            tuple: (rendered text, list of unreplaced placeholders)
+        """
+        parts = []
+        unreplaced = []
+        for section, literal, non_masters_literal, placeholder in self.segments:
+            if section is not None and not sections.get(section, False):
+                continue
+            if placeholder is None:
+                parts.append(literal if masters else non_masters_literal)
+            elif placeholder in values:
+                parts.append(values[placeholder])
+            else:
+                parts.append(placeholder)
+                unreplaced.append(placeholder)
+        return ''.join(parts), unreplaced
+
+
+@lru_cache(maxsize=1)
+def load_compiled_template():
+    """Load and tokenize the HTML template (once per process)"""
+    return CompiledTemplate(load_template())
+
+
 def extract_non_negotiables(race_data, index):
     """Extract non-negotiable data, handling both dict and string formats"""
     # Check multiple possible locations for non_negotiables
@@ -67,7 +171,7 @@ def extract_non_negotiables(race_data, index):
     return defaults[index] if index < len(defaults) else {'requirement': '', 'by_when': '', 'why': ''}
 
 
-def generate_guide(race_data, tier_name, ability_level, output_path):
+def generate_guide(race_data, tier_name, ability_level, output_path, verbose=True):
     """
     Generate a training guide for a specific race, tier, and ability level.
     
@@ -76,10 +180,39 @@ def generate_guide(race_data, tier_name, ability_level, output_path):
         tier_name: str - "TIME CRUNCHED", "FINISHER", "COMPETE", or "PODIUM"
         ability_level: str - "Beginner", "Intermediate", or "Advanced"
         output_path: str - Where to save the generated HTML
+        verbose: bool - Print section include/remove notes
+    """
+    output = render_guide(race_data, tier_name, ability_level, verbose=verbose)
+    
+    # Write output
+    with open(output_path, 'w', encoding='utf-8') as f:
+        f.write(output)
+    
+    if verbose:
+        print(f"✓ Generated: {output_path}")
+    return output_path
+
+
+def render_guide(race_data, tier_name, ability_level, verbose=True):
+    """
+    Render a training guide to an HTML string without touching the filesystem.
+    
+    The template and markdown converters are loaded once per process, so
+    callers generating many plans for a race can call this repeatedly
+    with already-loaded race data.
+    
+    Args:
+        race_data: Dict containing race information
+        tier_name: str - "TIME CRUNCHED", "FINISHER", "COMPETE", or "PODIUM"
+        ability_level: str - "Beginner", "Intermediate", or "Advanced"
+        verbose: bool - Print section include/remove notes
+    
+    Returns:
+        str: Rendered guide HTML
     """
     
-    # Load template
-    template = load_template()
+    # Load compiled template
+    template = load_compiled_template()
     
     # Extract race data from proper JSON structure
     metadata = race_data.get('race_metadata', {})
@@ -171,6 +304,8 @@ def generate_guide(race_data, tier_name, ability_level, output_path):
         if not weather_strategy:
             weather_strategy = "Check forecast week of race. Pack appropriate layers. Start hydrated if hot conditions expected. Monitor conditions daily starting 5 days out."
     
+    non_negotiables = [extract_non_negotiables(race_data, i) for i in range(5)]
+    
     # Build substitution dictionary
     substitutions = {
         '{{RACE_NAME}}': metadata.get('name', race_data.get('name', 'Race Name')),
@@ -216,21 +351,21 @@ def generate_guide(race_data, tier_name, ability_level, output_path):
         '{{INFOGRAPHIC_KEY_WORKOUT_SUMMARY}}': generate_key_workout_summary(race_data),
         
         # Non-negotiables (extract from race_data)
-        '{{NON_NEG_1_REQUIREMENT}}': convert_markdown_to_html(extract_non_negotiables(race_data, 0)['requirement']),
-        '{{NON_NEG_1_BY_WHEN}}': extract_non_negotiables(race_data, 0)['by_when'],
-        '{{NON_NEG_1_WHY}}': convert_markdown_to_html(extract_non_negotiables(race_data, 0)['why']),
-        '{{NON_NEG_2_REQUIREMENT}}': convert_markdown_to_html(extract_non_negotiables(race_data, 1)['requirement']),
-        '{{NON_NEG_2_BY_WHEN}}': extract_non_negotiables(race_data, 1)['by_when'],
-        '{{NON_NEG_2_WHY}}': convert_markdown_to_html(extract_non_negotiables(race_data, 1)['why']),
-        '{{NON_NEG_3_REQUIREMENT}}': convert_markdown_to_html(extract_non_negotiables(race_data, 2)['requirement']),
-        '{{NON_NEG_3_BY_WHEN}}': extract_non_negotiables(race_data, 2)['by_when'],
-        '{{NON_NEG_3_WHY}}': convert_markdown_to_html(extract_non_negotiables(race_data, 2)['why']),
-        '{{NON_NEG_4_REQUIREMENT}}': convert_markdown_to_html(extract_non_negotiables(race_data, 3)['requirement']),
-        '{{NON_NEG_4_BY_WHEN}}': extract_non_negotiables(race_data, 3)['by_when'],
-        '{{NON_NEG_4_WHY}}': convert_markdown_to_html(extract_non_negotiables(race_data, 3)['why']),
-        '{{NON_NEG_5_REQUIREMENT}}': convert_markdown_to_html(extract_non_negotiables(race_data, 4)['requirement']),
-        '{{NON_NEG_5_BY_WHEN}}': extract_non_negotiables(race_data, 4)['by_when'],
-        '{{NON_NEG_5_WHY}}': convert_markdown_to_html(extract_non_negotiables(race_data, 4)['why']),
+        '{{NON_NEG_1_REQUIREMENT}}': convert_markdown_to_html(non_negotiables[0]['requirement']),
+        '{{NON_NEG_1_BY_WHEN}}': non_negotiables[0]['by_when'],
+        '{{NON_NEG_1_WHY}}': convert_markdown_to_html(non_negotiables[0]['why']),
+        '{{NON_NEG_2_REQUIREMENT}}': convert_markdown_to_html(non_negotiables[1]['requirement']),
+        '{{NON_NEG_2_BY_WHEN}}': non_negotiables[1]['by_when'],
+        '{{NON_NEG_2_WHY}}': convert_markdown_to_html(non_negotiables[1]['why']),
+        '{{NON_NEG_3_REQUIREMENT}}': convert_markdown_to_html(non_negotiables[2]['requirement']),
+        '{{NON_NEG_3_BY_WHEN}}': non_negotiables[2]['by_when'],
+        '{{NON_NEG_3_WHY}}': convert_markdown_to_html(non_negotiables[2]['why']),
+        '{{NON_NEG_4_REQUIREMENT}}': convert_markdown_to_html(non_negotiables[3]['requirement']),
+        '{{NON_NEG_4_BY_WHEN}}': non_negotiables[3]['by_when'],
+        '{{NON_NEG_4_WHY}}': convert_markdown_to_html(non_negotiables[3]['why']),
+        '{{NON_NEG_5_REQUIREMENT}}': convert_markdown_to_html(non_negotiables[4]['requirement']),
+        '{{NON_NEG_5_BY_WHEN}}': non_negotiables[4]['by_when'],
+        '{{NON_NEG_5_WHY}}': convert_markdown_to_html(non_negotiables[4]['why']),
         
         # Skill placeholder examples (would be race-specific)
         '{{SKILL_5_NAME}}': 'Emergency Repairs',
@@ -239,51 +374,26 @@ def generate_guide(race_data, tier_name, ability_level, output_path):
         '{{SKILL_5_CUE}}': convert_markdown_to_html('Carry tools. Know your bike. Practice fixes. Mechanicals are when, not if.'),
     }
     
-    # Perform all substitutions
-    output = template
-    for placeholder, value in substitutions.items():
-        output = output.replace(placeholder, str(value))
-    
-    # Conditionally remove Masters section if not a Masters plan
-    import re
-    if ability_level != 'Masters':
-        # Remove Masters section from TOC
-        masters_toc_pattern = r'<!-- START MASTERS SECTION TOC -->.*?<!-- END MASTERS SECTION TOC -->'
-        output = re.sub(masters_toc_pattern, '', output, flags=re.DOTALL)
-        # Remove Masters section content
-        masters_section_pattern = r'<!-- START MASTERS SECTION -->.*?<!-- END MASTERS SECTION -->'
-        output = re.sub(masters_section_pattern, '', output, flags=re.DOTALL)
-        # Renumber Women-Specific from section 14 to section 13
-        output = output.replace('id="section-14-women-specific-considerations"', 'id="section-13-women-specific-considerations"')
-        output = output.replace('14 · Women-Specific Considerations', '13 · Women-Specific Considerations')
-        output = output.replace('href="#section-14-women-specific-considerations"', 'href="#section-13-women-specific-considerations"')
-        # Renumber FAQ from section 15 to section 14
-        output = output.replace('id="section-15-faq"', 'id="section-14-faq"')
-        output = output.replace('15 · Frequently Asked Questions', '14 · Frequently Asked Questions')
-        output = output.replace('href="#section-15-faq"', 'href="#section-14-faq"')
-        print(f"  → Removed Masters section (not a Masters plan)")
-        print(f"  → Renumbered Women-Specific to section 13, FAQ to section 14")
-    else:
-        print(f"  → Included Masters section (Masters plan)")
-        print(f"  → Women-Specific is section 14, FAQ is section 15")
-    
     # Wire in race-specific modules
     race_specific = race_data.get("race_specific") or {}
-    output = output.replace("{{FLINT_MODULE}}", build_flint_module(race_specific))
-    output = output.replace("{{TIRE_PRESSURE_MODULE}}", build_tire_pressure_module(race_specific))
-    output = output.replace("{{WIND_MODULE}}", build_wind_module(race_specific))
-    output = output.replace("{{TIME_DRIFT_MODULE}}", build_time_drift_module(race_specific))
-    output = output.replace("{{DECISION_TREE_MODULE}}", build_decision_tree_module(race_specific))
-    output = output.replace("{{PSYCH_LANDMARKS_MODULE}}", build_psych_landmarks_module(race_specific))
-    
-    # Validate no unreplaced placeholders remain
-    import re
-    unreplaced = re.findall(r'\{\{[A-Z_]+\}\}', output)
-    if unreplaced:
-        # Filter out known placeholders that are intentionally left (like INFOGRAPHIC placeholders that are handled)
-        critical_unreplaced = [p for p in unreplaced if 'XXX' not in p and 'INFOGRAPHIC' not in p and 'PHASE' not in p]
-        if critical_unreplaced:
-            print(f"  Warning: Unreplaced placeholders found: {set(critical_unreplaced)}")
+    substitutions.update({
+        "{{FLINT_MODULE}}": build_flint_module(race_specific),
+        "{{TIRE_PRESSURE_MODULE}}": build_tire_pressure_module(race_specific),
+        "{{WIND_MODULE}}": build_wind_module(race_specific),
+        "{{TIME_DRIFT_MODULE}}": build_time_drift_module(race_specific),
+        "{{DECISION_TREE_MODULE}}": build_decision_tree_module(race_specific),
+        "{{PSYCH_LANDMARKS_MODULE}}": build_psych_landmarks_module(race_specific),
+    })
+    
+    # Masters section is only included for Masters plans
+    is_masters = ability_level == 'Masters'
+    if verbose:
+        if not is_masters:
+            print(f"  → Removed Masters section (not a Masters plan)")
+            print(f"  → Renumbered Women-Specific to section 13, FAQ to section 14")
+        else:
+            print(f"  → Included Masters section (Masters plan)")
+            print(f"  → Women-Specific is section 14, FAQ is section 15")
     
     # Conditionally remove altitude section if elevation < 5000 feet
     # Check multiple possible field names for elevation (avg_elevation_feet is the race location elevation)
@@ -301,25 +411,33 @@ def generate_guide(race_data, tier_name, ability_level, output_path):
     except (ValueError, TypeError):
         race_elevation = 0
     
-    if race_elevation < 5000:
-        # Remove altitude section (between START and END comments - match both instances)
-        import re
-        # Remove first altitude section marker (ONLY SHOW IF >= 3000)
-        altitude_pattern1 = r'<!-- START ALTITUDE SECTION - ONLY SHOW IF RACE_ELEVATION >= 3000 -->.*?<!-- END ALTITUDE SECTION -->'
-        output = re.sub(altitude_pattern1, '', output, flags=re.DOTALL)
-        # Remove second altitude section (the detailed one - REMOVE IF < 5000)
-        altitude_pattern2 = r'<!-- START ALTITUDE SECTION - REMOVE IF.*?<!-- END ALTITUDE SECTION -->'
-        output = re.sub(altitude_pattern2, '', output, flags=re.DOTALL)
-        print(f"  → Removed altitude section (race elevation: {race_elevation} feet < 5000)")
-    else:
-        # Remove only the "REMOVE IF < 5000" section, keep the main one
-        import re
-        altitude_pattern2 = r'<!-- START ALTITUDE SECTION - REMOVE IF.*?<!-- END ALTITUDE SECTION -->'
-        output = re.sub(altitude_pattern2, '', output, flags=re.DOTALL)
-        print(f"  → Included altitude section (race elevation: {race_elevation} feet >= 5000)")
+    include_altitude = race_elevation >= 5000
+    if verbose:
+        if include_altitude:
+            print(f"  → Included altitude section (race elevation: {race_elevation} feet >= 5000)")
+        else:
+            print(f"  → Removed altitude section (race elevation: {race_elevation} feet < 5000)")
+    
+    # Render all substitutions and conditional sections in one pass.
+    # The detailed "REMOVE IF < 5000" altitude block is always dropped.
+    output, unreplaced = template.render(
+        {placeholder: str(value) for placeholder, value in substitutions.items()},
+        sections={
+            'masters': is_masters,
+            'altitude': include_altitude,
+            'altitude_detail': False,
+        },
+        masters=is_masters
+    )
+    
+    # Report unreplaced placeholders
+    if unreplaced:
+        # Filter out known placeholders that are intentionally left (like INFOGRAPHIC placeholders that are handled)
+        critical_unreplaced = [p for p in unreplaced if 'XXX' not in p and 'INFOGRAPHIC' not in p and 'PHASE' not in p]
+        if critical_unreplaced and verbose:
+            print(f"  Warning: Unreplaced placeholders found: {set(critical_unreplaced)}")
     
     # Convert any remaining markdown syntax to HTML in the body
-    import re
     body_start = output.find('<body>')
     body_end = output.find('</body>')
     
@@ -327,18 +445,13 @@ def generate_guide(race_data, tier_name, ability_level, output_path):
         body_content = output[body_start + 6:body_end]
         
         # Convert markdown to HTML (handles **bold**, *italic*, # headings, etc.)
-        md = markdown.Markdown(extensions=['tables', 'fenced_code', 'nl2br'])
-        html_body = md.convert(body_content)
+        md = _get_markdown(('tables', 'fenced_code', 'nl2br'))
+        html_body = md.reset().convert(body_content)
         
         # Reconstruct output with converted HTML
         output = output[:body_start + 6] + html_body + output[body_end:]
     
-    # Write output
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write(output)
-    
-    print(f"✓ Generated: {output_path}")
-    return output_path
+    return output
 
 
 def get_weekly_hours(tier_name):
@@ -1226,26 +1339,22 @@ def build_psych_landmarks_module(race_specific):
 """.strip()
 
 
-def main():
-    """CLI entry point for guide generator"""
-    parser = argparse.ArgumentParser(description='Generate training plan guide HTML')
-    parser.add_argument('--race', required=True, help='Path to race JSON file')
-    parser.add_argument('--plan', required=True, help='Path to plan JSON file')
-    parser.add_argument('--output-dir', required=True, help='Directory to save generated guide')
-    
-    args = parser.parse_args()
+def resolve_tier_and_level(plan_name, plan_data=None):
+    """
+    Work out the guide tier name and ability level for a plan.
     
-    # Load race and plan data
-    race_data = load_race_data(args.race)
-    plan_data = load_race_data(args.plan) if args.plan else None
+    Args:
+        plan_name: str - Plan file stem or slug (e.g. "compete_masters")
+        plan_data: Optional plan dict; top-level 'tier'/'level' keys override
     
-    # Extract tier and level from plan data or filename
+    Returns:
+        tuple: (tier_name, ability_level)
+    """
     tier_name = 'FINISHER'  # Default
     ability_level = 'Intermediate'  # Default
     
     # Try to extract from filename first (more reliable)
-    plan_path = Path(args.plan)
-    plan_name = plan_path.stem.lower()
+    plan_name = plan_name.lower()
     
     if 'ayahuasca' in plan_name or 'time crunched' in plan_name or 'time_crunched' in plan_name:
         tier_name = 'TIME CRUNCHED'  # Updated from AYAHUASCA
@@ -1275,22 +1384,67 @@ def main():
         if 'level' in plan_data:
             ability_level = plan_data.get('level', ability_level).title()
     
-    # Create output directory
-    output_dir = Path(args.output_dir)
-    output_dir.mkdir(parents=True, exist_ok=True)
-    
-    # Generate filename
+    return tier_name, ability_level
+
+
+def get_guide_filename(race_data, tier_name, ability_level):
+    """Return the standard guide filename for a race/tier/level"""
     race_name_slug = race_data.get('race_metadata', {}).get('name', 'race').lower().replace(' ', '_')
     plan_slug = f"{tier_name.lower()}_{ability_level.lower().replace(' ', '_')}"
-    output_filename = f"{race_name_slug}_{plan_slug}_guide.html"
-    output_path = output_dir / output_filename
+    return f"{race_name_slug}_{plan_slug}_guide.html"
+
+
+def generate_guide_for_plan(race_data, plan_data, plan_name, output_dir, verbose=True):
+    """
+    Generate a guide from already-loaded race and plan data.
+    
+    In-process equivalent of running this script with --race/--plan/--output-dir,
+    without writing the plan to a temporary JSON file first.
+    
+    Args:
+        race_data: Dict containing race information
+        plan_data: Plan template dict (may be None)
+        plan_name: str - Plan slug used to detect tier/level (e.g. "compete_masters")
+        output_dir: Directory to save the generated guide
+        verbose: bool - Print section include/remove notes
+    
+    Returns:
+        Path: Path of the written guide
+    """
+    tier_name, ability_level = resolve_tier_and_level(plan_name, plan_data)
+    
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    output_path = output_dir / get_guide_filename(race_data, tier_name, ability_level)
     
-    # Generate guide
     generate_guide(
         race_data=race_data,
         tier_name=tier_name,
         ability_level=ability_level,
-        output_path=str(output_path)
+        output_path=str(output_path),
+        verbose=verbose
+    )
+    return output_path
+
+
+def main():
+    """CLI entry point for guide generator"""
+    parser = argparse.ArgumentParser(description='Generate training plan guide HTML')
+    parser.add_argument('--race', required=True, help='Path to race JSON file')
+    parser.add_argument('--plan', required=True, help='Path to plan JSON file')
+    parser.add_argument('--output-dir', required=True, help='Directory to save generated guide')
+    
+    args = parser.parse_args()
+    
+    # Load race and plan data
+    race_data = load_race_data(args.race)
+    plan_data = load_race_data(args.plan) if args.plan else None
+    
+    output_path = generate_guide_for_plan(
+        race_data=race_data,
+        plan_data=plan_data,
+        plan_name=Path(args.plan).stem,
+        output_dir=args.output_dir
     )
     
     print(f"✓ Generated: {output_path}")
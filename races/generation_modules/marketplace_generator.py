@@ -4,6 +4,7 @@ Marketplace Description Generator
 Generates TrainingPeaks marketplace HTML descriptions from race + plan data
 """
 
+import random
 import re
 import sys
 import os
@@ -182,8 +183,13 @@ def format_level_name(level):
     }
     return level_map.get(level, level.title())
 
-def generate_marketplace_html(race_data, plan_template, plan_info):
-    """Generate marketplace description HTML with varied copy"""
+def generate_marketplace_html(race_data, plan_template, plan_info, rng=None):
+    """
+    Generate marketplace description HTML with varied copy
+
+    Copy is drawn from rng, by default one seeded from race, tier and level,
+    so output is reproducible and plans can be generated in parallel.
+    """
     marketplace_vars = race_data.get("marketplace_variables", {})
     plan_metadata = plan_template.get("plan_metadata", {})
     
@@ -192,7 +198,9 @@ def generate_marketplace_html(race_data, plan_template, plan_info):
     level_key = plan_info.get("level", "").lower()
     
     # Generate varied copy for this variant
-    copy = generate_varied_marketplace_copy(race_data, tier_key, level_key)
+    if rng is None:
+        rng = random.Random(f"{race_data['race_metadata']['name']}_{tier_key}_{level_key}")
+    copy = generate_varied_marketplace_copy(race_data, tier_key, level_key, rng=rng)
     
     # Get display names
     tier = plan_info.get("tier", "").title()
@@ -240,11 +248,11 @@ def generate_marketplace_html(race_data, plan_template, plan_info):
     
     # Get race-specific references (Mid South content) - ensures uniqueness per plan
     used_refs = set()
-    race_terrain_ref = get_race_specific_reference(race_data, "terrain", tier_key, level_key, used_refs)
-    race_weather_ref = get_race_specific_reference(race_data, "weather", tier_key, level_key, used_refs)
-    race_location_ref = get_race_specific_reference(race_data, "location", tier_key, level_key, used_refs)
-    race_character_ref = get_race_specific_reference(race_data, "character", tier_key, level_key, used_refs)
-    race_challenge_ref = get_race_specific_reference(race_data, "challenges", tier_key, level_key, used_refs)
+    race_terrain_ref = get_race_specific_reference(race_data, "terrain", tier_key, level_key, used_refs, rng)
+    race_weather_ref = get_race_specific_reference(race_data, "weather", tier_key, level_key, used_refs, rng)
+    race_location_ref = get_race_specific_reference(race_data, "location", tier_key, level_key, used_refs, rng)
+    race_character_ref = get_race_specific_reference(race_data, "character", tier_key, level_key, used_refs, rng)
+    race_challenge_ref = get_race_specific_reference(race_data, "challenges", tier_key, level_key, used_refs, rng)
     
     tier_philosophy = copy.get('tier_philosophy', '')
     
@@ -43,9 +43,14 @@ G-Spot (87-92% FTP) replaces Sweet Spot throughout this generator.
 Version: 2.0 (Full Methodology Support)
 """
 
+import hashlib
 import html
+import json
 import logging
+import os
 import sys
+from collections import OrderedDict
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple, Any
 
@@ -117,16 +122,9 @@ def set_log_level(level: int) -> None:
 # ARCHETYPE IMPORTS
 # =============================================================================
 
-from new_archetypes import (
-    NEW_ARCHETYPES,
-    VO2MAX_NEW,
-    THRESHOLD_NEW,
-    SPRINT_NEW,
-    ANAEROBIC_CAPACITY,
-    DURABILITY_NEW,
-    ENDURANCE_NEW,
-    RACE_SIMULATION
-)
+# Compiled store of new_archetypes.py: category -> archetypes, each decoded
+# on first access (see archetype_store)
+from archetype_store import NEW_ARCHETYPES, SOURCE_PATH as ARCHETYPES_SOURCE
 
 # =============================================================================
 # ZWO TEMPLATE
@@ -496,11 +494,10 @@ def get_archetype_by_category_and_index(category: str, index: int = 0) -> Option
     if category not in NEW_ARCHETYPES:
         return None
 
-    archetypes = NEW_ARCHETYPES[category]
-    if index >= len(archetypes):
+    if index >= NEW_ARCHETYPES.count(category):
         index = 0
 
-    return archetypes[index]
+    return NEW_ARCHETYPES.archetype(category, index)
 
 
 def get_all_archetypes_for_category(category: str) -> List[Dict]:
@@ -1907,6 +1904,199 @@ def get_category_purpose(archetype_name: str) -> str:
     return "Quality training. Building race-specific fitness through structured work."
 
 
+# =============================================================================
+# SYNTHESIS CACHE
+# =============================================================================
+
+WorkoutKey = Tuple[str, int, str, int]
+WorkoutTuple = Tuple[Optional[str], Optional[str], Optional[str]]
+
+
+@lru_cache(maxsize=8)
+def _hash_sources(stamps: Tuple[Tuple[str, int, int], ...]) -> str:
+    """Hash source files; stamps are (path, mtime_ns, size) so edits miss the cache."""
+    digest = hashlib.sha256()
+    for module_file, _, _ in stamps:
+        digest.update(Path(module_file).read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def get_archetype_fingerprint() -> str:
+    """
+    Hash the sources that determine workout synthesis output.
+
+    Covers the archetype library (new_archetypes.py) and this generator, so a
+    persisted cache is invalidated whenever either changes. The files are
+    only re-read when their mtime or size changes.
+
+    Returns:
+        Short hex digest string
+    """
+    stamps = []
+    for module_file in (ARCHETYPES_SOURCE, __file__):
+        stat = os.stat(module_file)
+        stamps.append((str(module_file), stat.st_mtime_ns, stat.st_size))
+    return _hash_sources(tuple(stamps))
+
+
+class SynthesisCache:
+    """
+    Bounded LRU cache of synthesized workouts with an optional on-disk store.
+
+    Keys are (workout_type, level, methodology, variation); values are the
+    (name, description, blocks) tuple produced by generate_nate_workout with
+    the default workout name. When cache_dir is set, entries are persisted to
+    a JSON file named after get_archetype_fingerprint(), so a changed
+    archetype library never serves stale workouts.
+
+    Attributes:
+        maxsize: Maximum number of in-memory entries
+        cache_dir: Directory for the persisted store, or None for memory only
+        hits: Lookups served from memory or disk
+        misses: Lookups that required synthesis
+    """
+
+    def __init__(self, maxsize: int = 1024, cache_dir: Optional[str] = None):
+        self.maxsize = maxsize
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[WorkoutKey, WorkoutTuple]" = OrderedDict()
+        self._disk: Optional[Dict[str, List[Optional[str]]]] = None
+        self._dirty = False
+
+    @staticmethod
+    def _disk_key(key: WorkoutKey) -> str:
+        return "|".join(str(part) for part in key)
+
+    @property
+    def store_path(self) -> Optional[Path]:
+        """Path of the persisted store for the current archetype fingerprint."""
+        if self.cache_dir is None:
+            return None
+        return self.cache_dir / f"nate_synthesis_{get_archetype_fingerprint()}.json"
+
+    def _load_disk(self) -> Dict[str, List[Optional[str]]]:
+        if self._disk is None:
+            self._disk = {}
+            store_path = self.store_path
+            if store_path is not None and store_path.exists():
+                try:
+                    with open(store_path, "r", encoding="utf-8") as f:
+                        self._disk = json.load(f)
+                except (OSError, ValueError) as e:
+                    get_logger().warning(f"Ignoring unreadable synthesis cache {store_path}: {e}")
+        return self._disk
+
+    def get(self, key: WorkoutKey) -> Optional[WorkoutTuple]:
+        """Return a cached workout tuple, or None on a miss."""
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key]
+
+        if self.cache_dir is not None:
+            stored = self._load_disk().get(self._disk_key(key))
+            if stored is not None:
+                self.hits += 1
+                value = tuple(stored)
+                self._remember(key, value)
+                return value
+
+        self.misses += 1
+        return None
+
+    def put(self, key: WorkoutKey, value: WorkoutTuple) -> None:
+        """Store a synthesized workout tuple."""
+        self._remember(key, value)
+        if self.cache_dir is not None:
+            self._load_disk()[self._disk_key(key)] = list(value)
+            self._dirty = True
+
+    def _remember(self, key: WorkoutKey, value: WorkoutTuple) -> None:
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def save(self) -> Optional[Path]:
+        """
+        Write new entries to the on-disk store.
+
+        Entries already on disk (e.g. written by another worker process) are
+        merged in before an atomic replace.
+
+        Returns:
+            Path written, or None if there was nothing to save
+        """
+        store_path = self.store_path
+        if store_path is None or not self._dirty:
+            return None
+
+        store_path.parent.mkdir(parents=True, exist_ok=True)
+        merged = {}
+        if store_path.exists():
+            try:
+                with open(store_path, "r", encoding="utf-8") as f:
+                    merged = json.load(f)
+            except (OSError, ValueError):
+                merged = {}
+        merged.update(self._disk or {})
+
+        tmp_path = store_path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(merged, f)
+        os.replace(tmp_path, store_path)
+
+        self._disk = merged
+        self._dirty = False
+        return store_path
+
+    def clear(self) -> None:
+        """Drop in-memory entries and reset counters (the disk store is kept)."""
+        self._entries.clear()
+        self._disk = None
+        self._dirty = False
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and sizes."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "store": str(self.store_path) if self.store_path else None,
+        }
+
+
+_synthesis_cache = SynthesisCache()
+
+
+def configure_synthesis_cache(maxsize: int = 1024, cache_dir: Optional[str] = None) -> SynthesisCache:
+    """
+    Replace the module synthesis cache.
+
+    Args:
+        maxsize: Maximum number of in-memory entries (0 disables caching)
+        cache_dir: Optional directory for the persisted store
+
+    Returns:
+        The new cache instance
+    """
+    global _synthesis_cache
+    _synthesis_cache = SynthesisCache(maxsize=maxsize, cache_dir=cache_dir)
+    return _synthesis_cache
+
+
+def get_synthesis_cache() -> SynthesisCache:
+    """Return the module synthesis cache."""
+    return _synthesis_cache
+
+
 # =============================================================================
 # MAIN WORKOUT GENERATION
 # =============================================================================
@@ -1923,6 +2113,9 @@ def generate_nate_workout(
 
     This function selects an appropriate archetype based on workout type and
     methodology, then generates the workout name, description, and ZWO blocks.
+    Output depends only on (workout_type, level, methodology, variation), so
+    results are memoized in the module SynthesisCache (see
+    configure_synthesis_cache).
 
     Args:
         workout_type: Type of workout. Valid types include:
@@ -1973,6 +2166,29 @@ def generate_nate_workout(
         get_logger().warning(f"Level {level} out of range [1-6], clamping to valid range")
         level = max(1, min(6, level))
 
+    # Output depends only on these four inputs, so serve repeats from the cache
+    key = (workout_type, level, methodology, variation)
+    cache = _synthesis_cache
+    result = cache.get(key) if cache.maxsize > 0 else None
+    if result is None:
+        result = _synthesize_workout(workout_type, level, methodology, variation)
+        if cache.maxsize > 0:
+            cache.put(key, result)
+
+    name, description, blocks = result
+    if name is not None and workout_name:
+        name = workout_name
+
+    return name, description, blocks
+
+
+def _synthesize_workout(
+    workout_type: str,
+    level: int,
+    methodology: str,
+    variation: int
+) -> WorkoutTuple:
+    """Build (name, description, blocks) for an already-clamped level."""
     # Select archetype
     archetype = select_archetype_for_workout(workout_type, methodology, variation)
 
@@ -1985,7 +2201,7 @@ def generate_nate_workout(
         return None, None, None
 
     # Generate name
-    name = workout_name or f"{archetype['name']} L{level}"
+    name = f"{archetype['name']} L{level}"
 
     # Generate description
     description = generate_description(archetype, level, methodology)
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Plan Template Catalogue
+Scans plans/ once per process and hands out immutable, cached plan templates.
+
+- Index by folder name ("5. Finisher Beginner (12 weeks)") and by
+  (tier, level, weeks), e.g. ("finisher", "beginner", 12)
+- template.json files are parsed lazily, on first request
+- Parsed templates are frozen (read-only dicts/lists) and shared; derive
+  new templates with overlays (see generate_expanded_race_plans) instead of
+  mutating them. copy.deepcopy() returns a private mutable copy.
+- A pickle snapshot in plans/__pycache__/ keyed by each file's mtime/size
+  and SHA-256 lets cold starts skip JSON parsing. It holds the templates
+  processes have actually used; the first use of a cold template adds it
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import re
+from pathlib import Path
+
+SNAPSHOT_VERSION = 1
+
+# "5. Finisher Beginner (12 weeks)" -> number, tier + level words, weeks
+PLAN_FOLDER_PATTERN = re.compile(r'^(\d+)\.\s+(\S+)\s+(.+?)\s+\((\d+)\s+weeks\)$')
+
+# Same search order load_plan_template used: repo plans/, races/plans/, parent plans/
+DEFAULT_PLANS_DIRS = [
+    Path(__file__).parent.parent.parent / "plans",
+    Path(__file__).parent.parent / "plans",
+    Path(__file__).parent.parent.parent.parent / "plans",
+]
+
+# ============================================================================
+# IMMUTABLE TEMPLATE NODES
+# ============================================================================
+
+def _readonly(self, *args, **kwargs):
+    raise TypeError(f"{type(self).__name__} is read-only; overlay or copy.deepcopy() it instead")
+
+
+class FrozenDict(dict):
+    """Read-only dict (still a dict, so json.dumps and isinstance checks work)"""
+    __slots__ = ()
+    __setitem__ = __delitem__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+    __ior__ = _readonly
+
+    def __reduce__(self):
+        return (FrozenDict, (dict(self),))
+
+    def __copy__(self):
+        return dict(self)
+
+    def __deepcopy__(self, memo):
+        return thaw(self)
+
+
+class FrozenList(list):
+    """Read-only list (still a list, so json.dumps and isinstance checks work)"""
+    __slots__ = ()
+    __setitem__ = __delitem__ = _readonly
+    append = extend = insert = pop = remove = clear = sort = reverse = _readonly
+    __iadd__ = __imul__ = _readonly
+
+    def __reduce__(self):
+        return (FrozenList, (list(self),))
+
+    def __copy__(self):
+        return list(self)
+
+    def __deepcopy__(self, memo):
+        return thaw(self)
+
+
+def freeze(obj):
+    """Recursively convert parsed JSON into FrozenDict/FrozenList"""
+    if isinstance(obj, dict):
+        return FrozenDict((key, freeze(value)) for key, value in obj.items())
+    if isinstance(obj, list):
+        return FrozenList(freeze(item) for item in obj)
+    return obj
+
+
+def thaw(obj):
+    """Recursively convert frozen nodes back into plain mutable dicts/lists"""
+    if isinstance(obj, dict):
+        return {key: thaw(value) for key, value in obj.items()}
+    if isinstance(obj, list):
+        return [thaw(item) for item in obj]
+    return obj
+
+# ============================================================================
+# CATALOGUE
+# ============================================================================
+
+def parse_plan_folder_name(folder_name):
+    """
+    Parse a plan folder name into its catalogue key.
+
+    Returns:
+        tuple: (tier, level, weeks), e.g. ("podium", "advanced_goat", 12),
+        or None if the folder name doesn't follow the plan naming scheme
+    """
+    match = PLAN_FOLDER_PATTERN.match(folder_name)
+    if not match:
+        return None
+    _, tier, level, weeks = match.groups()
+    return tier.lower(), level.lower().replace(' ', '_'), int(weeks)
+
+
+class PlanCatalogue:
+    """
+    Index of plan templates across one or more plans/ directories
+
+    Directories are scanned once, in priority order; the first directory
+    containing a given folder's template.json wins.
+    """
+
+    def __init__(self, plans_dirs=None, use_snapshot=True):
+        self.plans_dirs = [Path(d) for d in (plans_dirs or DEFAULT_PLANS_DIRS)]
+        self.use_snapshot = use_snapshot
+        self.paths = {}
+        self.by_key = {}
+        self._templates = {}
+        self._snapshot = None
+        self._snapshot_dirty = False
+        self.parses = 0
+        self.snapshot_hits = 0
+        self._scan()
+
+    def _scan(self):
+        for plans_dir in self.plans_dirs:
+            if not plans_dir.is_dir():
+                continue
+            for entry in sorted(plans_dir.iterdir()):
+                template_path = entry / "template.json"
+                if entry.name in self.paths or not template_path.is_file():
+                    continue
+                self.paths[entry.name] = template_path
+                key = parse_plan_folder_name(entry.name)
+                if key is not None:
+                    self.by_key.setdefault(key, entry.name)
+
+    def folders(self):
+        """All indexed plan folder names"""
+        return list(self.paths)
+
+    def find(self, tier, level, weeks):
+        """Folder name for (tier, level, weeks), or None"""
+        return self.by_key.get((tier.lower(), level.lower().replace(' ', '_'), int(weeks)))
+
+    def get(self, folder_name):
+        """
+        Frozen template for a plan folder (parsed on first request), or None
+        if the folder isn't in the catalogue
+        """
+        if folder_name not in self._templates:
+            template_path = self.paths.get(folder_name)
+            if template_path is None:
+                return None
+            self._templates[folder_name] = freeze(self._load(folder_name, template_path))
+        return self._templates[folder_name]
+
+    def get_by_key(self, tier, level, weeks):
+        """Frozen template for (tier, level, weeks), or None"""
+        folder_name = self.find(tier, level, weeks)
+        return self.get(folder_name) if folder_name else None
+
+    # ------------------------------------------------------------------
+    # Binary snapshot
+    # ------------------------------------------------------------------
+
+    @property
+    def snapshot_path(self):
+        return self.plans_dirs[0] / "__pycache__" / "plan_catalogue.pickle"
+
+    def _read_snapshot_file(self):
+        if self.use_snapshot:
+            try:
+                with open(self.snapshot_path, 'rb') as f:
+                    snapshot = pickle.load(f)
+                if snapshot.get("version") == SNAPSHOT_VERSION:
+                    return snapshot["templates"]
+            except (OSError, pickle.UnpicklingError, EOFError, AttributeError, KeyError):
+                pass
+        return {}
+
+    def _read_snapshot(self):
+        if self._snapshot is None:
+            self._snapshot = self._read_snapshot_file()
+        return self._snapshot
+
+    def _remember(self, folder_name, stat, digest, data):
+        self._snapshot[folder_name] = {
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "sha256": digest,
+            "data": data
+        }
+        self._snapshot_dirty = True
+
+    def _load(self, folder_name, template_path):
+        stat = template_path.stat()
+        cached = self._read_snapshot().get(folder_name)
+
+        # Unchanged file: trust the snapshot without reading the JSON
+        if cached and cached["mtime_ns"] == stat.st_mtime_ns and cached["size"] == stat.st_size:
+            self.snapshot_hits += 1
+            return cached["data"]
+
+        with open(template_path, 'rb') as f:
+            content = f.read()
+        digest = hashlib.sha256(content).hexdigest()
+
+        # Touched but identical content (e.g. git checkout): reuse and refresh mtime
+        if cached and cached["sha256"] == digest:
+            self.snapshot_hits += 1
+            self._remember(folder_name, stat, digest, cached["data"])
+            return cached["data"]
+
+        self.parses += 1
+        data = json.loads(content)
+        self._remember(folder_name, stat, digest, data)
+        return data
+
+    def save_snapshot(self):
+        """
+        Write the pickle snapshot if a template was loaded from JSON.
+
+        Only templates this catalogue actually loaded are added; entries
+        already on disk (possibly written by another process meanwhile) are
+        kept while their file's mtime/size still match, so unused templates
+        are never parsed just to be snapshotted.
+
+        Returns:
+            Path written, or None
+        """
+        if not self.use_snapshot or not self._snapshot_dirty:
+            return None
+        templates = {}
+        for name, entry in self._read_snapshot_file().items():
+            template_path = self.paths.get(name)
+            try:
+                stat = template_path.stat() if template_path else None
+            except OSError:
+                stat = None
+            if stat and entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+                templates[name] = entry
+        templates.update((name, self._snapshot[name]) for name in self._templates if name in self._snapshot)
+        snapshot = {
+            "version": SNAPSHOT_VERSION,
+            "templates": templates
+        }
+        try:
+            self.snapshot_path.parent.mkdir(exist_ok=True)
+            tmp_path = self.snapshot_path.with_suffix(f".{os.getpid()}.tmp")
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.snapshot_path)
+        except OSError:
+            return None  # Read-only checkout: catalogue still works, just not persisted
+        self._snapshot_dirty = False
+        return self.snapshot_path
+
+
+_catalogue = None
+
+def get_plan_catalogue():
+    """Process-wide plan catalogue (scanned on first use)"""
+    global _catalogue
+    if _catalogue is None:
+        _catalogue = PlanCatalogue()
+    return _catalogue
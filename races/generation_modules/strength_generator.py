@@ -5,10 +5,15 @@ Generates TrainingPeaks-compatible strength workout ZWO files
 """
 
 import os
+import hashlib
 import html
+import json
 import re
+from functools import lru_cache
 from pathlib import Path
 
+from zwo_bundle import write_workout_file
+
 # Import exercise lookup (optional - will validate exercises if available)
 try:
     from exercise_lookup import get_video_url, validate_exercise_urls
@@ -117,17 +122,18 @@ STRENGTH_SCHEDULE = {
     20: [("Mon", "GREEN_B_MAINT")]
 }
 
-def load_strength_templates(templates_file_path):
+# Canonical template keys: RED phases 1-3, YELLOW hypertrophy/max, GREEN power/conversion/maintenance
+TEMPLATE_KEY_PATTERN = re.compile(
+    r'^(?:RED_[AB]_PHASE[1-3]|YELLOW_[AB]_(?:HYPER|MAX)|GREEN_[AB]_(?:POWER|CONV|MAINT))$'
+)
+
+# Bump when the parsed sidecar format or parsing rules change
+TEMPLATE_SIDECAR_VERSION = 1
+
+def parse_strength_templates(content):
     """
-    Load strength templates from MASTER_TEMPLATES_V2.md
-    
-    Returns dict mapping template_key -> description_text
+    Parse MASTER_TEMPLATES markdown content into template_key -> description_text
     """
-    import re
-    
-    with open(templates_file_path, 'r', encoding='utf-8') as f:
-        content = f.read()
-    
     templates = {}
     
     # Find all template sections: ## KEY followed by ``` on next line
@@ -152,6 +158,183 @@ def load_strength_templates(templates_file_path):
     
     return templates
 
+def validate_strength_templates(templates):
+    """
+    Check parsed templates against the RED/YELLOW/GREEN key rules
+    
+    Returns list of issue strings (empty if valid):
+    - keys that are not canonical PATHWAY_SESSION_PHASE keys
+    - keys referenced by STRENGTH_SCHEDULE that are missing
+    """
+    issues = []
+    for key in templates:
+        if not TEMPLATE_KEY_PATTERN.match(key):
+            issues.append(f"Non-standard template key: {key}")
+    
+    scheduled_keys = {key for sessions in STRENGTH_SCHEDULE.values() for _, key in sessions}
+    scheduled_keys.update(["GREEN_A_MAINT", "GREEN_B_MAINT"])  # 12-week maintenance plans
+    for key in sorted(scheduled_keys - set(templates)):
+        issues.append(f"Missing scheduled template: {key}")
+    
+    return issues
+
+def apply_exercise_exclusions(description, exclusions):
+    """
+    Remove excluded exercises from a workout description
+    
+    Args:
+        description: Workout description text
+        exclusions: List of exercise names to exclude
+    
+    Returns:
+        Modified description with excluded exercises removed
+    """
+    # Normalize exclusion names for matching (case-insensitive, handle variations)
+    exclusion_patterns = []
+    for exclusion in exclusions:
+        # Create pattern that matches exercise name (handles variations)
+        pattern = re.escape(exclusion)
+        # Match an exercise line starting with the name (after a bullet or
+        # A1-style label), plus its more-indented "→ demo link" lines
+        exclusion_patterns.append(
+            re.compile(
+                rf'(?i)\n(?P<indent>[ \t]*)(?:[•*-]|[A-Z]?\d+\.?)?[ \t]*{pattern}[^\n]*'
+                rf'(?:\n(?P=indent)[ \t]+→[^\n]*)*'
+            )
+        )
+    
+    # Remove excluded exercises
+    modified_description = description
+    for pattern in exclusion_patterns:
+        modified_description = pattern.sub('', modified_description)
+    
+    # Clean up extra blank lines
+    modified_description = re.sub(r'\n{3,}', '\n\n', modified_description)
+    
+    # Add note about exclusions if any were removed
+    if modified_description != description:
+        exclusion_note = f"\n\n⚠️  Note: Some exercises have been excluded based on your injury history/limitations.\n"
+        # Find a good place to insert the note (after header, before first section)
+        header_end = modified_description.find('\n\n★')
+        if header_end > 0:
+            modified_description = (
+                modified_description[:header_end] + 
+                exclusion_note + 
+                modified_description[header_end:]
+            )
+    
+    return modified_description
+
+class StrengthTemplateStore:
+    """
+    Strength templates parsed once per process
+    
+    Parsed templates are also written to a JSON sidecar in the templates
+    file's __pycache__ directory, keyed by the file's mtime and SHA-256, so
+    later runs skip the markdown regex entirely. Exclusion-filtered
+    descriptions are cached per (template_key, exclusions).
+    """
+    
+    def __init__(self, templates_file_path):
+        self.path = Path(templates_file_path)
+        self.templates, self.loaded_from_sidecar = self._load()
+        self.issues = validate_strength_templates(self.templates)
+        self._filtered = {}
+    
+    @property
+    def sidecar_path(self):
+        return self.path.parent / "__pycache__" / f"{self.path.name}.templates.json"
+    
+    def _read_sidecar(self):
+        try:
+            with open(self.sidecar_path, 'r', encoding='utf-8') as f:
+                sidecar = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if sidecar.get("version") != TEMPLATE_SIDECAR_VERSION:
+            return None
+        return sidecar
+    
+    def _write_sidecar(self, stat, digest, templates):
+        sidecar = {
+            "version": TEMPLATE_SIDECAR_VERSION,
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "sha256": digest,
+            "templates": templates
+        }
+        try:
+            self.sidecar_path.parent.mkdir(exist_ok=True)
+            tmp_path = self.sidecar_path.with_suffix(f".{os.getpid()}.tmp")
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(sidecar, f)
+            os.replace(tmp_path, self.sidecar_path)
+        except OSError:
+            pass  # Read-only checkout: parsing still works, just not persisted
+    
+    def _load(self):
+        stat = self.path.stat()
+        sidecar = self._read_sidecar()
+        
+        # Unchanged file: trust the sidecar without reading the markdown
+        if sidecar and sidecar["mtime_ns"] == stat.st_mtime_ns and sidecar["size"] == stat.st_size:
+            return sidecar["templates"], True
+        
+        with open(self.path, 'r', encoding='utf-8') as f:
+            content = f.read()
+        digest = hashlib.sha256(content.encode('utf-8')).hexdigest()
+        
+        # Touched but identical content (e.g. git checkout): reuse and refresh mtime
+        if sidecar and sidecar["sha256"] == digest:
+            self._write_sidecar(stat, digest, sidecar["templates"])
+            return sidecar["templates"], True
+        
+        templates = parse_strength_templates(content)
+        self._write_sidecar(stat, digest, templates)
+        return templates, False
+    
+    def get(self, template_key, exclusions=()):
+        """Return a template description, optionally with exercises excluded"""
+        if template_key not in self.templates:
+            raise KeyError(template_key)
+        exclusions = tuple(exclusions)
+        if not exclusions:
+            return self.templates[template_key]
+        
+        cache_key = (template_key, exclusions)
+        if cache_key not in self._filtered:
+            self._filtered[cache_key] = apply_exercise_exclusions(self.templates[template_key], exclusions)
+        return self._filtered[cache_key]
+
+_TEMPLATE_STORES = {}
+
+def get_template_store(templates_file_path):
+    """
+    Return the process-wide StrengthTemplateStore for a templates file
+    
+    Stores are reused until the file's mtime or size changes.
+    """
+    path = Path(templates_file_path).resolve()
+    stat = path.stat()
+    cache_key = (str(path), stat.st_mtime_ns, stat.st_size)
+    
+    store = _TEMPLATE_STORES.get(cache_key)
+    if store is None:
+        store = StrengthTemplateStore(path)
+        _TEMPLATE_STORES[cache_key] = store
+        for issue in store.issues:
+            print(f"     ⚠️  {path.name}: {issue}")
+    return store
+
+def load_strength_templates(templates_file_path):
+    """
+    Load strength templates from MASTER_TEMPLATES_V2.md
+    
+    Returns dict mapping template_key -> description_text
+    (a copy of the process-wide cached templates, parsed once per file)
+    """
+    return dict(get_template_store(templates_file_path).templates)
+
 def get_pathway_name(template_key):
     """Extract pathway name from template key"""
     # Check for maintenance first (more specific)
@@ -173,6 +356,14 @@ def get_session_letter(template_key):
         return "B"
     return "A"  # Default
 
+@lru_cache(maxsize=256)
+def _prepare_description(description):
+    """Return (description with exercise URLs, estimated duration) for a template body"""
+    if not WORKOUT_ENHANCEMENTS_AVAILABLE:
+        return description, 40
+    duration_min = estimate_workout_duration(description)
+    return add_urls_to_all_exercises(description), duration_min
+
 def format_description_with_tagline(description, template_key, week, plan_weeks=20):
     """
     Format description with updated header including tagline, duration, and context
@@ -195,18 +386,14 @@ def format_description_with_tagline(description, template_key, week, plan_weeks=
     rpe = phase_info.get("rpe", "")
     equipment = phase_info.get("equipment", "")
     
-    # Estimate duration
-    duration_min = estimate_workout_duration(description) if WORKOUT_ENHANCEMENTS_AVAILABLE else 40
+    # Estimate duration and add URLs to all exercises (cached per description text)
+    description, duration_min = _prepare_description(description)
     
     # Get workout context
     context = None
     if WORKOUT_ENHANCEMENTS_AVAILABLE:
         context = get_workout_context(week, template_key, plan_weeks, get_pathway_name, STRENGTH_SCHEDULE)
     
-    # Add URLs to all exercises
-    if WORKOUT_ENHANCEMENTS_AVAILABLE:
-        description = add_urls_to_all_exercises(description)
-    
     # Build new header
     new_header = f"★ STRENGTH: {pathway_name} │ Session {session} │ Week {week}\n\n"
     new_header += f"  {tagline_short}\n\n"
@@ -290,10 +477,8 @@ def create_strength_zwo_file(week, template_key, description, output_path, plan_
         blocks=workout_blocks
     )
     
-    # Write file
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write(zwo_content)
+    # Write file (buffered instead if the plan's workouts are being bundled)
+    write_workout_file(output_path, zwo_content)
     
     return output_path
 
@@ -12,7 +12,11 @@ from exercise_lookup import (
     get_substitutes,
     validate_exercise_urls,
     search_exercises,
-    get_library_stats
+    get_library_stats,
+    normalize_exercise_name,
+    similarity_score,
+    _load_library,
+    _get_index
 )
 
 
@@ -123,6 +127,35 @@ class TestExerciseLookup(unittest.TestCase):
         assert stats["by_source"]["precision_nutrition"] >= 390, \
             "PN exercise count too low"
 
+    
+    def test_index_matches_normalized_library(self):
+        """Index holds the same normalized names as normalize_exercise_name"""
+        library = _load_library()
+        index = _get_index()
+        for i, ex in enumerate(library["exercises"]):
+            assert index.normalized_names[i] == normalize_exercise_name(ex["name"]), \
+                f"Index out of sync for {ex['name']}"
+    
+    def test_fuzzy_scores_match_full_scan(self):
+        """Bound-pruned fuzzy scores agree with an unpruned similarity scan"""
+        library = _load_library()
+        index = _get_index()
+        query = normalize_exercise_name("Goblet Squats")
+        pruned = dict(index.fuzzy_scores(query, min_score=0.6))
+        for i, ex in enumerate(library["exercises"]):
+            names = [ex["name"]] + ex.get("aliases", [])
+            score = max(similarity_score(normalize_exercise_name(n), query) for n in names)
+            if score >= 0.6:
+                assert abs(pruned.get(i, 0.0) - score) < 1e-9, \
+                    f"Pruned score mismatch for {ex['name']}"
+            else:
+                assert i not in pruned, f"{ex['name']} should have been pruned"
+    
+    def test_get_video_url_repeat_lookup_consistent(self):
+        """Cached lookups return the same URL as the first lookup"""
+        first = get_video_url("Single-Leg RDL")
+        assert get_video_url("Single-Leg RDL") == first
+
 
 if __name__ == "__main__":
     unittest.main()
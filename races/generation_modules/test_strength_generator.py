@@ -24,6 +24,8 @@ from strength_generator import (
     generate_strength_workout_for_plan_week,
     generate_strength_files,
     generate_all_strength_workouts,
+    StrengthTemplateStore,
+    validate_strength_templates,
     PATHWAY_NAMES,
     STRENGTH_SCHEDULE
 )
@@ -505,6 +507,57 @@ class TestStrengthGenerator(unittest.TestCase):
         # Should have context about previous workout
         has_context = ("Building on" in desc or "Continuing" in desc or "Next week" in desc)
         self.assertTrue(has_context, "Workout context missing")
+    
+    def test_16_template_store_sidecar(self):
+        """Test that parsed templates round-trip through the JSON sidecar"""
+        templates_copy = self.test_output_dir / "templates_copy.md"
+        shutil.copy(self.templates_file, templates_copy)
+        
+        first = StrengthTemplateStore(templates_copy)
+        self.assertFalse(first.loaded_from_sidecar, "First load should parse markdown")
+        self.assertTrue(first.sidecar_path.exists(), "Sidecar not written")
+        
+        second = StrengthTemplateStore(templates_copy)
+        self.assertTrue(second.loaded_from_sidecar, "Second load should use sidecar")
+        self.assertEqual(first.templates, second.templates)
+        self.assertEqual(second.templates, self.templates)
+        
+        # Edited content must invalidate the sidecar
+        with open(templates_copy, 'a', encoding='utf-8') as f:
+            f.write("\n## RED_A_EXTRA\n```\n" + "x" * 60 + "\n```\n")
+        third = StrengthTemplateStore(templates_copy)
+        self.assertFalse(third.loaded_from_sidecar, "Edited file should be re-parsed")
+        self.assertIn("RED_A_EXTRA", third.templates)
+        self.assertIn("Non-standard template key: RED_A_EXTRA", third.issues)
+    
+    def test_17_template_validation(self):
+        """Test that production templates pass RED/YELLOW/GREEN key validation"""
+        self.assertEqual(validate_strength_templates(self.templates), [])
+        
+        incomplete = dict(self.templates)
+        del incomplete["GREEN_B_MAINT"]
+        issues = validate_strength_templates(incomplete)
+        self.assertIn("Missing scheduled template: GREEN_B_MAINT", issues)
+    
+    def test_18_exclusion_filtered_descriptions(self):
+        """Test that exclusion-filtered descriptions are cached and filtered"""
+        store = StrengthTemplateStore(self.templates_file)
+        plain = store.get("RED_A_PHASE1")
+        self.assertEqual(plain, self.templates["RED_A_PHASE1"])
+        
+        original = self.templates["YELLOW_A_HYPER"]
+        self.assertRegex(original, r'(?m)^\s*A1 Goblet Squat')
+        filtered = store.get("YELLOW_A_HYPER", ["Goblet Squat"])
+        self.assertIs(filtered, store.get("YELLOW_A_HYPER", ("Goblet Squat",)))
+        
+        # Goblet Squat exercise lines and their demo links are gone...
+        self.assertNotRegex(filtered, r'(?m)^\s*(?:•|[A-Z]\d+)\s*Goblet Squat')
+        self.assertNotIn("watch?v=MeIiIdhvXT4", filtered)
+        self.assertIn("Some exercises have been excluded", filtered)
+        # ...while everything else is kept
+        self.assertIn("Lateral Lunges ─ 8/side", filtered)
+        self.assertIn("B1 Bulgarian Split Squat (or Goblet Squat) ─ 8/side", filtered)
+        self.assertEqual(store.get("YELLOW_A_HYPER"), original)
 
 
 def run_tests():
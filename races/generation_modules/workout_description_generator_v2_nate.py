@@ -35,7 +35,7 @@ NATE_ARCHIVE_PATH = Path("/Users/mattirowe/Documents/GravelGod/archive/nate_work
 sys.path.insert(0, str(NATE_ARCHIVE_PATH))
 
 try:
-    from new_archetypes import NEW_ARCHETYPES, VO2MAX_NEW, THRESHOLD_NEW, SPRINT_NEW, ANAEROBIC_CAPACITY, DURABILITY_NEW, ENDURANCE_NEW, RACE_SIMULATION
+    from archetype_store import NEW_ARCHETYPES
     NATE_ARCHETYPES_AVAILABLE = True
 except ImportError:
     print(f"WARNING: Nate archetypes not found at {NATE_ARCHIVE_PATH}")
@@ -0,0 +1,360 @@
+#!/usr/bin/env python3
+"""
+Workout Metrics
+Structured ZWO block arrays with vectorized duration, time-in-zone,
+normalized power, IF and TSS for whole plans at once.
+
+Each workout's blocks string is parsed once into segments of
+(duration, power low, power high, cadence); a plan becomes a set of
+column arrays over all its segments, tagged with the workout they belong
+to. Metrics are then per-workout group sums over those columns.
+
+Power is a fraction of FTP throughout, so IF == NP. Ramps (Warmup,
+Cooldown, Ramp) are treated as linear between their two power targets.
+FreeRide/MaxEffort have no target: they count toward duration but not
+toward power metrics or zones (NP is taken over targeted time only, and
+TSS uses targeted hours).
+
+Uses NumPy when installed; otherwise falls back to plain Python lists
+with identical results.
+
+Usage:
+    python workout_metrics.py "plans/5. Finisher Beginner (12 weeks)/template.json"
+"""
+
+import math
+import re
+import sys
+from functools import lru_cache
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+from constants import PowerZones
+
+# Zone lower bounds (FTP fractions); the last zone is open-ended
+ZONES = (
+    ("recovery", 0.0),
+    ("endurance", PowerZones.ENDURANCE_LOW),
+    ("tempo", PowerZones.TEMPO_LOW),
+    ("g_spot", PowerZones.G_SPOT_LOW),
+    ("threshold", PowerZones.THRESHOLD_LOW),
+    ("vo2max", PowerZones.VO2MAX_LOW),
+    ("anaerobic", PowerZones.ANAEROBIC_LOW),
+)
+ZONE_NAMES = tuple(name for name, _ in ZONES)
+
+SEGMENT_PATTERN = re.compile(
+    r'<(Warmup|Cooldown|Ramp|SteadyState|IntervalsT|FreeRide|MaxEffort)\b([^>]*)>'
+)
+ATTRIBUTE_PATTERN = re.compile(r'(\w+)="([^"]*)"')
+
+NAN = float("nan")
+
+# ============================================================================
+# PARSING
+# ============================================================================
+
+def _number(attributes, key, default=NAN):
+    try:
+        return float(attributes[key])
+    except (KeyError, ValueError):
+        return default
+
+
+@lru_cache(maxsize=8192)
+def parse_segments(blocks):
+    """
+    Parse ZWO blocks into segments.
+
+    IntervalsT is folded into two segments (all on time, all off time):
+    every metric here is a duration-weighted sum, so this is exact.
+
+    Returns:
+        tuple of (duration_sec, power_low, power_high, cadence) tuples;
+        power is NaN for untargeted segments, cadence NaN when unspecified
+    """
+    segments = []
+    for tag, attribute_text in SEGMENT_PATTERN.findall(blocks or ""):
+        attributes = dict(ATTRIBUTE_PATTERN.findall(attribute_text))
+        cadence = _number(attributes, "Cadence")
+
+        if tag == "IntervalsT":
+            repeat = _number(attributes, "Repeat", 1.0)
+            on_power = _number(attributes, "OnPower")
+            off_power = _number(attributes, "OffPower")
+            segments.append((repeat * _number(attributes, "OnDuration", 0.0), on_power, on_power, cadence))
+            segments.append((repeat * _number(attributes, "OffDuration", 0.0), off_power, off_power,
+                             _number(attributes, "CadenceResting")))
+        elif tag == "SteadyState":
+            power = _number(attributes, "Power")
+            segments.append((_number(attributes, "Duration", 0.0), power, power, cadence))
+        elif tag in ("Warmup", "Cooldown", "Ramp"):
+            segments.append((_number(attributes, "Duration", 0.0),
+                             _number(attributes, "PowerLow"), _number(attributes, "PowerHigh"), cadence))
+        else:
+            segments.append((_number(attributes, "Duration", 0.0), NAN, NAN, cadence))
+    return tuple(segments)
+
+# ============================================================================
+# SEGMENT KERNELS
+# ============================================================================
+# Each kernel has a NumPy version (whole columns) and a scalar version used
+# per segment by the fallback. Both must agree.
+
+def _mean_fourth_power(low, high):
+    """Mean of p^4 over a linear ramp from low to high (0 when untargeted)"""
+    if math.isnan(low) or math.isnan(high):
+        return 0.0
+    if abs(high - low) < 1e-9:
+        return low ** 4
+    return (high ** 5 - low ** 5) / (5 * (high - low))
+
+
+def _zone_fraction(low, high, zone_low, zone_high):
+    """Fraction of a linear ramp spent in [zone_low, zone_high)"""
+    if math.isnan(low) or math.isnan(high):
+        return 0.0
+    low, high = min(low, high), max(low, high)
+    if high - low < 1e-9:
+        return 1.0 if zone_low <= low < zone_high else 0.0
+    return max(0.0, min(high, zone_high) - max(low, zone_low)) / (high - low)
+
+
+def _np_mean_fourth_power(low, high):
+    span = high - low
+    flat = np.abs(span) < 1e-9
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ramp = (high ** 5 - low ** 5) / (5 * span)
+    return np.nan_to_num(np.where(flat, low ** 4, ramp), nan=0.0)
+
+
+def _np_zone_fraction(low, high, zone_low, zone_high):
+    low, high = np.minimum(low, high), np.maximum(low, high)
+    span = high - low
+    flat = span < 1e-9
+    overlap = np.clip(np.minimum(high, zone_high) - np.maximum(low, zone_low), 0.0, None)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ramp = overlap / span
+    inside = (zone_low <= low) & (low < zone_high)
+    return np.nan_to_num(np.where(flat, inside.astype(float), ramp), nan=0.0)
+
+# ============================================================================
+# WORKOUT ARRAYS
+# ============================================================================
+
+class WorkoutArrays:
+    """
+    Segment columns for a collection of workouts
+
+    Attributes:
+        duration, power_low, power_high, cadence: per-segment columns
+        workout: index of the owning workout for each segment
+        count: number of workouts
+    """
+
+    def __init__(self, segments_per_workout):
+        columns = ([], [], [], [], [])
+        for index, segments in enumerate(segments_per_workout):
+            for segment in segments:
+                for column, value in zip(columns, segment):
+                    column.append(value)
+                columns[4].append(index)
+        self.count = len(segments_per_workout)
+
+        if NUMPY_AVAILABLE:
+            self.duration, self.power_low, self.power_high, self.cadence = (
+                np.asarray(column, dtype=float) for column in columns[:4])
+            self.workout = np.asarray(columns[4], dtype=np.intp)
+        else:
+            self.duration, self.power_low, self.power_high, self.cadence, self.workout = columns
+
+    @classmethod
+    def from_blocks(cls, blocks_list):
+        """Build arrays from ZWO blocks strings (parsed once per distinct string)"""
+        return cls([parse_segments(blocks) for blocks in blocks_list])
+
+    def _group_sum(self, values):
+        """Sum per-segment values into per-workout totals"""
+        if NUMPY_AVAILABLE:
+            return np.bincount(self.workout, weights=values, minlength=self.count)
+        totals = [0.0] * self.count
+        for index, value in zip(self.workout, values):
+            totals[index] += value
+        return totals
+
+    def total_duration(self):
+        """Seconds per workout"""
+        return self._group_sum(self.duration)
+
+    def targeted_duration(self):
+        """Seconds per workout with a power target (excludes FreeRide/MaxEffort)"""
+        if NUMPY_AVAILABLE:
+            untargeted = np.isnan(self.power_low) | np.isnan(self.power_high)
+            return self._group_sum(np.where(untargeted, 0.0, self.duration))
+        return self._group_sum([0.0 if math.isnan(low) or math.isnan(high) else d
+                                for d, low, high in zip(self.duration, self.power_low, self.power_high)])
+
+    def time_in_zones(self):
+        """
+        Seconds per workout per zone (see ZONE_NAMES)
+
+        Returns:
+            count x len(ZONES) matrix (ndarray, or list of lists)
+        """
+        bounds = [low for _, low in ZONES[1:]] + [math.inf]
+        columns = []
+        for (_, zone_low), zone_high in zip(ZONES, bounds):
+            if NUMPY_AVAILABLE:
+                weighted = self.duration * _np_zone_fraction(self.power_low, self.power_high, zone_low, zone_high)
+            else:
+                weighted = [d * _zone_fraction(low, high, zone_low, zone_high)
+                            for d, low, high in zip(self.duration, self.power_low, self.power_high)]
+            columns.append(self._group_sum(weighted))
+        if NUMPY_AVAILABLE:
+            return np.column_stack(columns) if columns else np.zeros((self.count, 0))
+        return [list(row) for row in zip(*columns)]
+
+    def normalized_power(self):
+        """
+        Normalized power per workout (FTP fraction): fourth root of the
+        duration-weighted mean of power^4 over the workout's targeted time
+        (0 for a workout with no targeted segments)
+        """
+        if NUMPY_AVAILABLE:
+            fourth = self._group_sum(self.duration * _np_mean_fourth_power(self.power_low, self.power_high))
+            targeted = self.targeted_duration()
+            with np.errstate(divide="ignore", invalid="ignore"):
+                return np.nan_to_num((fourth / targeted) ** 0.25, nan=0.0)
+        fourth = self._group_sum([d * _mean_fourth_power(low, high)
+                                  for d, low, high in zip(self.duration, self.power_low, self.power_high)])
+        return [(f / t) ** 0.25 if t else 0.0 for f, t in zip(fourth, self.targeted_duration())]
+
+    def intensity_factor(self):
+        """IF per workout (power is already relative to FTP, so IF == NP)"""
+        return self.normalized_power()
+
+    def tss(self):
+        """Training Stress Score per workout: targeted hours x IF^2 x 100"""
+        hours = self.targeted_duration()
+        intensity = self.intensity_factor()
+        if NUMPY_AVAILABLE:
+            return hours / 3600 * intensity ** 2 * 100
+        return [h / 3600 * i ** 2 * 100 for h, i in zip(hours, intensity)]
+
+# ============================================================================
+# PLAN SUMMARIES
+# ============================================================================
+
+def _as_list(values):
+    return values.tolist() if NUMPY_AVAILABLE else list(values)
+
+
+def weekly_summary(plan_template):
+    """
+    Weekly volume/TSS curve for a plan template
+
+    Returns:
+        list of dicts (one per week): week_number, volume_percent,
+        workouts, hours, tss, zone_hours
+    """
+    weeks = plan_template.get("weeks", [])
+    week_of_workout = []
+    blocks_list = []
+    for week_index, week in enumerate(weeks):
+        for workout in week.get("workouts", []):
+            week_of_workout.append(week_index)
+            blocks_list.append(workout.get("blocks", ""))
+
+    arrays = WorkoutArrays.from_blocks(blocks_list)
+    seconds = _as_list(arrays.total_duration())
+    tss = _as_list(arrays.tss())
+    zones = _as_list(arrays.time_in_zones())
+
+    summary = [{
+        "week_number": week.get("week_number", index + 1),
+        "volume_percent": week.get("volume_percent"),
+        "workouts": 0,
+        "hours": 0.0,
+        "tss": 0.0,
+        "zone_hours": dict.fromkeys(ZONE_NAMES, 0.0)
+    } for index, week in enumerate(weeks)]
+    for week_index, workout_seconds, workout_tss, workout_zones in zip(week_of_workout, seconds, tss, zones):
+        entry = summary[week_index]
+        entry["workouts"] += 1
+        entry["hours"] += workout_seconds / 3600
+        entry["tss"] += workout_tss
+        for name, zone_seconds in zip(ZONE_NAMES, workout_zones):
+            entry["zone_hours"][name] += zone_seconds / 3600
+
+    for entry in summary:
+        entry["hours"] = round(entry["hours"], 2)
+        entry["tss"] = round(entry["tss"], 1)
+        entry["zone_hours"] = {name: round(hours, 2) for name, hours in entry["zone_hours"].items()}
+    return summary
+
+
+def check_volume_percent(plan_template, tolerance=20):
+    """
+    Compare each week's volume_percent with its actual ride time
+
+    Both are normalized to the plan's biggest week, so volume_percent=60
+    should mean roughly 60% of the peak week's hours.
+
+    Returns:
+        list of issue strings (empty if every week is within tolerance
+        percentage points)
+    """
+    summary = [entry for entry in weekly_summary(plan_template) if entry["volume_percent"]]
+    if not summary:
+        return []
+    peak_hours = max(entry["hours"] for entry in summary)
+    peak_percent = max(entry["volume_percent"] for entry in summary)
+    if not peak_hours:
+        return []
+
+    issues = []
+    for entry in summary:
+        expected = entry["volume_percent"] / peak_percent * 100
+        actual = entry["hours"] / peak_hours * 100
+        if abs(actual - expected) > tolerance:
+            issues.append(f"Week {entry['week_number']}: volume_percent {entry['volume_percent']} "
+                          f"({expected:.0f}% of peak) but {entry['hours']}h is {actual:.0f}% of peak")
+    return issues
+
+
+def main():
+    import json
+
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+
+    exit_code = 0
+    for template_path in sys.argv[1:]:
+        with open(template_path, 'r') as f:
+            plan_template = json.load(f)
+        print(f"\n{template_path}")
+        print(f"  {'Week':>4}  {'Vol%':>4}  {'Hours':>6}  {'TSS':>6}  {'Z1-Z2 h':>7}  {'Z3+ h':>6}")
+        for entry in weekly_summary(plan_template):
+            easy = entry["zone_hours"]["recovery"] + entry["zone_hours"]["endurance"]
+            hard = sum(entry["zone_hours"].values()) - easy
+            print(f"  {entry['week_number']:>4}  {entry['volume_percent'] or '-':>4}  {entry['hours']:>6.2f}  "
+                  f"{entry['tss']:>6.1f}  {easy:>7.2f}  {hard:>6.2f}")
+        issues = check_volume_percent(plan_template)
+        if issues:
+            exit_code = 1
+            print(f"  ⚠️  {len(issues)} week(s) off their volume_percent:")
+            for issue in issues:
+                print(f"     {issue}")
+        else:
+            print("  ✓ Weekly ride time matches volume_percent")
+    sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    main()
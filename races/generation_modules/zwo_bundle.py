@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+ZWO Bundles
+One archive per plan instead of one loose .zwo file per workout.
+
+While a workouts directory is being bundled (see bundle_directory), every
+write_workout_file() aimed at it is buffered in memory; on exit the whole
+plan is written in one go as <plan>/workouts.zip (or .tar) next to a
+manifest mapping each standardized filename to its size, SHA-256 and
+location: header_offset (the zip local file header) for zip bundles,
+data_offset (the first byte of the uncompressed member) for tar bundles.
+The manifest is also stored inside the archive as manifest.json.
+
+Without an active bundle, write_workout_file() writes the loose file as
+before.
+
+Usage:
+    python zwo_bundle.py list "Unbound Gravel 200/5. Finisher .../workouts.zip"
+    python zwo_bundle.py extract <bundle> <dest_dir> [filename ...]
+"""
+
+import hashlib
+import io
+import json
+import os
+import sys
+import tarfile
+import zipfile
+from contextlib import contextmanager
+from pathlib import Path
+
+BUNDLE_FORMATS = ("zip", "tar")
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+
+# Workouts directories whose writes are redirected: absolute path -> sink
+# (anything with add(filename, content), e.g. BundleWriter)
+_active_sinks = {}
+
+
+def manifest_path_for(bundle_path):
+    """Sidecar manifest path: workouts.zip -> workouts.manifest.json"""
+    bundle_path = Path(bundle_path)
+    return bundle_path.with_name(bundle_path.stem + ".manifest.json")
+
+# ============================================================================
+# WRITING
+# ============================================================================
+
+class BundleWriter:
+    """
+    Buffers workout files and writes them as a single zip or tar archive
+
+    Zip members are deflated; tar is left uncompressed so each member's
+    data can be read straight from its manifest data_offset.
+    """
+
+    def __init__(self, bundle_path, fmt="zip"):
+        if fmt not in BUNDLE_FORMATS:
+            raise ValueError(f"Unknown bundle format: {fmt} (expected one of {', '.join(BUNDLE_FORMATS)})")
+        self.bundle_path = Path(bundle_path)
+        self.fmt = fmt
+        self.files = {}
+
+    def add(self, filename, content):
+        """Buffer one file (str content is UTF-8 encoded); later adds replace earlier ones"""
+        if isinstance(content, str):
+            content = content.encode("utf-8")
+        self.files[filename] = content
+
+    def _write_zip(self, tmp_path, entries):
+        with zipfile.ZipFile(tmp_path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+            for filename in entries:
+                info = zipfile.ZipInfo(filename, date_time=(1980, 1, 1, 0, 0, 0))
+                info.compress_type = zipfile.ZIP_DEFLATED
+                info.external_attr = 0o644 << 16
+                archive.writestr(info, self.files[filename])
+                entries[filename]["header_offset"] = info.header_offset
+            archive.writestr(MANIFEST_NAME, json.dumps(self._manifest(entries), indent=2))
+
+    def _write_tar(self, tmp_path, entries):
+        with tarfile.open(tmp_path, "w", format=tarfile.PAX_FORMAT) as archive:
+            for filename in entries:
+                content = self.files[filename]
+                info = tarfile.TarInfo(filename)
+                info.size = len(content)
+                info.mode = 0o644
+                archive.addfile(info, io.BytesIO(content))
+                # Data ends the member, padded to the tar block size
+                padded = -(-len(content) // tarfile.BLOCKSIZE) * tarfile.BLOCKSIZE
+                entries[filename]["data_offset"] = archive.offset - padded
+            manifest = json.dumps(self._manifest(entries), indent=2).encode("utf-8")
+            info = tarfile.TarInfo(MANIFEST_NAME)
+            info.size = len(manifest)
+            archive.addfile(info, io.BytesIO(manifest))
+
+    def _manifest(self, entries):
+        return {
+            "version": MANIFEST_VERSION,
+            "format": self.fmt,
+            "workouts": entries
+        }
+
+    def close(self):
+        """
+        Write the archive and sidecar manifest (atomically).
+
+        Returns:
+            dict: The manifest
+        """
+        entries = {
+            filename: {"size": len(content), "sha256": hashlib.sha256(content).hexdigest()}
+            for filename, content in sorted(self.files.items())
+        }
+
+        self.bundle_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.bundle_path.with_name(f".{self.bundle_path.name}.{os.getpid()}.tmp")
+        if self.fmt == "zip":
+            self._write_zip(tmp_path, entries)
+        else:
+            self._write_tar(tmp_path, entries)
+        os.replace(tmp_path, self.bundle_path)
+
+        manifest = self._manifest(entries)
+        sidecar = manifest_path_for(self.bundle_path)
+        tmp_sidecar = sidecar.with_name(f".{sidecar.name}.{os.getpid()}.tmp")
+        with open(tmp_sidecar, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_sidecar, sidecar)
+        return manifest
+
+
+@contextmanager
+def redirect_workouts(workouts_dir, sink):
+    """Route write_workout_file() calls for workouts_dir to sink.add(filename, content)"""
+    key = os.path.abspath(workouts_dir)
+    _active_sinks[key] = sink
+    try:
+        yield sink
+    finally:
+        del _active_sinks[key]
+
+
+@contextmanager
+def bundle_directory(workouts_dir, fmt="zip"):
+    """
+    Bundle every workout written to workouts_dir inside the block.
+
+    The archive is written next to the directory (workouts/ ->
+    workouts.zip) on normal exit; the directory itself is removed if it
+    was left empty. Nothing is written if the block raises.
+    """
+    workouts_dir = Path(workouts_dir)
+    writer = BundleWriter(workouts_dir.with_name(f"{workouts_dir.name}.{fmt}"), fmt)
+    with redirect_workouts(workouts_dir, writer):
+        yield writer
+    writer.close()
+    try:
+        workouts_dir.rmdir()
+    except OSError:
+        pass  # Missing, or holds files written outside the bundle
+
+
+def write_workout_file(output_path, content):
+    """Write a workout file, or hand it to the sink its directory is redirected to"""
+    output_path = Path(output_path)
+    sink = _active_sinks.get(os.path.abspath(output_path.parent)) if _active_sinks else None
+    if sink is not None:
+        sink.add(output_path.name, content)
+        return
+    os.makedirs(output_path.parent, exist_ok=True)
+    # Replace rather than rewrite: output_path may be a hardlink to a
+    # shared store object (zwo_store.py --dedup hardlink)
+    tmp_path = output_path.with_name(f".{output_path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    os.replace(tmp_path, output_path)
+
+# ============================================================================
+# READING
+# ============================================================================
+
+class ZWOBundle:
+    """
+    Read-only access to a workout bundle
+
+    Uses the sidecar manifest when present (falls back to the embedded
+    one). Tar members are read directly at their manifest data_offset.
+    """
+
+    def __init__(self, bundle_path):
+        self.bundle_path = Path(bundle_path)
+        self.fmt = "tar" if self.bundle_path.suffix == ".tar" else "zip"
+        self._zip = zipfile.ZipFile(self.bundle_path) if self.fmt == "zip" else None
+        self._file = open(self.bundle_path, "rb") if self.fmt == "tar" else None
+        self.manifest = self._load_manifest()
+        self.workouts = self.manifest["workouts"]
+
+    def _load_manifest(self):
+        sidecar = manifest_path_for(self.bundle_path)
+        if sidecar.exists():
+            with open(sidecar, "r", encoding="utf-8") as f:
+                return json.load(f)
+        if self._zip is not None:
+            return json.loads(self._zip.read(MANIFEST_NAME))
+        with tarfile.open(fileobj=self._file) as archive:
+            return json.load(archive.extractfile(MANIFEST_NAME))
+
+    def close(self):
+        if self._zip is not None:
+            self._zip.close()
+        if self._file is not None:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def names(self):
+        """Standardized workout filenames in the bundle"""
+        return list(self.workouts)
+
+    def read(self, filename, verify=True):
+        """
+        Raw bytes of one workout.
+
+        Raises:
+            KeyError: filename isn't in the bundle
+            ValueError: content doesn't match the manifest hash
+        """
+        entry = self.workouts[filename]
+        if self._zip is not None:
+            content = self._zip.read(filename)
+        else:
+            self._file.seek(entry["data_offset"])
+            content = self._file.read(entry["size"])
+        if verify and hashlib.sha256(content).hexdigest() != entry["sha256"]:
+            raise ValueError(f"{filename}: content does not match manifest hash")
+        return content
+
+    def read_text(self, filename):
+        return self.read(filename).decode("utf-8")
+
+    def iter_workouts(self, names=None):
+        """Yield (filename, bytes) one workout at a time, e.g. for upload"""
+        for filename in names or self.names():
+            yield filename, self.read(filename)
+
+    def extract(self, dest_dir, names=None):
+        """Extract workouts as loose .zwo files; returns the written paths"""
+        dest_dir = Path(dest_dir)
+        dest_dir.mkdir(parents=True, exist_ok=True)
+        written = []
+        for filename, content in self.iter_workouts(names):
+            path = dest_dir / Path(filename).name
+            with open(path, "wb") as f:
+                f.write(content)
+            written.append(path)
+        return written
+
+
+def main():
+    if len(sys.argv) < 3 or sys.argv[1] not in ("list", "extract"):
+        print(__doc__)
+        sys.exit(1)
+
+    with ZWOBundle(sys.argv[2]) as bundle:
+        if sys.argv[1] == "list":
+            for filename, entry in bundle.workouts.items():
+                print(f"{entry['size']:>8}  {entry['sha256'][:12]}  {filename}")
+            print(f"\n{len(bundle.workouts)} workouts")
+        else:
+            if len(sys.argv) < 4:
+                print("Usage: python zwo_bundle.py extract <bundle> <dest_dir> [filename ...]")
+                sys.exit(1)
+            written = bundle.extract(sys.argv[3], sys.argv[4:] or None)
+            print(f"✓ Extracted {len(written)} workouts to {sys.argv[3]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -11,6 +11,8 @@ import html
 import re
 from pathlib import Path
 
+from zwo_bundle import write_workout_file
+
 # Import the FULL Nate workout generator (generates blocks + descriptions)
 try:
     from nate_workout_generator import (
@@ -18,6 +20,7 @@ try:
         generate_nate_zwo,
         select_archetype_for_workout,
         calculate_level_from_week,
+        get_synthesis_cache,
         TRAINING_METHODOLOGIES,
         NEW_ARCHETYPES
     )
@@ -653,13 +656,19 @@ def create_zwo_file(workout, output_path, race_data, plan_info):
         blocks=blocks
     )
 
-    # Write file
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write(zwo_content)
+    # Write file (buffered instead if the plan's workouts are being bundled)
+    write_workout_file(output_path, zwo_content)
 
     return True
 
+def with_week_number(workout, week_num):
+    """Workout with week_number set; only copies if it differs"""
+    if workout.get("week_number") == week_num:
+        return workout
+    workout_copy = dict(workout)
+    workout_copy["week_number"] = week_num
+    return workout_copy
+
 def generate_all_zwo_files(plan_template, race_data, plan_info, output_dir):
     """Generate all ZWO files for a plan"""
     workouts_dir = Path(output_dir) / "workouts"
@@ -676,9 +685,8 @@ def generate_all_zwo_files(plan_template, race_data, plan_info, output_dir):
             # This week has block options - generate all blocks
             for block_name, block_workouts in week_data["workouts_by_block"].items():
                 for workout in block_workouts:
-                    # Create a copy to avoid modifying original
-                    workout_copy = workout.copy()
-                    workout_copy["week_number"] = week_num
+                    # Overlay week number (template workouts are shared, never modified)
+                    workout_copy = with_week_number(workout, week_num)
                     
                     # Use standardized filename for drag-and-drop compatibility
                     filename = generate_standardized_filename(
@@ -698,9 +706,8 @@ def generate_all_zwo_files(plan_template, race_data, plan_info, output_dir):
         elif "workouts" in week_data:
             # Regular week without blocks
             for workout in week_data["workouts"]:
-                # Create a copy to avoid modifying original
-                workout_copy = workout.copy()
-                workout_copy["week_number"] = week_num
+                # Overlay week number (template workouts are shared, never modified)
+                workout_copy = with_week_number(workout, week_num)
                 
                 # Use standardized filename for drag-and-drop compatibility
                 filename = generate_standardized_filename(
@@ -714,6 +721,10 @@ def generate_all_zwo_files(plan_template, race_data, plan_info, output_dir):
                 create_zwo_file(workout_copy, output_path, race_data, plan_info)
                 total_workouts += 1
     
+    # Persist newly synthesized Nate workouts (no-op without an on-disk store)
+    if NATE_GENERATOR_AVAILABLE:
+        get_synthesis_cache().save()
+    
     return total_workouts
 
 def estimate_race_time_hours(race_data, tier_key, level_key):
@@ -931,8 +942,7 @@ Good luck! You've got this. 🚴"""
         blocks=blocks
     )
     
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write(zwo_content)
+    write_workout_file(output_path, zwo_content)
     
     return output_path
 
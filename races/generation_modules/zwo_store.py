@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+ZWO Object Store
+Content-addressed storage for workout files shared across plans.
+
+Standardized filenames mean the same workout often has byte-identical ZWO
+content in many plan folders. With a store, each distinct file is written
+once to <race folder>/.zwo_objects/<sha[:2]>/<sha>.zwo and plan folders
+are populated either by:
+
+- hardlink: workouts/*.zwo are hardlinks to the stored object (falls back
+  to a plain copy where the filesystem can't link)
+- manifest: no loose files; workouts.objects.json maps each filename to
+  its object hash (materialize() writes loose copies when needed)
+
+Usage:
+    python zwo_store.py stats "Unbound Gravel 200"
+    python zwo_store.py prune "Unbound Gravel 200"
+    python zwo_store.py materialize "Unbound Gravel 200/5. Finisher .../workouts" [dest_dir]
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import sys
+from contextlib import contextmanager
+from pathlib import Path
+
+from zwo_bundle import redirect_workouts
+
+OBJECTS_DIRNAME = ".zwo_objects"
+OBJECTS_MANIFEST_SUFFIX = ".objects.json"
+DEDUP_MODES = ("hardlink", "manifest")
+
+
+def objects_manifest_for(workouts_dir):
+    """workouts/ -> workouts.objects.json"""
+    workouts_dir = Path(workouts_dir)
+    return workouts_dir.with_name(workouts_dir.name + OBJECTS_MANIFEST_SUFFIX)
+
+
+def _atomic_write(path, content):
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+
+class ObjectStore:
+    """hash -> bytes store rooted at <root>/.zwo_objects"""
+
+    def __init__(self, root):
+        self.path = Path(root) / OBJECTS_DIRNAME
+        self.written = 0
+        self.reused = 0
+
+    def object_path(self, digest):
+        return self.path / digest[:2] / f"{digest}.zwo"
+
+    def put(self, content):
+        """
+        Store content (bytes) if it isn't stored yet.
+
+        Safe across worker processes: objects are written to a temp file and
+        linked into place only if absent, so an object's inode never changes
+        once plan folders link to it. Objects are never written in place
+        (nor are the workout files linked to them, see write_workout_file),
+        so an existing object is trusted to match its name.
+
+        Returns:
+            str: SHA-256 hex digest
+        """
+        digest = hashlib.sha256(content).hexdigest()
+        object_path = self.object_path(digest)
+        if object_path.exists():
+            self.reused += 1
+            return digest
+
+        object_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = object_path.with_name(f".{object_path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(content)
+        try:
+            os.link(tmp_path, object_path)
+            self.written += 1
+        except FileExistsError:
+            self.reused += 1  # Another worker stored it first
+        except OSError:
+            os.replace(tmp_path, object_path)  # No hardlink support: plain rename
+            self.written += 1
+        finally:
+            if tmp_path.exists():
+                os.unlink(tmp_path)
+        return digest
+
+    def get(self, digest):
+        with open(self.object_path(digest), "rb") as f:
+            return f.read()
+
+
+def link_or_copy(object_path, output_path):
+    """
+    Point output_path at object_path with a hardlink (copy if linking fails).
+
+    Returns:
+        bool: True if output_path is a hardlink to the object
+    """
+    try:
+        if os.path.samefile(object_path, output_path):
+            return True  # Unchanged since the last run
+    except OSError:
+        pass
+    tmp_path = output_path.with_name(f".{output_path.name}.{os.getpid()}.tmp")
+    try:
+        os.link(object_path, tmp_path)
+        linked = True
+    except OSError:
+        with open(object_path, "rb") as f:
+            content = f.read()
+        with open(tmp_path, "wb") as f:
+            f.write(content)
+        linked = False
+    os.replace(tmp_path, output_path)
+    return linked
+
+
+class StoreWriter:
+    """write_workout_file() sink that routes one workouts directory through a store"""
+
+    def __init__(self, store, workouts_dir, mode="hardlink"):
+        if mode not in DEDUP_MODES:
+            raise ValueError(f"Unknown dedup mode: {mode} (expected one of {', '.join(DEDUP_MODES)})")
+        self.store = store
+        self.workouts_dir = Path(workouts_dir)
+        self.mode = mode
+        self.entries = {}
+
+    def add(self, filename, content):
+        if isinstance(content, str):
+            content = content.encode("utf-8")
+        digest = self.store.put(content)
+        self.entries[filename] = {"sha256": digest, "size": len(content)}
+        if self.mode == "hardlink":
+            self.workouts_dir.mkdir(parents=True, exist_ok=True)
+            link_or_copy(self.store.object_path(digest), self.workouts_dir / filename)
+
+    def close(self):
+        if self.mode != "manifest":
+            return
+        manifest = {
+            "store": os.path.relpath(self.store.path, self.workouts_dir.parent),
+            "workouts": dict(sorted(self.entries.items()))
+        }
+        self.workouts_dir.parent.mkdir(parents=True, exist_ok=True)
+        _atomic_write(objects_manifest_for(self.workouts_dir),
+                      json.dumps(manifest, indent=2).encode("utf-8"))
+        try:
+            self.workouts_dir.rmdir()
+        except OSError:
+            pass  # Missing, or holds files written outside the store
+
+
+@contextmanager
+def dedup_directory(workouts_dir, store_root, mode="hardlink"):
+    """
+    Route every workout written to workouts_dir inside the block through
+    the object store at store_root (typically the race folder).
+    """
+    writer = StoreWriter(ObjectStore(store_root), workouts_dir, mode)
+    with redirect_workouts(workouts_dir, writer):
+        yield writer
+    writer.close()
+
+
+def materialize(workouts_dir, dest_dir=None):
+    """
+    Write loose .zwo copies for a manifest-mode workouts directory.
+
+    Returns:
+        list: Paths written
+    """
+    workouts_dir = Path(workouts_dir)
+    manifest_path = objects_manifest_for(workouts_dir)
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    store = ObjectStore(Path(manifest_path.parent / manifest["store"]).parent)
+    dest_dir = Path(dest_dir or workouts_dir)
+    dest_dir.mkdir(parents=True, exist_ok=True)
+    written = []
+    for filename, entry in manifest["workouts"].items():
+        path = dest_dir / filename
+        with open(path, "wb") as f:
+            f.write(store.get(entry["sha256"]))
+        written.append(path)
+    return written
+
+
+def prune_store(race_folder):
+    """
+    Delete objects no plan references any more (run after a full generation).
+
+    An object is referenced when an objects manifest lists its hash or a
+    workout file is hardlinked to it (link count above 1). Copies made where
+    hardlinks aren't supported don't need the object.
+
+    Returns:
+        dict: objects, bytes removed
+    """
+    race_folder = Path(race_folder)
+    store = ObjectStore(race_folder)
+    referenced = set()
+    for manifest_path in race_folder.glob(f"*/*{OBJECTS_MANIFEST_SUFFIX}"):
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        referenced.update(entry["sha256"] for entry in manifest["workouts"].values())
+
+    removed = {"objects": 0, "bytes": 0}
+    if not store.path.exists():
+        return removed
+    for object_path in store.path.glob("*/*.zwo"):
+        stat = object_path.stat()
+        if object_path.stem in referenced or stat.st_nlink > 1:
+            continue
+        object_path.unlink()
+        removed["objects"] += 1
+        removed["bytes"] += stat.st_size
+    for fanout_dir in store.path.iterdir():
+        try:
+            fanout_dir.rmdir()
+        except OSError:
+            pass  # Still holds objects
+    return removed
+
+
+def remove_unused_store(race_folder):
+    """
+    Delete the race folder's object store once no objects manifest uses it.
+
+    Hardlinked workout files keep their own link to the data, so only
+    manifest-mode plans need the store to stay around.
+
+    Returns:
+        bool: True if a store was removed
+    """
+    race_folder = Path(race_folder)
+    store = ObjectStore(race_folder)
+    if not store.path.exists() or any(race_folder.glob(f"*/*{OBJECTS_MANIFEST_SUFFIX}")):
+        return False
+    shutil.rmtree(store.path)
+    return True
+
+
+def store_stats(race_folder):
+    """
+    Dedup report for a race folder.
+
+    Logical bytes count every plan's workouts (loose files and manifest
+    entries); stored bytes count each distinct inode once (objects plus
+    any loose files that aren't linked to an object).
+
+    Returns:
+        dict: files, logical_bytes, objects, stored_bytes, dedup_ratio
+    """
+    race_folder = Path(race_folder)
+    store = ObjectStore(race_folder)
+    files = 0
+    logical_bytes = 0
+    inodes = {}
+
+    for workout_path in race_folder.glob("*/workouts/*.zwo"):
+        stat = workout_path.stat()
+        files += 1
+        logical_bytes += stat.st_size
+        inodes[(stat.st_dev, stat.st_ino)] = stat.st_size
+
+    for manifest_path in race_folder.glob(f"*/*{OBJECTS_MANIFEST_SUFFIX}"):
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        for entry in manifest["workouts"].values():
+            files += 1
+            logical_bytes += entry["size"]
+
+    objects = 0
+    if store.path.exists():
+        for object_path in store.path.glob("*/*.zwo"):
+            stat = object_path.stat()
+            objects += 1
+            inodes[(stat.st_dev, stat.st_ino)] = stat.st_size
+
+    stored_bytes = sum(inodes.values())
+    return {
+        "files": files,
+        "logical_bytes": logical_bytes,
+        "objects": objects,
+        "stored_bytes": stored_bytes,
+        "dedup_ratio": round(logical_bytes / stored_bytes, 2) if stored_bytes else 1.0
+    }
+
+
+def print_store_stats(race_folder):
+    stats = store_stats(race_folder)
+    print(f"   Workout store: {stats['files']} files → {stats['objects']} objects, "
+          f"{stats['logical_bytes'] / 1e6:.1f} MB → {stats['stored_bytes'] / 1e6:.1f} MB "
+          f"(dedup ratio {stats['dedup_ratio']}x)")
+    return stats
+
+
+def main():
+    if len(sys.argv) < 3 or sys.argv[1] not in ("stats", "prune", "materialize"):
+        print(__doc__)
+        sys.exit(1)
+
+    if sys.argv[1] == "stats":
+        print(json.dumps(store_stats(sys.argv[2]), indent=2))
+    elif sys.argv[1] == "prune":
+        removed = prune_store(sys.argv[2])
+        print(f"✓ Removed {removed['objects']} unreferenced objects ({removed['bytes'] / 1e6:.1f} MB)")
+    else:
+        written = materialize(sys.argv[2], sys.argv[3] if len(sys.argv) > 3 else None)
+        print(f"✓ Wrote {len(written)} workouts")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Archetype Store Tests
+=====================
+
+Tests for the compiled archetype store: round trip against new_archetypes.py,
+lazy per-archetype decoding and rebuilds when the source changes.
+"""
+
+import sys
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'generation_modules'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'nate_archetypes'))
+
+import unittest
+import new_archetypes
+from archetype_store import SOURCE_PATH, NEW_ARCHETYPES, load_store, source_stamp
+from nate_workout_generator import get_archetype_by_category_and_index, select_archetype_for_workout
+
+
+class TestArchetypeStore(unittest.TestCase):
+    """Test the compiled store against the source library."""
+
+    def test_round_trip(self):
+        """Every archetype should decode to the source literal (tuples included)."""
+        self.assertEqual(list(NEW_ARCHETYPES), list(new_archetypes.NEW_ARCHETYPES))
+        for category, archetypes in new_archetypes.NEW_ARCHETYPES.items():
+            self.assertEqual(NEW_ARCHETYPES[category], archetypes)
+        self.assertIsInstance(NEW_ARCHETYPES['VO2max'][0]['levels']['1']['intervals'], tuple)
+
+    def test_selection_uses_store(self):
+        """Selection helpers should return the store's cached archetypes."""
+        archetype = get_archetype_by_category_and_index('VO2max', 1)
+        self.assertIs(archetype, NEW_ARCHETYPES['VO2max'][1])
+        self.assertIs(get_archetype_by_category_and_index('VO2max', 99), NEW_ARCHETYPES['VO2max'][0])
+        self.assertEqual(select_archetype_for_workout('vo2max', 'POLARIZED')['name'], '5x3 VO2 Classic')
+
+
+class TestStoreFile(unittest.TestCase):
+    """Test lazy decoding and staleness of the store file."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.source = Path(self.tmpdir.name) / "new_archetypes.py"
+        shutil.copy(SOURCE_PATH, self.source)
+        self.store_path = Path(self.tmpdir.name) / "new_archetypes.archetypes"
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_decodes_on_first_access(self):
+        load_store(self.source, self.store_path)
+        store = load_store(self.source, self.store_path)
+        self.assertEqual(store.count(), 41)
+        self.assertEqual(store._decoded, {})
+
+        archetype = store.find('TT_Threshold', 'Threshold Ramps')
+        self.assertEqual(archetype['name'], 'Threshold Ramps')
+        self.assertEqual(list(store._decoded), [('TT_Threshold', 1)])
+        self.assertIs(store.archetype('TT_Threshold', -2), archetype)
+
+    def test_rebuilds_when_source_changes(self):
+        load_store(self.source, self.store_path)
+        with open(self.source, 'a', encoding='utf-8') as f:
+            f.write("\nNEW_ARCHETYPES = {'Recovery': RECOVERY_NEW}\n")
+        store = load_store(self.source, self.store_path)
+        self.assertEqual(list(store), ['Recovery'])
+        self.assertEqual(tuple(store.stamp), source_stamp(self.source))
+
+    def test_rebuilds_corrupt_store(self):
+        self.store_path.write_bytes(b"not a store")
+        store = load_store(self.source, self.store_path)
+        self.assertEqual(store.count(), 41)
+        self.assertTrue(self.store_path.read_bytes().startswith(b"GGARCH1"))
+
+
+if __name__ == '__main__':
+    unittest.main()
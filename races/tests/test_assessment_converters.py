@@ -0,0 +1,105 @@
+"""
+Assessment Workout Converter Tests
+==================================
+
+Tests for parse-once FTP and durability test conversion.
+"""
+
+import sys
+import os
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'generation_modules'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import unittest
+from ftp_test_converter import convert_ftp_test, load_ftp_test_blocks
+from durability_test_converter import convert_durability_test, load_durability_test_template
+
+
+FTP_ZWO = """<workout_file><name>FTP</name><workout>
+<FreeRide Duration="720"><textevent timeoffset="0" message="RPE 4"/></FreeRide>
+<FreeRide Duration="300"><textevent timeoffset="0" message="RPE 9"/></FreeRide>
+<FreeRide Duration="300"/>
+</workout></workout_file>
+"""
+
+DURABILITY_ZWO = """<workout_file><name>Durability</name><workout>
+<Warmup Duration="900" PowerLow="0.55" PowerHigh="0.75"/>
+<SteadyState Duration="7200" Power="0.80"/>
+<Cooldown Duration="600" PowerLow="0.50" PowerHigh="0.70"/>
+</workout></workout_file>
+"""
+
+
+class TestAssessmentConverters(unittest.TestCase):
+    """Test cached FTP/durability test conversion."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.ftp_path = os.path.join(self.tmpdir.name, 'ftp.zwo')
+        self.durability_path = os.path.join(self.tmpdir.name, 'durability.zwo')
+        with open(self.ftp_path, 'w') as f:
+            f.write(FTP_ZWO)
+        with open(self.durability_path, 'w') as f:
+            f.write(DURABILITY_ZWO)
+        load_ftp_test_blocks.cache_clear()
+        load_durability_test_template.cache_clear()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_ftp_test_parsed_once(self):
+        """Repeated conversions reuse the parsed blocks and stamp the week."""
+        week1 = convert_ftp_test(self.ftp_path, 1)
+        week7 = convert_ftp_test(self.ftp_path, 7)
+        self.assertEqual(load_ftp_test_blocks.cache_info().misses, 1)
+        self.assertEqual(week1['name'], 'W01 Tue - FTP Test')
+        self.assertEqual(week7['name'], 'W07 Tue - FTP Test')
+        self.assertEqual(week7['week_number'], 7)
+        self.assertEqual(week1['blocks'], week7['blocks'])
+        self.assertIn('<SteadyState Duration="300" Power="1.10" Cadence="88"/>', week1['blocks'])
+
+    def test_returned_workouts_are_independent(self):
+        """Mutating one converted workout must not affect later ones."""
+        first = convert_ftp_test(self.ftp_path, 1)
+        first['name'] = 'changed'
+        self.assertEqual(convert_ftp_test(self.ftp_path, 1)['name'], 'W01 Tue - FTP Test')
+
+    def test_source_edit_invalidates_cache(self):
+        """Editing the source ZWO is picked up on the next conversion."""
+        convert_ftp_test(self.ftp_path, 1)
+        with open(self.ftp_path, 'w') as f:
+            f.write(FTP_ZWO.replace('Duration="720"', 'Duration="600"'))
+        os.utime(self.ftp_path, ns=(time.time_ns(), time.time_ns() + 1_000_000_000))
+        self.assertIn('Duration="600"', convert_ftp_test(self.ftp_path, 1)['blocks'])
+
+    def test_missing_source_returns_none(self):
+        """Missing files still convert to None."""
+        self.assertIsNone(convert_ftp_test(os.path.join(self.tmpdir.name, 'missing.zwo'), 1))
+
+    def test_durability_test_parsed_once(self):
+        """Durability conversions reuse the parsed template per file."""
+        week7 = convert_durability_test(self.durability_path, 7, 'Durability Test - Metabolism 1')
+        week19 = convert_durability_test(self.durability_path, 19, 'Durability Test - Metabolism 3')
+        self.assertEqual(load_durability_test_template.cache_info().misses, 1)
+        self.assertEqual(week7['name'], 'W07 - Durability Test - Metabolism 1')
+        self.assertEqual(week19['name'], 'W19 - Durability Test - Metabolism 3')
+        self.assertEqual(week7['duration_hours'], 2.0)
+        self.assertIn('2 hours @ 0.80 FTP', week7['description'])
+
+
+class TestEstimateBlocksDuration(unittest.TestCase):
+    """Test cached workout duration estimates."""
+
+    def test_sums_durations(self):
+        from generate_expanded_race_plans import estimate_blocks_duration
+        blocks = '<Warmup Duration="600"/>\n<SteadyState Duration="1200" Power="0.7"/>\n'
+        self.assertEqual(estimate_blocks_duration(blocks), 1800)
+        self.assertEqual(estimate_blocks_duration(''), 0)
+        self.assertEqual(estimate_blocks_duration('<FreeRide/>'), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+"""
+Build Graph Tests
+=================
+
+Tests for incremental regeneration: race data read tracking, staleness
+reasons and the per-race build manifest.
+"""
+
+import sys
+import os
+import copy
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'generation_modules'))
+
+import unittest
+from build_graph import BuildGraph, TrackedDict, fingerprint
+
+
+RACE_DATA = {
+    "race_metadata": {"name": "Test Race", "distance_miles": 200},
+    "race_specific": {
+        "wind_protocol": {"solo_tactics": "Tuck in."},
+        "surface": {"type": "Flint"}
+    },
+    "non_negotiables": ["Finish"]
+}
+
+
+class TestTrackedDict(unittest.TestCase):
+    """Test race data read recording."""
+
+    def test_records_key_paths(self):
+        paths = set()
+        data = TrackedDict(RACE_DATA, paths)
+        self.assertEqual(data["race_metadata"]["name"], "Test Race")
+        data.get("race_specific", {}).get("wind_protocol")
+        self.assertEqual(paths, {("race_metadata", "name"), ("race_specific", "wind_protocol")})
+
+    def test_records_misses(self):
+        paths = set()
+        data = TrackedDict(RACE_DATA, paths)
+        self.assertIsNone(data.get("guide_variables"))
+        self.assertNotIn("tier_overrides", data)
+        self.assertEqual(paths, {("guide_variables",), ("tier_overrides",)})
+
+    def test_whole_node_access(self):
+        paths = set()
+        data = TrackedDict(RACE_DATA, paths)
+        list(data["race_specific"].items())
+        self.assertEqual(paths, {("race_specific",)})
+        self.assertEqual(copy.deepcopy(data), RACE_DATA)
+        self.assertIn((), paths)
+
+    def test_truth_test_not_recorded(self):
+        paths = set()
+        self.assertTrue(TrackedDict(RACE_DATA, paths))
+        self.assertEqual(paths, set())
+
+
+class TestBuildGraph(unittest.TestCase):
+    """Test staleness decisions and the build manifest."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.race_folder = Path(self.tmpdir.name)
+        self.guide = self.race_folder / "guide.html"
+        self.inputs = {"code": fingerprint("v1")}
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _build(self, race_data, inputs=None, force=False):
+        """Run one guide step; returns its reasons (None if it was up to date)"""
+        graph = BuildGraph(self.race_folder, force=force)
+        step = graph.step("plan/guide", inputs or self.inputs, race_data, [self.guide])
+        if not step.stale:
+            return None
+        data = step.track(race_data)
+        self.guide.write_text(data["race_specific"]["wind_protocol"]["solo_tactics"])
+        step.finish()
+        graph.save()
+        return step.reasons
+
+    def test_rerun_is_up_to_date(self):
+        self.assertEqual(self._build(RACE_DATA), ["never built"])
+        self.assertIsNone(self._build(RACE_DATA))
+        self.assertEqual(self._build(RACE_DATA, force=True), ["forced"])
+
+    def test_only_read_paths_invalidate(self):
+        self._build(RACE_DATA)
+        unread = copy.deepcopy(RACE_DATA)
+        unread["race_specific"]["surface"]["type"] = "Gravel"
+        self.assertIsNone(self._build(unread))
+
+        edited = copy.deepcopy(RACE_DATA)
+        edited["race_specific"]["wind_protocol"]["solo_tactics"] = "Pull through."
+        self.assertEqual(self._build(edited), ["race data changed: race_specific.wind_protocol"])
+
+    def test_input_change_and_missing_output(self):
+        self._build(RACE_DATA)
+        self.assertEqual(self._build(RACE_DATA, {"code": fingerprint("v2")}), ["code changed"])
+        self.guide.unlink()
+        self.assertEqual(self._build(RACE_DATA, {"code": fingerprint("v2")}), ["output missing: guide.html"])
+
+    def test_disabled_graph(self):
+        graph = BuildGraph(None)
+        step = graph.step("plan/guide", self.inputs, RACE_DATA)
+        self.assertTrue(step.stale)
+        step.finish()
+        graph.save()
+        self.assertEqual(graph.records, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+"""
+Compiled Guide Template Tests
+=============================
+
+Tests for the single-pass placeholder and conditional-section renderer.
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'generation_modules'))
+
+import unittest
+
+try:
+    from guide_generator import CompiledTemplate
+    GUIDE_GENERATOR_AVAILABLE = True
+except ImportError:
+    GUIDE_GENERATOR_AVAILABLE = False
+
+
+TEMPLATE = (
+    '<a href="#section-14-women-specific-considerations">14 · Women-Specific Considerations</a>\n'
+    '<!-- START MASTERS SECTION TOC -->TOC {{RACE_NAME}}<!-- END MASTERS SECTION TOC -->\n'
+    '<h1>{{RACE_NAME}}</h1>\n'
+    '<!-- START ALTITUDE SECTION - ONLY SHOW IF RACE_ELEVATION >= 3000 -->High<!-- END ALTITUDE SECTION -->\n'
+    '<!-- START ALTITUDE SECTION - REMOVE IF {{RACE_ELEVATION}} < 5000 -->Detail<!-- END ALTITUDE SECTION -->\n'
+    '<!-- START MASTERS SECTION -->Masters {{UNKNOWN}}<!-- END MASTERS SECTION -->\n'
+    '<p id="section-15-faq">{{plan_weeks}}</p>'
+)
+
+
+@unittest.skipUnless(GUIDE_GENERATOR_AVAILABLE, "markdown not installed")
+class TestCompiledTemplate(unittest.TestCase):
+    """Test CompiledTemplate rendering."""
+
+    def setUp(self):
+        self.template = CompiledTemplate(TEMPLATE)
+        self.values = {'{{RACE_NAME}}': 'Unbound', '{{plan_weeks}}': '12'}
+
+    def test_masters_render(self):
+        """Masters plans keep their sections and original numbering."""
+        output, unreplaced = self.template.render(
+            self.values, sections={'masters': True, 'altitude': True}, masters=True)
+        self.assertIn('TOC Unbound', output)
+        self.assertIn('Masters {{UNKNOWN}}', output)
+        self.assertIn('section-14-women-specific-considerations', output)
+        self.assertIn('High', output)
+        self.assertNotIn('Detail', output)
+        self.assertEqual(unreplaced, ['{{UNKNOWN}}'])
+
+    def test_non_masters_render(self):
+        """Non-Masters plans drop Masters sections and renumber the rest."""
+        output, unreplaced = self.template.render(
+            self.values, sections={'masters': False, 'altitude': False}, masters=False)
+        self.assertNotIn('MASTERS', output)
+        self.assertNotIn('High', output)
+        self.assertIn('13 · Women-Specific Considerations', output)
+        self.assertIn('href="#section-13-women-specific-considerations"', output)
+        self.assertIn('id="section-14-faq">12</p>', output)
+        self.assertEqual(unreplaced, [])
+
+    def test_placeholders_collected(self):
+        """All placeholders in the template are indexed at compile time."""
+        self.assertEqual(
+            self.template.placeholders,
+            {'{{RACE_NAME}}', '{{RACE_ELEVATION}}', '{{UNKNOWN}}', '{{plan_weeks}}'})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,145 @@
+"""
+Plan Catalogue Tests
+====================
+
+Tests for the plan template catalogue: folder/key indexing, lazy parsing,
+immutable shared templates and the pickle snapshot.
+"""
+
+import sys
+import os
+import copy
+import json
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'generation_modules'))
+
+import unittest
+from plan_catalogue import PlanCatalogue, parse_plan_folder_name
+
+
+def write_template(plans_dir, folder_name, name):
+    folder = Path(plans_dir) / folder_name
+    folder.mkdir(parents=True, exist_ok=True)
+    template = {
+        "plan_metadata": {"name": name, "duration_weeks": 12},
+        "weeks": [{"week_number": 1, "workouts": [{"name": "W01_Tue_Intervals"}]}]
+    }
+    with open(folder / "template.json", 'w') as f:
+        json.dump(template, f)
+    return folder / "template.json"
+
+
+class TestPlanCatalogue(unittest.TestCase):
+    """Test plan template indexing and caching."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.plans_dir = Path(self.tmpdir.name) / "plans"
+        self.finisher_path = write_template(self.plans_dir, "5. Finisher Beginner (12 weeks)", "Finisher")
+        write_template(self.plans_dir, "15. Podium Advanced GOAT (12 weeks)", "GOAT")
+        (self.plans_dir / "notes").mkdir()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_parse_plan_folder_name(self):
+        self.assertEqual(parse_plan_folder_name("13. Compete Save My Race (6 weeks)"),
+                         ("compete", "save_my_race", 6))
+        self.assertEqual(parse_plan_folder_name("15. Podium Advanced GOAT (12 weeks)"),
+                         ("podium", "advanced_goat", 12))
+        self.assertIsNone(parse_plan_folder_name("guide_generator.py"))
+
+    def test_index_by_folder_and_key(self):
+        catalogue = PlanCatalogue([self.plans_dir], use_snapshot=False)
+        self.assertEqual(sorted(catalogue.folders()),
+                         ["15. Podium Advanced GOAT (12 weeks)", "5. Finisher Beginner (12 weeks)"])
+        self.assertEqual(catalogue.get_by_key("podium", "advanced_goat", 12)["plan_metadata"]["name"], "GOAT")
+        self.assertIsNone(catalogue.get("Missing Plan"))
+        self.assertIsNone(catalogue.get_by_key("finisher", "masters", 12))
+
+    def test_parsed_lazily_and_shared(self):
+        catalogue = PlanCatalogue([self.plans_dir], use_snapshot=False)
+        self.assertEqual(catalogue.parses, 0)
+        first = catalogue.get("5. Finisher Beginner (12 weeks)")
+        second = catalogue.get("5. Finisher Beginner (12 weeks)")
+        self.assertIs(first, second)
+        self.assertEqual(catalogue.parses, 1)
+
+    def test_templates_are_read_only(self):
+        catalogue = PlanCatalogue([self.plans_dir], use_snapshot=False)
+        template = catalogue.get("5. Finisher Beginner (12 weeks)")
+        with self.assertRaises(TypeError):
+            template["weeks"] = []
+        with self.assertRaises(TypeError):
+            template["weeks"][0]["workouts"].append({})
+        # Still plain JSON to consumers; deepcopy gives a private mutable copy
+        self.assertEqual(json.loads(json.dumps(template))["plan_metadata"]["name"], "Finisher")
+        private = copy.deepcopy(template)
+        private["weeks"][0]["workouts"].append({})
+        self.assertEqual(len(template["weeks"][0]["workouts"]), 1)
+
+    def test_first_plans_dir_wins(self):
+        override_dir = Path(self.tmpdir.name) / "override"
+        write_template(override_dir, "5. Finisher Beginner (12 weeks)", "Override")
+        catalogue = PlanCatalogue([override_dir, self.plans_dir], use_snapshot=False)
+        self.assertEqual(catalogue.get("5. Finisher Beginner (12 weeks)")["plan_metadata"]["name"], "Override")
+        self.assertIn("15. Podium Advanced GOAT (12 weeks)", catalogue.folders())
+
+    def test_snapshot_skips_parsing(self):
+        catalogue = PlanCatalogue([self.plans_dir])
+        catalogue.get("5. Finisher Beginner (12 weeks)")
+        self.assertIsNotNone(catalogue.save_snapshot())
+        self.assertEqual(catalogue.parses, 1)
+
+        warm = PlanCatalogue([self.plans_dir])
+        self.assertEqual(warm.get("5. Finisher Beginner (12 weeks)")["plan_metadata"]["name"], "Finisher")
+        self.assertEqual((warm.parses, warm.snapshot_hits), (0, 1))
+
+    def test_snapshot_stays_lazy(self):
+        catalogue = PlanCatalogue([self.plans_dir])
+        self.assertIsNone(catalogue.save_snapshot())
+        self.assertEqual(catalogue.parses, 0)
+        self.assertFalse(catalogue.snapshot_path.exists())
+
+    def test_snapshot_merges_cold_templates(self):
+        first = PlanCatalogue([self.plans_dir])
+        first.get("5. Finisher Beginner (12 weeks)")
+        first.save_snapshot()
+
+        # A later process uses a different template: both end up snapshotted
+        second = PlanCatalogue([self.plans_dir])
+        second.get("15. Podium Advanced GOAT (12 weeks)")
+        second.save_snapshot()
+        self.assertEqual(second.parses, 1)
+
+        warm = PlanCatalogue([self.plans_dir])
+        warm.get("5. Finisher Beginner (12 weeks)")
+        warm.get("15. Podium Advanced GOAT (12 weeks)")
+        self.assertEqual((warm.parses, warm.snapshot_hits), (0, 2))
+
+    def test_snapshot_invalidated_by_edit(self):
+        catalogue = PlanCatalogue([self.plans_dir])
+        catalogue.get("5. Finisher Beginner (12 weeks)")
+        catalogue.save_snapshot()
+        write_template(self.plans_dir, "5. Finisher Beginner (12 weeks)", "Finisher v2")
+        os.utime(self.finisher_path, ns=(time.time_ns(), time.time_ns() + 1_000_000_000))
+
+        catalogue = PlanCatalogue([self.plans_dir])
+        self.assertEqual(catalogue.get("5. Finisher Beginner (12 weeks)")["plan_metadata"]["name"], "Finisher v2")
+        self.assertEqual(catalogue.parses, 1)
+
+    def test_snapshot_reused_for_touched_file(self):
+        catalogue = PlanCatalogue([self.plans_dir])
+        catalogue.get("5. Finisher Beginner (12 weeks)")
+        catalogue.save_snapshot()
+        os.utime(self.finisher_path, ns=(time.time_ns(), time.time_ns() + 1_000_000_000))
+
+        catalogue = PlanCatalogue([self.plans_dir])
+        catalogue.get("5. Finisher Beginner (12 weeks)")
+        self.assertEqual((catalogue.parses, catalogue.snapshot_hits), (0, 1))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+"""
+Plan Template Overlay Tests
+===========================
+
+Tests for copy-on-write plan template derivation (extension, FTP test
+insertion, variations): base templates are never modified and unchanged
+weeks/workouts are shared rather than copied.
+"""
+
+import sys
+import os
+import json
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'generation_modules'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import unittest
+from generate_expanded_race_plans import (
+    extend_plan_template,
+    create_plan_variation,
+    renumber_workout_name,
+)
+
+
+def make_template():
+    weeks = []
+    for week_num in range(1, 13):
+        weeks.append({
+            "week_number": week_num,
+            "focus": f"Week {week_num}",
+            "volume_percent": 90,
+            "workouts": [
+                {"name": f"W{week_num:02d}_Tue_Intervals", "description": "x" * 2000,
+                 "blocks": '<SteadyState Duration="600"/>', "week_number": week_num},
+                {"name": f"W{week_num:02d}_Sat_Long_Ride", "description": "y" * 2000,
+                 "blocks": '<SteadyState Duration="7200"/>', "week_number": week_num},
+            ]
+        })
+    return {"plan_metadata": {"duration_weeks": 12, "name": "Test"}, "weeks": weeks}
+
+
+class TestPlanOverlays(unittest.TestCase):
+    """Test copy-on-write template derivation."""
+
+    def setUp(self):
+        self.base = make_template()
+        self.snapshot = json.dumps(self.base, sort_keys=True)
+
+    def test_extend_does_not_modify_base(self):
+        extended = extend_plan_template(self.base, 20)
+        self.assertEqual(json.dumps(self.base, sort_keys=True), self.snapshot)
+        self.assertEqual(extended["plan_metadata"]["duration_weeks"], 20)
+        self.assertEqual(self.base["plan_metadata"]["duration_weeks"], 12)
+
+    def test_extend_shares_original_weeks(self):
+        extended = extend_plan_template(self.base, 16)
+        self.assertEqual(len(extended["weeks"]), 16)
+        for original, shared in zip(self.base["weeks"], extended["weeks"][:12]):
+            self.assertIs(original, shared)
+
+    def test_extended_weeks_overlay_pattern(self):
+        extended = extend_plan_template(self.base, 16)
+        week13 = extended["weeks"][12]
+        self.assertEqual(week13["week_number"], 13)
+        self.assertEqual(week13["focus"], "Extended Build - Week 13")
+        self.assertEqual(week13["volume_percent"], 95)
+        self.assertEqual(week13["workouts"][0]["name"], "W13_Tue_Intervals")
+        # Long strings are shared with the pattern week, not copied
+        self.assertIs(week13["workouts"][0]["description"], self.base["weeks"][8]["workouts"][0]["description"])
+
+    def test_variation_overlays_volume(self):
+        variation = create_plan_variation(self.base, "volume", {"name": "High Volume"})
+        self.assertEqual(variation["weeks"][0]["volume_percent"], 95)
+        self.assertEqual(self.base["weeks"][0]["volume_percent"], 90)
+        self.assertIs(variation["weeks"][0]["workouts"], self.base["weeks"][0]["workouts"])
+        self.assertEqual(variation["variation"], {"name": "High Volume"})
+
+    def test_standard_variation_shares_weeks(self):
+        variation = create_plan_variation(self.base, "standard", {"name": "Standard"})
+        self.assertIs(variation["weeks"], self.base["weeks"])
+        self.assertNotIn("variation", self.base)
+
+    def test_renumber_workout_name(self):
+        self.assertEqual(renumber_workout_name("W09_Tue_Intervals", 17), "W17_Tue_Intervals")
+        self.assertEqual(renumber_workout_name("Build W9 Tue", 13), "Build W13 Tue")
+
+
+if __name__ == '__main__':
+    unittest.main()
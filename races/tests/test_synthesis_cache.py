@@ -0,0 +1,116 @@
+"""
+Synthesis Cache Tests
+=====================
+
+Tests for memoized Nate workout synthesis (in-memory LRU and on-disk store).
+"""
+
+import sys
+import os
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'generation_modules'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'nate_archetypes'))
+
+import unittest
+import nate_workout_generator
+from nate_workout_generator import (
+    generate_nate_workout,
+    configure_synthesis_cache,
+    get_synthesis_cache,
+    SynthesisCache,
+)
+
+
+class TestSynthesisCache(unittest.TestCase):
+    """Test in-memory synthesis caching."""
+
+    def setUp(self):
+        self._previous = get_synthesis_cache()
+        self.cache = configure_synthesis_cache(maxsize=4)
+
+    def tearDown(self):
+        nate_workout_generator._synthesis_cache = self._previous
+
+    def test_repeat_lookup_is_a_hit(self):
+        """Second identical request should be served from the cache."""
+        first = generate_nate_workout('vo2max', 4, 'POLARIZED')
+        second = generate_nate_workout('vo2max', 4, 'POLARIZED')
+        self.assertEqual(first, second)
+        self.assertEqual(self.cache.hits, 1)
+        self.assertEqual(self.cache.misses, 1)
+
+    def test_cached_output_matches_uncached(self):
+        """Cached results should equal freshly synthesized ones."""
+        cached = generate_nate_workout('threshold', 3, 'PYRAMIDAL')
+        configure_synthesis_cache(maxsize=0)
+        uncached = generate_nate_workout('threshold', 3, 'PYRAMIDAL')
+        self.assertEqual(cached, uncached)
+
+    def test_custom_name_not_cached(self):
+        """A custom workout_name should not leak into later lookups."""
+        name, _, _ = generate_nate_workout('vo2max', 2, 'POLARIZED', workout_name='Custom')
+        self.assertEqual(name, 'Custom')
+        name, _, _ = generate_nate_workout('vo2max', 2, 'POLARIZED')
+        self.assertIn('L2', name)
+
+    def test_clamped_levels_share_entry(self):
+        """Out-of-range levels should hit the clamped level's entry."""
+        generate_nate_workout('vo2max', 6, 'POLARIZED')
+        generate_nate_workout('vo2max', 100, 'POLARIZED')
+        self.assertEqual(self.cache.hits, 1)
+
+    def test_lru_is_bounded(self):
+        """Cache should never exceed maxsize entries."""
+        for level in range(1, 7):
+            generate_nate_workout('vo2max', level, 'POLARIZED')
+        self.assertEqual(self.cache.stats()['size'], 4)
+
+    def test_unknown_type_cached_as_none(self):
+        """Unknown workout types should still cache their (None, None, None) result."""
+        generate_nate_workout('nonexistent_workout_type', 4, 'POLARIZED')
+        result = generate_nate_workout('nonexistent_workout_type', 4, 'POLARIZED')
+        self.assertEqual(result, (None, None, None))
+        self.assertEqual(self.cache.hits, 1)
+
+
+class TestSynthesisCacheDiskStore(unittest.TestCase):
+    """Test the persisted synthesis store."""
+
+    def setUp(self):
+        self._previous = get_synthesis_cache()
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        nate_workout_generator._synthesis_cache = self._previous
+        self.tmpdir.cleanup()
+
+    def test_store_round_trip(self):
+        """Entries saved by one cache should be hits for a fresh one."""
+        cache = configure_synthesis_cache(cache_dir=self.tmpdir.name)
+        expected = generate_nate_workout('sprint', 3, 'POLARIZED')
+        store_path = cache.save()
+        self.assertTrue(store_path.exists())
+
+        fresh = configure_synthesis_cache(cache_dir=self.tmpdir.name)
+        self.assertEqual(generate_nate_workout('sprint', 3, 'POLARIZED'), expected)
+        self.assertEqual(fresh.hits, 1)
+        self.assertEqual(fresh.misses, 0)
+
+    def test_save_without_changes_is_noop(self):
+        """Saving a cache with no new entries should not write anything."""
+        cache = SynthesisCache(cache_dir=self.tmpdir.name)
+        self.assertIsNone(cache.save())
+        self.assertEqual(os.listdir(self.tmpdir.name), [])
+
+    def test_fingerprint_hashed_once_per_source_version(self):
+        """store_path should not re-read the sources while they are unchanged."""
+        cache = SynthesisCache(cache_dir=self.tmpdir.name)
+        first = cache.store_path
+        misses = nate_workout_generator._hash_sources.cache_info().misses
+        self.assertEqual(cache.store_path, first)
+        self.assertEqual(nate_workout_generator._hash_sources.cache_info().misses, misses)
+
+
+if __name__ == '__main__':
+    unittest.main()
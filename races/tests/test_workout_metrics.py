@@ -0,0 +1,108 @@
+"""
+Workout Metrics Tests
+=====================
+
+Tests for structured ZWO segment arrays and plan-level summaries.
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'generation_modules'))
+
+import unittest
+from unittest import mock
+import workout_metrics
+from workout_metrics import (
+    WorkoutArrays,
+    ZONE_NAMES,
+    parse_segments,
+    weekly_summary,
+    check_volume_percent,
+)
+
+
+STEADY = '<SteadyState Duration="3600" Power="0.65" Cadence="85"/>'
+INTERVALS = ('<Warmup Duration="600" PowerLow="0.50" PowerHigh="0.70"/>\n'
+             '<IntervalsT Repeat="4" OnDuration="300" OnPower="1.10" OffDuration="180" OffPower="0.55"/>\n'
+             '<Cooldown Duration="600" PowerLow="0.60" PowerHigh="0.50"/>')
+REST = '<FreeRide Duration="60"/>'
+
+
+def make_plan(hours_per_week, volume_percents):
+    weeks = []
+    for week_num, (hours, volume) in enumerate(zip(hours_per_week, volume_percents), 1):
+        blocks = f'<SteadyState Duration="{int(hours * 3600)}" Power="0.65"/>'
+        weeks.append({"week_number": week_num, "volume_percent": volume,
+                      "workouts": [{"name": f"W{week_num:02d} Sat", "blocks": blocks}]})
+    return {"weeks": weeks}
+
+
+class TestWorkoutArrays(unittest.TestCase):
+    """Test per-workout metrics."""
+
+    def setUp(self):
+        self.arrays = WorkoutArrays.from_blocks([STEADY, INTERVALS, REST, ""])
+
+    def test_parse_folds_intervals(self):
+        segments = parse_segments(INTERVALS)
+        self.assertEqual([s[0] for s in segments], [600, 1200, 720, 600])
+        self.assertEqual(segments[1][1:3], (1.10, 1.10))
+
+    def test_total_duration(self):
+        self.assertEqual(list(self.arrays.total_duration()), [3600, 3120, 60, 0])
+
+    def test_steady_state_metrics(self):
+        self.assertAlmostEqual(self.arrays.normalized_power()[0], 0.65)
+        self.assertAlmostEqual(self.arrays.tss()[0], 100 * 0.65 ** 2)
+
+    def test_untargeted_segments_have_no_power(self):
+        self.assertEqual(self.arrays.normalized_power()[2], 0.0)
+        self.assertEqual(self.arrays.tss()[3], 0.0)
+        self.assertEqual(sum(self.arrays.time_in_zones()[2]), 0.0)
+
+    def test_untargeted_segments_do_not_dilute_np(self):
+        arrays = WorkoutArrays.from_blocks([STEADY + REST])
+        self.assertEqual(list(arrays.total_duration()), [3660])
+        self.assertAlmostEqual(arrays.normalized_power()[0], 0.65)
+        self.assertAlmostEqual(arrays.tss()[0], 100 * 0.65 ** 2)
+
+    def test_time_in_zones_splits_ramps(self):
+        zones = dict(zip(ZONE_NAMES, self.arrays.time_in_zones()[1]))
+        # Warmup 0.50-0.70 spends 0.06/0.20 of its time below 0.56, cooldown 0.06/0.10
+        self.assertAlmostEqual(zones["recovery"], 600 * 0.3 + 720 + 600 * 0.6)
+        self.assertAlmostEqual(zones["endurance"], 600 * 0.7 + 600 * 0.4)
+        self.assertAlmostEqual(zones["vo2max"], 1200)
+        self.assertAlmostEqual(sum(zones.values()), 3120)
+
+    def test_fallback_matches(self):
+        """Pure-Python fallback gives the same numbers as the active backend."""
+        expected = (list(self.arrays.total_duration()), list(self.arrays.tss()))
+        with mock.patch.object(workout_metrics, "NUMPY_AVAILABLE", False):
+            fallback = WorkoutArrays.from_blocks([STEADY, INTERVALS, REST, ""])
+            self.assertEqual(list(fallback.targeted_duration()), list(self.arrays.targeted_duration()))
+            self.assertEqual(list(fallback.total_duration()), expected[0])
+            for a, b in zip(fallback.tss(), expected[1]):
+                self.assertAlmostEqual(a, b)
+
+
+class TestPlanSummary(unittest.TestCase):
+    """Test weekly summaries and the volume_percent check."""
+
+    def test_weekly_summary(self):
+        summary = weekly_summary(make_plan([5, 10], [50, 100]))
+        self.assertEqual([w["hours"] for w in summary], [5.0, 10.0])
+        self.assertEqual(summary[1]["zone_hours"]["endurance"], 10.0)
+        self.assertEqual(summary[0]["workouts"], 1)
+
+    def test_volume_percent_matches(self):
+        self.assertEqual(check_volume_percent(make_plan([6, 8, 10], [60, 80, 100])), [])
+
+    def test_volume_percent_mismatch(self):
+        issues = check_volume_percent(make_plan([10, 8, 10], [60, 80, 100]))
+        self.assertEqual(len(issues), 1)
+        self.assertTrue(issues[0].startswith("Week 1:"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,138 @@
+"""
+ZWO Bundle Tests
+================
+
+Tests for plan-level workout bundles: buffered writes, manifest offsets
+and hashes, and the reader.
+"""
+
+import sys
+import os
+import json
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'generation_modules'))
+
+import unittest
+from zwo_bundle import (
+    BundleWriter,
+    ZWOBundle,
+    bundle_directory,
+    manifest_path_for,
+    write_workout_file,
+)
+
+
+WORKOUTS = {
+    "W01_Tue_Intervals.zwo": "<workout_file><name>W01 Tue – Intervals</name></workout_file>",
+    "W01_Sat_Long_Ride.zwo": "<workout_file><name>W01 Sat</name></workout_file>" * 50,
+    "RACE_DAY.zwo": "<workout_file><name>RACE DAY</name></workout_file>",
+}
+
+
+class TestZWOBundle(unittest.TestCase):
+    """Test bundle writing and reading."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmpdir.name)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _write_bundle(self, fmt):
+        writer = BundleWriter(self.root / f"workouts.{fmt}", fmt)
+        for filename, content in WORKOUTS.items():
+            writer.add(filename, content)
+        return writer.close()
+
+    def test_round_trip(self):
+        for fmt in ("zip", "tar"):
+            with self.subTest(fmt=fmt):
+                manifest = self._write_bundle(fmt)
+                self.assertEqual(sorted(manifest["workouts"]), sorted(WORKOUTS))
+                with ZWOBundle(self.root / f"workouts.{fmt}") as bundle:
+                    for filename, content in WORKOUTS.items():
+                        self.assertEqual(bundle.read_text(filename), content)
+
+    def test_tar_offsets_point_at_content(self):
+        manifest = self._write_bundle("tar")
+        raw = (self.root / "workouts.tar").read_bytes()
+        for filename, entry in manifest["workouts"].items():
+            self.assertNotIn("header_offset", entry)
+            content = raw[entry["data_offset"]:entry["data_offset"] + entry["size"]]
+            self.assertEqual(content.decode("utf-8"), WORKOUTS[filename])
+
+    def test_zip_offsets_point_at_local_headers(self):
+        manifest = self._write_bundle("zip")
+        raw = (self.root / "workouts.zip").read_bytes()
+        for entry in manifest["workouts"].values():
+            self.assertNotIn("data_offset", entry)
+            self.assertEqual(raw[entry["header_offset"]:entry["header_offset"] + 4], b"PK\x03\x04")
+
+    def test_embedded_manifest_without_sidecar(self):
+        for fmt in ("zip", "tar"):
+            with self.subTest(fmt=fmt):
+                self._write_bundle(fmt)
+                os.remove(manifest_path_for(self.root / f"workouts.{fmt}"))
+                with ZWOBundle(self.root / f"workouts.{fmt}") as bundle:
+                    self.assertEqual(sorted(bundle.names()), sorted(WORKOUTS))
+                    self.assertEqual(bundle.read_text("RACE_DAY.zwo"), WORKOUTS["RACE_DAY.zwo"])
+
+    def test_hash_mismatch_detected(self):
+        self._write_bundle("tar")
+        sidecar = manifest_path_for(self.root / "workouts.tar")
+        manifest = json.loads(sidecar.read_text())
+        manifest["workouts"]["RACE_DAY.zwo"]["sha256"] = "0" * 64
+        sidecar.write_text(json.dumps(manifest))
+        with ZWOBundle(self.root / "workouts.tar") as bundle:
+            with self.assertRaises(ValueError):
+                bundle.read("RACE_DAY.zwo")
+
+    def test_extract_selected(self):
+        self._write_bundle("zip")
+        with ZWOBundle(self.root / "workouts.zip") as bundle:
+            written = bundle.extract(self.root / "out", ["RACE_DAY.zwo"])
+        self.assertEqual([p.name for p in written], ["RACE_DAY.zwo"])
+        self.assertEqual(written[0].read_text(encoding="utf-8"), WORKOUTS["RACE_DAY.zwo"])
+
+
+class TestBundleDirectory(unittest.TestCase):
+    """Test buffering write_workout_file() into a bundle."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.workouts_dir = Path(self.tmpdir.name) / "plan" / "workouts"
+        self.workouts_dir.mkdir(parents=True)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_writes_buffered_into_bundle(self):
+        with bundle_directory(self.workouts_dir, "zip"):
+            for filename, content in WORKOUTS.items():
+                write_workout_file(self.workouts_dir / filename, content)
+            self.assertFalse(any(self.workouts_dir.iterdir()))
+        self.assertFalse(self.workouts_dir.exists())
+        with ZWOBundle(self.workouts_dir.parent / "workouts.zip") as bundle:
+            self.assertEqual(sorted(bundle.names()), sorted(WORKOUTS))
+
+    def test_other_directories_written_loose(self):
+        other = Path(self.tmpdir.name) / "other" / "W01.zwo"
+        with bundle_directory(self.workouts_dir, "zip"):
+            write_workout_file(other, "loose")
+        self.assertEqual(other.read_text(encoding="utf-8"), "loose")
+
+    def test_nothing_written_on_error(self):
+        with self.assertRaises(RuntimeError):
+            with bundle_directory(self.workouts_dir, "zip"):
+                write_workout_file(self.workouts_dir / "W01.zwo", "x")
+                raise RuntimeError("plan failed")
+        self.assertFalse((self.workouts_dir.parent / "workouts.zip").exists())
+        write_workout_file(self.workouts_dir / "W01.zwo", "x")
+        self.assertTrue((self.workouts_dir / "W01.zwo").exists())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+"""
+ZWO Object Store Tests
+======================
+
+Tests for content-addressed workout storage shared across plan folders.
+"""
+
+import sys
+import os
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'generation_modules'))
+
+import unittest
+from zwo_bundle import write_workout_file
+from zwo_store import (
+    ObjectStore,
+    dedup_directory,
+    materialize,
+    objects_manifest_for,
+    prune_store,
+    remove_unused_store,
+    store_stats,
+)
+
+
+SHARED = "<workout_file><name>W01 Tue – Intervals</name></workout_file>"
+RACE_DAY = "<workout_file><name>RACE DAY - {plan}</name></workout_file>"
+
+
+class TestZWOStore(unittest.TestCase):
+    """Test dedup across plan folders."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.race_folder = Path(self.tmpdir.name) / "Race"
+        self.plans = [self.race_folder / f"{i}. Plan" / "workouts" for i in (1, 2, 3)]
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _generate(self, mode):
+        for workouts_dir in self.plans:
+            with dedup_directory(workouts_dir, self.race_folder, mode):
+                write_workout_file(workouts_dir / "W01_Tue_Intervals.zwo", SHARED)
+                write_workout_file(workouts_dir / "RACE_DAY.zwo", RACE_DAY.format(plan=workouts_dir.parent.name))
+
+    def test_put_is_content_addressed(self):
+        store = ObjectStore(self.race_folder)
+        first = store.put(b"abc")
+        self.assertEqual(store.put(b"abc"), first)
+        self.assertEqual((store.written, store.reused), (1, 1))
+        self.assertEqual(store.get(first), b"abc")
+
+    def test_hardlinks_share_one_object(self):
+        self._generate("hardlink")
+        shared = [workouts_dir / "W01_Tue_Intervals.zwo" for workouts_dir in self.plans]
+        self.assertEqual(shared[0].read_text(encoding="utf-8"), SHARED)
+        self.assertTrue(os.path.samefile(shared[0], shared[2]))
+        self.assertEqual(shared[0].stat().st_nlink, 4)  # object + 3 plans
+
+    def test_rerun_keeps_links(self):
+        self._generate("hardlink")
+        inode = (self.plans[0] / "W01_Tue_Intervals.zwo").stat().st_ino
+        self._generate("hardlink")
+        self.assertEqual((self.plans[0] / "W01_Tue_Intervals.zwo").stat().st_ino, inode)
+
+    def test_plain_run_after_hardlink_keeps_objects_intact(self):
+        """hardlink -> plain run with new content must not rewrite the shared object"""
+        self._generate("hardlink")
+        store = ObjectStore(self.race_folder)
+        digest = store.put(SHARED.encode("utf-8"))
+        for workouts_dir in self.plans:
+            write_workout_file(workouts_dir / "W01_Tue_Intervals.zwo", SHARED.replace("Intervals", "Tempo"))
+        self.assertEqual(store.get(digest), SHARED.encode("utf-8"))
+
+    def test_prune_removes_unreferenced_objects(self):
+        self._generate("hardlink")
+        for workouts_dir in self.plans[1:]:
+            write_workout_file(workouts_dir / "RACE_DAY.zwo", "<workout_file/>")  # Replaces the links
+        self.assertEqual(prune_store(self.race_folder)["objects"], 2)
+        self.assertEqual(store_stats(self.race_folder)["objects"], 2)
+        self.assertEqual(prune_store(self.race_folder)["objects"], 0)
+
+    def test_prune_keeps_manifest_objects(self):
+        self._generate("manifest")
+        self.assertEqual(prune_store(self.race_folder)["objects"], 0)
+        self.assertEqual(len(materialize(self.plans[0])), 2)
+
+    def test_manifest_mode(self):
+        self._generate("manifest")
+        self.assertFalse(self.plans[0].exists())
+        self.assertTrue(objects_manifest_for(self.plans[0]).exists())
+        written = materialize(self.plans[1])
+        self.assertEqual(sorted(p.name for p in written), ["RACE_DAY.zwo", "W01_Tue_Intervals.zwo"])
+        self.assertEqual((self.plans[1] / "RACE_DAY.zwo").read_text(encoding="utf-8"),
+                         RACE_DAY.format(plan="2. Plan"))
+
+    def test_remove_unused_store(self):
+        self._generate("manifest")
+        self.assertFalse(remove_unused_store(self.race_folder))  # Manifests still need it
+        for workouts_dir in self.plans:
+            objects_manifest_for(workouts_dir).unlink()
+        self.assertTrue(remove_unused_store(self.race_folder))
+        self.assertFalse(ObjectStore(self.race_folder).path.exists())
+
+    def test_stats(self):
+        for mode in ("hardlink", "manifest"):
+            with self.subTest(mode=mode):
+                self._generate(mode)
+                stats = store_stats(self.race_folder)
+                self.assertEqual((stats["files"], stats["objects"]), (6, 4))
+                self.assertLess(stats["stored_bytes"], stats["logical_bytes"])
+                self.assertGreater(stats["dedup_ratio"], 1.0)
+                self.tearDown()
+                self.setUp()
+
+
+if __name__ == '__main__':
+    unittest.main()
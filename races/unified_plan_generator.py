@@ -26,7 +26,8 @@ from config.weekly_structure import get_weekly_template, get_strength_days
 
 # Import existing generators
 from generation_modules.strength_generator import (
-    load_strength_templates,
+    get_template_store,
+    apply_exercise_exclusions,
     create_strength_zwo_file,
     get_pathway_name,
     get_session_letter
@@ -175,7 +176,7 @@ class UnifiedPlanGenerator:
         if not templates_file.exists():
             templates_file = generation_modules_dir / "MASTER_TEMPLATES_V2.md"
         
-        strength_templates = load_strength_templates(str(templates_file))
+        strength_templates = get_template_store(templates_file)
         
         # Map strength phase names to template keys
         phase_to_template_map = {
@@ -232,7 +233,7 @@ class UnifiedPlanGenerator:
     def _generate_strength_week(
         self, 
         week_info: Dict, 
-        strength_templates: dict,
+        strength_templates,
         phase_to_template_map: dict,
         output_dir: Path
     ) -> List[str]:
@@ -259,11 +260,12 @@ class UnifiedPlanGenerator:
             template_idx = (week - 1) % len(template_keys)
             template_key = template_keys[template_idx]
             
-            if template_key not in strength_templates:
+            if template_key not in strength_templates.templates:
                 print(f"  ⚠️  Template {template_key} not found, skipping")
                 continue
             
-            description = strength_templates[template_key]
+            # Exclusion-filtered descriptions are cached per (template_key, exclusions)
+            description = strength_templates.get(template_key, self.exercise_exclusions)
             
             # Generate filename
             pathway_name = get_pathway_name(template_key)
@@ -271,10 +273,6 @@ class UnifiedPlanGenerator:
             filename = f"W{week:02d}_STR_{pathway_name.replace(' ', '_')}_{session_letter}.zwo"
             output_path = output_dir / filename
             
-            # Apply exercise exclusions if provided
-            if self.exercise_exclusions:
-                description = self._apply_exercise_exclusions(description, self.exercise_exclusions)
-            
             # Create ZWO file
             create_strength_zwo_file(
                 week=week,
@@ -346,42 +344,7 @@ class UnifiedPlanGenerator:
         Returns:
             Modified description with excluded exercises removed/replaced
         """
-        import re
-        
-        # Normalize exclusion names for matching (case-insensitive, handle variations)
-        exclusion_patterns = []
-        for exclusion in exclusions:
-            # Create pattern that matches exercise name (handles variations)
-            pattern = re.escape(exclusion)
-            # Match exercise name at start of line or after bullet/number
-            exclusion_patterns.append(
-                re.compile(
-                    rf'(?i)(?:^|\n)\s*[A-Z]?\d*\s*{pattern}[^→\n]*→[^\n]*',
-                    re.MULTILINE
-                )
-            )
-        
-        # Remove excluded exercises
-        modified_description = description
-        for pattern in exclusion_patterns:
-            modified_description = pattern.sub('', modified_description)
-        
-        # Clean up extra blank lines
-        modified_description = re.sub(r'\n{3,}', '\n\n', modified_description)
-        
-        # Add note about exclusions if any were removed
-        if modified_description != description:
-            exclusion_note = f"\n\n⚠️  Note: Some exercises have been excluded based on your injury history/limitations.\n"
-            # Find a good place to insert the note (after header, before first section)
-            header_end = modified_description.find('\n\n★')
-            if header_end > 0:
-                modified_description = (
-                    modified_description[:header_end] + 
-                    exclusion_note + 
-                    modified_description[header_end:]
-                )
-        
-        return modified_description
+        return apply_exercise_exclusions(description, exclusions)
     
     def _generate_calendar_file(self, calendar: List[Dict], output_dir: Path):
         """Generate calendar file (JSON and markdown)."""
@@ -6,73 +6,60 @@ Run this before showing Matti any output.
 
 Usage:
     python run_all_qc.py [output_dir]
+    python run_all_qc.py --group qc-all --jobs 4 --json qc.json --junit qc.xml
     
-This runs:
+This runs (default "qc" group; see qc_orchestrator.py for the others):
     1. Regression tests (prevents previously-fixed bugs)
     2. Variation pool validation
     3. Generated description validation
     4. Masters-specific checks
     5. Character count summary
+
+Stages run in-process via qc_orchestrator (no python3 subprocess per stage).
 """
 
 import sys
-import os
-import subprocess
 
-def run_command(cmd, description):
-    """Run a command and report results."""
-    print(f"\n{'='*80}")
-    print(f"RUNNING: {description}")
-    print(f"{'='*80}")
-    
-    result = subprocess.run(
-        cmd,
-        shell=True,
-        capture_output=False,
-        text=True
-    )
-    
-    return result.returncode == 0
+from qc_orchestrator import build_parser, run
+
+# Printed when a stage fails
+STAGE_FAILURE_HINTS = {
+    "marketplace": ["⚠️  REGRESSION DETECTED: Previously-fixed bugs have returned!",
+                    "   Review errors above and fix before proceeding."],
+    "guide": ["⚠️  REGRESSION DETECTED: Previously-fixed bugs have returned!",
+              "   Review errors above and fix before proceeding."],
+    "pools": ["⚠️  FIX VARIATION POOLS BEFORE GENERATING"],
+    "output": ["⚠️  FIX GENERATED DESCRIPTIONS BEFORE SHIPPING"],
+}
 
 def main():
-    output_dir = sys.argv[1] if len(sys.argv) > 1 else "output/html_descriptions"
+    args = build_parser().parse_args()
     
     print("\n" + "="*80)
     print("GRAVEL GOD MARKETPLACE DESCRIPTION QC")
     print("="*80)
-    print(f"\nOutput directory: {output_dir}\n")
-    
-    all_passed = True
+    print(f"\nOutput directory: {args.output_dir}\n")
     
-    # 1. Run marketplace regression tests (prevents previously-fixed bugs from returning)
-    if not run_command("python3 test_regression_marketplace.py", "Marketplace Regression Test Suite"):
-        all_passed = False
-        print("\n⚠️  REGRESSION DETECTED: Previously-fixed bugs have returned!")
-        print("   Review errors above and fix before proceeding.")
+    report = run(args)
     
-    # 2. Validate variation pools
-    if not run_command("python3 validate_variation_pools.py", "Variation Pool Validation"):
-        all_passed = False
-        print("\n⚠️  FIX VARIATION POOLS BEFORE GENERATING")
+    for stage in report["stages"]:
+        if stage["status"] == "failed":
+            print()
+            for line in STAGE_FAILURE_HINTS.get(stage["name"], [f"⚠️  {stage['title']} failed"]):
+                print(line)
     
-    # 3. Validate generated descriptions
-    if os.path.exists(output_dir):
-        if not run_command(f"python3 validate_descriptions.py {output_dir}", "Description Validation"):
-            all_passed = False
-            print("\n⚠️  FIX GENERATED DESCRIPTIONS BEFORE SHIPPING")
-    else:
-        print(f"\n⚠️  Output directory not found: {output_dir}")
-        print("Generate descriptions first, then run QC again.")
-        all_passed = False
+    summary = report["summary"]
+    all_passed = not summary["failed"]
+    print(f"\n{summary['passed']} checks passed, {summary['failed']} failed in {summary['duration']:.2f}s")
     
     # Final summary
     print("\n" + "="*80)
     if all_passed:
         print("✅ ALL QC CHECKS PASSED")
         print("="*80)
-        print("\n✓ Marketplace regression tests passed")
-        print("✓ Variation pools validated")
-        print("✓ Generated descriptions validated")
+        print()
+        for stage in report["stages"]:
+            print(f"✓ {stage['title']} passed")
         print("✓ Ready to show Matti\n")
         return 0
     else:
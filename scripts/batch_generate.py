@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Batch generate landing pages for all race data files.
+
+Replaces the per-race shell loop (three interpreters per race) with a single
+process that:
+- Loads the base Elementor template and landing page CSS once per worker
+- Validates race data and generated output in-process
+- Builds races concurrently over a worker pool
+- Writes a single JSON summary of the run
+
+Usage:
+    python3 scripts/batch_generate.py
+    python3 scripts/batch_generate.py --jobs 8 --summary output/batch-summary.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, Any, List
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+
+sys.path.insert(0, str(SCRIPT_DIR))
+
+from generate_landing_page import (
+    generate_landing_page,
+    load_race_data,
+    load_base_template,
+    load_landing_page_css,
+)
+from validate_race_data import validate_race_data
+from validate_output import validate_elementor_json
+
+
+def find_race_files(data_dir: Path) -> List[Path]:
+    """Find all race data files, sorted by name."""
+    return sorted(data_dir.rglob('*-data.json'))
+
+
+def output_path_for(race_data_path: Path, output_dir: Path) -> Path:
+    """Output file for a race data file (elementor-<race>.json)."""
+    race_name = race_data_path.name[:-len('-data.json')]
+    return output_dir / f"elementor-{race_name}.json"
+
+
+def _preload_assets(template_path: str):
+    """Warm the parsed template and CSS caches."""
+    load_base_template(template_path)
+    try:
+        load_landing_page_css()
+    except FileNotFoundError:
+        pass  # Reported per race if the template needs it
+
+
+def build_race(race_data_path: str, template_path: str, output_path: str,
+               capture_output: bool = True) -> Dict[str, Any]:
+    """
+    Validate, generate and check a single landing page.
+
+    Returns a result dict with status one of:
+    'generated', 'invalid_data', 'generation_failed', 'invalid_output'.
+    """
+    race_name = Path(race_data_path).name[:-len('-data.json')]
+    result = {
+        'race': race_name,
+        'input': race_data_path,
+        'output': output_path,
+        'status': None,
+        'errors': [],
+        'seconds': 0.0,
+        'log': '',
+    }
+    start = time.perf_counter()
+    buffer = io.StringIO() if capture_output else None
+    redirect = contextlib.redirect_stdout(buffer) if capture_output else contextlib.nullcontext()
+
+    with redirect:
+        try:
+            data = load_race_data(race_data_path)
+        except (OSError, json.JSONDecodeError) as e:
+            result['status'] = 'invalid_data'
+            result['errors'] = [str(e)]
+        else:
+            errors = validate_race_data(data)
+            if errors:
+                result['status'] = 'invalid_data'
+                result['errors'] = errors
+            else:
+                try:
+                    elementor_json = generate_landing_page(race_data_path, template_path, output_path, data=data)
+                except Exception:
+                    result['status'] = 'generation_failed'
+                    result['errors'] = [traceback.format_exc()]
+                else:
+                    errors = validate_elementor_json(elementor_json)
+                    result['status'] = 'invalid_output' if errors else 'generated'
+                    result['errors'] = errors
+
+    if buffer is not None:
+        result['log'] = buffer.getvalue()
+    result['seconds'] = round(time.perf_counter() - start, 3)
+    return result
+
+
+def print_result(result: Dict[str, Any], verbose: bool = False):
+    """Print a one-race report in the batch log format."""
+    print(f"Generating: {result['race']}")
+    print(f"  Input:  {result['input']}")
+    print(f"  Output: {result['output']}")
+
+    status = result['status']
+    if status == 'generated':
+        print("  ✓ Generated and validated")
+    elif status == 'invalid_output':
+        print("  ⚠ Generated but validation failed")
+    elif status == 'invalid_data':
+        print("  ✗ Validation failed, skipping")
+    else:
+        print("  ✗ Generation failed")
+
+    if verbose or status == 'generation_failed':
+        if result['log']:
+            print(result['log'].rstrip())
+        for error in result['errors']:
+            print(f"    {error.rstrip()}")
+    print()
+
+
+def run_batch(race_files: List[Path], template_path: str, output_dir: Path,
+              jobs: int = 1, verbose: bool = False) -> List[Dict[str, Any]]:
+    """Build all races, in-process when jobs == 1, otherwise over a process pool."""
+    tasks = [(str(path), template_path, str(output_path_for(path, output_dir))) for path in race_files]
+
+    if jobs <= 1:
+        _preload_assets(template_path)
+        results = []
+        for task in tasks:
+            result = build_race(*task)
+            print_result(result, verbose)
+            results.append(result)
+        return results
+
+    results = []
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_preload_assets,
+                             initargs=(template_path,)) as executor:
+        futures = [executor.submit(build_race, *task) for task in tasks]
+        for future in as_completed(futures):
+            result = future.result()
+            print_result(result, verbose)
+            results.append(result)
+
+    # Keep summary order stable regardless of completion order
+    order = {task[0]: i for i, task in enumerate(tasks)}
+    results.sort(key=lambda r: order[r['input']])
+    return results
+
+
+def write_summary(results: List[Dict[str, Any]], summary_path: Path, elapsed: float):
+    """Write JSON summary of the batch run."""
+    counts = {}
+    for result in results:
+        counts[result['status']] = counts.get(result['status'], 0) + 1
+
+    summary = {
+        'total': len(results),
+        'counts': counts,
+        'elapsed_seconds': round(elapsed, 3),
+        'races': [{k: v for k, v in result.items() if k != 'log'} for result in results],
+    }
+    with open(summary_path, 'w', encoding='utf-8') as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2)
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch generate landing pages for all race data files")
+    parser.add_argument("--data-dir", default=str(PROJECT_ROOT / "data"),
+                        help="Directory containing *-data.json files")
+    parser.add_argument("--template", default=str(PROJECT_ROOT / "templates" / "elementor-base-template.json"),
+                        help="Base Elementor template")
+    parser.add_argument("--output-dir", default=str(PROJECT_ROOT / "output"),
+                        help="Directory for generated Elementor JSON")
+    parser.add_argument("--jobs", "-j", type=int, default=os.cpu_count() or 1,
+                        help="Worker processes (default: CPU count; 1 runs in-process)")
+    parser.add_argument("--summary", default=None,
+                        help="JSON summary path (default: <output-dir>/batch-summary.json)")
+    parser.add_argument("--verbose", "-v", action="store_true",
+                        help="Print generator output and errors for every race")
+    args = parser.parse_args()
+
+    data_dir = Path(args.data_dir)
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    if not Path(args.template).is_file():
+        print(f"ERROR: Template not found: {args.template}")
+        sys.exit(1)
+
+    race_files = find_race_files(data_dir)
+    if not race_files:
+        print(f"No race data files found in {data_dir}")
+        sys.exit(1)
+
+    print(f"Found {len(race_files)} race data file(s)")
+    print()
+
+    start = time.perf_counter()
+    results = run_batch(race_files, args.template, output_dir, jobs=args.jobs, verbose=args.verbose)
+    elapsed = time.perf_counter() - start
+
+    summary_path = Path(args.summary) if args.summary else output_dir / "batch-summary.json"
+    summary = write_summary(results, summary_path, elapsed)
+
+    print("Batch generation complete!")
+    print(f"  {summary['counts'].get('generated', 0)}/{summary['total']} generated and validated in {elapsed:.1f}s")
+    print(f"Output files in: {output_dir}")
+    print(f"Summary: {summary_path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -11,11 +11,13 @@ This file handles only:
 - Widget replacement
 """
 
+import copy
 import json
 import re
 import sys
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Iterable, List, Optional, Tuple
 from html import unescape
 
 # Add automation module to path
@@ -106,11 +108,117 @@ def replace_widget_html(elementor_json: Dict, search_pattern: str, new_html: str
     return False
 
 
+@lru_cache(maxsize=None)
+def load_base_template(base_json_path: str) -> Dict:
+    """Load and parse base Elementor template (once per process). Do not mutate."""
+    with open(base_json_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+@lru_cache(maxsize=None)
+def load_landing_page_css(css_path: str = 'assets/css/landing-page.css') -> str:
+    """Load neo brutalist landing page CSS (once per process)."""
+    with open(css_path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+class WidgetIndex:
+    """
+    One-pass index of an Elementor tree.
+    
+    Maps `_element_id` values to elements and content markers (CSS classes,
+    id attributes) to HTML widgets, in document order, so a page's section
+    replacements don't each re-walk the tree and re-scan every widget.
+    """
+    
+    def __init__(self, elementor_json: Dict, markers: Iterable[str] = ()):
+        self.by_element_id: Dict[str, List[Dict]] = {}
+        self.html_widgets: List[Dict] = []
+        self._index(elementor_json.get('content', []))
+        self.by_marker: Dict[str, List[Dict]] = {}
+        for marker in markers:
+            self.index_marker(marker)
+    
+    def _index(self, elements: List[Dict]):
+        for element in elements:
+            settings = element.get('settings', {})
+            if isinstance(settings, dict):
+                element_id = settings.get('_element_id')
+                if element_id:
+                    self.by_element_id.setdefault(element_id, []).append(element)
+                if element.get('widgetType') == 'html':
+                    self.html_widgets.append(element)
+            if 'elements' in element:
+                self._index(element['elements'])
+    
+    def index_marker(self, marker: str) -> List[Dict]:
+        """HTML widgets whose content contains marker (computed once per marker)."""
+        if marker not in self.by_marker:
+            self.by_marker[marker] = [
+                widget for widget in self.html_widgets
+                if marker in widget['settings'].get('html', '')
+            ]
+        return self.by_marker[marker]
+    
+    def resolve(self, search_pattern: str, element_id: Optional[str] = None) -> Tuple[Optional[Dict], int]:
+        """
+        Find target widget, preferring element ID over content marker.
+        
+        Returns (widget, match_count); widget is the first match in document
+        order, as with find_widget_by_element_id / find_widget_by_content.
+        """
+        if element_id:
+            matches = [w for w in self.by_element_id.get(element_id, []) if isinstance(w.get('settings'), dict)]
+            if matches:
+                return matches[0], len(matches)
+        matches = self.index_marker(search_pattern)
+        return (matches[0] if matches else None), len(matches)
+
+
+def replace_widgets_html(elementor_json: Dict, replacements: List[Tuple[str, str, str, Optional[str]]]) -> Dict[str, List[str]]:
+    """
+    Replace HTML of several widgets using a single indexing pass.
+    
+    Args:
+        elementor_json: Elementor document (modified in place)
+        replacements: (name, search_pattern, new_html, element_id) tuples
+    
+    Returns:
+        Report dict with lists of replacement names:
+        - replaced: widget found and replaced
+        - missing: no widget matched
+        - ambiguous: element ID or marker matched more than one widget (first used)
+        - conflicts: targeted a widget already claimed by an earlier replacement
+    """
+    index = WidgetIndex(elementor_json, markers=[pattern for _, pattern, _, _ in replacements])
+    report = {'replaced': [], 'missing': [], 'ambiguous': [], 'conflicts': []}
+    claimed = {}
+    
+    # Resolve every target against the original tree, then apply
+    targets = []
+    for name, search_pattern, new_html, element_id in replacements:
+        widget, match_count = index.resolve(search_pattern, element_id)
+        if widget is None:
+            report['missing'].append(name)
+            continue
+        if match_count > 1:
+            report['ambiguous'].append(name)
+        if id(widget) in claimed:
+            report['conflicts'].append(name)
+        claimed[id(widget)] = name
+        targets.append((name, widget, new_html))
+    
+    for name, widget, new_html in targets:
+        widget['settings']['html'] = new_html
+        report['replaced'].append(name)
+    
+    return report
+
+
 def build_elementor_json(data: Dict, base_json_path: str) -> Dict:
     """Build complete Elementor JSON with all sections."""
-    # Load base JSON structure
-    with open(base_json_path, 'r', encoding='utf-8') as f:
-        elementor_data = json.load(f)
+    # Copy base JSON structure from the parsed template cache
+    elementor_data = copy.deepcopy(load_base_template(base_json_path))
     
     # Generate all HTML sections
     print("  Generating hero section...")
@@ -155,57 +263,31 @@ def build_elementor_json(data: Dict, base_json_path: str) -> Dict:
     print("  Generating gravel races CTA...")
     gravel_races_cta_html = generate_gravel_races_cta_html()
     
-    # Find and replace widgets in Elementor JSON
-    print("  Replacing hero widget...")
-    if not replace_widget_html(elementor_data, 'gg-hero-inner', hero_html):
-        print("  WARNING: Hero widget not found!")
-    
-    print("  Replacing vitals widget...")
-    if not replace_widget_html(elementor_data, 'id="race-vitals"', vitals_html, element_id='vitals'):
-        print("  WARNING: Vitals widget not found!")
-    
-    print("  Replacing ratings widget...")
-    if not replace_widget_html(elementor_data, 'id="course-ratings"', ratings_html, element_id='course'):
-        print("  WARNING: Ratings widget not found!")
-    
-    print("  Replacing black pill widget...")
-    if not replace_widget_html(elementor_data, 'gg-blackpill-section', blackpill_html, element_id='blackpill'):
-        print("  WARNING: Black pill widget not found!")
-    
-    print("  Replacing training plans widget...")
-    if not replace_widget_html(elementor_data, 'gg-volume-section', training_html, element_id='training'):
-        print("  WARNING: Training plans widget not found!")
-    
-    print("  Replacing course map widget...")
-    if not replace_widget_html(elementor_data, 'gg-route-section', course_map_html, element_id='course-map'):
-        print("  WARNING: Course map widget not found!")
-    
-    print("  Replacing overview hero widget...")
-    if not replace_widget_html(elementor_data, 'gg-overview-hero-v2', overview_html):
-        print("  WARNING: Overview hero widget not found!")
-    
-    print("  Replacing TLDR widget...")
-    if not replace_widget_html(elementor_data, 'gg-decision-grid', tldr_html, element_id='tldr'):
-        print("  WARNING: TLDR widget not found!")
-    
-    print("  Replacing history widget...")
-    if not replace_widget_html(elementor_data, 'gg-tldr-grid', history_html, element_id='history'):
-        print("  WARNING: History widget not found!")
-    
-    print("  Replacing biased opinion widget...")
-    if not replace_widget_html(elementor_data, 'gg-opinion-section', opinion_html, element_id='opinion'):
-        print("  WARNING: Biased opinion widget not found!")
-    
-    print("  Replacing final verdict widget...")
-    if not replace_widget_html(elementor_data, 'gg-overall-section', verdict_html, element_id='verdict'):
-        print("  WARNING: Final verdict widget not found!")
-    
-    print("  Replacing logistics widget...")
     # Append CTAs directly to logistics HTML (simpler approach)
     logistics_html += '\n\n' + coaching_cta_html + '\n\n' + gravel_races_cta_html
     
-    if not replace_widget_html(elementor_data, 'gg-logistics-section', logistics_html, element_id='logistics'):
-        print("  WARNING: Logistics widget not found!")
+    # Find and replace widgets in Elementor JSON (one indexing pass)
+    print("  Replacing widgets...")
+    report = replace_widgets_html(elementor_data, [
+        ('Hero', 'gg-hero-inner', hero_html, None),
+        ('Vitals', 'id="race-vitals"', vitals_html, 'vitals'),
+        ('Ratings', 'id="course-ratings"', ratings_html, 'course'),
+        ('Black pill', 'gg-blackpill-section', blackpill_html, 'blackpill'),
+        ('Training plans', 'gg-volume-section', training_html, 'training'),
+        ('Course map', 'gg-route-section', course_map_html, 'course-map'),
+        ('Overview hero', 'gg-overview-hero-v2', overview_html, None),
+        ('TLDR', 'gg-decision-grid', tldr_html, 'tldr'),
+        ('History', 'gg-tldr-grid', history_html, 'history'),
+        ('Biased opinion', 'gg-opinion-section', opinion_html, 'opinion'),
+        ('Final verdict', 'gg-overall-section', verdict_html, 'verdict'),
+        ('Logistics', 'gg-logistics-section', logistics_html, 'logistics'),
+    ])
+    for name in report['missing']:
+        print(f"  WARNING: {name} widget not found!")
+    for name in report['ambiguous']:
+        print(f"  WARNING: {name} widget marker matched more than one widget (used first)")
+    for name in report['conflicts']:
+        print(f"  WARNING: {name} widget already replaced by another section")
     
     # Update page title
     race_name = data['race']['display_name']
@@ -213,8 +295,7 @@ def build_elementor_json(data: Dict, base_json_path: str) -> Dict:
     
     # Add neo brutalist CSS to page_settings.custom_css
     if 'page_settings' in elementor_data and 'custom_css' in elementor_data['page_settings']:
-        with open('assets/css/landing-page.css', 'r', encoding='utf-8') as f:
-            neo_brutalist_css = f.read()
+        neo_brutalist_css = load_landing_page_css()
         # Append to existing CSS
         elementor_data['page_settings']['custom_css'] += '\n\n' + neo_brutalist_css
     
@@ -311,10 +392,12 @@ Focus Keyword:
     return config
 
 
-def generate_landing_page(race_data_path: str, base_json_path: str, output_path: str):
-    """Main generation function."""
-    print(f"Loading race data from {race_data_path}...")
-    data = load_race_data(race_data_path)
+def generate_landing_page(race_data_path: str, base_json_path: str, output_path: str,
+                          data: Optional[Dict] = None) -> Dict:
+    """Main generation function. Returns the generated Elementor JSON."""
+    if data is None:
+        print(f"Loading race data from {race_data_path}...")
+        data = load_race_data(race_data_path)
     
     print("Generating HTML sections...")
     elementor_json = build_elementor_json(data, base_json_path)
@@ -357,6 +440,8 @@ def generate_landing_page(race_data_path: str, base_json_path: str, output_path:
     print(f"✓ Landing page generated for {race_name}")
     print(f"✓ Output: {output_path}")
     print(f"✓ Ready to import to Elementor")
+    
+    return elementor_json
 
 
 if __name__ == '__main__':
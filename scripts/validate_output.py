@@ -47,7 +47,9 @@ def check_section_ids(json_data: Dict) -> List[str]:
     errors = []
     expected_sections = ['vitals', 'blackpill', 'training']
     
-    def search_html_widgets(elements, found_ids=set()):
+    def search_html_widgets(elements, found_ids=None):
+        if found_ids is None:
+            found_ids = set()
         for element in elements:
             if element.get('widgetType') == 'html':
                 settings = element.get('settings', {})
@@ -96,6 +98,22 @@ def check_tp_urls(json_data: Dict) -> List[str]:
     return errors
 
 
+def validate_elementor_json(json_data: Dict) -> List[str]:
+    """Run all quality checks on parsed Elementor JSON."""
+    all_errors = []
+    
+    # Check for placeholders
+    all_errors.extend(check_placeholders(json_data))
+    
+    # Check section IDs
+    all_errors.extend(check_section_ids(json_data))
+    
+    # Check TP URLs
+    all_errors.extend(check_tp_urls(json_data))
+    
+    return all_errors
+
+
 def main():
     if len(sys.argv) < 2:
         print("Usage: python validate_output.py <elementor_json.json>")
@@ -111,19 +129,7 @@ def main():
     with open(json_path, 'r', encoding='utf-8') as f:
         json_data = json.load(f)
     
-    all_errors = []
-    
-    # Check for placeholders
-    placeholder_errors = check_placeholders(json_data)
-    all_errors.extend(placeholder_errors)
-    
-    # Check section IDs
-    section_errors = check_section_ids(json_data)
-    all_errors.extend(section_errors)
-    
-    # Check TP URLs
-    url_errors = check_tp_urls(json_data)
-    all_errors.extend(url_errors)
+    all_errors = validate_elementor_json(json_data)
     
     if all_errors:
         print("VALIDATION FAILED:")
@@ -15,12 +15,17 @@ Tests critical fixes:
 8. No duplicate alternatives (fixed 2024-12-11)
 9. No within-tier duplicates (fixed 2024-12-11)
 10. SMR positioning isolation (fixed 2024-12-XX - SMR plans must use salvage/urgency, not performance/progression)
+11. Reproducible generation (global random state and worker count don't change output)
+12. Compiled pool partitions (precomputed Masters bitsets match the keyword check)
+13. Validator duplicate detection (identical copy is an error, one-word variations warn)
 
 Exit codes:
     0 = All regression tests passed
     1 = Regression detected (previously-fixed bug returned)
 """
 
+import contextlib
+import io
 import os
 import re
 import sys
@@ -489,24 +494,154 @@ def test_smr_positioning_isolation():
     if errors:
         raise RegressionTestFailure("SMR positioning isolation regression:\n" + "\n".join(errors))
 
+def test_generation_reproducible():
+    """
+    REGRESSION: Generation must not depend on global random state or run order
+
+    WHY: The generator used to reseed the global random module per plan and
+    dedupe via shared sets, so concurrent or interleaved runs corrupted each
+    other's sequences. Serial and parallel runs must now produce identical files.
+    """
+    import random
+    import tempfile
+    import generate_html_marketplace_descriptions as generator
+    
+    errors = []
+    plans = list(generator.iter_plans())
+    allocation, conflicts = generator.allocate_content(plans, "Unbound Gravel 200")
+    for slot in generator.ALLOCATED_SLOTS:
+        chosen = [allocation[plan][slot] for plan in plans]
+        if len(set(chosen)) != len(chosen) and not any(conflict[2] == slot for conflict in conflicts):
+            errors.append(f"Allocation reuses {slot} content without reporting a conflict")
+    
+    with tempfile.TemporaryDirectory() as tmpdir:
+        outputs = []
+        for run, jobs in enumerate((1, 2)):
+            random.seed(run)  # Unrelated global state must not leak into output
+            output_dir = Path(tmpdir) / f"run{run}"
+            with contextlib.redirect_stdout(io.StringIO()):
+                generator.generate_all_html_descriptions(output_dir=str(output_dir), jobs=jobs)
+            outputs.append({
+                path.relative_to(output_dir): path.read_text(encoding='utf-8')
+                for path in output_dir.rglob("*.html")
+            })
+        if outputs[0] != outputs[1]:
+            differing = sorted(str(name) for name in outputs[0] if outputs[0][name] != outputs[1].get(name))
+            errors.append(f"Serial and parallel runs differ: {', '.join(differing)}")
+    
+    if errors:
+        raise RegressionTestFailure("Reproducible generation regression:\n" + "\n".join(errors))
+
+def test_compiled_pool_partitions():
+    """
+    REGRESSION: Precomputed Masters partitions must match is_masters_content()
+
+    WHY: Selection now uses bitsets computed once at import instead of running
+    the keyword check on every draw. A variation registered under the wrong
+    partition would leak Masters content into non-Masters plans (or vice versa).
+    Ad-hoc lists must not be added to the global registry.
+    """
+    import variation_pools
+    
+    errors = []
+    pools = []
+    for name, value in vars(variation_pools).items():
+        if name.endswith(('_POOL', '_POOLS')):
+            pools.extend(value.values() if isinstance(value, dict) else [value])
+    
+    for pool in pools:
+        masters = set(pool.ids_in(pool.masters))
+        for variation_id in pool.ids:
+            expected = variation_pools.is_masters_content(variation_pools.get_item(variation_id))
+            if expected != (variation_id in masters):
+                errors.append(f"{pool.name}: variation {variation_id} misclassified (masters={expected})")
+        if pool.masters & pool.non_masters or pool.masters | pool.non_masters != pool.mask:
+            errors.append(f"{pool.name}: partitions don't split the pool")
+    
+    # Ad-hoc lists are classified locally, without growing the registry
+    registered = len(variation_pools.ITEMS)
+    adhoc = ["Built for riders 50+ who recover slower", "Your plan for {race_name}", "Train smarter"]
+    pool = variation_pools.as_pool(adhoc)
+    if len(variation_pools.ITEMS) != registered:
+        errors.append("as_pool() registered ad-hoc variations in the global registry")
+    if pool.items(pool.partition(True)) != adhoc[:1] or pool.items(pool.partition(False)) != adhoc[1:]:
+        errors.append("as_pool(): ad-hoc list misclassified")
+    if pool.items(pool.with_placeholder('{race_name}')) != adhoc[1:2]:
+        errors.append("as_pool(): ad-hoc placeholder mask wrong")
+    
+    if errors:
+        raise RegressionTestFailure("Compiled pool partition regression:\n" + "\n".join(errors[:10]))
+
+def test_validator_duplicate_detection():
+    """
+    REGRESSION: validate_descriptions.py must flag identical and near-identical copy
+
+    WHY: Cross-plan duplicates are now found by hashing the variations each
+    file was parsed into (no second read), plus MinHash signatures for copy
+    that differs by a word - it still reads as canned.
+    """
+    from validate_descriptions import validate_cross_plan_duplicates
+    
+    story = ("Here's why the Podium Advanced plan works at elite volume: it balances "
+             "polarized intensity with race-specific demands. Most high-volume plans "
+             "just pile on endurance. This one builds a complete athlete.")
+    stories = {
+        "podium_advanced.html": story,
+        "podium_elite.html": story.replace("Podium Advanced", "Podium Elite"),
+        "podium_copy.html": story,
+        "finisher_beginner.html": "You have a job, a family and eight hours a week. "
+                                  "This plan turns those hours into a finish line.",
+    }
+    results = [
+        {
+            'filepath': os.path.join("output", filename),
+            'filename': filename,
+            'variations': {'opening': "", 'story': text, 'closing': "", 'alternative': ""},
+            'warnings': [],
+        }
+        for filename, text in stories.items()
+    ]
+    
+    errors = []
+    duplicate_errors = validate_cross_plan_duplicates(results)
+    if duplicate_errors != ["DUPLICATE story: podium_copy.html and podium_advanced.html have identical content"]:
+        errors.append(f"Identical stories not reported as one duplicate: {duplicate_errors}")
+    
+    warnings = {result['filename']: result['warnings'] for result in results}
+    for filename, other in (("podium_advanced.html", "podium_elite.html"), ("podium_elite.html", "podium_advanced.html")):
+        if not any(w.startswith("Near-duplicate story") and other in w for w in warnings[filename]):
+            errors.append(f"{filename}: near-duplicate of {other} not flagged")
+    for filename in ("podium_copy.html", "finisher_beginner.html"):
+        if warnings[filename]:
+            errors.append(f"{filename}: unexpected warnings {warnings[filename]}")
+    
+    if errors:
+        raise RegressionTestFailure("Validator duplicate detection regression:\n" + "\n".join(errors))
+
 # ============================================================================
 # TEST RUNNER
 # ============================================================================
 
+# (display name, test function) in run order; qc_orchestrator.py runs these in-process
+TESTS = [
+    ("Marketplace Character Limits", test_marketplace_character_limits),
+    ("Marketplace No Section References", test_marketplace_no_section_references),
+    ("Marketplace Closing Validation", test_marketplace_closing_validation),
+    ("Masters Content Isolation", test_masters_content_isolation),
+    ("No Duplicate Openings", test_no_duplicate_openings),
+    ("No Duplicate Stories", test_no_duplicate_stories),
+    ("No Duplicate Closings", test_no_duplicate_closings),
+    ("No Duplicate Alternative Hooks", test_no_duplicate_alternative_hooks),
+    ("No Within-Tier Duplicates", test_within_tier_duplicates),
+    ("SMR Positioning Isolation", test_smr_positioning_isolation),
+    ("Reproducible Generation", test_generation_reproducible),
+    ("Compiled Pool Partitions", test_compiled_pool_partitions),
+    ("Validator Duplicate Detection", test_validator_duplicate_detection),
+]
+
 def run_marketplace_regression_tests():
     """Run all marketplace regression tests"""
-    tests = [
-        ("Marketplace Character Limits", test_marketplace_character_limits),
-        ("Marketplace No Section References", test_marketplace_no_section_references),
-        ("Marketplace Closing Validation", test_marketplace_closing_validation),
-        ("Masters Content Isolation", test_masters_content_isolation),
-        ("No Duplicate Openings", test_no_duplicate_openings),
-        ("No Duplicate Stories", test_no_duplicate_stories),
-        ("No Duplicate Closings", test_no_duplicate_closings),
-        ("No Duplicate Alternative Hooks", test_no_duplicate_alternative_hooks),
-        ("No Within-Tier Duplicates", test_within_tier_duplicates),
-        ("SMR Positioning Isolation", test_smr_positioning_isolation),
-    ]
+    tests = TESTS
     
     passed = 0
     failed = 0
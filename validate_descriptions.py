@@ -4,19 +4,26 @@ MARKETPLACE DESCRIPTION QC VALIDATOR
 ====================================
 Run after generating HTML descriptions to catch issues BEFORE review.
 
+Each file is read and scanned once; with enough files they are validated
+in parallel. Opening, story, closing and alternative copy is then compared
+across plans by hash (identical = error) and by MinHash over word shingles
+(near-duplicate, e.g. one word changed = warning).
+
 Usage:
-    python validate_descriptions.py [output_dir]
+    python validate_descriptions.py [output_dir] [--jobs N]
     
 Exit codes:
     0 = All checks passed
     1 = Validation failures found
 """
 
+import hashlib
 import os
+import random
 import sys
 import re
-from pathlib import Path
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 
 # ============================================================================
 # VALIDATION RULES
@@ -61,12 +68,106 @@ FORBIDDEN_PATTERNS = {
 MAX_CHAR_LIMIT = 3700  # Warning threshold
 HARD_CHAR_LIMIT = 4000  # TrainingPeaks limit
 
+# Near-duplicate detection: MinHash over word shingles, LSH-banded
+SHINGLE_SIZE = 3
+MINHASH_PERMUTATIONS = 128
+MINHASH_BANDS = 32  # 4 rows per band
+MINHASH_SEED = 23
+NEAR_DUPLICATE_THRESHOLD = 0.6  # Estimated Jaccard similarity of shingles
+_MERSENNE_PRIME = (1 << 61) - 1
+
+PARALLEL_MIN_FILES = 200  # ~0.5 ms per file vs. ~100 ms to start a pool
+
+# ============================================================================
+# FIELD EXTRACTION
+# ============================================================================
+
+# One scan finds every field the checks need: the opening, each 16px copy
+# paragraph (tagged when it follows the story block or the Alternative?
+# header) and the footer.
+FIELD_PATTERN = re.compile(
+    r'<p style="margin:0;font-size:24px;font-weight:700;line-height:1.3">(?P<opening>[^<]+)</p>'
+    r'|(?:(?P<story_block><div style="margin-bottom:14px">)|(?P<alternative_header><h3[^>]*>Alternative\?</h3>))?'
+    r'\s*<p style="margin:0;font-size:16px">(?P<paragraph>[^<]+)</p>'
+    r'|(?P<footer><div style="border-top:2px)'
+)
+CLOSING_START = re.compile(r'^(This is |Built for |Designed for |Unbound)', re.IGNORECASE)
+CLOSING_PHRASE = re.compile(r'(?:This is |Built for |Designed for |Unbound)[^<]')
+
+VARIATION_TYPES = ('opening', 'story', 'closing', 'alternative')
+
+def extract_fields(content):
+    """
+    Extract the copy variations and closing context in a single scan.
+
+    The closing is the last paragraph before_footer (the footer has
+    border-top:2px); without one, the first closing-style paragraph.
+
+    Returns:
+        dict: opening/story/closing/alternative text (stripped, "" if
+            missing), has_footer, last_paragraph (raw text of the last
+            paragraph before the footer) and closing_style_paragraphs
+    """
+    opening = story = alternative = ""
+    paragraphs_before_footer = []
+    closing_style = []
+    has_footer = False
+
+    for match in FIELD_PATTERN.finditer(content):
+        if match.group('footer'):
+            has_footer = True
+            continue
+        if match.group('opening') is not None:
+            if not opening:
+                opening = match.group('opening').strip()
+            continue
+        paragraph = match.group('paragraph')
+        if match.group('story_block') and not story:
+            story = paragraph.strip()
+        elif match.group('alternative_header') and not alternative:
+            alternative = paragraph.strip()
+        if CLOSING_PHRASE.search(paragraph):
+            closing_style.append(paragraph)
+        if not has_footer:
+            paragraphs_before_footer.append(paragraph)
+
+    if has_footer and paragraphs_before_footer:
+        closing = paragraphs_before_footer[-1].strip()
+    else:
+        closing = closing_style[0].strip() if closing_style else ""
+
+    return {
+        'opening': opening,
+        'story': story,
+        'closing': closing,
+        'alternative': alternative,
+        'has_footer': has_footer,
+        'last_paragraph': paragraphs_before_footer[-1] if has_footer and paragraphs_before_footer else None,
+        'closing_style_paragraphs': len(closing_style),
+    }
+
+def extract_opening(content):
+    """Extract opening paragraph from HTML."""
+    return extract_fields(content)['opening']
+
+def extract_story(content):
+    """Extract story justification paragraph from HTML."""
+    return extract_fields(content)['story']
+
+def extract_closing(content):
+    """Extract closing statement from HTML."""
+    return extract_fields(content)['closing']
+
+def extract_alternative(content):
+    """Extract alternative hook paragraph from HTML."""
+    return extract_fields(content)['alternative']
+
 # ============================================================================
 # VALIDATION FUNCTIONS
 # ============================================================================
 
 def validate_file(filepath):
-    """Run all validation checks on a single HTML file."""
+    """Run all validation checks on a single HTML file (read once)."""
     errors = []
     warnings = []
     
@@ -75,6 +176,8 @@ def validate_file(filepath):
     
     filename = os.path.basename(filepath)
     is_masters = 'masters' in filename
+    fields = extract_fields(content)
+    lowered = content.lower()
     
     # 1. CHARACTER COUNT
     char_count = len(content)
@@ -97,12 +200,12 @@ def validate_file(filepath):
     if is_masters:
         # Masters plans MUST have Masters content
         masters_content_found = any(
-            keyword in content.lower() 
+            keyword in lowered 
             for keyword in MASTERS_KEYWORDS
         )
         # Check for multiple Masters keywords (not just one mention)
         masters_keyword_count = sum(
-            content.lower().count(keyword) 
+            lowered.count(keyword) 
             for keyword in MASTERS_KEYWORDS
         )
         # Need at least 2 instances of Masters keywords (beyond just plan name)
@@ -114,7 +217,7 @@ def validate_file(filepath):
     else:
         # NON-Masters plans MUST NOT have Masters content
         masters_mentions = sum(
-            content.lower().count(keyword) 
+            lowered.count(keyword) 
             for keyword in ['45+', '50+', 'age', 'masters', 'older', 'veteran']
         )
         if masters_mentions > 2:  # Allow 1-2 incidental mentions
@@ -126,30 +229,14 @@ def validate_file(filepath):
     # 5. CLOSING REPETITION CHECK
     # Only check the last paragraph before the footer (actual closing)
     # Other paragraphs may contain "Unbound" but aren't the closing
-    footer_match = re.search(r'<div style="border-top:2px', content)
-    if footer_match:
-        before_footer = content[:footer_match.start()]
-        # Find all paragraphs before footer
-        all_paragraphs = list(re.finditer(
-            r'<p style="margin:0;font-size:16px">([^<]+)</p>',
-            before_footer
-        ))
-        # Check only the last paragraph (the actual closing)
-        if all_paragraphs:
-            last_paragraph_text = all_paragraphs[-1].group(1)
-            # Check if it matches closing pattern
-            closing_pattern = r'^(This is |Built for |Designed for |Unbound)'
-            if not re.search(closing_pattern, last_paragraph_text, re.IGNORECASE):
-                # Last paragraph doesn't match closing pattern - might be missing
-                errors.append("Last paragraph before footer doesn't match closing pattern")
-    else:
+    if fields['has_footer']:
+        last_paragraph_text = fields['last_paragraph']
+        # Last paragraph doesn't match closing pattern - might be missing
+        if last_paragraph_text is not None and not CLOSING_START.search(last_paragraph_text):
+            errors.append("Last paragraph before footer doesn't match closing pattern")
+    elif fields['closing_style_paragraphs'] > 1:
         # No footer found - check for any closing-style paragraphs (fallback)
-        closing_matches = re.findall(
-            r'<p style="margin:0;font-size:16px">([^<]*(?:This is |Built for |Designed for |Unbound)[^<]+)</p>',
-            content
-        )
-        if len(closing_matches) > 1:
-            errors.append(f"Multiple closing-style paragraphs found: {len(closing_matches)}")
+        errors.append(f"Multiple closing-style paragraphs found: {fields['closing_style_paragraphs']}")
     
     # 6. GUIDE INTRIGUE LINE FORMAT
     intrigue_matches = re.findall(
@@ -178,54 +265,39 @@ def validate_file(filepath):
         'filepath': filepath,
         'filename': filename,
         'char_count': char_count,
+        'variations': {content_type: fields[content_type] for content_type in VARIATION_TYPES},
         'errors': errors,
         'warnings': warnings,
         'passed': len(errors) == 0
     }
 
-def validate_directory(output_dir):
-    """Validate all HTML files in output directory."""
-    results = []
-    
+def find_descriptions(output_dir):
+    """HTML files under output_dir, in walk order"""
+    paths = []
     for root, dirs, files in os.walk(output_dir):
         for file in files:
             if file.endswith('.html'):
-                filepath = os.path.join(root, file)
-                result = validate_file(filepath)
-                results.append(result)
-    
-    return results
+                paths.append(os.path.join(root, file))
+    return paths
 
-def extract_opening(content):
-    """Extract opening paragraph from HTML."""
-    match = re.search(r'<p style="margin:0;font-size:24px;font-weight:700;line-height:1.3">([^<]+)</p>', content)
-    return match.group(1).strip() if match else ""
+def validate_directory(output_dir, jobs=1):
+    """
+    Validate all HTML files in output directory.
 
-def extract_story(content):
-    """Extract story justification paragraph from HTML."""
-    # First paragraph after opening (before "What the" header)
-    match = re.search(r'<div style="margin-bottom:14px">\s*<p style="margin:0;font-size:16px">([^<]+)</p>', content)
-    return match.group(1).strip() if match else ""
+    Args:
+        output_dir: Directory of generated descriptions (searched recursively)
+        jobs: Worker processes. Files are validated in parallel only once
+            there are PARALLEL_MIN_FILES of them - below that, starting the
+            workers costs more than the validation.
 
-def extract_closing(content):
-    """Extract closing statement from HTML."""
-    # Find the last paragraph before the footer (which has border-top:2px)
-    # This is the closing statement
-    footer_match = re.search(r'<div style="border-top:2px', content)
-    if footer_match:
-        before_footer = content[:footer_match.start()]
-        # Find the last <p> tag with the closing style before the footer
-        matches = list(re.finditer(r'<p style="margin:0;font-size:16px">([^<]+)</p>', before_footer))
-        if matches:
-            return matches[-1].group(1).strip()
-    # Fallback: look for closing patterns
-    match = re.search(r'<p style="margin:0;font-size:16px">([^<]*(?:This is |Built for |Designed for |Unbound)[^<]+)</p>', content)
-    return match.group(1).strip() if match else ""
-
-def extract_alternative(content):
-    """Extract alternative hook paragraph from HTML."""
-    match = re.search(r'<h3[^>]*>Alternative\?</h3>\s*<p style="margin:0;font-size:16px">([^<]+)</p>', content)
-    return match.group(1).strip() if match else ""
+    Returns:
+        list: validate_file() results, in walk order
+    """
+    paths = find_descriptions(output_dir)
+    if jobs > 1 and len(paths) >= PARALLEL_MIN_FILES:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(paths))) as pool:
+            return list(pool.map(validate_file, paths, chunksize=64))
+    return [validate_file(path) for path in paths]
 
 def get_tier_from_filename(filename):
     """Extract tier from filename (e.g., 'finisher_advanced.html' -> 'finisher')."""
@@ -234,48 +306,121 @@ def get_tier_from_filename(filename):
         return parts[0]
     return "unknown"
 
+# ============================================================================
+# CROSS-PLAN DUPLICATES
+# ============================================================================
+
+def content_hash(text):
+    """Exact fingerprint of a variation"""
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+
+def shingles(text, size=SHINGLE_SIZE):
+    """Word n-grams of text (case and punctuation ignored)"""
+    words = re.findall(r"\w+", text.lower())
+    if len(words) <= size:
+        return {' '.join(words)} if words else set()
+    return {' '.join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+def _minhash_permutations(count=MINHASH_PERMUTATIONS, seed=MINHASH_SEED):
+    rng = random.Random(seed)
+    return [(rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME)) for _ in range(count)]
+
+_PERMUTATIONS = _minhash_permutations()
+
+def minhash_signature(text):
+    """MinHash signature of text's shingles (None if it has no words)"""
+    hashed = [
+        int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest(), 'little')
+        for shingle in shingles(text)
+    ]
+    if not hashed:
+        return None
+    return tuple(
+        min((a * h + b) % _MERSENNE_PRIME for h in hashed)
+        for a, b in _PERMUTATIONS
+    )
+
+def estimated_similarity(signature_a, signature_b):
+    """Estimated Jaccard similarity of the two texts' shingle sets"""
+    matches = sum(1 for a, b in zip(signature_a, signature_b) if a == b)
+    return matches / len(signature_a)
+
+def find_near_duplicates(entries, threshold=NEAR_DUPLICATE_THRESHOLD):
+    """
+    Pairs of entries whose texts are near-duplicates.
+
+    Candidates come from LSH banding over the MinHash signatures (texts
+    sharing any band of rows), so only likely pairs are compared.
+
+    Args:
+        entries: [(key, signature)] - signatures from minhash_signature()
+        threshold: Minimum estimated similarity
+
+    Returns:
+        list: [(key_a, key_b, similarity)] with key_a before key_b in entries
+    """
+    rows = MINHASH_PERMUTATIONS // MINHASH_BANDS
+    buckets = defaultdict(list)
+    for position, (key, signature) in enumerate(entries):
+        for band in range(MINHASH_BANDS):
+            buckets[(band, signature[band * rows:(band + 1) * rows])].append(position)
+
+    candidates = set()
+    for positions in buckets.values():
+        for i, first in enumerate(positions):
+            for second in positions[i + 1:]:
+                candidates.add((first, second))
+
+    pairs = []
+    for first, second in sorted(candidates):
+        similarity = estimated_similarity(entries[first][1], entries[second][1])
+        if similarity >= threshold:
+            pairs.append((entries[first][0], entries[second][0], similarity))
+    return pairs
+
 def validate_cross_plan_duplicates(results):
-    """Check that no content is duplicated across any plans (within or across tiers)."""
-    from collections import defaultdict
-    
-    # Track content by variation type across ALL plans
-    content_tracker = defaultdict(dict)  # content -> (filepath, tier)
-    
+    """
+    Check that no content is duplicated across any plans (within or across tiers).
+
+    Uses the variations validate_file() extracted - no file is read again.
+    Identical variations are errors; near-duplicates (estimated similarity
+    >= NEAR_DUPLICATE_THRESHOLD, e.g. copy that differs by a word or two)
+    are added to both files' warnings.
+
+    Returns:
+        list: Duplicate error messages
+    """
     errors = []
     
-    for result in results:
-        filepath = result['filepath']
-        filename = result['filename']
-        tier = get_tier_from_filename(filename)
-        
-        with open(filepath, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        # Extract each variation type
-        opening = extract_opening(content)
-        story = extract_story(content)
-        closing = extract_closing(content)
-        alternative = extract_alternative(content)
-        
-        # Check for duplicates (within or across tiers)
-        variations = [
-            ('opening', opening),
-            ('story', story),
-            ('closing', closing),
-            ('alternative', alternative)
-        ]
+    for content_type in VARIATION_TYPES:
+        # Track content by hash across ALL plans: hash -> first filepath
+        seen = {}
+        unique = []
+        for result in results:
+            variation_content = result['variations'][content_type]
+            if not variation_content:  # Only check non-empty content
+                continue
+            digest = content_hash(variation_content)
+            if digest in seen:
+                errors.append(
+                    f"DUPLICATE {content_type}: {os.path.basename(result['filepath'])} "
+                    f"and {os.path.basename(seen[digest]['filepath'])} have identical content"
+                )
+                continue
+            seen[digest] = result
+            signature = minhash_signature(variation_content)
+            if signature is not None:
+                unique.append((result, signature))
         
-        for content_type, variation_content in variations:
-            if variation_content:  # Only check non-empty content
-                if variation_content in content_tracker[content_type]:
-                    # Found duplicate
-                    original_file, original_tier = content_tracker[content_type][variation_content]
-                    errors.append(
-                        f"DUPLICATE {content_type}: {os.path.basename(filepath)} "
-                        f"and {os.path.basename(original_file)} have identical content"
-                    )
-                else:
-                    content_tracker[content_type][variation_content] = (filepath, tier)
+        by_id = {id(result): result for result, _ in unique}
+        for first_id, second_id, similarity in find_near_duplicates(
+            [(id(result), signature) for result, signature in unique]
+        ):
+            first, second = by_id[first_id], by_id[second_id]
+            for result, other in ((first, second), (second, first)):
+                result['warnings'].append(
+                    f"Near-duplicate {content_type}: {similarity:.0%} similar to {other['filename']}"
+                )
     
     return errors
 
@@ -361,8 +506,15 @@ def print_results(results):
 # ============================================================================
 
 if __name__ == "__main__":
-    if len(sys.argv) > 1:
-        output_dir = sys.argv[1]
+    args = sys.argv[1:]
+    jobs = os.cpu_count() or 1
+    if "--jobs" in args:
+        index = args.index("--jobs")
+        jobs = int(args[index + 1])
+        del args[index:index + 2]
+    
+    if args:
+        output_dir = args[0]
     else:
         output_dir = "output/html_descriptions"
     
@@ -370,7 +522,7 @@ if __name__ == "__main__":
         print(f"Error: Directory not found: {output_dir}")
         sys.exit(1)
     
-    results = validate_directory(output_dir)
+    results = validate_directory(output_dir, jobs=jobs)
     
     if not results:
         print(f"Error: No HTML files found in {output_dir}")
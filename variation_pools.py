@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+VARIATION POOL INDEX
+Compiles the marketplace variation pools once, at import.
+
+Every distinct variation gets a stable integer ID (registration order: pool
+files in the order below, items in source order). Each pool keeps its items'
+IDs plus bitsets (plain ints, bit N = variation N) for its Masters and
+non-Masters partitions, so selection and dedup are integer operations
+instead of re-running the Masters keyword checks and string comparisons on
+every draw.
+
+Usage:
+    from variation_pools import OPENING_POOLS
+    pool = OPENING_POOLS["finisher"]
+    opening = pool.choice(rng, pool.partition(is_masters_plan=False))
+"""
+
+from TIER_SPECIFIC_SOLUTION_STATE_V3 import SOLUTION_STATE_OPENINGS
+from TIER_SPECIFIC_CHOICE_FEATURES import CHOICE_FEATURES
+from TIER_SPECIFIC_GUIDE_TOPICS_FINAL import GUIDE_TOPICS
+from ALTERNATIVE_HOOKS_BEHAVIORAL import ALTERNATIVES, MASTERS_ALTERNATIVES
+from TIER_SPECIFIC_STORY_JUSTIFICATIONS import STORY_JUSTIFICATIONS
+from TIER_SPECIFIC_VALUE_PROP_BOXES import VALUE_PROP_BOXES
+from GUIDE_INTRIGUE_LINES import GUIDE_INTRIGUE_LINES
+from SMR_SPECIFIC_VARIATIONS import (
+    SMR_OPENINGS, SMR_STORY_JUSTIFICATIONS, SMR_FEATURES,
+    SMR_GUIDE_TOPICS, SMR_ALTERNATIVES, SMR_CLOSINGS, SMR_VALUE_PROP_BOXES
+)
+
+# ============================================================================
+# MASTERS CLASSIFICATION
+# ============================================================================
+
+# Direct age references
+AGE_KEYWORDS = ['45+', '50+', 'age', 'older', 'veteran', 'masters']
+
+# Age-specific training language
+AGE_TRAINING_PATTERNS = [
+    'recovery protocols for',
+    'adaptation timeline',
+    'adaptation windows',
+    'longer recovery',
+    'age-appropriate',
+    'at your age',
+    'as you age',
+    'recovery isn\'t optional',
+    'recovery becomes the primary',
+    'recovery architecture',
+    'recovery-first',
+    'injury prevention',
+    'hrv monitoring',
+    'hrv-based'
+]
+
+# Placeholders tracked per variation (story must name the plan, first feature the race)
+PLACEHOLDERS = ('{plan_name}', '{race_name}')
+
+def item_text(item):
+    """Searchable text of a variation: a string, or a value prop box's philosophy + props"""
+    if isinstance(item, dict):
+        return item.get('philosophy', '') + ' ' + ' '.join(item.get('props', []))
+    return item or ''
+
+def is_masters_content(item):
+    """
+    Check if a variation contains Masters-specific content.
+
+    Masters content typically includes:
+    - Age references: 45+, 50+, age, older, veteran
+    - Age-specific training: recovery protocols, adaptation timelines
+    - Age-related language: "at your age", "as you age"
+
+    Args:
+        item: Can be a string (for most variations) or dict (for value prop boxes)
+    """
+    if not item:
+        return False
+
+    text_lower = item_text(item).lower()
+    if not text_lower:
+        return False
+
+    if any(keyword in text_lower for keyword in AGE_KEYWORDS):
+        return True
+    return any(pattern in text_lower for pattern in AGE_TRAINING_PATTERNS)
+
+# ============================================================================
+# REGISTRY
+# ============================================================================
+
+# ID -> variation (string or value prop dict)
+ITEMS = []
+_IDS = {}
+
+# Bitsets over all registered variations
+MASTERS_MASK = 0
+PLACEHOLDER_MASKS = {placeholder: 0 for placeholder in PLACEHOLDERS}
+
+def _key(item):
+    if isinstance(item, dict):
+        return ('box', item.get('philosophy', ''), tuple(item.get('props', [])))
+    return item
+
+def _classify(item, bit, placeholder_masks):
+    """Set bit in placeholder_masks for each placeholder item contains; True if Masters content"""
+    text = item_text(item)
+    for placeholder in PLACEHOLDERS:
+        if placeholder in text:
+            placeholder_masks[placeholder] |= bit
+    return is_masters_content(item)
+
+def item_id(item):
+    """Stable ID of a variation, registering (and classifying) it on first sight"""
+    global MASTERS_MASK
+    key = _key(item)
+    found = _IDS.get(key)
+    if found is not None:
+        return found
+
+    new_id = len(ITEMS)
+    ITEMS.append(item)
+    _IDS[key] = new_id
+    bit = 1 << new_id
+    if _classify(item, bit, PLACEHOLDER_MASKS):
+        MASTERS_MASK |= bit
+    return new_id
+
+def get_item(variation_id):
+    return ITEMS[variation_id]
+
+def mask_of(items):
+    """Bitset of already-used variations, e.g. a legacy set of strings"""
+    mask = 0
+    for item in items:
+        found = _IDS.get(_key(item))
+        if found is not None:
+            mask |= 1 << found
+    return mask
+
+# ============================================================================
+# POOLS
+# ============================================================================
+
+class VariationPool:
+    """
+    One compiled pool: variation IDs in source order plus partition bitsets
+
+    Masks passed to choice()/sample() select a subset of the pool; IDs are
+    drawn in source order so a given rng yields the same picks as drawing
+    from the original list.
+
+    With register=False (ad-hoc lists, see as_pool) the pool numbers and
+    classifies its items locally instead of adding them to the registry;
+    its IDs and masks then only mean something to the pool itself.
+    """
+    __slots__ = ("name", "ids", "mask", "masters", "non_masters", "table", "placeholder_masks")
+
+    def __init__(self, name, items, register=True):
+        self.name = name
+        if register:
+            self.table = ITEMS
+            self.placeholder_masks = PLACEHOLDER_MASKS
+            self.ids = tuple(item_id(item) for item in items)
+            masters_mask = MASTERS_MASK
+        else:
+            self.table = list(items)
+            self.placeholder_masks = {placeholder: 0 for placeholder in PLACEHOLDERS}
+            self.ids = tuple(range(len(self.table)))
+            masters_mask = 0
+            for variation_id, item in enumerate(self.table):
+                if _classify(item, 1 << variation_id, self.placeholder_masks):
+                    masters_mask |= 1 << variation_id
+        self.mask = 0
+        for variation_id in self.ids:
+            self.mask |= 1 << variation_id
+        self.masters = self.mask & masters_mask
+        self.non_masters = self.mask & ~masters_mask
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __repr__(self):
+        return f"VariationPool({self.name!r}, {len(self.ids)} items)"
+
+    def partition(self, is_masters_plan):
+        """
+        Masters plans get ONLY Masters variations; non-Masters plans get none.
+
+        Falls back to the whole pool if the partition is empty (shouldn't happen).
+        """
+        part = self.masters if is_masters_plan else self.non_masters
+        return part or self.mask
+
+    def with_placeholder(self, placeholder, mask=None):
+        """Subset of mask (default: whole pool) containing placeholder; mask itself if none do"""
+        mask = self.mask if mask is None else mask
+        return (mask & self.placeholder_masks[placeholder]) or mask
+
+    def ids_in(self, mask):
+        """IDs of the pool selected by mask, in source order"""
+        return [variation_id for variation_id in self.ids if mask >> variation_id & 1]
+
+    def items(self, mask=None):
+        return [self.table[variation_id] for variation_id in (self.ids if mask is None else self.ids_in(mask))]
+
+    def choice(self, rng, mask=None):
+        """Draw one variation from mask (default: whole pool); None if it selects nothing"""
+        ids = self.ids if mask is None else self.ids_in(mask)
+        return self.table[rng.choice(ids)] if ids else None
+
+    def sample(self, rng, k, mask=None):
+        """Draw up to k distinct variations from mask"""
+        ids = self.ids if mask is None else self.ids_in(mask)
+        return [self.table[variation_id] for variation_id in rng.sample(ids, min(k, len(ids)))]
+
+def compile_pools(name, source):
+    """VariationPool for a list, or {key: VariationPool} for a dict of lists"""
+    if isinstance(source, dict):
+        return {key: VariationPool(f"{name}[{key}]", items) for key, items in source.items()}
+    return VariationPool(name, source)
+
+def as_pool(pool):
+    """Accept a VariationPool or a plain list of variations (wrapped without registering them)"""
+    return pool if isinstance(pool, VariationPool) else VariationPool("<list>", pool, register=False)
+
+# Tier pools (tier -> VariationPool)
+OPENING_POOLS = compile_pools("SOLUTION_STATE_OPENINGS", SOLUTION_STATE_OPENINGS)
+STORY_POOLS = compile_pools("STORY_JUSTIFICATIONS", STORY_JUSTIFICATIONS)
+FEATURE_POOLS = compile_pools("CHOICE_FEATURES", CHOICE_FEATURES)
+GUIDE_TOPIC_POOLS = compile_pools("GUIDE_TOPICS", GUIDE_TOPICS)
+VALUE_PROP_POOLS = compile_pools("VALUE_PROP_BOXES", VALUE_PROP_BOXES)
+
+# Alternatives (tier_level / tier_masters -> VariationPool)
+ALTERNATIVE_POOLS = compile_pools("ALTERNATIVES", ALTERNATIVES)
+MASTERS_ALTERNATIVE_POOLS = compile_pools("MASTERS_ALTERNATIVES", MASTERS_ALTERNATIVES)
+
+GUIDE_INTRIGUE_POOL = compile_pools("GUIDE_INTRIGUE_LINES", GUIDE_INTRIGUE_LINES)
+
+# Save My Race pools
+SMR_OPENING_POOL = compile_pools("SMR_OPENINGS", SMR_OPENINGS)
+SMR_STORY_POOLS = compile_pools("SMR_STORY_JUSTIFICATIONS", SMR_STORY_JUSTIFICATIONS)
+SMR_FEATURE_POOL = compile_pools("SMR_FEATURES", SMR_FEATURES)
+SMR_GUIDE_TOPIC_POOL = compile_pools("SMR_GUIDE_TOPICS", SMR_GUIDE_TOPICS)
+SMR_ALTERNATIVE_POOL = compile_pools("SMR_ALTERNATIVES", SMR_ALTERNATIVES)
+SMR_CLOSING_POOLS = compile_pools("SMR_CLOSINGS", SMR_CLOSINGS)
+SMR_VALUE_PROP_POOLS = compile_pools("SMR_VALUE_PROP_BOXES", SMR_VALUE_PROP_BOXES)
@@ -5,12 +5,20 @@ Takes race database JSON + template JSON and pushes pages to WordPress via REST
 Replaces placeholders in template with race-specific data.
 """
 
+import hashlib
 import json
 import re
 import requests
 import os
-from typing import Dict, List, Any
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, List, Any, Optional
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
 
 load_dotenv()
 
@@ -26,8 +34,154 @@ except (ImportError, AttributeError):
     }
 
 
+# HTTP statuses worth retrying (rate limited or transient server errors)
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Statuses safe to retry for any method: the server did not act on the request
+PRE_PROCESSING_STATUSES = {429}
+
+# Methods that can be repeated without side effects beyond the first attempt
+IDEMPOTENT_METHODS = {'GET', 'HEAD', 'OPTIONS', 'PUT', 'PATCH', 'DELETE'}
+
+# Longest single backoff sleep, in seconds
+MAX_BACKOFF = 30.0
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a Retry-After header into seconds to wait.
+    
+    Accepts both forms from RFC 9110: delay-seconds ("120") and an
+    HTTP-date ("Wed, 21 Oct 2026 07:28:00 GMT"). Returns None when the
+    header is missing or unparseable; dates in the past give 0.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+def failed_before_send(error: Exception) -> bool:
+    """
+    True if a connection error happened before any bytes reached the server.
+    
+    Connect timeouts and refused/unresolvable connections qualify. Read
+    timeouts and dropped connections do not: the server may already have
+    acted on the request.
+    """
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+    if isinstance(error, requests.Timeout):
+        return False
+    reason = getattr(error.args[0], 'reason', None) if error.args else None
+    return isinstance(reason, NewConnectionError)
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket rate limiter.
+    
+    Allows bursts of up to `capacity` requests, refilling at `rate` tokens
+    per second.
+    """
+    
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def acquire(self):
+        """Block until a token is available, then take it."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class PushManifest:
+    """
+    Local record of what has been pushed, per race slug.
+    
+    Stores the WordPress page ID and a stable hash of the formatted page
+    payload (title, content, _elementor_data and other meta), so batch
+    pushes can skip unchanged pages and update existing ones in place.
+    Entries are only trusted for the site URL they were recorded against.
+    """
+    
+    VERSION = 1
+    
+    def __init__(self, path: str, site_url: str):
+        self.path = path
+        self.site_url = site_url.rstrip('/')
+        self.pages: Dict[str, Dict[str, Any]] = {}
+        self.lock = threading.Lock()
+        self.dirty = False
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except (json.JSONDecodeError, OSError) as e:
+                print(f"⚠ Ignoring unreadable push manifest {path}: {e}")
+                data = {}
+            if data.get('version') == self.VERSION and data.get('site_url') == self.site_url:
+                self.pages = data.get('pages', {})
+            elif data:
+                print(f"⚠ Push manifest {path} is for a different site or version - starting fresh")
+    
+    @staticmethod
+    def content_hash(formatted_data: Dict[str, Any]) -> str:
+        """Stable sha256 of a formatted page payload."""
+        canonical = json.dumps(formatted_data, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+        return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+    
+    def get(self, slug: str) -> Optional[Dict[str, Any]]:
+        with self.lock:
+            return self.pages.get(slug)
+    
+    def record(self, slug: str, page_id: int, content_hash: str):
+        with self.lock:
+            self.pages[slug] = {
+                'page_id': page_id,
+                'hash': content_hash,
+                'pushed_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            }
+            self.dirty = True
+    
+    def save(self):
+        """Write manifest atomically (no-op if nothing changed)."""
+        with self.lock:
+            if not self.dirty:
+                return
+            data = {'version': self.VERSION, 'site_url': self.site_url, 'pages': self.pages}
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.path)
+            self.dirty = False
+
+
 class WordPressPagePusher:
-    def __init__(self, wordpress_url: str, username: str, password: str):
+    def __init__(self, wordpress_url: str, username: str, password: str,
+                 pool_size: int = 10, max_retries: int = 3, backoff_factor: float = 0.5,
+                 requests_per_second: Optional[float] = None, timeout: Optional[float] = 60):
         """
         Initialize WordPress REST API client.
         
@@ -35,13 +189,61 @@ class WordPressPagePusher:
             wordpress_url: Base URL of WordPress site (e.g., 'https://example.com')
             username: WordPress username or application password username
             password: WordPress application password (not regular password)
+            pool_size: HTTP connection pool size (should be >= batch push workers)
+            max_retries: Retries for 429/5xx responses and connection errors
+            backoff_factor: Base delay for exponential backoff (factor * 2^attempt seconds)
+            requests_per_second: Token-bucket rate limit across all threads (None = unlimited)
+            timeout: Per-request timeout in seconds
         """
         self.wordpress_url = wordpress_url.rstrip('/')
         self.api_url = f"{self.wordpress_url}/wp-json/wp/v2"
         self.auth = (username, password)
         self.session = requests.Session()
         self.session.auth = self.auth
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.timeout = timeout
+        self.rate_limiter = TokenBucket(requests_per_second) if requests_per_second else None
+    
+    def _request(self, method: str, url: str, idempotent: Optional[bool] = None,
+                 **kwargs) -> requests.Response:
+        """
+        Send a request with rate limiting and exponential backoff.
         
+        Idempotent requests (IDEMPOTENT_METHODS, or idempotent=True for POST
+        endpoints that are safe to repeat) are retried on RETRY_STATUSES and
+        on any connection error or timeout. Other requests, such as page
+        creation, are retried only when the server cannot have acted on them:
+        a 429 response or a connection that failed before sending. Retry-After
+        is honoured in both its seconds and HTTP-date forms. The last response
+        is returned even if still failing, so callers keep their existing
+        status handling.
+        """
+        if idempotent is None:
+            idempotent = method.upper() in IDEMPOTENT_METHODS
+        retry_statuses = RETRY_STATUSES if idempotent else PRE_PROCESSING_STATUSES
+        kwargs.setdefault('timeout', self.timeout)
+        for attempt in range(self.max_retries + 1):
+            if self.rate_limiter:
+                self.rate_limiter.acquire()
+            delay = self.backoff_factor * (2 ** attempt)
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt == self.max_retries or not (idempotent or failed_before_send(e)):
+                    raise
+            else:
+                if response.status_code not in retry_statuses or attempt == self.max_retries:
+                    return response
+                retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                if retry_after is not None:
+                    delay = retry_after
+            time.sleep(min(delay, MAX_BACKOFF))
+    
+
     def replace_placeholders(self, template: Dict[str, Any], race_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Replace placeholders in template with race-specific data.
@@ -296,17 +498,7 @@ class WordPressPagePusher:
                 race_data.get('registration_url') or
                 ''
             ),
-            'RACE_SLUG': (
-                race.get('slug') or
-                race_data.get('RACE_SLUG') or
-                race_data.get('race_slug') or
-                self._generate_slug(
-                    race.get('name') or
-                    race_data.get('RACE_NAME') or
-                    race_data.get('race_name') or
-                    ''
-                )
-            ),
+            'RACE_SLUG': self._race_slug(race_data),
         }
 
         # Add all field mappings to replacements
@@ -414,6 +606,21 @@ class WordPressPagePusher:
         
         return ''
 
+    def _race_slug(self, race_data: Dict[str, Any]) -> str:
+        """Slug for a race: explicit slug fields first, else generated from the name."""
+        race = race_data.get('race', race_data)
+        return (
+            race.get('slug') or
+            race_data.get('RACE_SLUG') or
+            race_data.get('race_slug') or
+            self._generate_slug(
+                race.get('name') or
+                race_data.get('RACE_NAME') or
+                race_data.get('race_name') or
+                ''
+            )
+        )
+
     def _generate_slug(self, name: str) -> str:
         """
         Generate a URL-friendly slug from a race name.
@@ -458,7 +665,7 @@ class WordPressPagePusher:
         """
         try:
             url = f"{self.api_url}/users/me"
-            response = self.session.get(url)
+            response = self._request('GET', url)
             
             if response.status_code == 200:
                 user_data = response.json()
@@ -562,7 +769,7 @@ class WordPressPagePusher:
         if 'status' not in formatted_data:
             formatted_data['status'] = 'publish'
 
-        response = self.session.post(url, json=formatted_data)
+        response = self._request('POST', url, json=formatted_data)
 
         # Better error handling
         if response.status_code not in [200, 201]:
@@ -676,7 +883,7 @@ class WordPressPagePusher:
             Page data from WordPress API
         """
         url = f"{self.api_url}/pages/{page_id}"
-        response = self.session.get(url)
+        response = self._request('GET', url)
         
         if response.status_code == 200:
             return response.json()
@@ -702,7 +909,7 @@ class WordPressPagePusher:
         url = f"{self.wordpress_url}/wp-json/gravel-god/v1/regenerate-css/{page_id}"
 
         try:
-            response = self.session.post(url)
+            response = self._request('POST', url, idempotent=True)
 
             if response.status_code == 200:
                 result = response.json()
@@ -737,7 +944,7 @@ class WordPressPagePusher:
         url = f"{self.wordpress_url}/wp-json/gravel-god/v1/regenerate-css-bulk"
 
         try:
-            response = self.session.post(url, json={'post_ids': page_ids})
+            response = self._request('POST', url, json={'post_ids': page_ids}, idempotent=True)
 
             if response.status_code == 200:
                 result = response.json()
@@ -765,7 +972,7 @@ class WordPressPagePusher:
         url = f"{self.api_url}/pages/{page_id}"
         params = {'force': force} if force else {}
         
-        response = self.session.delete(url, params=params)
+        response = self._request('DELETE', url, params=params)
         
         if response.status_code in [200, 202]:
             return True
@@ -786,18 +993,42 @@ class WordPressPagePusher:
         """
         url = f"{self.api_url}/pages/{page_id}"
         
-        response = self.session.post(url, json=page_data)
+        # POST to an existing page ID overwrites it, so repeating is safe
+        response = self._request('POST', url, json=page_data, idempotent=True)
         response.raise_for_status()
         
         return response.json()
     
-    def push_race_page(self, race_data: Dict[str, Any], template: Dict[str, Any]) -> Dict[str, Any]:
+    def patch_page(self, page_id: int, page_data: Dict[str, Any], skip_validation: bool = False) -> Dict[str, Any]:
+        """
+        Update an existing page in place with a formatted payload (HTTP PATCH).
+        
+        Args:
+            page_id: WordPress page ID
+            page_data: Page data (as produced by replace_placeholders)
+            skip_validation: If True, skip pre-push validation (NOT RECOMMENDED)
+            
+        Returns:
+            Updated page data from WordPress API
+            
+        Raises:
+            requests.HTTPError: On non-2xx responses (404 if the page was deleted)
+        """
+        self.validate_before_push(page_data, skip_validation)
+        url = f"{self.api_url}/pages/{page_id}"
+        response = self._request('PATCH', url, json=self._format_page_data(page_data))
+        response.raise_for_status()
+        return response.json()
+    
+    def push_race_page(self, race_data: Dict[str, Any], template: Dict[str, Any],
+                       regenerate_css: bool = True) -> Dict[str, Any]:
         """
         Push a single race page to WordPress.
         
         Args:
             race_data: Race data from database
             template: Template JSON with placeholders
+            regenerate_css: Regenerate Elementor CSS for newly created pages
             
         Returns:
             Created/updated page data
@@ -811,7 +1042,7 @@ class WordPressPagePusher:
             return self.update_page(page_data['id'], page_data)
         else:
             # Create new page
-            return self.create_page(page_data)
+            return self.create_page(page_data, regenerate_css=regenerate_css)
     
     def dry_run(self, races: List[Dict[str, Any]], template: Dict[str, Any]) -> List[Dict[str, Any]]:
         """
@@ -876,40 +1107,148 @@ class WordPressPagePusher:
         
         return results
     
-    def batch_push(self, races: List[Dict[str, Any]], template: Dict[str, Any]) -> List[Dict[str, Any]]:
+    @staticmethod
+    def _race_name(race_data: Dict[str, Any]) -> str:
+        race = race_data.get('race', race_data)
+        return race.get('name') or race_data.get('RACE_NAME') or race_data.get('race_name', 'Unknown')
+    
+    def _push_for_batch(self, race_data: Dict[str, Any], template: Dict[str, Any],
+                        manifest: Optional[PushManifest] = None) -> Dict[str, Any]:
+        """
+        Push one race without per-page CSS regeneration; return a batch result entry.
+        
+        With a manifest, pages whose payload hash is unchanged are skipped and
+        previously pushed pages are PATCHed in place instead of re-created.
+        """
+        race_name = self._race_name(race_data)
+        try:
+            if manifest is None:
+                action = 'updated' if template.get('id') else 'created'
+                result = self.push_race_page(race_data, template, regenerate_css=False)
+            else:
+                page_data = self.replace_placeholders(template, race_data)
+                slug = self._race_slug(race_data)
+                content_hash = PushManifest.content_hash(self._format_page_data(page_data))
+                entry = manifest.get(slug)
+                
+                if entry and entry.get('hash') == content_hash:
+                    print(f"= Unchanged: {race_name}")
+                    return {
+                        'race': race_name,
+                        'status': 'skipped',
+                        'action': 'unchanged',
+                        'page_id': entry.get('page_id'),
+                    }
+                
+                result = None
+                if page_data.get('id'):
+                    action = 'updated'
+                    result = self.update_page(page_data['id'], page_data)
+                elif entry and entry.get('page_id'):
+                    action = 'updated'
+                    try:
+                        result = self.patch_page(entry['page_id'], page_data)
+                    except requests.HTTPError as e:
+                        if e.response is None or e.response.status_code != 404:
+                            raise
+                        print(f"⚠ Page {entry['page_id']} for {race_name} no longer exists - recreating")
+                if result is None:
+                    action = 'created'
+                    result = self.create_page(page_data, regenerate_css=False)
+                manifest.record(slug, result.get('id'), content_hash)
+            
+            print(f"✓ Pushed: {result.get('title', {}).get('rendered', 'Unknown')}")
+            return {
+                'race': race_name,
+                'status': 'success',
+                'action': action,
+                'page_id': result.get('id'),
+                'page_url': result.get('link'),
+            }
+        except Exception as e:
+            print(f"✗ Error pushing race: {e}")
+            return {
+                'race': race_name,
+                'status': 'error',
+                'error': str(e)
+            }
+    
+    def regenerate_css_batched(self, page_ids: List[int], batch_size: int = 20) -> Dict[int, bool]:
+        """
+        Regenerate Elementor CSS for many pages via the bulk endpoint.
+        
+        Page IDs are sent in chunks of batch_size. If a bulk call fails
+        (e.g. older plugin without the bulk route), that chunk falls back to
+        per-page regeneration.
+        
+        Returns:
+            Dict mapping page ID to whether its regeneration request succeeded
+        """
+        status = {}
+        for i in range(0, len(page_ids), batch_size):
+            chunk = page_ids[i:i + batch_size]
+            result = self.regenerate_elementor_css_bulk(chunk)
+            if result.get('success') is False:
+                for page_id in chunk:
+                    status[page_id] = self.regenerate_elementor_css(page_id).get('success', True) is not False
+                continue
+            for page_id in chunk:
+                status[page_id] = True
+        return status
+    
+    def batch_push(self, races: List[Dict[str, Any]], template: Dict[str, Any],
+                   workers: int = 1, regenerate_css: bool = True, css_batch_size: int = 20,
+                   manifest: Optional[PushManifest] = None) -> List[Dict[str, Any]]:
         """
         Push multiple race pages.
         
+        Pages are pushed over a bounded thread pool sharing this pusher's
+        session (size the connection pool to at least `workers`). Elementor
+        CSS for created pages is regenerated afterwards in bulk batches
+        instead of one request per page.
+        
+        With a manifest, unchanged pages are skipped, changed ones are
+        PATCHed in place (and get CSS regenerated too), and the manifest is
+        saved at the end.
+        
         Args:
             races: List of race data dictionaries
             template: Template JSON with placeholders
+            workers: Concurrent push threads (1 = serial)
+            regenerate_css: Regenerate Elementor CSS for created pages
+            css_batch_size: Page IDs per bulk CSS regeneration request
+            manifest: Optional PushManifest for incremental pushes
             
         Returns:
-            List of created/updated page data
+            List of created/updated page data, in input order
         """
-        results = []
+        try:
+            if workers <= 1:
+                results = [self._push_for_batch(race_data, template, manifest) for race_data in races]
+            else:
+                results = [None] * len(races)
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    futures = {
+                        executor.submit(self._push_for_batch, race_data, template, manifest): i
+                        for i, race_data in enumerate(races)
+                    }
+                    for future in as_completed(futures):
+                        results[futures[future]] = future.result()
+        finally:
+            if manifest is not None:
+                manifest.save()
         
-        for race_data in races:
-            try:
-                result = self.push_race_page(race_data, template)
-                race = race_data.get('race', race_data)
-                race_name = race.get('name') or race_data.get('RACE_NAME') or race_data.get('race_name', 'Unknown')
-                results.append({
-                    'race': race_name,
-                    'status': 'success',
-                    'page_id': result.get('id'),
-                    'page_url': result.get('link')
-                })
-                print(f"✓ Pushed: {result.get('title', {}).get('rendered', 'Unknown')}")
-            except Exception as e:
-                race = race_data.get('race', race_data)
-                race_name = race.get('name') or race_data.get('RACE_NAME') or race_data.get('race_name', 'Unknown')
-                results.append({
-                    'race': race_name,
-                    'status': 'error',
-                    'error': str(e)
-                })
-                print(f"✗ Error pushing race: {e}")
+        if regenerate_css:
+            # Manifest-driven updates change _elementor_data, so they need fresh CSS too
+            css_actions = {'created', 'updated'} if manifest is not None else {'created'}
+            page_ids = [r['page_id'] for r in results
+                        if r['status'] == 'success' and r.get('action') in css_actions and r.get('page_id')]
+            if page_ids:
+                print(f"🎨 Regenerating Elementor CSS for {len(page_ids)} page(s)...")
+                css_status = self.regenerate_css_batched(page_ids, css_batch_size)
+                for r in results:
+                    if r.get('page_id') in css_status:
+                        r['css_regenerated'] = css_status[r['page_id']]
         
         return results
 
@@ -951,6 +1290,13 @@ def main():
     parser.add_argument('--dry-run', action='store_true', help='Dry run: show replacements without pushing')
     parser.add_argument('--test-connection', action='store_true', help='Test WordPress connection only')
     parser.add_argument('--delete-pages', nargs='+', type=int, metavar='ID', help='Delete pages by ID (e.g., --delete-pages 4794 4795 4796)')
+    parser.add_argument('--workers', type=int, default=4, help='Concurrent push threads (default: 4, 1 = serial)')
+    parser.add_argument('--rate-limit', type=float, default=None, metavar='RPS', help='Max API requests per second across all workers')
+    parser.add_argument('--max-retries', type=int, default=3, help='Retries on 429/5xx and connection errors (default: 3)')
+    parser.add_argument('--manifest', default='push_manifest.json', help='Push manifest path for incremental pushes (default: push_manifest.json)')
+    parser.add_argument('--no-manifest', action='store_true', help='Ignore the push manifest: create every page')
+    parser.add_argument('--force', action='store_true', help='Push every page even if unchanged (manifest is still updated)')
+    parser.add_argument('--css-batch-size', type=int, default=20, help='Page IDs per bulk CSS regeneration request (default: 20)')
     
     args = parser.parse_args()
     
@@ -1045,11 +1391,22 @@ def main():
         )
     
     # Initialize pusher
-    pusher = WordPressPagePusher(wordpress_url, username, password)
+    pusher = WordPressPagePusher(wordpress_url, username, password,
+                                 pool_size=max(10, args.workers),
+                                 max_retries=args.max_retries,
+                                 requests_per_second=args.rate_limit)
     
     # Push pages
-    print(f"🚀 Pushing {len(races)} race pages to WordPress...")
-    results = pusher.batch_push(races, template)
+    print(f"🚀 Pushing {len(races)} race pages to WordPress ({args.workers} worker(s))...")
+    manifest = None
+    if not args.no_manifest:
+        manifest = PushManifest(args.manifest, wordpress_url)
+        if args.force:
+            # Keep page IDs (so pages are updated, not duplicated) but drop hashes
+            for entry in manifest.pages.values():
+                entry['hash'] = None
+    results = pusher.batch_push(races, template, workers=args.workers,
+                                css_batch_size=args.css_batch_size, manifest=manifest)
     
     # Print summary
     success_count = sum(1 for r in results if r['status'] == 'success')
@@ -1057,6 +1414,9 @@ def main():
     
     print(f"\n📊 Summary:")
     print(f"  ✓ Success: {success_count}")
+    if manifest is not None:
+        for action, label in [('created', 'Created'), ('updated', 'Updated'), ('unchanged', 'Unchanged (skipped)')]:
+            print(f"    {label}: {sum(1 for r in results if r.get('action') == action)}")
     print(f"  ✗ Errors: {error_count}")
     
     # Save results
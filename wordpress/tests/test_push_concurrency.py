@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Tests for concurrent batch push against a local stub WordPress server.
+
+Tests:
+1. Concurrent batch push creates every page, results in input order
+2. 429/5xx responses are retried with backoff; page creation only on 429
+3. Created pages get CSS regenerated in bulk batches
+4. Bulk endpoint failure falls back to per-page regeneration
+5. Token bucket rate limiting
+6. Push manifest: unchanged pages skipped, changed pages PATCHed
+"""
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+# Add parent directory for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+try:
+    import requests
+    from push_pages import WordPressPagePusher, TokenBucket, PushManifest, parse_retry_after
+    HAS_REQUESTS = True
+except ImportError:
+    HAS_REQUESTS = False
+
+
+class StubWordPress(BaseHTTPRequestHandler):
+    """Minimal WordPress REST API: page creation and CSS regeneration routes."""
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body):
+        payload = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        if status == 429:
+            self.send_header('Retry-After', '0')
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_POST(self):
+        state = self.server.state
+        length = int(self.headers.get('Content-Length', 0))
+        body = json.loads(self.rfile.read(length) or b'{}')
+
+        with state['lock']:
+            state['requests'].append(self.path)
+            failures = state['fail_next'].get(self.path, [])
+            status = failures.pop(0) if failures else None
+        if status:
+            self._send(status, {'message': 'try again'})
+            return
+
+        if self.path == '/wp-json/wp/v2/pages':
+            with state['lock']:
+                state['next_id'] += 1
+                page_id = state['next_id']
+            time.sleep(0.05)  # Simulated server latency
+            self._send(201, {'id': page_id, 'link': f'https://stub/{page_id}',
+                             'title': {'rendered': body.get('title', '')}})
+        elif self.path == '/wp-json/gravel-god/v1/regenerate-css-bulk':
+            if state['bulk_missing']:
+                self._send(404, {'message': 'No route'})
+                return
+            with state['lock']:
+                state['bulk_calls'].append(body['post_ids'])
+            self._send(200, {'success_count': len(body['post_ids']), 'error_count': 0})
+        elif self.path.startswith('/wp-json/gravel-god/v1/regenerate-css/'):
+            with state['lock']:
+                state['single_calls'].append(int(self.path.rsplit('/', 1)[1]))
+            self._send(200, {'success': True})
+        else:
+            self._send(404, {'message': 'No route'})
+
+    def do_PATCH(self):
+        state = self.server.state
+        length = int(self.headers.get('Content-Length', 0))
+        body = json.loads(self.rfile.read(length) or b'{}')
+        page_id = int(self.path.rsplit('/', 1)[1])
+
+        with state['lock']:
+            state['requests'].append(f'PATCH {self.path}')
+            exists = page_id <= state['next_id'] and page_id not in state['deleted']
+        if not exists:
+            self._send(404, {'code': 'rest_post_invalid_id'})
+            return
+        self._send(200, {'id': page_id, 'link': f'https://stub/{page_id}',
+                         'title': {'rendered': body.get('title', '')}})
+
+
+class StubServerTestCase(unittest.TestCase):
+    """Runs a StubWordPress server and a pusher pointed at it."""
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), StubWordPress)
+        self.server.state = {
+            'lock': threading.Lock(),
+            'next_id': 1000,
+            'requests': [],
+            'fail_next': {},
+            'bulk_calls': [],
+            'single_calls': [],
+            'bulk_missing': False,
+            'deleted': set(),
+        }
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        url = f'http://127.0.0.1:{self.server.server_address[1]}'
+        self.pusher = WordPressPagePusher(url, 'user', 'pass', pool_size=8, backoff_factor=0.01)
+        self.template = {'title': '{{RACE_NAME}}', 'content': 'Guide to {{RACE_NAME}}'}
+        self.races = [{'race': {'name': f'Race {i}'}} for i in range(12)]
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@unittest.skipUnless(HAS_REQUESTS, "requests not installed")
+class TestConcurrentBatchPush(StubServerTestCase):
+    """Test batch_push against a local stub server."""
+
+    def test_concurrent_push_creates_all_pages_in_order(self):
+        """All races pushed; results keep input order."""
+        results = self.pusher.batch_push(self.races, self.template, workers=6)
+        self.assertEqual([r['race'] for r in results], [f'Race {i}' for i in range(12)])
+        self.assertTrue(all(r['status'] == 'success' for r in results))
+        self.assertEqual(len({r['page_id'] for r in results}), 12)
+
+    def test_retries_on_429_and_5xx(self):
+        """Transient 429/503 responses on an idempotent POST are retried until success."""
+        self.server.state['fail_next']['/wp-json/gravel-god/v1/regenerate-css-bulk'] = [429, 503]
+        results = self.pusher.batch_push(self.races[:1], self.template)
+        self.assertEqual(results[0]['status'], 'success')
+        self.assertEqual(len(self.server.state['bulk_calls']), 1)
+        bulk_posts = [p for p in self.server.state['requests']
+                      if p == '/wp-json/gravel-god/v1/regenerate-css-bulk']
+        self.assertEqual(len(bulk_posts), 3)
+
+    def test_page_creation_retried_on_429_only(self):
+        """A 429 is retried for page creation; a 5xx is not, to avoid duplicate pages."""
+        self.server.state['fail_next']['/wp-json/wp/v2/pages'] = [429, 503]
+        results = self.pusher.batch_push(self.races[:1], self.template, regenerate_css=False)
+        self.assertEqual(results[0]['status'], 'error')
+        self.assertIn('503', results[0]['error'])
+        page_posts = [p for p in self.server.state['requests'] if p == '/wp-json/wp/v2/pages']
+        self.assertEqual(len(page_posts), 2)
+
+    def test_page_creation_retried_when_connection_refused(self):
+        """Connections refused before sending are safe to retry even for POST."""
+        self.server.server_close()
+        url = f'http://127.0.0.1:{self.server.server_address[1]}'
+        pusher = WordPressPagePusher(url, 'user', 'pass', max_retries=2, backoff_factor=0.0)
+        attempts = []
+        send = pusher.session.request
+        pusher.session.request = lambda *a, **kw: attempts.append(a) or send(*a, **kw)
+        with self.assertRaises(requests.ConnectionError):
+            pusher.create_page({'title': 'Race 0', 'content': 'Guide to Race 0'})
+        self.assertEqual(len(attempts), 3)
+
+    def test_gives_up_after_max_retries(self):
+        """Persistent 5xx is reported as an error after max_retries."""
+        self.pusher.max_retries = 1
+        self.server.state['bulk_missing'] = True
+        self.server.state['fail_next']['/wp-json/gravel-god/v1/regenerate-css/1001'] = [500, 500, 500]
+        results = self.pusher.batch_push(self.races[:1], self.template)
+        self.assertFalse(results[0]['css_regenerated'])
+        self.assertEqual(self.server.state['fail_next']['/wp-json/gravel-god/v1/regenerate-css/1001'], [500])
+
+    def test_css_regenerated_in_bulk_batches(self):
+        """Created page IDs are batched into the bulk CSS endpoint."""
+        results = self.pusher.batch_push(self.races, self.template, workers=4, css_batch_size=5)
+        bulk_calls = self.server.state['bulk_calls']
+        self.assertEqual([len(c) for c in bulk_calls], [5, 5, 2])
+        self.assertEqual(sorted(i for c in bulk_calls for i in c), sorted(r['page_id'] for r in results))
+        self.assertEqual(self.server.state['single_calls'], [])
+        self.assertTrue(all(r['css_regenerated'] for r in results))
+
+    def test_bulk_failure_falls_back_to_single_regeneration(self):
+        """Without the bulk route, each page is regenerated individually."""
+        self.server.state['bulk_missing'] = True
+        results = self.pusher.batch_push(self.races[:3], self.template, workers=3)
+        self.assertEqual(sorted(self.server.state['single_calls']), sorted(r['page_id'] for r in results))
+
+
+@unittest.skipUnless(HAS_REQUESTS, "requests not installed")
+class TestIncrementalPush(StubServerTestCase):
+    """Test manifest-driven incremental pushes."""
+
+    def setUp(self):
+        super().setUp()
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.manifest_path = os.path.join(self.tmpdir.name, 'push_manifest.json')
+        self.races = self.races[:4]
+
+    def tearDown(self):
+        super().tearDown()
+        self.tmpdir.cleanup()
+
+    def _push(self, races):
+        manifest = PushManifest(self.manifest_path, self.pusher.wordpress_url)
+        return self.pusher.batch_push(races, self.template, workers=2, manifest=manifest)
+
+    def _page_requests(self):
+        return [p for p in self.server.state['requests'] if 'wp/v2/pages' in p]
+
+    def test_unchanged_pages_are_skipped(self):
+        """Second push of identical content makes no page requests."""
+        first = self._push(self.races)
+        self.assertEqual({r['action'] for r in first}, {'created'})
+        self.server.state['requests'].clear()
+
+        second = self._push(self.races)
+        self.assertEqual({r['action'] for r in second}, {'unchanged'})
+        self.assertEqual(self._page_requests(), [])
+        self.assertEqual([r['page_id'] for r in second], [r['page_id'] for r in first])
+
+    def test_changed_page_is_patched(self):
+        """Only the changed race is PATCHed, in place, and gets CSS regenerated."""
+        first = self._push(self.races)
+        self.server.state['requests'].clear()
+        self.server.state['bulk_calls'].clear()
+
+        # Same slug, different rendered title
+        changed = list(self.races)
+        changed[2] = {'race': {'name': 'Race 2 (Updated)', 'slug': 'race-2'}}
+        results = self._push(changed)
+        self.assertEqual([r['action'] for r in results], ['unchanged', 'unchanged', 'updated', 'unchanged'])
+        self.assertEqual(results[2]['page_id'], first[2]['page_id'])
+        self.assertEqual(self._page_requests(), [f"PATCH /wp-json/wp/v2/pages/{first[2]['page_id']}"])
+        self.assertEqual(self.server.state['bulk_calls'], [[first[2]['page_id']]])
+
+    def test_deleted_page_is_recreated(self):
+        """A PATCH 404 falls back to creating the page again."""
+        first = self._push(self.races[:1])
+        self.server.state['deleted'].add(first[0]['page_id'])
+        results = self._push([{'race': {'name': 'Race 0 (Updated)', 'slug': 'race-0'}}])
+        self.assertEqual(results[0]['action'], 'created')
+        self.assertNotEqual(results[0]['page_id'], first[0]['page_id'])
+
+    def test_manifest_ignored_for_other_site(self):
+        """Entries recorded for one site are not trusted for another."""
+        self._push(self.races[:1])
+        other = PushManifest(self.manifest_path, 'https://other.example.com')
+        self.assertEqual(other.pages, {})
+
+
+@unittest.skipUnless(HAS_REQUESTS, "requests not installed")
+class TestRetryAfter(unittest.TestCase):
+    """Retry-After header parsing."""
+
+    def test_delay_seconds(self):
+        self.assertEqual(parse_retry_after('7'), 7.0)
+
+    def test_http_date(self):
+        from email.utils import formatdate
+        delay = parse_retry_after(formatdate(time.time() + 20, usegmt=True))
+        self.assertGreater(delay, 15)
+        self.assertLessEqual(delay, 20)
+
+    def test_past_date_and_garbage(self):
+        self.assertEqual(parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT'), 0.0)
+        self.assertIsNone(parse_retry_after('soon'))
+        self.assertIsNone(parse_retry_after(None))
+
+
+@unittest.skipUnless(HAS_REQUESTS, "requests not installed")
+class TestTokenBucket(unittest.TestCase):
+    """Test token bucket rate limiting."""
+
+    def test_burst_then_throttle(self):
+        """Burst up to capacity is immediate; further tokens wait for refill."""
+        bucket = TokenBucket(rate=50, capacity=5)
+        start = time.monotonic()
+        for _ in range(5):
+            bucket.acquire()
+        self.assertLess(time.monotonic() - start, 0.05)
+        for _ in range(5):
+            bucket.acquire()
+        self.assertGreaterEqual(time.monotonic() - start, 0.08)
+
+    def test_rejects_non_positive_rate(self):
+        """Rate must be positive."""
+        with self.assertRaises(ValueError):
+            TokenBucket(rate=0)
+
+
+if __name__ == '__main__':
+    unittest.main()